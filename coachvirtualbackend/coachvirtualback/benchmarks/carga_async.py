@@ -0,0 +1,84 @@
+"""
+Prueba de carga: throughput y latencia (p50/p99) con concurrencia creciente.
+
+Compara cuántos requests simultáneos aguanta un worker con el perfil WSGI
+(hilos sync) y con el perfil ASGI (uvicorn) en los endpoints que esperan a
+servicios externos (Google Fit, Stripe). Ejemplo con un solo worker:
+
+    # Antes: worker sync
+    gunicorn -c gunicorn.conf.py -w 1 -b 127.0.0.1:8000
+    python benchmarks/carga_async.py --token <access_jwt>
+
+    # Después: worker uvicorn
+    SERVIDOR_PERFIL=asgi gunicorn -c gunicorn.conf.py -w 1 -b 127.0.0.1:8000
+    python benchmarks/carga_async.py --token <access_jwt>
+
+Por defecto consulta /api/dispositivo/googlefit/ con niveles de concurrencia
+1, 10, 50, 100, 250 y 500.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+async def _usuario(cliente, url, headers, fin, latencias, errores):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            respuesta = await cliente.get(url, headers=headers)
+            if respuesta.status_code >= 400:
+                errores.append(respuesta.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errores.append(type(e).__name__)
+            continue
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def medir_nivel(url, token, concurrencia, duracion):
+    """Mantiene `concurrencia` requests en vuelo durante `duracion` segundos."""
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    latencias, errores = [], []
+    async with httpx.AsyncClient(limits=limites, timeout=60) as cliente:
+        fin = time.perf_counter() + duracion
+        await asyncio.gather(*(
+            _usuario(cliente, url, headers, fin, latencias, errores) for _ in range(concurrencia)
+        ))
+    return latencias, errores
+
+
+async def main_async(args):
+    niveles = [int(n) for n in args.niveles.split(',')]
+    print(f"URL: {args.url}")
+    print(f"{'concurrencia':>12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for concurrencia in niveles:
+        latencias, errores = await medir_nivel(args.url, args.token, concurrencia, args.duracion)
+        if not latencias:
+            print(f"{concurrencia:>12} {'-':>9} {'-':>9} {'-':>9} {len(errores):>8}")
+            continue
+        print(
+            f"{concurrencia:>12} {len(latencias) / args.duracion:>9.1f} "
+            f"{percentil(latencias, 50):>9.1f} {percentil(latencias, 99):>9.1f} {len(errores):>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/dispositivo/googlefit/')
+    parser.add_argument('--token', default='', help='Access token JWT')
+    parser.add_argument('--niveles', default='1,10,50,100,250,500', help='Niveles de concurrencia')
+    parser.add_argument('--duracion', type=float, default=10, help='Segundos por nivel')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
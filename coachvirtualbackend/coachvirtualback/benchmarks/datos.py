@@ -0,0 +1,138 @@
+"""
+Generadores de datos para la suite de benchmarks (benchmarks/suite.py).
+
+Todo sale de un random.Random con semilla, así dos corridas con los mismos
+parámetros cargan exactamente los mismos datos. Se insertan con bulk_create
+y la contraseña se hashea una sola vez para todos los usuarios.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from dispositivo.simulador import SimuladorFitness
+from poses.models import PoseTrainingData
+from suscripciones.models import MetodoPago, TipoPlan
+from suscripciones.services.catalogo import invalidar_catalogo
+from usuarios.models import Alertas, Usuario
+
+
+PASSWORD = 'bench-pass-123'
+EJERCICIOS = ('flexion', 'sentadilla', 'plancha', 'abdominal', 'zancada')
+LOTE = 1000
+
+
+def email_usuario(i):
+    return f'bench{i}@coachvirtual.test'
+
+
+def crear_catalogo(rnd, planes=3, metodos=3):
+    """Planes (gratis, basico, premium y extras) y métodos de pago."""
+    base = [('gratis', 0, 15), ('basico', 25, 45), ('premium', 49, -1)]
+    filas = []
+    for i in range(planes):
+        clave, precio, minutos = base[i] if i < len(base) else (f'plan{i}', rnd.randint(10, 100), rnd.choice((30, 60, -1)))
+        filas.append(TipoPlan(
+            nombre=clave.title(), clave=clave, precio=precio, minutos_por_dia=minutos,
+            descripcion=f'Plan {clave} generado para benchmarks', orden=i,
+            feedback_voz=precio > 0, analisis_angulos=precio > 0, historial_dias=-1 if precio > 40 else 7,
+        ))
+    TipoPlan.objects.bulk_create(filas)
+    MetodoPago.objects.bulk_create([
+        MetodoPago(nombre=f'Método {i}', clave=f'metodo{i}', orden=i, instrucciones='Instrucciones ' * 10)
+        for i in range(metodos)
+    ])
+    invalidar_catalogo()
+
+
+def crear_usuarios(rnd, n):
+    """n usuarios con planes y fechas de última sesión variadas."""
+    password = make_password(PASSWORD)
+    ahora = timezone.now()
+    planes = ('gratis', 'gratis', 'basico', 'premium')
+    usuarios = []
+    for i in range(n):
+        plan = rnd.choice(planes)
+        usuarios.append(Usuario(
+            username=f'bench{i}', email=email_usuario(i), password=password,
+            plan_actual=plan,
+            fecha_expiracion_plan=ahora + timedelta(days=rnd.randint(-5, 30)) if plan != 'gratis' else None,
+            ultima_sesion=(ahora - timedelta(days=rnd.randint(0, 10))).date(),
+        ))
+    Usuario.objects.bulk_create(usuarios, batch_size=LOTE)
+    return list(Usuario.objects.filter(email__endswith='@coachvirtual.test').order_by('id'))
+
+
+def crear_alertas(rnd, usuarios, por_usuario):
+    """por_usuario alertas por usuario, con fechas de los últimos 30 días."""
+    ahora = timezone.now()
+    alertas = [
+        Alertas(
+            usuario=usuario, mensaje=f'Alerta {j} de benchmark',
+            fecha=ahora - timedelta(minutes=rnd.randint(0, 30 * 24 * 60)),
+            estado=rnd.random() < 0.7,
+        )
+        for usuario in usuarios for j in range(por_usuario)
+    ]
+    Alertas.objects.bulk_create(alertas, batch_size=LOTE)
+
+
+def landmarks(rnd, n=33):
+    return [
+        {'x': rnd.random(), 'y': rnd.random(), 'z': rnd.uniform(-1, 1), 'visibility': rnd.random()}
+        for _ in range(n)
+    ]
+
+
+def angulos(rnd):
+    return {nombre: round(rnd.uniform(0, 180), 2) for nombre in ('codo_izq', 'codo_der', 'rodilla_izq', 'rodilla_der', 'cadera')}
+
+
+def pose_secuencia(rnd, frames):
+    """Payload de una secuencia como la envía el entrenador del frontend."""
+    return {
+        'ejercicio': rnd.choice(EJERCICIOS),
+        'tipo': 'secuencia',
+        'frames': [
+            {'landmarks': landmarks(rnd), 'angulos': angulos(rnd), 'timestamp': i * 33}
+            for i in range(frames)
+        ],
+        'duracion_segundos': frames / 30,
+        'fps': 30,
+        'total_frames': frames,
+        'etiqueta': rnd.choice(('correcto', 'incorrecto')),
+    }
+
+
+def crear_poses(rnd, n, frames):
+    """n registros: mitad snapshots, mitad secuencias de `frames` frames."""
+    poses = []
+    for i in range(n):
+        if i % 2:
+            datos = pose_secuencia(rnd, frames)
+        else:
+            datos = {
+                'ejercicio': rnd.choice(EJERCICIOS), 'tipo': 'snapshot',
+                'landmarks': landmarks(rnd), 'angulos': angulos(rnd),
+                'etiqueta': rnd.choice(('correcto', 'incorrecto')),
+            }
+        poses.append(PoseTrainingData(**datos))
+    PoseTrainingData.objects.bulk_create(poses, batch_size=100)
+
+
+def crear_fitness(semilla, usuarios, dias):
+    """Serie de fitness por hora y resúmenes diarios/semanales de los últimos `dias` días."""
+    if dias <= 0:
+        return
+    ahora = timezone.localtime()
+    SimuladorFitness(semilla).escribir([u.id for u in usuarios], ahora.date() - timedelta(days=dias - 1), ahora)
+
+
+def cargar(rnd, usuarios, alertas_por_usuario, poses, frames, planes, dias_fitness=0, semilla=0):
+    """Carga el dataset completo y retorna los usuarios creados."""
+    crear_catalogo(rnd, planes)
+    creados = crear_usuarios(rnd, usuarios)
+    crear_alertas(rnd, creados, alertas_por_usuario)
+    crear_poses(rnd, poses, frames)
+    crear_fitness(semilla, creados, dias_fitness)
+    return creados
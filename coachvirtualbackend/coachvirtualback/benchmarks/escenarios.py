@@ -0,0 +1,100 @@
+"""
+Escenarios de la suite de benchmarks (benchmarks/suite.py).
+
+Cada escenario es una función (contexto, i) que hace UNA operación: un
+request al stack completo de Django (middleware, auth JWT, DRF) o, en
+`notificaciones_todos`, una corrida del motor para todos los usuarios. Los
+payloads se preparan antes de medir para no contar su generación.
+"""
+import json
+
+from poses import renderers as poses_renderers
+from suscripciones.services.tokens import emitir_tokens
+from usuarios.services.notification_engine import run_notifications_for_all_users
+
+from datos import PASSWORD, pose_secuencia
+
+
+class Contexto:
+    """Estado compartido por los escenarios: cliente, usuarios, tokens y payloads."""
+
+    def __init__(self, cliente, usuarios, rnd, frames):
+        self.cliente = cliente
+        self.usuarios = usuarios
+        self.tokens = [emitir_tokens(usuario)['access'] for usuario in usuarios]
+        secuencia = pose_secuencia(rnd, frames)
+        self.pose_json = json.dumps(secuencia).encode()
+        self.pose_msgpack = poses_renderers.dumps(secuencia)
+        self.ultima_alerta = {}
+
+    def auth(self, i):
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.tokens[i % len(self.tokens)]}'}
+
+
+def login(ctx, i):
+    usuario = ctx.usuarios[i % len(ctx.usuarios)]
+    return ctx.cliente.post(
+        '/api/token/', {'email': usuario.email, 'password': PASSWORD}, content_type='application/json',
+    )
+
+
+def catalogo(ctx, i):
+    ruta = '/api/suscripciones/tipos-plan/' if i % 2 == 0 else '/api/suscripciones/metodos-pago/'
+    return ctx.cliente.get(ruta)
+
+
+def alertas_polling(ctx, i):
+    """El frontend consulta las alertas nuevas desde la última que vio."""
+    indice = i % len(ctx.usuarios)
+    since = ctx.ultima_alerta.get(indice, 0)
+    respuesta = ctx.cliente.get('/api/alertas/mis-alertas/ultimas/', {'since': since}, **ctx.auth(indice))
+    if respuesta.status_code == 200 and respuesta.json():
+        ctx.ultima_alerta[indice] = respuesta.json()[-1]['id']
+    return respuesta
+
+
+def poses_export(ctx, i):
+    return ctx.cliente.get('/api/poses/export/', {'formato': 'ml'})
+
+
+def poses_ingesta(ctx, i):
+    return ctx.cliente.post('/api/poses/', ctx.pose_json, content_type='application/json')
+
+
+def poses_ingesta_msgpack(ctx, i):
+    return ctx.cliente.post(
+        '/api/poses/', ctx.pose_msgpack,
+        content_type=poses_renderers.MEDIA_TYPE, HTTP_ACCEPT=poses_renderers.MEDIA_TYPE,
+    )
+
+
+def fitness_serie(ctx, i):
+    """Gráfico semanal (por día) del dashboard, leído de los rollups."""
+    return ctx.cliente.get('/api/dispositivo/serie/', {'periodo': 'dia'}, **ctx.auth(i))
+
+
+def fitness_hoy(ctx, i):
+    return ctx.cliente.get('/api/dispositivo/googlefit/', **ctx.auth(i))
+
+
+def notificaciones(ctx, i):
+    return ctx.cliente.post('/api/alertas/check/', **ctx.auth(i))
+
+
+def notificaciones_todos(ctx, i):
+    run_notifications_for_all_users()
+
+
+# nombre -> (función, fracción de --iteraciones que se ejecuta)
+ESCENARIOS = {
+    'login': (login, 0.2),
+    'catalogo': (catalogo, 1.0),
+    'alertas_polling': (alertas_polling, 1.0),
+    'poses_export': (poses_export, 0.05),
+    'poses_ingesta': (poses_ingesta, 0.2),
+    'poses_ingesta_msgpack': (poses_ingesta_msgpack, 0.2),
+    'fitness_serie': (fitness_serie, 1.0),
+    'fitness_hoy': (fitness_hoy, 0.5),
+    'notificaciones': (notificaciones, 0.5),
+    'notificaciones_todos': (notificaciones_todos, 0.02),
+}
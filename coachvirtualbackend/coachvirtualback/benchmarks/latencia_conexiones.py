@@ -0,0 +1,64 @@
+"""
+Benchmark de latencia (p50/p99) de un endpoint trivial con acceso a la BD.
+
+Sirve para comparar la configuración de conexiones de `settings.py` contra un
+servidor corriendo con gunicorn. Ejemplo (antes / después):
+
+    # Antes: una conexión nueva por request
+    DB_CONN_MAX_AGE=0 gunicorn coachvirtualback.wsgi:application -b 127.0.0.1:8000
+    python benchmarks/latencia_conexiones.py --token <access_jwt>
+
+    # Después: conexiones persistentes o pool de psycopg
+    DB_CONN_MAX_AGE=60 gunicorn coachvirtualback.wsgi:application -b 127.0.0.1:8000
+    DB_POOL=True gunicorn coachvirtualback.wsgi:application -b 127.0.0.1:8000
+    python benchmarks/latencia_conexiones.py --token <access_jwt>
+
+Por defecto consulta /api/usuarios/me/, que carga el usuario del JWT.
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def medir(url, token, n, calentamiento):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    # Una sesión HTTP con keep-alive: solo se mide el costo del lado del servidor
+    with requests.Session() as sesion:
+        for _ in range(calentamiento):
+            sesion.get(url, headers=headers)
+
+        latencias = []
+        for _ in range(n):
+            inicio = time.perf_counter()
+            respuesta = sesion.get(url, headers=headers)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            respuesta.raise_for_status()
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/usuarios/me/')
+    parser.add_argument('--token', default='', help='Access token JWT')
+    parser.add_argument('-n', type=int, default=500, help='Número de requests medidos')
+    parser.add_argument('--calentamiento', type=int, default=20)
+    args = parser.parse_args()
+
+    latencias = medir(args.url, args.token, args.n, args.calentamiento)
+    print(f"URL: {args.url}")
+    print(f"Requests: {len(latencias)}")
+    print(f"p50: {percentil(latencias, 50):.2f} ms")
+    print(f"p99: {percentil(latencias, 99):.2f} ms")
+    print(f"media: {statistics.mean(latencias):.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
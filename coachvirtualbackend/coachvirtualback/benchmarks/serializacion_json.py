@@ -0,0 +1,109 @@
+"""
+Benchmark de serialización: JSONRenderer de DRF vs ORJSONRenderer (core.renderers).
+
+Genera respuestas con la forma de los endpoints que más pesan y mide solo el
+tiempo de encode (sin BD ni red):
+- export ML de poses (/api/poses/export/?formato=ml): N samples con 33
+  landmarks (x, y, z, visibility) y ángulos
+- listado de poses (/api/poses/): registros serializados con fechas
+- catálogo de planes (/api/suscripciones/tipos-plan/): pocos dicts con Decimal
+
+    python benchmarks/serializacion_json.py --samples 5000 --repeticiones 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coachvirtualback.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from core.renderers import ORJSONRenderer  # noqa: E402
+
+
+def _landmarks(rnd):
+    return [
+        {'x': rnd.random(), 'y': rnd.random(), 'z': rnd.uniform(-1, 1), 'visibility': rnd.random()}
+        for _ in range(33)
+    ]
+
+
+def _angulos(rnd):
+    return {nombre: rnd.uniform(0, 180) for nombre in ('codo_izq', 'codo_der', 'rodilla_izq', 'rodilla_der', 'cadera')}
+
+
+def export_ml(n, rnd):
+    data = [{
+        'ejercicio': 'sentadilla',
+        'tipo': 'secuencia_frame',
+        'landmarks': _landmarks(rnd),
+        'angulos': _angulos(rnd),
+        'timestamp': i * 33,
+        'etiqueta': 'correcto',
+        'etiqueta_numerica': 1,
+        'secuencia_id': i // 30,
+    } for i in range(n)]
+    return {'total_samples': n, 'formato': 'ml_optimizado', 'descripcion': '', 'data': data}
+
+
+def listado_poses(n, rnd):
+    inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [{
+        'id': i,
+        'ejercicio': 'sentadilla',
+        'tipo': 'snapshot',
+        'landmarks': _landmarks(rnd),
+        'angulos': _angulos(rnd),
+        'etiqueta': 'correcto',
+        'fecha_creacion': inicio + timedelta(minutes=i),
+    } for i in range(n)]
+
+
+def catalogo():
+    return {'planes': [
+        {'id': i, 'clave': clave, 'nombre': clave.title(), 'precio': Decimal(precio), 'minutos_por_dia': 15 * i}
+        for i, (clave, precio) in enumerate((('gratis', '0.00'), ('basico', '25.00'), ('premium', '49.90')), 1)
+    ], 'total': 3}
+
+
+def medir(renderer, datos, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        contenido = renderer.render(datos, 'application/json', {})
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), len(contenido)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=5000, help='Samples del export ML')
+    parser.add_argument('--registros', type=int, default=500, help='Registros del listado de poses')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    escenarios = [
+        (f'export ML ({args.samples} samples)', export_ml(args.samples, rnd)),
+        (f'listado poses ({args.registros})', listado_poses(args.registros, rnd)),
+        ('catálogo de planes', catalogo()),
+    ]
+    print(f"{'escenario':<32} {'bytes':>10} {'DRF ms':>9} {'orjson ms':>10} {'x':>6}")
+    for nombre, datos in escenarios:
+        drf_ms, tamano = medir(JSONRenderer(), datos, args.repeticiones)
+        orjson_ms, _ = medir(ORJSONRenderer(), datos, args.repeticiones)
+        print(f"{nombre:<32} {tamano:>10} {drf_ms:>9.2f} {orjson_ms:>10.2f} {drf_ms / orjson_ms:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
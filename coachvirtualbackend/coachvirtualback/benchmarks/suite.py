@@ -0,0 +1,198 @@
+"""
+Suite de benchmarks de la API REST.
+
+Crea una base de datos de prueba (como `manage.py test`, no toca los datos
+reales), la llena con los generadores de benchmarks/datos.py y ejecuta los
+escenarios de benchmarks/escenarios.py contra el stack completo de Django
+en el mismo proceso. Por escenario registra throughput, latencia
+p50/p95/p99 y consultas SQL por request, y escribe todo en JSON para
+comparar entre commits.
+
+    # Postgres local (usa DATABASE_URL / DB_*; crea test_<nombre>)
+    python benchmarks/suite.py --salida bench_antes.json
+
+    # SQLite
+    DATABASE_URL=sqlite:///bench.sqlite3 python benchmarks/suite.py
+
+    # Comparar con una corrida anterior
+    python benchmarks/suite.py --salida bench_despues.json --comparar bench_antes.json
+
+    # Solo algunos escenarios, dataset más grande
+    python benchmarks/suite.py --escenarios catalogo,alertas_polling --usuarios 2000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coachvirtualback.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+import datos  # noqa: E402
+from escenarios import ESCENARIOS, Contexto  # noqa: E402
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+class _ContadorConsultas:
+    def __init__(self):
+        self.cantidad = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.cantidad += 1
+        return execute(sql, params, many, context)
+
+
+def ejecutar(funcion, contexto, iteraciones, calentamiento):
+    for i in range(calentamiento):
+        funcion(contexto, i)
+
+    latencias, consultas, errores = [], [], 0
+    inicio_total = time.perf_counter()
+    for i in range(iteraciones):
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contador):
+            respuesta = funcion(contexto, calentamiento + i)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(contador.cantidad)
+        if respuesta is not None and respuesta.status_code >= 400:
+            errores += 1
+    total = time.perf_counter() - inicio_total
+
+    return {
+        'requests': iteraciones,
+        'errores': errores,
+        'throughput_rps': round(iteraciones / total, 2),
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50), 3),
+            'p95': round(percentil(latencias, 95), 3),
+            'p99': round(percentil(latencias, 99), 3),
+            'media': round(statistics.mean(latencias), 3),
+            'max': round(max(latencias), 3),
+        },
+        'consultas_por_request': {
+            'media': round(statistics.mean(consultas), 2),
+            'max': max(consultas),
+        },
+    }
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, previo):
+    print(f"\n{'escenario':<24} {'p50 ms':>16} {'p99 ms':>16} {'req/s':>16} {'consultas':>12}")
+    for nombre, res in actual['escenarios'].items():
+        antes = previo.get('escenarios', {}).get(nombre)
+        if not antes:
+            continue
+
+        def delta(clave, sub=None):
+            a = antes[clave][sub] if sub else antes[clave]
+            b = res[clave][sub] if sub else res[clave]
+            cambio = f'{(b - a) / a * 100:+.0f}%' if a else '-'
+            return f'{b:>9} {cambio:>6}'
+
+        print(
+            f"{nombre:<24} {delta('latencia_ms', 'p50')} {delta('latencia_ms', 'p99')} "
+            f"{delta('throughput_rps')} {res['consultas_por_request']['media']:>5} ({antes['consultas_por_request']['media']})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, default=200)
+    parser.add_argument('--alertas-por-usuario', type=int, default=20)
+    parser.add_argument('--poses', type=int, default=100, help='Registros de poses (mitad secuencias)')
+    parser.add_argument('--frames', type=int, default=60, help='Frames por secuencia')
+    parser.add_argument('--planes', type=int, default=3)
+    parser.add_argument('--dias-fitness', type=int, default=28, help='Días de historial de fitness simulado')
+    parser.add_argument('--iteraciones', type=int, default=500, help='Requests por escenario (escalado por escenario)')
+    parser.add_argument('--calentamiento', type=int, default=3)
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS), help='Lista separada por comas')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', default='bench_resultados.json')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior')
+    parser.add_argument('--keepdb', action='store_true', help='Conservar la base de prueba')
+    args = parser.parse_args()
+
+    nombres = [n.strip() for n in args.escenarios.split(',') if n.strip()]
+    desconocidos = [n for n in nombres if n not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f"Escenarios desconocidos: {', '.join(desconocidos)}")
+
+    setup_test_environment()
+    config_bd = setup_databases(verbosity=0, interactive=False, keepdb=args.keepdb)
+    try:
+        rnd = random.Random(args.semilla)
+        inicio = time.perf_counter()
+        usuarios = datos.cargar(
+            rnd, args.usuarios, args.alertas_por_usuario, args.poses, args.frames, args.planes,
+            args.dias_fitness, args.semilla,
+        )
+        print(f"Datos generados en {time.perf_counter() - inicio:.1f} s")
+
+        contexto = Contexto(Client(raise_request_exception=False), usuarios, rnd, args.frames)
+        resultados = {}
+        for nombre in nombres:
+            funcion, fraccion = ESCENARIOS[nombre]
+            iteraciones = max(3, int(args.iteraciones * fraccion))
+            resultados[nombre] = res = ejecutar(funcion, contexto, iteraciones, args.calentamiento)
+            lat = res['latencia_ms']
+            print(
+                f"{nombre:<24} {res['throughput_rps']:>9.1f} req/s  p50 {lat['p50']:>8.2f}  p95 {lat['p95']:>8.2f}  "
+                f"p99 {lat['p99']:>8.2f} ms  {res['consultas_por_request']['media']:>6.1f} consultas  "
+                f"{res['errores']} errores"
+            )
+    finally:
+        teardown_databases(config_bd, verbosity=0, keepdb=args.keepdb)
+        teardown_test_environment()
+
+    salida = {
+        'meta': {
+            'commit': _commit(),
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'bd': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')},
+        },
+        'escenarios': resultados,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(salida, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(salida, json.load(archivo))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coachvirtualback.settings')
+# settings ajusta las conexiones a la BD según el servidor (ver DATABASES)
+os.environ['SERVIDOR_PERFIL'] = 'asgi'
 
 application = get_asgi_application()
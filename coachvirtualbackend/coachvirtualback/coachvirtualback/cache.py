@@ -0,0 +1,92 @@
+"""
+Backends de cache con contadores de aciertos/fallos.
+
+Son los backends de Django con un mixin que cuenta hits y misses por prefijo
+de clave (KEY_PREFIX). Los contadores son por proceso; `estadisticas_cache()`
+los expone para las métricas. Las lecturas del propio sistema de métricas
+(claves `metricas:*`) no se cuentan, para que el hit rate mida la app.
+La configuración (CACHE_URL) está en settings.py.
+"""
+
+import threading
+from collections import defaultdict
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import PyMemcacheCache
+from django.core.cache.backends.redis import RedisCache
+
+
+_AUSENTE = object()
+# Claves internas de core.metricas (slots, copias publicadas): no se cuentan
+PREFIJO_SIN_CONTAR = 'metricas:'
+_lock = threading.Lock()
+_contadores = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def _contar(espacio, hits=0, misses=0):
+    with _lock:
+        contador = _contadores[espacio]
+        contador['hits'] += hits
+        contador['misses'] += misses
+
+
+def estadisticas_cache():
+    """{prefijo: {'hits', 'misses', 'hit_rate'}} del proceso actual."""
+    with _lock:
+        copia = {espacio: dict(valores) for espacio, valores in _contadores.items()}
+    for valores in copia.values():
+        total = valores['hits'] + valores['misses']
+        valores['hit_rate'] = round(valores['hits'] / total, 4) if total else None
+    return copia
+
+
+def reiniciar_estadisticas_cache():
+    with _lock:
+        _contadores.clear()
+
+
+class MetricasCacheMixin:
+    """Cuenta hits/misses de get() y get_many()."""
+
+    # Solo los backends con get_many propio; los demás lo resuelven llamando a get()
+    CUENTA_GET_MANY = False
+
+    @property
+    def espacio_metricas(self):
+        return self.key_prefix or 'default'
+
+    def get(self, key, default=None, version=None):
+        if key.startswith(PREFIJO_SIN_CONTAR):
+            return super().get(key, default, version=version)
+        valor = super().get(key, _AUSENTE, version=version)
+        if valor is _AUSENTE:
+            _contar(self.espacio_metricas, misses=1)
+            return default
+        _contar(self.espacio_metricas, hits=1)
+        return valor
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        encontrados = super().get_many(keys, version=version)
+        contadas = [key for key in keys if not key.startswith(PREFIJO_SIN_CONTAR)]
+        if self.CUENTA_GET_MANY and contadas:
+            hits = sum(1 for key in contadas if key in encontrados)
+            _contar(self.espacio_metricas, hits=hits, misses=len(contadas) - hits)
+        return encontrados
+
+
+class MetricasRedisCache(MetricasCacheMixin, RedisCache):
+    CUENTA_GET_MANY = True
+
+
+class MetricasPyMemcacheCache(MetricasCacheMixin, PyMemcacheCache):
+    CUENTA_GET_MANY = True
+
+
+class MetricasFileBasedCache(MetricasCacheMixin, FileBasedCache):
+    pass
+
+
+class MetricasLocMemCache(MetricasCacheMixin, LocMemCache):
+    pass
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config
 import os
+import tempfile
 from urllib.parse import urlparse
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,18 +59,39 @@ INSTALLED_APPS = [
     "suscripciones",
     "musculos",
     "dispositivo",
+    "rutinas",
+    "core",
 ]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    # JSON con orjson (core.renderers): mismo formato que el JSONRenderer de DRF
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+# Los tokens llevan los claims del plan para verificar permisos sin consultar la BD
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "usuarios.serializers.TokenPlanObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "usuarios.serializers.TokenPlanRefreshSerializer",
 }
 
 MIDDLEWARE = [
+    "core.salud.SaludMiddleware",  # /healthz y /readyz, antes de todo lo demás
     "corsheaders.middleware.CorsMiddleware", # DEBE estar al principio o lo más arriba posible
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.CompresionMiddleware",  # gzip/brotli de respuestas JSON grandes
+    "core.middleware.EstaticosMiddleware",  # WhiteNoise sync/async
+    "core.middleware.RendimientoMiddleware",  # tiempos, consultas y tamaño por request
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -96,6 +118,34 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "coachvirtualback.wsgi.application"
+ASGI_APPLICATION = "coachvirtualback.asgi.application"
+
+# Requests más lentos que este umbral se registran con sus consultas más lentas
+RENDIMIENTO_UMBRAL_LENTO_MS = config("RENDIMIENTO_UMBRAL_LENTO_MS", default=500, cast=int)
+
+# Compresión de respuestas de la API (core.middleware.CompresionMiddleware)
+COMPRESION_MIN_BYTES = config("COMPRESION_MIN_BYTES", default=1024, cast=int)
+COMPRESION_NIVEL_BROTLI = config("COMPRESION_NIVEL_BROTLI", default=4, cast=int)
+
+# Segundos que /readyz reutiliza su último resultado (core.salud)
+SALUD_CACHE_SEGUNDOS = config("SALUD_CACHE_SEGUNDOS", default=5, cast=float)
+
+# Clientes HTTP salientes de las vistas async (Google Fit, Stripe)
+HTTP_TIMEOUT = config("HTTP_TIMEOUT", default=20, cast=float)
+HTTP_MAX_CONEXIONES = config("HTTP_MAX_CONEXIONES", default=200, cast=int)
+HTTP_MAX_KEEPALIVE = config("HTTP_MAX_KEEPALIVE", default=50, cast=int)
+
+# Google Fit (dispositivo.googlefit); las URLs se pueden apuntar a un servidor de prueba
+GOOGLE_FIT_CLIENT_ID = config("GOOGLE_FIT_CLIENT_ID", default="")
+GOOGLE_FIT_CLIENT_SECRET = config("GOOGLE_FIT_CLIENT_SECRET", default="")
+GOOGLE_FIT_API_URL = config("GOOGLE_FIT_API_URL", default="https://www.googleapis.com/fitness/v1")
+GOOGLE_OAUTH_TOKEN_URL = config("GOOGLE_OAUTH_TOKEN_URL", default="https://oauth2.googleapis.com/token")
+
+# Con una semilla, el simulador local de fitness usa dispositivo.simulador (determinista)
+SIMULADOR_FITNESS_SEMILLA = config("SIMULADOR_FITNESS_SEMILLA", default="", cast=lambda v: int(v) if v else None)
+
+# Token para el scrape de /metrics (Authorization: Bearer <token>); sin él /metrics da 403 salvo con DEBUG
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
 
 
 # Database
@@ -103,12 +153,20 @@ WSGI_APPLICATION = "coachvirtualback.wsgi.application"
 
 """Configuración de base de datos.
 Se prioriza el uso de una URL completa (DATABASE_URL) si está definida en el entorno.
+sqlite:///ruta/archivo.sqlite3 usa SQLite (desarrollo local y benchmarks).
 """
 
 # NOTA: Idealmente, no dejes la URL real hardcodeada aquí si subes esto a GitHub público.
 database_url = config("DATABASE_URL", default="")
 
-if database_url:
+if database_url.startswith("sqlite:"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": urlparse(database_url).path[1:] or ":memory:",
+        }
+    }
+elif database_url:
     parsed = urlparse(database_url)
     DATABASES = {
         "default": {
@@ -133,6 +191,76 @@ else:
         }
     }
 
+# Conexiones a la base de datos:
+# - DB_POOL=True: pool nativo de psycopg 3 (por proceso). Django exige CONN_MAX_AGE=0 con pool.
+# - DB_POOL=False: conexiones persistentes (CONN_MAX_AGE segundos) con health check
+#   antes de reutilizarlas, para no abrir una conexión (y TLS) en cada request.
+# Bajo ASGI (perfil por defecto de gunicorn.conf.py) el ORM síncrono corre en hilos
+# por request: una conexión persistente queda abierta al terminar el hilo en vez de
+# reutilizarse. Ahí el pool es el default y, sin pool, CONN_MAX_AGE se fuerza a 0.
+# SERVIDOR_PERFIL lo fijan asgi.py / wsgi.py; manage.py y los tests usan wsgi.
+SERVIDOR_ASGI = os.environ.get("SERVIDOR_PERFIL", "wsgi") == "asgi"
+DB_POOL = config("DB_POOL", default=SERVIDOR_ASGI, cast=bool)
+
+if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+            "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=1800, cast=float),
+            "max_idle": config("DB_POOL_MAX_IDLE", default=300, cast=float),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0 if SERVIDOR_ASGI else config("DB_CONN_MAX_AGE", default=60, cast=int)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool)
+
+
+# Cache compartida entre procesos (workers de gunicorn).
+# CACHE_URL (o REDIS_URL de Railway):
+#   redis://host:6379/0, rediss://..., memcached://host:11211, file:///ruta, locmem://
+# Sin URL se usa una cache en archivos en el directorio temporal, compartida por
+# todos los workers de la misma máquina. Es SOLO PARA DESARROLLO: add/incr no son
+# atómicos entre procesos y el culling puede eliminar claves vigentes (versiones
+# del catálogo, tokens de Google Fit, contadores de consumo) y /metrics solo ve
+# el worker que atiende el scrape. En producción usar Redis o Memcached.
+cache_url = urlparse(config("CACHE_URL", default=config("REDIS_URL", default="")))
+
+if cache_url.scheme in ("redis", "rediss"):
+    CACHE_BACKEND = "coachvirtualback.cache.MetricasRedisCache"
+    CACHE_LOCATION = cache_url.geturl()
+elif cache_url.scheme in ("memcached", "pymemcache"):
+    CACHE_BACKEND = "coachvirtualback.cache.MetricasPyMemcacheCache"
+    CACHE_LOCATION = cache_url.netloc
+elif cache_url.scheme == "locmem":
+    CACHE_BACKEND = "coachvirtualback.cache.MetricasLocMemCache"
+    CACHE_LOCATION = cache_url.netloc
+else:
+    CACHE_BACKEND = "coachvirtualback.cache.MetricasFileBasedCache"
+    CACHE_LOCATION = cache_url.path or os.path.join(tempfile.gettempdir(), "coachvirtual_cache")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": CACHE_LOCATION,
+        # Espacio de nombres y versión global de las claves (subir CACHE_VERSION
+        # invalida toda la cache, ej: al cambiar el formato de los datos guardados)
+        "KEY_PREFIX": config("CACHE_KEY_PREFIX", default="coachvirtual"),
+        "VERSION": config("CACHE_VERSION", default=1, cast=int),
+        "TIMEOUT": config("CACHE_TIMEOUT", default=300, cast=int),
+    }
+}
+
+# Los backends de archivo y memoria limitan las claves (300 por defecto) y, al
+# pasarse, eliminan 1/CULL_FREQUENCY de ellas al azar
+if CACHE_BACKEND.endswith(("FileBasedCache", "LocMemCache")):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=100000, cast=int),
+        "CULL_FREQUENCY": config("CACHE_CULL_FREQUENCY", default=10, cast=int),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
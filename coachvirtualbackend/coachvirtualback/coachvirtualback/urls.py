@@ -5,10 +5,14 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from core.controllers.metricas_controller import metricas_prometheus
 
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Métricas para Prometheus
+    path('metrics', metricas_prometheus, name='metrics'),
+
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
@@ -19,4 +23,6 @@ urlpatterns = [
     # ⬇️ ESTA línea es la que te falta
     path('api/', include('musculos.urls')),
     path('api/', include('dispositivo.urls')),
+    path('api/', include('rutinas.urls')),
+    path('api/', include('core.urls')),
 ]
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coachvirtualback.settings')
+# settings ajusta las conexiones a la BD según el servidor (ver DATABASES)
+os.environ['SERVIDOR_PERFIL'] = 'wsgi'
 
 application = get_wsgi_application()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Métricas de infraestructura que se leen antes de cada publicación
+        from . import metricas, recolectores
+        metricas.registrar_recolector(recolectores.recolectar_pool_bd)
+        metricas.registrar_recolector(recolectores.recolectar_cache)
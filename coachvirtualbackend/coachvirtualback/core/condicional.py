@@ -0,0 +1,41 @@
+"""
+GET condicional (ETag / Last-Modified) para vistas de DRF que cambian poco.
+
+El validador se calcula sin serializar la respuesta (versión del catálogo,
+hash precalculado), así que un 304 no toca la BD ni renderiza JSON. Se agrega
+`Cache-Control: no-cache` para que el cliente revalide siempre en vez de
+usar una copia vieja por heurística.
+"""
+
+from calendar import timegm
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def respuesta_condicional(etag_func, ultima_modificacion_func=None):
+    """
+    Decorador para `get` de una APIView.
+    etag_func(request) -> str; ultima_modificacion_func(request) -> datetime | None.
+    Se evalúa después de la autenticación y los permisos de la vista.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(vista, request, *args, **kwargs):
+            etag = quote_etag(etag_func(request))
+            ultima = ultima_modificacion_func(request) if ultima_modificacion_func else None
+            ultima_ts = timegm(ultima.utctimetuple()) if ultima else None
+
+            respuesta = get_conditional_response(request, etag=etag, last_modified=ultima_ts)
+            if respuesta is None:
+                respuesta = metodo(vista, request, *args, **kwargs)
+                if respuesta.status_code != 200:
+                    return respuesta
+            respuesta.headers['ETag'] = etag
+            if ultima_ts is not None:
+                respuesta.headers['Last-Modified'] = http_date(ultima_ts)
+            patch_cache_control(respuesta, no_cache=True)
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,83 @@
+"""
+Controlador de arranque de la app.
+Junta en una sola respuesta lo que el frontend pedía por separado al cargar
+(usuarios/me/, suscripciones/permisos/, alertas/stats/, dispositivo/googlefit/).
+"""
+import logging
+
+from django.core.cache import cache
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from dispositivo.services import fitness_de_hoy
+from suscripciones.services import estado_consumo, plan_de_request, resumen_plan
+from usuarios.models import Alertas, Usuario
+from usuarios.serializers import UsuarioSerializer
+
+logger = logging.getLogger(__name__)
+
+SECCIONES = ('perfil', 'plan', 'consumo', 'alertas', 'fitness')
+
+# El dashboard refresca el fitness por su cuenta; al arrancar basta uno reciente
+TTL_FITNESS = 60
+
+
+def _fitness(usuario_id):
+    # Sin sincronizar con Google Fit: el arranque de la app no espera a la red
+    try:
+        return cache.get_or_set(
+            f'bootstrap:fitness:{usuario_id}', lambda: fitness_de_hoy(usuario_id, sincronizar=False), TTL_FITNESS,
+        )
+    except Exception:
+        # Sin fitness la app igual arranca
+        logger.exception("Error obteniendo el fitness del día (usuario %s)", usuario_id)
+        return None
+
+
+class BootstrapVista(APIView):
+    """
+    GET /api/bootstrap/?campos=perfil,plan,consumo,alertas,fitness
+    Sin `campos` retorna todas las secciones. El plan sale de los claims del
+    JWT y el usuario se carga (una consulta) solo para perfil o consumo.
+    """
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        campos = request.query_params.get('campos')
+        if campos:
+            pedidas = {c.strip() for c in campos.split(',') if c.strip()}
+            desconocidas = pedidas - set(SECCIONES)
+            if desconocidas:
+                return Response(
+                    {'error': f"Secciones desconocidas: {', '.join(sorted(desconocidas))}. "
+                              f"Disponibles: {', '.join(SECCIONES)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            pedidas = set(SECCIONES)
+
+        usuario_id = request.user.id
+        usuario = None
+        if 'perfil' in pedidas or 'consumo' in pedidas:
+            usuario = Usuario.objects.filter(pk=usuario_id, is_active=True).first()
+            if usuario is None:
+                return Response({'error': 'Usuario no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        datos = {}
+        if 'perfil' in pedidas:
+            datos['perfil'] = UsuarioSerializer(usuario).data
+        if 'plan' in pedidas:
+            datos['plan'] = resumen_plan(plan_de_request(request))
+        if 'consumo' in pedidas:
+            datos['consumo'] = estado_consumo(usuario)
+        if 'alertas' in pedidas:
+            datos['alertas'] = {
+                'no_leidas': Alertas.objects.filter(usuario_id=usuario_id, estado=True).count(),
+            }
+        if 'fitness' in pedidas:
+            datos['fitness'] = _fitness(usuario_id)
+        return Response(datos)
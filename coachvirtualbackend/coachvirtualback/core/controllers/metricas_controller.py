@@ -0,0 +1,24 @@
+"""
+Endpoint /metrics en formato Prometheus.
+Exige `Authorization: Bearer <METRICS_TOKEN>`. Sin token configurado solo
+responde con DEBUG (desarrollo); en producción da 403.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_http_methods
+
+from .. import metricas
+from ..prometheus import exportar, CONTENT_TYPE
+
+
+@require_http_methods(["GET"])
+def metricas_prometheus(request):
+    """Métricas agregadas de todos los workers (un scrape cubre todo el servicio)."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif request.headers.get('Authorization', '') != f'Bearer {token}':
+        return HttpResponse(status=401)
+
+    return HttpResponse(exportar(metricas.agregado(scrape=True)), content_type=CONTENT_TYPE)
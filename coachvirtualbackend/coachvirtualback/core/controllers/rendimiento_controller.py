@@ -0,0 +1,71 @@
+"""
+Controlador de rendimiento (solo administradores).
+Histogramas de latencia y consultas por nombre de URL, agregados entre workers.
+"""
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+from .. import metricas
+
+
+def _resumen_histograma(histograma):
+    return {
+        'p50': _redondear(metricas.percentil(histograma, 50)),
+        'p95': _redondear(metricas.percentil(histograma, 95)),
+        'p99': _redondear(metricas.percentil(histograma, 99)),
+        'media': _redondear(histograma['suma'] / histograma['n']) if histograma['n'] else None,
+        'buckets': {
+            str(limite): conteo for limite, conteo in zip(list(histograma['buckets']) + ['+Inf'], histograma['conteos'])
+        },
+    }
+
+
+def _redondear(valor):
+    return round(valor, 2) if valor is not None else None
+
+
+class RendimientoVista(APIView):
+    """
+    GET /api/rendimiento/
+    Métricas por ruta: requests, latencia (p50/p95/p99 + buckets en ms),
+    consultas por request, tiempo en BD y bytes de respuesta.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({'error': 'No autorizado'}, status=status.HTTP_403_FORBIDDEN)
+
+        datos = metricas.agregado()
+        rutas = {}
+        for (nombre, etiquetas), histograma in datos['histogramas'].items():
+            etiquetas = dict(etiquetas)
+            if nombre == 'http_duracion_ms':
+                rutas.setdefault(etiquetas['ruta'], {})['latencia_ms'] = _resumen_histograma(histograma)
+                rutas[etiquetas['ruta']]['requests'] = histograma['n']
+            elif nombre == 'http_consultas':
+                rutas.setdefault(etiquetas['ruta'], {})['consultas'] = _resumen_histograma(histograma)
+
+        for (nombre, etiquetas), valor in datos['contadores'].items():
+            etiquetas = dict(etiquetas)
+            ruta = rutas.get(etiquetas.get('ruta'))
+            if ruta is None or not ruta.get('requests'):
+                continue
+            if nombre == 'http_consultas_ms_total':
+                ruta['consultas_ms_promedio'] = round(valor / ruta['requests'], 2)
+            elif nombre == 'http_respuesta_bytes_total':
+                ruta['bytes_promedio'] = round(valor / ruta['requests'])
+
+        orden = request.query_params.get('orden', 'p99')
+        rutas_ordenadas = sorted(
+            ({'ruta': nombre, **valores} for nombre, valores in rutas.items()),
+            key=lambda r: (r.get('latencia_ms') or {}).get(orden) or 0,
+            reverse=True,
+        )
+        return Response({
+            'procesos': datos['procesos'],
+            'total': len(rutas_ordenadas),
+            'rutas': rutas_ordenadas,
+        })
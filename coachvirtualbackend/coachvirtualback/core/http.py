@@ -0,0 +1,79 @@
+"""
+Clientes HTTP asíncronos con pool de conexiones para las vistas async.
+
+Un cliente por event loop: con uvicorn hay un único loop por worker y el pool
+se reutiliza en todos los requests; con WSGI Django ejecuta cada vista async
+en un loop propio, y un cliente atado a un loop cerrado no puede reutilizarse.
+Por eso las vistas async llevan `@cerrar_clientes_al_terminar`: con WSGI
+cierran al final del request los clientes que abrió su loop.
+"""
+
+import asyncio
+import functools
+import weakref
+
+import httpx
+import stripe
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+
+_clientes = weakref.WeakKeyDictionary()
+_clientes_stripe = weakref.WeakKeyDictionary()
+
+
+def cliente_http() -> httpx.AsyncClient:
+    """httpx.AsyncClient compartido por el event loop actual."""
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None or cliente.is_closed:
+        cliente = _clientes[loop] = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=5),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONEXIONES,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            ),
+        )
+    return cliente
+
+
+def cliente_stripe() -> stripe.StripeClient:
+    """StripeClient con transporte httpx (métodos *_async) por event loop."""
+    loop = asyncio.get_running_loop()
+    par = _clientes_stripe.get(loop)
+    if par is None:
+        transporte = stripe.HTTPXClient(timeout=settings.HTTP_TIMEOUT)
+        par = _clientes_stripe[loop] = (stripe.StripeClient(stripe.api_key, http_client=transporte), transporte)
+    return par[0]
+
+
+def loop_del_worker(request) -> bool:
+    """True si la vista async corre en el loop del worker (ASGI) y no en uno propio del request (WSGI)."""
+    return isinstance(request, ASGIRequest)
+
+
+async def cerrar_clientes():
+    """Cierra los clientes del event loop actual (sus conexiones se liberan ya, no al recolectarlos)."""
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.pop(loop, None)
+    if cliente is not None:
+        await cliente.aclose()
+    par = _clientes_stripe.pop(loop, None)
+    if par is not None:
+        await par[1].close_async()
+
+
+def cerrar_clientes_al_terminar(vista):
+    """
+    Para vistas async: con WSGI el loop es del request y se cierra con él, así
+    que sus clientes se cierran al terminar la vista. Con ASGI el loop es del
+    worker y los clientes quedan abiertos para los siguientes requests.
+    """
+    @functools.wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        try:
+            return await vista(request, *args, **kwargs)
+        finally:
+            if not loop_del_worker(request):
+                await cerrar_clientes()
+    return envoltura
@@ -0,0 +1,402 @@
+"""
+Registro de métricas del proceso (histogramas y contadores con etiquetas).
+
+Cada worker de gunicorn acumula sus métricas en memoria (un dict y un lock,
+sin I/O por request) y un hilo del proceso publica una copia en la cache
+compartida cada INTERVALO_PUBLICACION segundos. La copia vive en un "slot"
+reservado con cache.add(), así que `agregado()` puede sumar las métricas de
+todos los procesos vivos sin coordinación entre ellos.
+
+Eso requiere Redis o Memcached: con la cache en archivos (desarrollo) add()
+no es atómico entre procesos y dos workers podrían tomar el mismo slot y
+pisarse la copia. Ahí no se publica y cada proceso reporta solo sus métricas
+(con un warning la primera vez).
+
+Los contadores y histogramas no retroceden cuando un proceso termina: su
+última copia se suma a un total de "retirados" (al salir con atexit, o cuando
+otro proceso encuentra su slot vencido al hacer scrape o al reservar ese
+slot). Solo los valores instantáneos de un proceso muerto desaparecen.
+
+Las métricas que no nacen de un evento (estado del pool de la BD, aciertos de
+cache, cola de Stripe) se leen con recolectores registrados por cada app:
+los de proceso corren antes de cada publicación, los de scrape solo en el
+proceso que atiende /metrics (pueden consultar la BD).
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+BUCKETS_SEGUNDOS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800, 3600)
+
+INTERVALO_PUBLICACION = 10
+MAX_SLOTS = 64
+TTL_SLOT = 60
+# La copia sobrevive varios scrapes al slot: si el proceso muere sin atexit
+# (SIGKILL, OOM) el próximo scrape todavía la encuentra y la pasa a retirados
+TTL_DATOS = 10 * TTL_SLOT
+CLAVE_SLOT = 'metricas:slot:{}'
+CLAVE_DATOS = 'metricas:datos:{}'
+CLAVE_RETIRADOS = 'metricas:retirados'
+CLAVE_RETIRO = 'metricas:retiro'  # lock de la suma a retirados
+CLAVE_RETIRADO = 'metricas:retirado:{}'  # marca: la copia de ese proceso ya se retiró
+TTL_RETIRO = 10
+TTL_RETIRADO = 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def _clave(nombre, etiquetas):
+    return (nombre, tuple(sorted(etiquetas.items())))
+
+
+class Registro:
+    """Métricas de un proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histogramas = {}
+        self.contadores = {}
+        self.valores = {}
+
+    def observar(self, nombre, valor, buckets=BUCKETS_MS, **etiquetas):
+        """Agrega una observación a un histograma (buckets acumulables por proceso)."""
+        clave = _clave(nombre, etiquetas)
+        indice = bisect_left(buckets, valor)
+        with self._lock:
+            histograma = self.histogramas.get(clave)
+            if histograma is None:
+                histograma = self.histogramas[clave] = {
+                    'buckets': buckets, 'conteos': [0] * (len(buckets) + 1), 'suma': 0.0, 'n': 0,
+                }
+            histograma['conteos'][indice] += 1
+            histograma['suma'] += valor
+            histograma['n'] += 1
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + valor
+
+    def fijar(self, nombre, valor, **etiquetas):
+        """Valor instantáneo (gauge) del proceso; se suma entre procesos."""
+        with self._lock:
+            self.valores[_clave(nombre, etiquetas)] = valor
+
+    def fijar_contador(self, nombre, valor, **etiquetas):
+        """Contador acumulado que se lleva en otro lado (ej: estadísticas de la cache)."""
+        with self._lock:
+            self.contadores[_clave(nombre, etiquetas)] = valor
+
+    def copia(self):
+        with self._lock:
+            return {
+                'histogramas': [
+                    [nombre, list(etiquetas), dict(h, conteos=list(h['conteos']), buckets=list(h['buckets']))]
+                    for (nombre, etiquetas), h in self.histogramas.items()
+                ],
+                'contadores': [[nombre, list(etiquetas), v] for (nombre, etiquetas), v in self.contadores.items()],
+                'valores': [[nombre, list(etiquetas), v] for (nombre, etiquetas), v in self.valores.items()],
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self.histogramas.clear()
+            self.contadores.clear()
+            self.valores.clear()
+
+
+registro = Registro()
+
+recolectores_proceso = []
+recolectores_scrape = []
+
+
+def registrar_recolector(funcion, en_scrape=False):
+    """Registra funcion(registro) para actualizar valores antes de publicar o al hacer scrape."""
+    destino = recolectores_scrape if en_scrape else recolectores_proceso
+    if funcion not in destino:
+        destino.append(funcion)
+
+
+def _recolectar(recolectores, destino):
+    for funcion in recolectores:
+        try:
+            funcion(destino)
+        except Exception:
+            pass
+
+
+@contextmanager
+def medir(nombre, **etiquetas):
+    """Observa la duración (ms) del bloque en el histograma `nombre`."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.observar(nombre, (time.perf_counter() - inicio) * 1000, **etiquetas)
+
+
+# pid + sufijo aleatorio: los pids se repiten entre reinicios del contenedor
+_identidad = f"{os.uname().nodename if hasattr(os, 'uname') else ''}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_slot = None
+_ultima_publicacion = 0.0
+_ultima_copia = None  # copia completa del registro en la última publicación
+_base = None  # parte del registro que ya está en los retirados
+_publicador = None
+_publicador_lock = threading.Lock()
+_AUSENTE = object()
+_avisado_por_proceso = False
+
+
+def _cache_atomica() -> bool:
+    """True con Redis o Memcached: add() atómico entre procesos (slots y lock de retiro)."""
+    return isinstance(caches['default'], (RedisCache, BaseMemcachedCache))
+
+
+def _avisar_por_proceso():
+    global _avisado_por_proceso
+    if not _avisado_por_proceso:
+        _avisado_por_proceso = True
+        logger.warning(
+            'Métricas por proceso: la cache no es Redis ni Memcached, /metrics solo '
+            'incluye el worker que atiende el scrape (pid %s)', os.getpid(),
+        )
+
+
+def _loop_publicador():
+    while True:
+        time.sleep(INTERVALO_PUBLICACION)
+        publicar(forzar=True)
+
+
+def _asegurar_publicador():
+    """Hilo que mantiene vivo el slot aunque el worker no reciba requests."""
+    global _publicador
+    if _publicador is not None and _publicador.is_alive():
+        return
+    with _publicador_lock:
+        if _publicador is None or not _publicador.is_alive():
+            _publicador = threading.Thread(target=_loop_publicador, name='metricas-publicador', daemon=True)
+            _publicador.start()
+
+
+def _fusionar(copias):
+    """Suma copias de registros: (histogramas, contadores, valores) indexados por (nombre, etiquetas)."""
+    histogramas, contadores, valores = {}, {}, {}
+    for copia in copias:
+        for nombre, etiquetas, h in copia['histogramas']:
+            clave = (nombre, tuple(tuple(e) for e in etiquetas))
+            actual = histogramas.get(clave)
+            if actual is None or actual['buckets'] != h['buckets']:
+                histogramas[clave] = dict(h, conteos=list(h['conteos']))
+                continue
+            actual['conteos'] = [a + b for a, b in zip(actual['conteos'], h['conteos'])]
+            actual['suma'] += h['suma']
+            actual['n'] += h['n']
+        for nombre, etiquetas, v in copia['contadores']:
+            clave = (nombre, tuple(tuple(e) for e in etiquetas))
+            contadores[clave] = contadores.get(clave, 0) + v
+        for nombre, etiquetas, v in copia['valores']:
+            clave = (nombre, tuple(tuple(e) for e in etiquetas))
+            valores[clave] = valores.get(clave, 0) + v
+    return histogramas, contadores, valores
+
+
+def _serializar(histogramas, contadores, valores):
+    """Inverso de _fusionar: el formato de Registro.copia() que se guarda en la cache."""
+    return {
+        'histogramas': [[nombre, [list(e) for e in etiquetas], h] for (nombre, etiquetas), h in histogramas.items()],
+        'contadores': [[nombre, [list(e) for e in etiquetas], v] for (nombre, etiquetas), v in contadores.items()],
+        'valores': [[nombre, [list(e) for e in etiquetas], v] for (nombre, etiquetas), v in valores.items()],
+    }
+
+
+def _restar(copia, base):
+    """Contadores e histogramas de `copia` menos lo que ya está en `base` (los valores quedan igual)."""
+    if base is None:
+        return copia
+    histogramas, contadores, valores = _fusionar([copia])
+    h_base, c_base, _ = _fusionar([base])
+    for clave, h in histogramas.items():
+        previo = h_base.get(clave)
+        if previo is not None and previo['buckets'] == h['buckets']:
+            h['conteos'] = [a - b for a, b in zip(h['conteos'], previo['conteos'])]
+            h['suma'] -= previo['suma']
+            h['n'] -= previo['n']
+    for clave, v in c_base.items():
+        if clave in contadores:
+            contadores[clave] -= v
+    return _serializar(histogramas, contadores, valores)
+
+
+def _retirar(slot):
+    """
+    Suma a los retirados la copia del slot si su proceso ya no lo tiene.
+    Retorna False si otro proceso está retirando en este momento.
+    """
+    if not cache.add(CLAVE_RETIRO, _identidad, TTL_RETIRO):
+        return False
+    try:
+        clave = CLAVE_DATOS.format(slot)
+        datos = cache.get(clave)
+        if datos is None or cache.get(CLAVE_SLOT.format(slot)) == datos.get('identidad', _AUSENTE):
+            return True
+        histogramas, contadores, _ = _fusionar([cache.get(CLAVE_RETIRADOS) or _serializar({}, {}, {}), datos])
+        # Sin timeout: es el acumulado histórico del servicio
+        cache.set(CLAVE_RETIRADOS, _serializar(histogramas, contadores, {}), None)
+        cache.set(CLAVE_RETIRADO.format(datos.get('identidad')), 1, TTL_RETIRADO)
+        cache.delete(clave)
+        return True
+    finally:
+        cache.delete(CLAVE_RETIRO)
+
+
+def _reservar_slot():
+    for i in range(MAX_SLOTS):
+        clave = CLAVE_SLOT.format(i)
+        if cache.get(clave) == _identidad:
+            return i
+        if cache.add(clave, _identidad, TTL_SLOT):
+            # La última copia de un proceso muerto en este slot pasa a retirados antes de pisarla
+            if _retirar(i):
+                return i
+            cache.delete(clave)
+    return None
+
+
+def publicacion_pendiente() -> bool:
+    """True si publicar() va a escribir en la cache (para no saltar de hilo si no)."""
+    return time.monotonic() - _ultima_publicacion >= INTERVALO_PUBLICACION
+
+
+def publicar(forzar=False):
+    """Publica la copia del proceso en la cache compartida (como máximo cada INTERVALO_PUBLICACION)."""
+    global _slot, _ultima_publicacion, _ultima_copia, _base
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_publicacion < INTERVALO_PUBLICACION:
+        return
+    _ultima_publicacion = ahora
+    if not _cache_atomica():
+        return
+    _asegurar_publicador()
+    _recolectar(recolectores_proceso, registro)
+    try:
+        if _slot is None or cache.get(CLAVE_SLOT.format(_slot)) != _identidad:
+            if _slot is not None:
+                # Se venció el slot con el proceso vivo (colgado más de TTL_SLOT)
+                if not _retirar(_slot):
+                    return
+                if cache.get(CLAVE_RETIRADO.format(_identidad)):
+                    # Lo publicado hasta ahora ya se sumó a los retirados
+                    _base = _ultima_copia
+                    cache.delete(CLAVE_RETIRADO.format(_identidad))
+            _slot = _reservar_slot()
+            if _slot is None:
+                return
+        copia = registro.copia()
+        cache.set(CLAVE_DATOS.format(_slot), dict(_restar(copia, _base), identidad=_identidad), TTL_DATOS)
+        cache.set(CLAVE_SLOT.format(_slot), _identidad, TTL_SLOT)
+        _ultima_copia = copia
+    except Exception:
+        # Las métricas nunca deben romper un request
+        _slot = None
+
+
+@atexit.register
+def retirar_proceso():
+    """Al terminar el worker su última copia pasa a los retirados (los contadores no retroceden)."""
+    global _slot, _base
+    if _slot is None:
+        return
+    try:
+        publicar(forzar=True)
+        if _slot is None:
+            return
+        if cache.get(CLAVE_SLOT.format(_slot)) == _identidad:
+            cache.delete(CLAVE_SLOT.format(_slot))
+        # Si otro proceso está retirando, queda el slot libre y el próximo scrape la retira
+        _retirar(_slot)
+        cache.delete(CLAVE_RETIRADO.format(_identidad))
+        _base, _slot = _ultima_copia, None
+    except Exception:
+        pass
+
+
+def reiniciar():
+    """Vacía el registro del proceso y su estado de publicación (tests)."""
+    global _slot, _ultima_publicacion, _ultima_copia, _base, _avisado_por_proceso
+    registro.reiniciar()
+    _slot = _ultima_copia = _base = None
+    _ultima_publicacion = 0.0
+    _avisado_por_proceso = False
+
+
+def _copias_publicadas():
+    """Copias de los procesos vivos más el total de los retirados."""
+    publicar(forzar=True)
+    slots = cache.get_many([CLAVE_SLOT.format(i) for i in range(MAX_SLOTS)])
+    datos = cache.get_many([CLAVE_DATOS.format(i) for i in range(MAX_SLOTS)])
+    copias = []
+    for clave, copia in datos.items():
+        slot = clave.rsplit(':', 1)[1]
+        if slots.get(CLAVE_SLOT.format(slot)) == copia.get('identidad', _AUSENTE) or not _retirar(slot):
+            copias.append(copia)
+    retirados = cache.get(CLAVE_RETIRADOS)
+    return copias, retirados
+
+
+def agregado(scrape=False):
+    """
+    Suma las métricas de todos los procesos: {'histogramas', 'contadores', 'valores', 'procesos'}.
+    Incluye los contadores e histogramas de los procesos que ya terminaron.
+    Con scrape=True agrega también los recolectores de scrape (una sola vez, no por proceso).
+    """
+    if _cache_atomica():
+        copias, retirados = _copias_publicadas()
+    else:
+        _avisar_por_proceso()
+        copias, retirados = [], None
+    if not copias:
+        copias = [registro.copia()]
+    procesos = len(copias)
+    if retirados:
+        copias.append(retirados)
+    if scrape:
+        extra = Registro()
+        _recolectar(recolectores_scrape, extra)
+        copias.append(extra.copia())
+    histogramas, contadores, valores = _fusionar(copias)
+    return {'histogramas': histogramas, 'contadores': contadores, 'valores': valores, 'procesos': procesos}
+
+
+def percentil(histograma, p):
+    """Estimación del percentil p (0-100) por interpolación lineal dentro del bucket."""
+    n = histograma['n']
+    if not n:
+        return None
+    objetivo = p / 100 * n
+    acumulado = 0
+    buckets = histograma['buckets']
+    for i, conteo in enumerate(histograma['conteos']):
+        if acumulado + conteo >= objetivo and conteo:
+            inferior = buckets[i - 1] if i > 0 else 0
+            superior = buckets[i] if i < len(buckets) else math.inf
+            if superior is math.inf:
+                return float(inferior)
+            return inferior + (superior - inferior) * (objetivo - acumulado) / conteo
+        acumulado += conteo
+    return float(buckets[-1])
@@ -0,0 +1,227 @@
+"""
+Middleware de rendimiento por request y compresión de respuestas de la API.
+
+Mide el tiempo total de la vista, las consultas SQL (cantidad y tiempo) y el
+tamaño de la respuesta, y lo agrega por nombre de URL en `core.metricas`. Los
+requests más lentos que RENDIMIENTO_UMBRAL_LENTO_MS se registran en el log con
+sus consultas más lentas. Por request solo guarda contadores y las N consultas
+más lentas, así que puede quedar activo en producción.
+
+El middleware es sync y async: con ASGI no obliga a pasar cada request por un
+hilo. Las consultas se miden con un execute_wrapper instalado en cada conexión
+que anota en el registro del request actual (ContextVar); sync_to_async copia
+el contexto, así que también cuenta las consultas de vistas async.
+"""
+
+import heapq
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metricas
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él se usa solo gzip
+    brotli = None
+
+
+logger = logging.getLogger('coachvirtual.rendimiento')
+
+TOP_CONSULTAS = 5
+
+
+class _RegistroConsultas:
+    """execute_wrapper que cuenta consultas y conserva las más lentas."""
+
+    __slots__ = ('cantidad', 'tiempo_ms', 'lentas')
+
+    def __init__(self):
+        self.cantidad = 0
+        self.tiempo_ms = 0.0
+        self.lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            self.cantidad += 1
+            self.tiempo_ms += duracion
+            if len(self.lentas) < TOP_CONSULTAS:
+                heapq.heappush(self.lentas, (duracion, self.cantidad, sql))
+            elif duracion > self.lentas[0][0]:
+                heapq.heapreplace(self.lentas, (duracion, self.cantidad, sql))
+
+
+_consultas_request = ContextVar('consultas_request', default=None)
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    consultas = _consultas_request.get()
+    if consultas is None:
+        return execute(sql, params, many, context)
+    return consultas(execute, sql, params, many, context)
+
+
+def _instalar_medicion(conexion):
+    if _medir_consulta not in conexion.execute_wrappers:
+        conexion.execute_wrappers.append(_medir_consulta)
+
+
+def _al_conectar(sender, connection, **kwargs):
+    _instalar_medicion(connection)
+
+
+connection_created.connect(_al_conectar)
+
+
+def nombre_ruta(request):
+    """Nombre de la URL resuelta (o su patrón) para agrupar métricas sin explotar la cardinalidad."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'sin_ruta'
+    if match.view_name:
+        return match.view_name
+    return match.route or 'sin_nombre'
+
+
+class RendimientoMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.umbral_ms = getattr(settings, 'RENDIMIENTO_UMBRAL_LENTO_MS', 500)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Conexiones abiertas antes de importar este módulo (ej: en tests)
+        _instalar_medicion(connection)
+        consultas = _RegistroConsultas()
+        token = _consultas_request.set(consultas)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _consultas_request.reset(token)
+        self._registrar(request, response, (time.perf_counter() - inicio) * 1000, consultas)
+        metricas.publicar()
+        return response
+
+    async def __acall__(self, request):
+        consultas = _RegistroConsultas()
+        token = _consultas_request.set(consultas)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _consultas_request.reset(token)
+        self._registrar(request, response, (time.perf_counter() - inicio) * 1000, consultas)
+        if metricas.publicacion_pendiente():
+            await sync_to_async(metricas.publicar)()
+        return response
+
+    def _registrar(self, request, response, duracion, consultas):
+        ruta = nombre_ruta(request)
+        tamano = 0 if response.streaming else len(response.content)
+
+        registro = metricas.registro
+        registro.observar('http_duracion_ms', duracion, ruta=ruta)
+        registro.observar('http_consultas', consultas.cantidad, buckets=metricas.BUCKETS_CONSULTAS, ruta=ruta)
+        registro.incrementar('http_consultas_ms_total', consultas.tiempo_ms, ruta=ruta)
+        registro.incrementar('http_respuesta_bytes_total', tamano, ruta=ruta)
+        registro.incrementar('http_requests_total', ruta=ruta, metodo=request.method, estado=f'{response.status_code // 100}xx')
+
+        if duracion >= self.umbral_ms:
+            lentas = sorted(consultas.lentas, reverse=True)
+            logger.warning(
+                'Request lento %s %s (%s): %.1f ms, %d consultas (%.1f ms), %d bytes\n%s',
+                request.method, request.path, ruta, duracion, consultas.cantidad, consultas.tiempo_ms, tamano,
+                '\n'.join(f'  {ms:.1f} ms  {sql[:500]}' for ms, _, sql in lentas),
+            )
+
+
+class EstaticosMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise sync y async. El original es solo sync y, al estar antes en la
+    cadena, haría que Django pasara todos los requests por un hilo con ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+re_acepta_br = re.compile(r'\bbr\b')
+
+
+class CompresionMiddleware(GZipMiddleware):
+    """
+    Comprime respuestas de la API (JSON, CSV, texto) de al menos
+    COMPRESION_MIN_BYTES según Accept-Encoding: brotli si el cliente lo acepta y
+    el paquete está instalado, si no gzip. Los archivos estáticos ya los
+    sirve WhiteNoise precomprimidos, así que no se tocan.
+    """
+
+    TIPOS = ('application/json', 'text/')
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, 'COMPRESION_MIN_BYTES', 1024)
+        self.nivel_br = getattr(settings, 'COMPRESION_NIVEL_BROTLI', 4)
+
+    def process_response(self, request, response):
+        if not response.get('Content-Type', '').startswith(self.TIPOS):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_bytes:
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or response.streaming or not re_acepta_br.search(ae):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        comprimido = brotli.compress(response.content, quality=self.nivel_br)
+        if len(comprimido) >= len(response.content):
+            return response
+        response.content = comprimido
+        response.headers['Content-Length'] = str(len(comprimido))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
@@ -0,0 +1,52 @@
+"""
+Paginación para listados grandes (API y admin).
+
+`ConteoEstimadoPaginator` evita el `SELECT COUNT(*)` sobre la tabla completa:
+sin filtros y en PostgreSQL usa la estimación de filas del planificador
+(`pg_class.reltuples`, que mantienen ANALYZE/autovacuum). Con filtros, o si
+la tabla es chica, cuenta de verdad: el filtro ya usa un índice.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+# Por debajo de esto el COUNT exacto es barato y la estimación no aporta
+UMBRAL_ESTIMACION = 10000
+
+
+def _filas_estimadas(queryset):
+    """reltuples de la tabla del queryset, o None si no aplica (otro motor, sin ANALYZE)."""
+    conexion = connections[queryset.db]
+    if conexion.vendor != 'postgresql':
+        return None
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        fila = cursor.fetchone()
+    # -1 = nunca analizada
+    return fila[0] if fila and fila[0] >= 0 else None
+
+
+class ConteoEstimadoPaginator(Paginator):
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where and not qs.query.distinct:
+            estimado = _filas_estimadas(qs)
+            if estimado is not None and estimado >= UMBRAL_ESTIMACION:
+                return estimado
+        return super().count
+
+
+class PaginacionEstandar(PageNumberPagination):
+    """?page=N&page_size=M (máx. 200). La respuesta es {count, next, previous, results}."""
+    django_paginator_class = ConteoEstimadoPaginator
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
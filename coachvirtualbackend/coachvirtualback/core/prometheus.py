@@ -0,0 +1,104 @@
+"""
+Exportación de `core.metricas` en el formato de texto de Prometheus (0.0.4).
+
+Convenciones: prefijo `coachvirtual_`; las métricas en milisegundos (`*_ms`)
+se exportan en segundos (`*_seconds`), como recomienda Prometheus.
+"""
+
+import math
+
+PREFIJO = 'coachvirtual_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Texto de ayuda por métrica (nombre interno)
+AYUDA = {
+    'http_duracion_ms': 'Duración de los requests por ruta',
+    'http_consultas': 'Consultas SQL por request',
+    'http_consultas_ms_total': 'Tiempo total en consultas SQL por ruta',
+    'http_respuesta_bytes_total': 'Bytes de respuesta por ruta',
+    'http_requests_total': 'Requests por ruta, método y clase de estado',
+    'db_pool_size': 'Conexiones abiertas en el pool de psycopg',
+    'db_pool_disponibles': 'Conexiones libres en el pool de psycopg',
+    'db_pool_esperando': 'Clientes esperando una conexión del pool',
+    'db_pool_requests_total': 'Conexiones pedidas al pool',
+    'db_pool_espera_ms_total': 'Tiempo total esperando conexiones del pool',
+    'db_pool_errores_total': 'Errores al abrir conexiones del pool',
+    'cache_hits_total': 'Aciertos de cache por espacio de claves',
+    'cache_misses_total': 'Fallos de cache por espacio de claves',
+    'notificaciones_duracion_ms': 'Duración de las ejecuciones del motor de notificaciones',
+    'notificaciones_alertas_total': 'Alertas creadas por el motor de notificaciones',
+    'stripe_webhook_lag_segundos': 'Tiempo entre la recepción y el procesamiento de un evento de Stripe',
+    'stripe_eventos_total': 'Eventos de Stripe procesados por tipo y resultado',
+    'stripe_eventos_pendientes': 'Eventos de Stripe pendientes en la cola',
+    'stripe_evento_mas_antiguo_segundos': 'Antigüedad del evento de Stripe pendiente más antiguo',
+    'poses_ingestadas_total': 'Registros de poses creados',
+    'poses_exportadas_total': 'Samples de poses exportados',
+}
+
+
+def _nombre(nombre):
+    """Nombre Prometheus y factor de escala (ms -> s)."""
+    if nombre.endswith('_ms'):
+        return PREFIJO + nombre[:-3] + '_seconds', 0.001
+    if nombre.endswith('_ms_total'):
+        return PREFIJO + nombre[:-9] + '_seconds_total', 0.001
+    if nombre.endswith('_segundos'):
+        return PREFIJO + nombre[:-9] + '_seconds', 1
+    return PREFIJO + nombre, 1
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(etiquetas, extra=()):
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+
+def _numero(valor):
+    if valor == math.inf:
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _agrupar(series):
+    grupos = {}
+    for (nombre, etiquetas), valor in sorted(series.items()):
+        grupos.setdefault(nombre, []).append((etiquetas, valor))
+    return grupos
+
+
+def exportar(datos):
+    """Texto Prometheus a partir de `metricas.agregado()`."""
+    lineas = []
+
+    def cabecera(interno, nombre, tipo):
+        if interno in AYUDA:
+            lineas.append(f'# HELP {nombre} {AYUDA[interno]}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+
+    for interno, series in _agrupar(datos['histogramas']).items():
+        nombre, escala = _nombre(interno)
+        cabecera(interno, nombre, 'histogram')
+        for etiquetas, h in series:
+            acumulado = 0
+            for limite, conteo in zip(list(h['buckets']) + [math.inf], h['conteos']):
+                acumulado += conteo
+                le = '+Inf' if limite == math.inf else _numero(limite * escala)
+                lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas, [("le", le)])} {acumulado}')
+            lineas.append(f'{nombre}_sum{_etiquetas(etiquetas)} {_numero(h["suma"] * escala)}')
+            lineas.append(f'{nombre}_count{_etiquetas(etiquetas)} {h["n"]}')
+
+    for tipo, clave in (('counter', 'contadores'), ('gauge', 'valores')):
+        for interno, series in _agrupar(datos[clave]).items():
+            nombre, escala = _nombre(interno)
+            cabecera(interno, nombre, tipo)
+            for etiquetas, valor in series:
+                lineas.append(f'{nombre}{_etiquetas(etiquetas)} {_numero(valor * escala)}')
+
+    lineas.append('# TYPE coachvirtual_procesos gauge')
+    lineas.append(f'coachvirtual_procesos {datos["procesos"]}')
+    return '\n'.join(lineas) + '\n'
@@ -0,0 +1,29 @@
+"""
+Recolectores de métricas de infraestructura (se registran en CoreConfig.ready).
+"""
+
+from django.db import connections
+
+from coachvirtualback.cache import estadisticas_cache
+
+
+def recolectar_pool_bd(registro):
+    """Estado del pool de psycopg del proceso (solo con DB_POOL=True)."""
+    pools = getattr(type(connections['default']), '_connection_pools', {})
+    pool = pools.get('default')
+    if pool is None:
+        return
+    stats = pool.get_stats()
+    registro.fijar('db_pool_size', stats.get('pool_size', 0))
+    registro.fijar('db_pool_disponibles', stats.get('pool_available', 0))
+    registro.fijar('db_pool_esperando', stats.get('requests_waiting', 0))
+    registro.fijar_contador('db_pool_requests_total', stats.get('requests_num', 0))
+    registro.fijar_contador('db_pool_espera_ms_total', stats.get('requests_wait_ms', 0))
+    registro.fijar_contador('db_pool_errores_total', stats.get('connections_errors', 0))
+
+
+def recolectar_cache(registro):
+    """Aciertos y fallos de la cache del proceso por espacio de claves."""
+    for espacio, valores in estadisticas_cache().items():
+        registro.fijar_contador('cache_hits_total', valores['hits'], espacio=espacio)
+        registro.fijar_contador('cache_misses_total', valores['misses'], espacio=espacio)
@@ -0,0 +1,134 @@
+"""
+Renderer y parser JSON de DRF basados en orjson.
+
+Mismo contrato que `rest_framework.renderers.JSONRenderer` y
+`rest_framework.parsers.JSONParser` (se configuran en REST_FRAMEWORK), pero
+el encode/decode se hace en C: en exportaciones de poses con miles de
+landmarks el renderizado deja de dominar el tiempo de CPU.
+
+Tipos que no son JSON nativo, igual que el encoder de DRF:
+- Decimal -> float (precios de planes)
+- datetime/date/time -> ISO 8601 (UTC con "Z")
+- timedelta -> segundos como string
+- arrays y escalares de numpy -> listas/números
+- QuerySet, generadores, sets -> listas; textos lazy -> str
+
+`con_descompresion` envuelve un parser para aceptar cuerpos enviados con
+`Content-Encoding: gzip` o `deflate` (lotes de telemetría del cliente).
+"""
+
+import datetime
+import decimal
+import io
+import uuid
+import zlib
+
+import orjson
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+
+OPCIONES = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Tamaño máximo de un cuerpo comprimido una vez descomprimido (evita zip bombs)
+MAX_DESCOMPRIMIDO = 8 * 1024 * 1024
+
+# wbits de zlib: 16 + MAX_WBITS para gzip; MAX_WBITS para deflate con cabecera zlib
+_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+def _default(obj):
+    """Tipos que orjson no serializa por sí mismo."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        # arrays de numpy no contiguos o con dtype no soportado por orjson
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        cls = list if isinstance(obj, (list, tuple)) else dict
+        try:
+            return cls(obj)
+        except Exception:
+            pass
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Tipo no serializable a JSON: {type(obj).__name__}')
+
+
+def dumps(data, indent=False) -> bytes:
+    opciones = OPCIONES | orjson.OPT_INDENT_2 if indent else OPCIONES
+    return orjson.dumps(data, default=_default, option=opciones)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # El renderer navegable de DRF pide indentación con "; indent=4"
+        indent = False
+        if accepted_media_type:
+            indent = 'indent' in accepted_media_type
+        return dumps(data, indent=indent)
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            contenido = stream.read() if stream is not None else b''
+            if encoding.lower().replace('-', '') != 'utf8':
+                contenido = contenido.decode(encoding).encode()
+            return orjson.loads(contenido)
+        except (orjson.JSONDecodeError, UnicodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def descomprimir(contenido: bytes, codificacion: str) -> bytes:
+    """Descomprime un cuerpo gzip/deflate; ParseError si es inválido o excede MAX_DESCOMPRIMIDO."""
+    if codificacion not in _WBITS:
+        raise ParseError(f'Content-Encoding no soportado: {codificacion}')
+    descompresor = zlib.decompressobj(_WBITS[codificacion])
+    try:
+        datos = descompresor.decompress(contenido, MAX_DESCOMPRIMIDO)
+    except zlib.error as exc:
+        raise ParseError(f'Cuerpo {codificacion} inválido - {exc}')
+    if descompresor.unconsumed_tail:
+        raise ParseError('Cuerpo descomprimido demasiado grande')
+    return datos
+
+
+class _DescompresionMixin:
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        codificacion = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower() if request else ''
+        if codificacion and codificacion != 'identity' and stream is not None:
+            stream = io.BytesIO(descomprimir(stream.read(), codificacion))
+        return super().parse(stream, media_type, parser_context)
+
+
+def con_descompresion(parser_class):
+    """Variante de `parser_class` que acepta cuerpos con Content-Encoding gzip/deflate."""
+    return type(f'{parser_class.__name__}Comprimido', (_DescompresionMixin, parser_class), {})
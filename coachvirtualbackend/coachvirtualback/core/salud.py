@@ -0,0 +1,130 @@
+"""
+Endpoints de salud para el balanceador / healthcheck de Railway.
+
+- /healthz: el proceso responde (sin BD ni cache)
+- /readyz: BD y cache alcanzables y sin migraciones pendientes
+
+Los atiende `SaludMiddleware`, primero en MIDDLEWARE: no pasan por sesiones,
+autenticación, CSRF, ALLOWED_HOSTS ni el router de URLs. /readyz guarda su
+resultado SALUD_CACHE_SEGUNDOS en memoria, así que un sondeo frecuente o bajo
+carga no toma una conexión de la BD en cada request.
+"""
+
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+
+
+RUTA_HEALTHZ = '/healthz'
+RUTA_READYZ = '/readyz'
+CLAVE_CACHE = 'salud:readyz'
+
+_lock = threading.Lock()
+_ultimo = None  # (monotonic, ok, detalle)
+_migraciones_ok = False
+
+
+def _revisar_bd():
+    conexion = connections[DEFAULT_DB_ALIAS]
+    with conexion.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def _revisar_cache():
+    cache.set(CLAVE_CACHE, 1, 30)
+    if cache.get(CLAVE_CACHE) != 1:
+        raise RuntimeError('la cache no devolvió el valor escrito')
+
+
+def _revisar_migraciones():
+    """Una vez aplicadas, las migraciones no vuelven atrás: se revisa hasta que pasa."""
+    global _migraciones_ok
+    if _migraciones_ok:
+        return
+    conexion = connections[DEFAULT_DB_ALIAS]
+    executor = MigrationExecutor(conexion)
+    pendientes = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if pendientes:
+        raise RuntimeError(f'{len(pendientes)} migraciones pendientes')
+    _migraciones_ok = True
+
+
+REVISIONES = (
+    ('bd', _revisar_bd),
+    ('cache', _revisar_cache),
+    ('migraciones', _revisar_migraciones),
+)
+
+
+def estado_readiness():
+    """(ok, detalle) con el resultado de cada revisión, reutilizado por SALUD_CACHE_SEGUNDOS."""
+    global _ultimo
+    vigencia = getattr(settings, 'SALUD_CACHE_SEGUNDOS', 5)
+    ultimo = _ultimo
+    if ultimo is not None and time.monotonic() - ultimo[0] < vigencia:
+        return ultimo[1], ultimo[2]
+    with _lock:
+        ultimo = _ultimo
+        if ultimo is not None and time.monotonic() - ultimo[0] < vigencia:
+            return ultimo[1], ultimo[2]
+        detalle = {}
+        for nombre, revision in REVISIONES:
+            try:
+                revision()
+                detalle[nombre] = 'ok'
+            except Exception as e:
+                detalle[nombre] = f'{type(e).__name__}: {e}'
+        ok = all(valor == 'ok' for valor in detalle.values())
+        _ultimo = (time.monotonic(), ok, detalle)
+        return ok, detalle
+
+
+def reiniciar():
+    """Olvida el último resultado (tests)."""
+    global _ultimo, _migraciones_ok
+    with _lock:
+        _ultimo = None
+        _migraciones_ok = False
+
+
+def _healthz():
+    return JsonResponse({'estado': 'ok'})
+
+
+def _readyz():
+    ok, detalle = estado_readiness()
+    return JsonResponse({'estado': 'ok' if ok else 'no_listo', **detalle}, status=200 if ok else 503)
+
+
+class SaludMiddleware:
+    """Responde /healthz y /readyz antes del resto del stack (sync y async)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path == RUTA_HEALTHZ:
+            return _healthz()
+        if request.path == RUTA_READYZ:
+            return _readyz()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path == RUTA_HEALTHZ:
+            return _healthz()
+        if request.path == RUTA_READYZ:
+            return await sync_to_async(_readyz)()
+        return await self.get_response(request)
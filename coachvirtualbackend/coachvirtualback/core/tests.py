@@ -1,3 +1,435 @@
-from django.test import TestCase
+"""
+Tests unitarios para el módulo core - CoachVirtual
+Cubre el middleware de rendimiento, el registro de métricas, /metrics, los
+endpoints de salud, la compresión de respuestas, el renderer orjson y
+/api/bootstrap/.
+"""
+import gzip
+import io
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import brotli
+import numpy as np
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from coachvirtualback.cache import estadisticas_cache, reiniciar_estadisticas_cache
+from suscripciones.services import obtener_catalogo
+from usuarios.models import Alertas
+
+from . import http, metricas, salud
+from .middleware import RendimientoMiddleware
+from .renderers import ORJSONParser, ORJSONRenderer
+
+User = get_user_model()
+
+CACHE_LOCAL = {'default': {'BACKEND': 'coachvirtualback.cache.MetricasLocMemCache'}}
+
+
+class HistogramaTest(TestCase):
+    """Tests para el registro de métricas"""
+
+    def setUp(self):
+        self.registro = metricas.Registro()
+
+    def test_percentiles_desde_buckets(self):
+        """Test: Percentiles estimados desde los buckets del histograma"""
+        for valor in range(1, 101):
+            self.registro.observar('x', valor, buckets=(10, 50, 100))
+        histograma = next(iter(self.registro.histogramas.values()))
+        self.assertEqual(histograma['n'], 100)
+        self.assertEqual(histograma['conteos'], [10, 40, 50, 0])
+        self.assertAlmostEqual(metricas.percentil(histograma, 50), 50.0)
+        self.assertAlmostEqual(metricas.percentil(histograma, 99), 99.0)
+
+    def test_contadores_por_etiqueta(self):
+        """Test: Los contadores se separan por etiquetas"""
+        self.registro.incrementar('req', ruta='a')
+        self.registro.incrementar('req', ruta='a')
+        self.registro.incrementar('req', ruta='b')
+        self.assertEqual(self.registro.contadores[('req', (('ruta', 'a'),))], 2)
+        self.assertEqual(self.registro.contadores[('req', (('ruta', 'b'),))], 1)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class RendimientoMiddlewareTest(APITestCase):
+    """Tests para el middleware de rendimiento y su endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        metricas.reiniciar()
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@coachvirtual.com', password='testpass123'
+        )
+        self.user = User.objects.create_user(
+            username='normal', email='normal@coachvirtual.com', password='testpass123'
+        )
+
+    def test_registra_request_por_ruta(self):
+        """Test: Cada request queda registrado con sus consultas"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/usuarios/me/')
+        claves = {clave for clave in metricas.registro.histogramas}
+        self.assertIn(('http_duracion_ms', (('ruta', 'me'),)), claves)
+        consultas = metricas.registro.histogramas[('http_consultas', (('ruta', 'me'),))]
+        self.assertEqual(consultas['n'], 1)
+
+    def test_endpoint_solo_admin(self):
+        """Test: Solo superusuarios ven las métricas"""
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/api/rendimiento/').status_code, 403)
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.get('/api/usuarios/me/')
+        response = self.client.get('/api/rendimiento/')
+        self.assertEqual(response.status_code, 200)
+        rutas = {r['ruta']: r for r in response.data['rutas']}
+        self.assertEqual(rutas['me']['requests'], 1)
+        self.assertIn('p99', rutas['me']['latencia_ms'])
+
+    @override_settings(RENDIMIENTO_UMBRAL_LENTO_MS=0)
+    def test_request_lento_se_registra_en_log(self):
+        """Test: Requests sobre el umbral se registran con sus consultas"""
+        self.client.force_authenticate(user=self.user)
+        with self.assertLogs('coachvirtual.rendimiento', level='WARNING') as logs:
+            self.client.get('/api/usuarios/me/')
+        self.assertIn('Request lento GET /api/usuarios/me/', logs.output[0])
+
+    async def test_modo_async(self):
+        """Test: Con una vista async el middleware corre async y cuenta sus consultas"""
+        async def vista(request):
+            await User.objects.filter(pk=self.user.pk).aexists()
+            return HttpResponse('ok')
+
+        middleware = RendimientoMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().get('/async/'))
+        self.assertEqual(response.status_code, 200)
+        consultas = metricas.registro.histogramas[('http_consultas', (('ruta', 'sin_ruta'),))]
+        self.assertEqual((consultas['n'], consultas['suma']), (1, 1))
+
+
+
+class ClientesHttpTest(TestCase):
+    """Tests del cierre de los clientes HTTP por event loop"""
+
+    @staticmethod
+    def _vista(abiertos):
+        @http.cerrar_clientes_al_terminar
+        async def vista(request):
+            abiertos.append(http.cliente_http())
+            return HttpResponse('ok')
+        return vista
+
+    def test_wsgi_cierra_al_terminar(self):
+        """Test: Con WSGI (un loop por request) el cliente se cierra al terminar la vista"""
+        abiertos = []
+        async_to_sync(self._vista(abiertos))(RequestFactory().get('/'))
+        self.assertTrue(abiertos[0].is_closed)
+
+    async def test_asgi_reutiliza(self):
+        """Test: Con ASGI el cliente queda abierto y el siguiente request lo reutiliza"""
+        abiertos = []
+        vista = self._vista(abiertos)
+        await vista(AsyncRequestFactory().get('/'))
+        await vista(AsyncRequestFactory().get('/'))
+        self.assertIs(abiertos[0], abiertos[1])
+        self.assertFalse(abiertos[0].is_closed)
+        await http.cerrar_clientes()
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class AgregadoProcesosTest(TestCase):
+    """Tests de la suma de métricas entre procesos"""
+
+    CLAVE = ('poses_ingestadas_total', (('tipo', 'snapshot'),))
+
+    def setUp(self):
+        cache.clear()
+        metricas.reiniciar()
+        # Los slots solo se usan con add() atómico entre procesos (Redis/Memcached)
+        self.atomica = mock.patch('core.metricas._cache_atomica', return_value=True).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _publicar_otro(self, slot, identidad, poses):
+        otro = metricas.Registro()
+        otro.incrementar('poses_ingestadas_total', poses, tipo='snapshot')
+        otro.observar('http_duracion', 20, ruta='me')
+        cache.set(metricas.CLAVE_DATOS.format(slot), dict(otro.copia(), identidad=identidad), metricas.TTL_DATOS)
+        cache.set(metricas.CLAVE_SLOT.format(slot), identidad, metricas.TTL_SLOT)
+
+    def test_proceso_muerto_no_resta(self):
+        """Test: Al vencer el slot de un proceso sus contadores e histogramas siguen sumando"""
+        self._publicar_otro(40, 'otro:1:a', 5)
+        self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 5)
+
+        cache.delete(metricas.CLAVE_SLOT.format(40))
+        for _ in range(2):  # una sola vez, no en cada scrape
+            datos = metricas.agregado()
+            self.assertEqual(datos['contadores'][self.CLAVE], 5)
+            self.assertEqual(datos['histogramas'][('http_duracion', (('ruta', 'me'),))]['n'], 1)
+        self.assertEqual(datos['procesos'], 1)
+
+    def test_proceso_muerto_slot_vencido(self):
+        """Test: Si el slot de un proceso muerto vence por TTL su copia todavía se retira"""
+        self._publicar_otro(40, 'otro:1:a', 5)
+        ahora = time.time()
+        with mock.patch('time.time', return_value=ahora + metricas.TTL_SLOT + 1):
+            self.assertIsNone(cache.get(metricas.CLAVE_SLOT.format(40)))
+            self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 5)
+        self.assertEqual(cache.get(metricas.CLAVE_RETIRADOS)['contadores'][0][2], 5)
+
+    def test_slot_reutilizado(self):
+        """Test: Quien reserva el slot de un proceso muerto suma antes su última copia"""
+        self._publicar_otro(0, 'otro:1:a', 3)
+        cache.delete(metricas.CLAVE_SLOT.format(0))
+        metricas.registro.incrementar('poses_ingestadas_total', 2, tipo='snapshot')
+        metricas.publicar(forzar=True)
+        self.assertEqual(cache.get(metricas.CLAVE_SLOT.format(0)), metricas._identidad)
+        self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 5)
+
+    def test_slot_vencido_con_proceso_vivo(self):
+        """Test: Si el proceso pierde su slot sigue publicando solo lo nuevo"""
+        metricas.registro.incrementar('poses_ingestadas_total', 2, tipo='snapshot')
+        self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 2)
+        cache.delete(metricas.CLAVE_SLOT.format(metricas._slot))
+        metricas.registro.incrementar('poses_ingestadas_total', 1, tipo='snapshot')
+        self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 3)
+
+    def test_salida_del_proceso(self):
+        """Test: Al terminar, el proceso deja sus contadores en los retirados"""
+        metricas.registro.incrementar('poses_ingestadas_total', 4, tipo='snapshot')
+        metricas.publicar(forzar=True)
+        metricas.retirar_proceso()
+        self.assertEqual(cache.get(metricas.CLAVE_RETIRADOS)['contadores'][0][2], 4)
+        self.assertEqual(metricas.agregado()['contadores'][self.CLAVE], 4)
+
+    def test_sin_cache_atomica_por_proceso(self):
+        """Test: Con la cache en archivos no se reservan slots y se reportan solo las métricas del proceso"""
+        self.atomica.return_value = False
+        self._publicar_otro(40, 'otro:1:a', 5)
+        metricas.registro.incrementar('poses_ingestadas_total', 2, tipo='snapshot')
+        with self.assertLogs('core.metricas', 'WARNING'):
+            datos = metricas.agregado()
+        self.assertEqual(datos['contadores'][self.CLAVE], 2)
+        self.assertEqual(datos['procesos'], 1)
+        self.assertIsNone(metricas._slot)
+        self.assertIsNone(cache.get(metricas.CLAVE_SLOT.format(0)))
+
+    def test_lecturas_propias_no_cuentan_en_la_cache(self):
+        """Test: Publicar y agregar métricas no cambia los aciertos/fallos de la cache"""
+        reiniciar_estadisticas_cache()
+        cache.get('otra-clave')
+        metricas.agregado()
+        metricas.agregado()
+        self.assertEqual(estadisticas_cache()['default'], {'hits': 0, 'misses': 1, 'hit_rate': 0.0})
+
+
+@override_settings(CACHES=CACHE_LOCAL, METRICS_TOKEN='secreto')
+class MetricasPrometheusTest(APITestCase):
+    """Tests para el endpoint /metrics"""
+
+    def setUp(self):
+        cache.clear()
+        metricas.reiniciar()
+        self.user = User.objects.create_user(
+            username='prom', email='prom@coachvirtual.com', password='testpass123'
+        )
+
+    def test_formato_prometheus(self):
+        """Test: /metrics exporta histogramas por ruta en segundos"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/usuarios/me/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = response.content.decode()
+        self.assertIn('# TYPE coachvirtual_http_duracion_seconds histogram', texto)
+        self.assertIn('coachvirtual_http_duracion_seconds_count{ruta="me"} 1', texto)
+        self.assertIn('coachvirtual_http_duracion_seconds_bucket{ruta="me",le="+Inf"} 1', texto)
+        self.assertIn('coachvirtual_stripe_eventos_pendientes 0', texto)
+
+    def test_incluye_metricas_de_negocio(self):
+        """Test: Las poses ingestadas aparecen como contador"""
+        metricas.registro.incrementar('poses_ingestadas_total', 3, tipo='snapshot')
+        texto = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto').content.decode()
+        self.assertIn('coachvirtual_poses_ingestadas_total{tipo="snapshot"} 3', texto)
+
+    def test_token_requerido(self):
+        """Test: Con METRICS_TOKEN configurado se exige el token"""
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_sin_token_cerrado(self):
+        """Test: Sin METRICS_TOKEN /metrics da 403 fuera de DEBUG"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+@override_settings(CACHES=CACHE_LOCAL, ALLOWED_HOSTS=['api.coachvirtual.com'])
+class SaludTest(TestCase):
+    """Tests para /healthz y /readyz"""
+
+    def setUp(self):
+        salud.reiniciar()
+
+    def test_healthz_sin_bd(self):
+        """Test: /healthz responde sin consultas ni validar el host"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/healthz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'estado': 'ok'})
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_readyz_reutiliza_resultado(self):
+        """Test: /readyz revisa BD, cache y migraciones una vez por ventana"""
+        response = self.client.get('/readyz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'estado': 'ok', 'bd': 'ok', 'cache': 'ok', 'migraciones': 'ok'})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/readyz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_readyz_no_listo(self):
+        """Test: Una revisión fallida responde 503 con el detalle"""
+        def falla():
+            raise RuntimeError('sin conexión')
+
+        with mock.patch.object(salud, 'REVISIONES', (('bd', falla),)):
+            response = self.client.get('/readyz', HTTP_HOST='healthcheck.railway.app')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['bd'], 'RuntimeError: sin conexión')
+
+
+@override_settings(CACHES=CACHE_LOCAL, COMPRESION_MIN_BYTES=1024, METRICS_TOKEN='secreto')
+class CompresionTest(TestCase):
+    """Tests para la compresión de respuestas JSON"""
+
+    def setUp(self):
+        cache.clear()
+        metricas.reiniciar()
+        for i in range(30):
+            metricas.registro.incrementar('poses_ingestadas_total', tipo=f'tipo_{i}')
+
+    def test_gzip_sobre_umbral(self):
+        """Test: Respuestas grandes se comprimen con gzip si el cliente lo acepta"""
+        response = self.client.get('/metrics', HTTP_ACCEPT_ENCODING='gzip', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'coachvirtual_poses_ingestadas_total{tipo="tipo_29"} 1', gzip.decompress(response.content))
+
+    def test_brotli_preferido(self):
+        """Test: Con 'br' aceptado se usa brotli"""
+        response = self.client.get(
+            '/metrics', HTTP_ACCEPT_ENCODING='gzip, deflate, br', HTTP_AUTHORIZATION='Bearer secreto'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(b'coachvirtual_poses_ingestadas_total{tipo="tipo_29"} 1', brotli.decompress(response.content))
+
+    def test_respuesta_chica_sin_comprimir(self):
+        """Test: Bajo el umbral la respuesta sale tal cual"""
+        response = self.client.get('/healthz', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class ORJSONRendererTest(TestCase):
+    """Tests para el renderer y parser JSON con orjson"""
+
+    def test_mismo_json_que_drf(self):
+        """Test: Decimal, datetime y textos se codifican igual que con DRF"""
+        datos = {
+            'precio': Decimal('49.90'),
+            'fecha': datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+            'nombre': 'Básico',
+            'items': (1, 2.5, None, True),
+        }
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(datos)),
+            json.loads(JSONRenderer().render(datos)),
+        )
+        self.assertIn(b'"2025-01-02T03:04:05Z"', ORJSONRenderer().render(datos))
+
+    def test_numpy(self):
+        """Test: Arrays y escalares de numpy se serializan como listas y números"""
+        landmarks = np.arange(6, dtype=np.float32).reshape(3, 2)
+        datos = {'landmarks': landmarks, 'transpuesta': landmarks.T, 'media': np.float64(1.5)}
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(datos)),
+            {'landmarks': [[0, 1], [2, 3], [4, 5]], 'transpuesta': [[0, 2, 4], [1, 3, 5]], 'media': 1.5},
+        )
+
+    def test_parser(self):
+        """Test: El parser lee JSON y rechaza contenido inválido"""
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}')), {'a': [1, 2]})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"a": '))
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class BootstrapTest(APITestCase):
+    """Tests para /api/bootstrap/"""
+
+    def setUp(self):
+        cache.clear()
+        obtener_catalogo()
+        self.user = User.objects.create_user(username='boot', email='boot@test.com', password='x')
+        Alertas.objects.create(usuario=self.user, mensaje='Nueva', fecha=timezone.now(), estado=True)
+        Alertas.objects.create(usuario=self.user, mensaje='Leída', fecha=timezone.now(), estado=False)
+        response = self.client.post('/api/token/', {'email': 'boot@test.com', 'password': 'x'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.fitness = mock.patch(
+            'core.controllers.bootstrap_controller.fitness_de_hoy', return_value={'steps': 1200}
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_todas_las_secciones(self):
+        """Test: Sin `campos` retorna perfil, plan, consumo, alertas y fitness"""
+        response = self.client.get('/api/bootstrap/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'perfil', 'plan', 'consumo', 'alertas', 'fitness'})
+        self.assertEqual(response.data['perfil']['email'], 'boot@test.com')
+        self.assertEqual(response.data['plan']['plan_actual'], 'gratis')
+        self.assertIn('features', response.data['plan'])
+        self.assertEqual(response.data['alertas'], {'no_leidas': 1})
+        self.assertEqual(response.data['fitness'], {'steps': 1200})
+
+    def test_campos_parciales_sin_cargar_usuario(self):
+        """Test: plan y alertas salen del token y un COUNT, sin cargar el usuario"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/bootstrap/?campos=plan,alertas')
+        self.assertEqual(set(response.data), {'plan', 'alertas'})
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_campo_desconocido(self):
+        """Test: Una sección inexistente responde 400"""
+        response = self.client.get('/api/bootstrap/?campos=perfil,clima')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('clima', response.data['error'])
+
+    def test_fitness_cacheado(self):
+        """Test: El fitness del día se reutiliza entre llamadas cercanas"""
+        self.client.get('/api/bootstrap/?campos=fitness')
+        self.client.get('/api/bootstrap/?campos=fitness')
+        self.assertEqual(self.fitness.call_count, 1)
+
+    def test_fitness_sin_sincronizar(self):
+        """Test: El arranque no sincroniza con Google Fit, solo lee la serie local"""
+        self.client.get('/api/bootstrap/?campos=fitness')
+        self.assertEqual(self.fitness.call_args.kwargs, {'sincronizar': False})
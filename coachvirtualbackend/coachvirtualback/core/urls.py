@@ -0,0 +1,11 @@
+# core/urls.py
+from django.urls import path
+from .controllers.bootstrap_controller import BootstrapVista
+from .controllers.rendimiento_controller import RendimientoVista
+
+urlpatterns = [
+    # /api/rendimiento/ (solo administradores)
+    path('rendimiento/', RendimientoVista.as_view(), name='rendimiento'),
+    # /api/bootstrap/ (arranque de la app en una llamada)
+    path('bootstrap/', BootstrapVista.as_view(), name='bootstrap'),
+]
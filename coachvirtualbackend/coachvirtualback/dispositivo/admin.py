@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import CuentaGoogleFit, ResumenFitness
+
+
+@admin.register(CuentaGoogleFit)
+class CuentaGoogleFitAdmin(admin.ModelAdmin):
+    list_display = ['id', 'usuario', 'email', 'expira_en', 'updated_at']
+    search_fields = ['usuario__email', 'email']
+    readonly_fields = ['access_token', 'expira_en', 'created_at', 'updated_at']
+    raw_id_fields = ['usuario']
+
+
+@admin.register(ResumenFitness)
+class ResumenFitnessAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'periodo', 'inicio', 'pasos', 'calorias', 'fc_promedio']
+    list_filter = ['periodo']
+    search_fields = ['usuario__email']
+    raw_id_fields = ['usuario']
+    date_hierarchy = 'inicio'
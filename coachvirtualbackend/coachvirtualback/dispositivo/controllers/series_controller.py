@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..serializers import MuestraFitnessSerializer
+from ..services.series import RANGO_MAXIMO, consultar_serie, registrar_muestras
+
+
+MAX_MUESTRAS = 5000
+
+# Días que se muestran si no se envía ?desde
+RANGO_POR_DEFECTO = {
+    'hora': 0,
+    'dia': 6,
+    'semana': 7 * 11,
+}
+
+
+class MuestrasFitnessVista(APIView):
+    """
+    POST /api/dispositivo/muestras/ — ingesta en lote de muestras del usuario.
+    Body: {"muestras": [{"timestamp": "...", "steps": 120, "calories": 5.2, "heartRate": 88}, ...]}
+    (también acepta la lista directamente)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        datos = request.data.get('muestras') if isinstance(request.data, dict) else request.data
+        serializer = MuestraFitnessSerializer(data=datos, many=True, max_length=MAX_MUESTRAS)
+        serializer.is_valid(raise_exception=True)
+        resultado = registrar_muestras(request.user.id, serializer.validated_data)
+        return Response(resultado, status=status.HTTP_201_CREATED)
+
+
+class SerieFitnessVista(APIView):
+    """
+    GET /api/dispositivo/serie/?periodo=dia&desde=2025-01-01&hasta=2025-01-31
+    Serie para gráficos desde los buckets por hora o los rollups diario/semanal.
+    Por defecto: la última semana por día, hoy por hora o 12 semanas por semana.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        periodo = request.query_params.get('periodo', 'dia')
+        if periodo not in RANGO_MAXIMO:
+            return Response(
+                {'error': f"periodo debe ser uno de: {', '.join(RANGO_MAXIMO)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            hasta = date.fromisoformat(request.query_params['hasta']) if 'hasta' in request.query_params \
+                else timezone.localdate()
+            desde = date.fromisoformat(request.query_params['desde']) if 'desde' in request.query_params \
+                else hasta - timedelta(days=RANGO_POR_DEFECTO[periodo])
+        except ValueError:
+            return Response({'error': 'Fechas inválidas (formato YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if desde > hasta:
+            return Response({'error': 'desde debe ser anterior a hasta'}, status=status.HTTP_400_BAD_REQUEST)
+        if (hasta - desde).days > RANGO_MAXIMO[periodo]:
+            return Response(
+                {'error': f'Rango máximo para {periodo}: {RANGO_MAXIMO[periodo]} días'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({
+            'periodo': periodo,
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'puntos': consultar_serie(request.user.id, periodo, desde, hasta),
+        })
@@ -1,150 +1,333 @@
 """
-Cliente para Google Fit usando una cuenta fija (token de acceso y refresh).
-Lee pasos, calorías y frecuencia cardiaca del día actual.
-
-Requiere variables en .env o entorno:
-- GOOGLE_FIT_CLIENT_ID
-- GOOGLE_FIT_CLIENT_SECRET
-- GOOGLE_FIT_ACCESS_TOKEN
-- GOOGLE_FIT_REFRESH_TOKEN
+Cliente de Google Fit por usuario.
+Lee pasos, calorías y frecuencia cardiaca de la cuenta de Google vinculada al
+usuario (`CuentaGoogleFit`). Los datos se copian por minuto a la serie local
+(services/sincronizacion.py) y el dashboard lee de ahí.
+
+- Conexiones: una `requests.Session` con pool por proceso (sync) y el
+  httpx.AsyncClient de `core.http` (async).
+- Tokens: el access_token de cada usuario se guarda en la cache y en la
+  cuenta; se refresca MARGEN_REFRESH segundos antes de expirar, no al
+  recibir un 401 (que igual se maneja con un refresh y un reintento).
+- Single-flight: requests concurrentes del mismo usuario en el proceso
+  comparten una sola sincronización y un solo refresh del token. Entre
+  procesos, la clave CACHE_SYNC_KEY limita la sincronización a una cada
+  INTERVALO_SYNC segundos por usuario.
+
+Las URLs salen de settings (GOOGLE_FIT_API_URL, GOOGLE_OAUTH_TOKEN_URL) para
+poder apuntar el cliente a un servidor local de prueba.
 """
 
+import asyncio
+import logging
+import threading
 import time
-from datetime import datetime
-from typing import Dict, Any
+import weakref
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import requests
-from decouple import config
+from django.conf import settings
 from django.core.cache import cache
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
+from core.http import cliente_http
+from .models import CuentaGoogleFit, ResumenFitness, SincronizacionGoogleFit
+from .services.sincronizacion import asincronizar, sincronizar
 
-class GoogleFitClient:
-    AGGREGATE_URL = "https://www.googleapis.com/fitness/v1/users/me/dataset:aggregate"
-    TOKEN_URL = "https://oauth2.googleapis.com/token"
+logger = logging.getLogger(__name__)
+
+MARGEN_REFRESH = 300  # segundos antes de la expiración
+
+
+# ============================================================
+# CONEXIONES
+# ============================================================
+
+_sesion = None
+_sesion_lock = threading.Lock()
+
+
+def sesion_http() -> requests.Session:
+    """requests.Session compartida por el proceso (keep-alive y pool de conexiones)."""
+    global _sesion
+    if _sesion is None:
+        with _sesion_lock:
+            if _sesion is None:
+                sesion = requests.Session()
+                adaptador = HTTPAdapter(pool_maxsize=settings.HTTP_MAX_KEEPALIVE)
+                sesion.mount('https://', adaptador)
+                sesion.mount('http://', adaptador)
+                _sesion = sesion
+    return _sesion
+
+
+# ============================================================
+# SINGLE-FLIGHT
+# ============================================================
+
+class _Llamada:
+    __slots__ = ('evento', 'resultado', 'error')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave (hilos de un proceso)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_curso: Dict[str, _Llamada] = {}
+
+    def hacer(self, clave: str, funcion: Callable[[], Any]) -> Any:
+        with self._lock:
+            llamada = self._en_curso.get(clave)
+            lider = llamada is None
+            if lider:
+                llamada = self._en_curso[clave] = _Llamada()
+
+        if not lider:
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+        try:
+            llamada.resultado = funcion()
+            return llamada.resultado
+        except Exception as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            llamada.evento.set()
 
-    CACHE_TOKEN_KEY = "google_fit_access_token"
-    CACHE_STATS_KEY = "google_fit_stats"
-    CACHE_STATS_TTL = 15  # segundos
+
+class SingleFlightAsync:
+    """
+    Agrupa corrutinas concurrentes con la misma clave (por event loop). Solo
+    agrupa requests con ASGI, donde el loop es del worker; con WSGI las vistas
+    usan la versión sync y `SingleFlight`.
+    """
 
     def __init__(self):
-        self.client_id = config("GOOGLE_FIT_CLIENT_ID", default="")
-        self.client_secret = config("GOOGLE_FIT_CLIENT_SECRET", default="")
-        self.refresh_token = config("GOOGLE_FIT_REFRESH_TOKEN", default="")
+        self._por_loop = weakref.WeakKeyDictionary()
+
+    async def hacer(self, clave: str, funcion: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        en_curso = self._por_loop.setdefault(loop, {})
+        tarea = en_curso.get(clave)
+        if tarea is None:
+            tarea = en_curso[clave] = loop.create_task(funcion())
+            tarea.add_done_callback(lambda _: en_curso.pop(clave, None))
+        # shield: si un request se cancela, los demás siguen esperando el resultado
+        return await asyncio.shield(tarea)
+
+
+_vuelos = SingleFlight()
+_vuelos_async = SingleFlightAsync()
+
+
+# ============================================================
+# CLIENTE
+# ============================================================
+
+class GoogleFitClient:
+    CACHE_TOKEN_KEY = "google_fit:token:{}"
+    CACHE_SYNC_KEY = "google_fit:sync:{}"
+    INTERVALO_SYNC = 60  # segundos
+
+    TIPOS_DATOS = {
+        SincronizacionGoogleFit.PASOS: "com.google.step_count.delta",
+        SincronizacionGoogleFit.CALORIAS: "com.google.calories.expended",
+        SincronizacionGoogleFit.FRECUENCIA: "com.google.heart_rate.bpm",
+    }
+    BUCKET_MS = 60 * 1000
+
+    def __init__(self, cuenta: CuentaGoogleFit):
+        self.cuenta = cuenta
+        self.usuario_id = cuenta.usuario_id
+        self.client_id = settings.GOOGLE_FIT_CLIENT_ID
+        self.client_secret = settings.GOOGLE_FIT_CLIENT_SECRET
+        self.aggregate_url = f"{settings.GOOGLE_FIT_API_URL.rstrip('/')}/users/me/dataset:aggregate"
+        self.token_url = settings.GOOGLE_OAUTH_TOKEN_URL
+        self.clave_token = self.CACHE_TOKEN_KEY.format(self.usuario_id)
+        self.clave_sync = self.CACHE_SYNC_KEY.format(self.usuario_id)
 
-        # access token preferentemente desde cache (puede venir de un refresh previo)
-        cached = cache.get(self.CACHE_TOKEN_KEY)
-        self.access_token = cached or config("GOOGLE_FIT_ACCESS_TOKEN", default="")
+    @classmethod
+    def para_usuario(cls, usuario_id) -> Optional["GoogleFitClient"]:
+        cuenta = CuentaGoogleFit.objects.filter(usuario_id=usuario_id).first()
+        return cls(cuenta) if cuenta else None
 
-        if not self.access_token:
-            raise ValueError("Falta GOOGLE_FIT_ACCESS_TOKEN en entorno o cache")
+    @classmethod
+    async def apara_usuario(cls, usuario_id) -> Optional["GoogleFitClient"]:
+        cuenta = await CuentaGoogleFit.objects.filter(usuario_id=usuario_id).afirst()
+        return cls(cuenta) if cuenta else None
 
-    def _headers(self) -> Dict[str, str]:
+    # ---------- tokens ----------
+
+    def _token_vigente(self, guardado: Optional[Dict[str, Any]]) -> Optional[str]:
+        if guardado is None and self.cuenta.access_token and self.cuenta.expira_en:
+            guardado = {'token': self.cuenta.access_token, 'expira': self.cuenta.expira_en.timestamp()}
+        if guardado and guardado['expira'] - time.time() > MARGEN_REFRESH:
+            return guardado['token']
+        return None
+
+    def _datos_refresh(self) -> Dict[str, str]:
         return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "refresh_token": self.cuenta.refresh_token,
+            "grant_type": "refresh_token",
         }
 
-    def _refresh_access_token_if_possible(self) -> bool:
-        """Intenta refrescar el access_token si hay client_id/secret y refresh_token."""
-        if not (self.client_id and self.client_secret and self.refresh_token):
-            return False
-        try:
-            data = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "refresh_token": self.refresh_token,
-                "grant_type": "refresh_token",
-            }
-            r = requests.post(self.TOKEN_URL, data=data, timeout=15)
-            r.raise_for_status()
-            payload = r.json()
-            new_access = payload.get("access_token")
-            expires_in = int(payload.get("expires_in", 3600))
-            if new_access:
-                self.access_token = new_access
-                # guarda en cache ligeramente menor al expires_in
-                cache.set(self.CACHE_TOKEN_KEY, new_access, max(60, expires_in - 60))
-                return True
-            return False
-        except requests.RequestException:
-            return False
+    def _guardar_token(self, payload: Dict[str, Any]):
+        """Guarda el token nuevo en la cache; retorna (token, campos para la cuenta)."""
+        token = payload.get("access_token")
+        if not token:
+            raise ValueError("Google no devolvió access_token")
+        expires_in = int(payload.get("expires_in", 3600))
+        expira = time.time() + expires_in
+        cache.set(self.clave_token, {'token': token, 'expira': expira}, expires_in)
+        self.cuenta.access_token = token
+        self.cuenta.expira_en = datetime.fromtimestamp(expira, tz=dt_timezone.utc)
+        return token, {'access_token': token, 'expira_en': self.cuenta.expira_en}
+
+    def _refrescar(self) -> str:
+        r = sesion_http().post(self.token_url, data=self._datos_refresh(), timeout=settings.HTTP_TIMEOUT)
+        r.raise_for_status()
+        token, campos = self._guardar_token(r.json())
+        CuentaGoogleFit.objects.filter(pk=self.cuenta.pk).update(**campos)
+        return token
+
+    async def _arefrescar(self) -> str:
+        r = await cliente_http().post(self.token_url, data=self._datos_refresh())
+        r.raise_for_status()
+        token, campos = self._guardar_token(r.json())
+        await CuentaGoogleFit.objects.filter(pk=self.cuenta.pk).aupdate(**campos)
+        return token
+
+    def access_token(self, forzar: bool = False) -> str:
+        token = None if forzar else self._token_vigente(cache.get(self.clave_token))
+        return token or _vuelos.hacer(f"token:{self.usuario_id}", self._refrescar)
+
+    async def aaccess_token(self, forzar: bool = False) -> str:
+        token = None if forzar else self._token_vigente(await cache.aget(self.clave_token))
+        return token or await _vuelos_async.hacer(f"token:{self.usuario_id}", self._arefrescar)
+
+    # ---------- aggregate ----------
+
+    @staticmethod
+    def _headers(token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
     def _post_aggregate(self, body: Dict[str, Any]) -> Dict[str, Any]:
-        # primer intento con el access_token actual
-        r = requests.post(self.AGGREGATE_URL, json=body, headers=self._headers(), timeout=20)
+        sesion = sesion_http()
+        r = sesion.post(self.aggregate_url, json=body, headers=self._headers(self.access_token()),
+                        timeout=settings.HTTP_TIMEOUT)
+        if r.status_code == 401:
+            # token revocado antes de su expiración: refresh y un reintento
+            r = sesion.post(self.aggregate_url, json=body, headers=self._headers(self.access_token(forzar=True)),
+                            timeout=settings.HTTP_TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+
+    async def _apost_aggregate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        client = cliente_http()
+        r = await client.post(self.aggregate_url, json=body, headers=self._headers(await self.aaccess_token()))
         if r.status_code == 401:
-            # intenta refresh si se puede
-            if self._refresh_access_token_if_possible():
-                r = requests.post(self.AGGREGATE_URL, json=body, headers=self._headers(), timeout=20)
+            r = await client.post(self.aggregate_url, json=body,
+                                  headers=self._headers(await self.aaccess_token(forzar=True)))
         r.raise_for_status()
         return r.json()
 
+    def _cuerpo(self, tipos, inicio, fin) -> Dict[str, Any]:
+        return {
+            "aggregateBy": [{"dataTypeName": self.TIPOS_DATOS[tipo]} for tipo in tipos],
+            "bucketByTime": {"durationMillis": self.BUCKET_MS},
+            "startTimeMillis": int(inicio.timestamp() * 1000),
+            "endTimeMillis": int(fin.timestamp() * 1000),
+        }
+
+    def aggregate(self, tipos, inicio, fin) -> List[Dict[str, Any]]:
+        """Muestras por minuto de `tipos` en [inicio, fin), en el formato de registrar_muestras."""
+        return self._parse_aggregate(self._post_aggregate(self._cuerpo(tipos, inicio, fin)), tipos)
+
+    async def aaggregate(self, tipos, inicio, fin) -> List[Dict[str, Any]]:
+        return self._parse_aggregate(await self._apost_aggregate(self._cuerpo(tipos, inicio, fin)), tipos)
+
     @staticmethod
-    def _start_end_today_ms():
-        now = datetime.now()
-        start = datetime(now.year, now.month, now.day)
-        return int(start.timestamp() * 1000), int(time.time() * 1000)
+    def _parse_aggregate(data: Dict[str, Any], tipos) -> List[Dict[str, Any]]:
+        # parse buckets → datasets (uno por tipo, en orden) → points
+        muestras = []
+        for bucket in data.get("bucket", []):
+            muestra = {}
+            for tipo, dataset in zip(tipos, bucket.get("dataset", [])):
+                valores = [p.get("value", [{}])[0] for p in dataset.get("point", [])]
+                if not valores:
+                    continue
+                if tipo == SincronizacionGoogleFit.PASOS:
+                    muestra["steps"] = sum(int(v.get("intVal") or v.get("fpVal") or 0) for v in valores)
+                elif tipo == SincronizacionGoogleFit.CALORIAS:
+                    muestra["calories"] = sum(float(v.get("fpVal") or v.get("intVal") or 0) for v in valores)
+                else:
+                    # heart rate: summary con avg/max/min; algunos retornan fpVal, otros mapVal
+                    v = valores[0]
+                    if "fpVal" in v:
+                        muestra["heartRate"] = int(round(v["fpVal"]))
+                    elif v.get("mapVal"):
+                        avg_items = [m for m in v["mapVal"] if m.get("key") == "avg"]
+                        if avg_items:
+                            muestra["heartRate"] = int(round(avg_items[0].get("value", {}).get("fpVal", 0)))
+            if muestra:
+                muestra["timestamp"] = datetime.fromtimestamp(int(bucket["startTimeMillis"]) / 1000, tz=dt_timezone.utc)
+                muestras.append(muestra)
+        return muestras
+
+    # ---------- stats del día ----------
 
     def get_today_stats(self) -> Dict[str, Any]:
-        # 1) Intentar servir desde cache inmediato para reducir latencia percibida
-        cached = cache.get(self.CACHE_STATS_KEY)
-        if cached:
-            return cached
-
-        start_ms, end_ms = self._start_end_today_ms()
-        body = {
-            "aggregateBy": [
-                {"dataTypeName": "com.google.step_count.delta"},
-                {"dataTypeName": "com.google.calories.expended"},
-                {"dataTypeName": "com.google.heart_rate.bpm"},
-            ],
-            "bucketByTime": {"durationMillis": end_ms - start_ms},
-            "startTimeMillis": start_ms,
-            "endTimeMillis": end_ms,
-        }
+        """Sincroniza lo nuevo (a lo más cada INTERVALO_SYNC s) y lee el día de la serie local."""
+        try:
+            _vuelos.hacer(f"sync:{self.usuario_id}", self._sincronizar_si_toca)
+        except Exception as e:
+            logger.warning("Sincronización de Google Fit falló (usuario %s): %s", self.usuario_id, e)
+        return self.stats_locales()
 
-        data = self._post_aggregate(body)
-
-        # parse buckets → datasets → points
-        steps = 0
-        calories = 0
-        hr_avg = 0
-
-        buckets = data.get("bucket", [])
-        if buckets:
-            ds = buckets[0].get("dataset", [])
-            # steps
-            if len(ds) > 0 and ds[0].get("point"):
-                p = ds[0]["point"][0]
-                v = p.get("value", [{}])[0]
-                steps = int(v.get("intVal") or v.get("fpVal") or 0)
-            # calories
-            if len(ds) > 1 and ds[1].get("point"):
-                p = ds[1]["point"][0]
-                v = p.get("value", [{}])[0]
-                calories = int(round(v.get("fpVal") or v.get("intVal") or 0))
-            # heart rate (puede venir como summary con avg)
-            if len(ds) > 2 and ds[2].get("point"):
-                p = ds[2]["point"][0]
-                v = p.get("value", [{}])[0]
-                # algunos retornan avg/min/max en mapVal, otros en fpVal
-                if "fpVal" in v:
-                    hr_avg = int(round(v["fpVal"]))
-                elif "mapVal" in v and v["mapVal"]:
-                    # buscar clave 'avg'
-                    avg_items = [m for m in v["mapVal"] if m.get("key") == "avg"]
-                    if avg_items:
-                        hr_avg = int(round(avg_items[0].get("value", {}).get("fpVal", 0)))
-
-        result = {
-            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "steps": steps,
-            "calories": calories,
-            "heartRate": hr_avg,
-            "owner": "joandanielrr@gmail.com",
+    def stats_locales(self) -> Dict[str, Any]:
+        """Stats del día según la serie local, sin llamar a Google (lo ya sincronizado)."""
+        return self._stats(ResumenFitness.objects.filter(**self._filtro_hoy()).first())
+
+    def _sincronizar_si_toca(self):
+        if cache.add(self.clave_sync, True, self.INTERVALO_SYNC):
+            sincronizar(self)
+
+    async def aget_today_stats(self) -> Dict[str, Any]:
+        """Igual que get_today_stats, sin bloquear el event loop mientras espera a Google."""
+        try:
+            await _vuelos_async.hacer(f"sync:{self.usuario_id}", self._asincronizar_si_toca)
+        except Exception as e:
+            logger.warning("Sincronización de Google Fit falló (usuario %s): %s", self.usuario_id, e)
+        return self._stats(await ResumenFitness.objects.filter(**self._filtro_hoy()).afirst())
+
+    async def _asincronizar_si_toca(self):
+        if await cache.aadd(self.clave_sync, True, self.INTERVALO_SYNC):
+            await asincronizar(self)
+
+    def _filtro_hoy(self) -> Dict[str, Any]:
+        return {"usuario_id": self.usuario_id, "periodo": ResumenFitness.DIA, "inicio": timezone.localdate()}
+
+    def _stats(self, resumen: Optional[ResumenFitness]) -> Dict[str, Any]:
+        return {
+            "fecha": timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"),
+            "steps": resumen.pasos if resumen else 0,
+            "calories": int(round(resumen.calorias)) if resumen else 0,
+            "heartRate": (resumen.fc_promedio or 0) if resumen else 0,
+            "owner": self.cuenta.email,
             "fuente": "Google Fit",
         }
-
-        # Guardar en cache por unos segundos para responder más rápido
-        cache.set(self.CACHE_STATS_KEY, result, self.CACHE_STATS_TTL)
-        return result
@@ -6,12 +6,19 @@ Genera datos basados en:
 - Hora del día (más actividad durante el día)
 - Patrones realistas de ejercicio
 - Datos persistentes por usuario
+
+Con SIMULADOR_FITNESS_SEMILLA configurada, `get_current_stats` usa el
+simulador determinista (dispositivo/simulador.py): la serie del día del
+usuario se calcula una vez, se guarda en la cache y cada consulta es un
+acceso por índice al minuto actual.
 """
 
 import random
 from datetime import datetime, timedelta
 from typing import Dict, Any
+from django.conf import settings
 from django.core.cache import cache
+from django.utils import timezone
 
 
 class LocalFitnessSimulator:
@@ -79,6 +86,9 @@ class LocalFitnessSimulator:
     
     def get_current_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas actuales simuladas."""
+        if settings.SIMULADOR_FITNESS_SEMILLA is not None:
+            return self._get_current_stats_determinista(settings.SIMULADOR_FITNESS_SEMILLA)
+
         base = self._load_daily_base()
         progress = self._get_day_progress()
         hour_factor = self._get_hour_factor()
@@ -119,6 +129,41 @@ class LocalFitnessSimulator:
             "dayProgress": int(progress * 100),
         }
     
+    def _get_current_stats_determinista(self, semilla: int) -> Dict[str, Any]:
+        """Estadísticas del minuto actual desde la serie determinista del día."""
+        from .simulador import SimuladorFitness
+
+        now = timezone.localtime()
+        cache_key = f"{self.cache_key}_serie_{semilla}_{now.date()}"
+        serie = cache.get(cache_key)
+        if serie is None:
+            simulador = SimuladorFitness(semilla)
+            serie = simulador.dia_de_usuario(self.user_id, now.date())
+            parametros = simulador.parametros([self.user_id])
+            serie["meta_pasos"] = int(parametros["meta_pasos"][0])
+            serie["meta_calorias"] = int(parametros["meta_calorias"][0])
+            cache.set(cache_key, serie, 60 * 60 * 24)
+
+        minuto = now.hour * 60 + now.minute
+        current_steps = int(serie["pasos"][minuto])
+        current_hr = int(serie["fc"][minuto])
+        hour_factor = self._get_hour_factor()
+
+        return {
+            "fecha": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "steps": current_steps,
+            "stepGoal": serie["meta_pasos"],
+            "stepProgress": min(100, int((current_steps / serie["meta_pasos"]) * 100)),
+            "calories": int(serie["calorias"][minuto]),
+            "calorieGoal": serie["meta_calorias"],
+            "heartRate": current_hr,
+            "heartRateZone": self._get_hr_zone(current_hr),
+            "owner": f"Usuario Local #{self.user_id}",
+            "fuente": "Simulador Local",
+            "activityLevel": self._get_activity_level(hour_factor),
+            "dayProgress": int(self._get_day_progress() * 100),
+        }
+    
     def _get_hr_zone(self, hr: int) -> str:
         """Determina la zona de frecuencia cardíaca."""
         if hr < 60:
@@ -144,11 +189,10 @@ class LocalFitnessSimulator:
             return "muy activo"
     
     def record_exercise(self, exercise_type: str, duration_minutes: int) -> Dict[str, Any]:
-        """Registra una sesión de ejercicio (bonus de pasos/calorías)."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        exercise_key = f"{self.cache_key}_exercise_{today}"
-        
-        exercises = cache.get(exercise_key) or []
+        """Registra una sesión de ejercicio (bonus de pasos/calorías) en la serie de fitness."""
+        from .services.series import registrar_muestras
+
+        now = timezone.now()
         
         # Calcular bonus
         steps_bonus = duration_minutes * random.randint(80, 120)
@@ -159,11 +203,14 @@ class LocalFitnessSimulator:
             "duration": duration_minutes,
             "steps_bonus": steps_bonus,
             "calories_bonus": int(calories_bonus),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
         }
         
-        exercises.append(exercise_record)
-        cache.set(exercise_key, exercises, 60 * 60 * 24)
+        registrar_muestras(self.user_id, [{
+            "timestamp": now,
+            "steps": steps_bonus,
+            "calories": exercise_record["calories_bonus"],
+        }])
         
         return exercise_record
 
@@ -0,0 +1,44 @@
+"""
+Genera historial de fitness determinista para entornos de demo y de carga.
+Ejecutar con:
+    python manage.py simular_fitness --dias 30 --semilla 42
+    python manage.py simular_fitness --dias 7 --limite 1000 --minutos
+Reemplaza los buckets y resúmenes de fitness de los usuarios y días generados.
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dispositivo.simulador import SimuladorFitness
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = 'Escribe en la serie de fitness un historial simulado (reproducible por semilla)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Días hacia atrás (se alinea al lunes)')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--limite', type=int, help='Solo los primeros N usuarios (por id)')
+        parser.add_argument('--minutos', action='store_true', help='Guardar también los buckets por minuto')
+
+    def handle(self, *args, **options):
+        ids = Usuario.objects.order_by('id').values_list('id', flat=True)
+        if options['limite']:
+            ids = ids[:options['limite']]
+        ids = list(ids)
+
+        ahora = timezone.localtime()
+        inicio = time.perf_counter()
+        filas = SimuladorFitness(options['semilla']).escribir(
+            ids, ahora.date() - timedelta(days=options['dias'] - 1), ahora, minutos=options['minutos'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Fitness simulado para {len(ids)} usuarios en {time.perf_counter() - inicio:.1f} s"
+        ))
+        self.stdout.write(f"   Buckets por minuto: {filas['minutos']}")
+        self.stdout.write(f"   Buckets por hora: {filas['horas']}")
+        self.stdout.write(f"   Resúmenes diarios y semanales: {filas['resumenes']}")
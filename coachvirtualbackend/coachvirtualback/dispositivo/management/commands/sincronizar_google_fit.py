@@ -0,0 +1,41 @@
+"""
+Sincroniza las cuentas de Google Fit vinculadas con la serie local.
+Ejecutar con (ej: cada 15 minutos desde cron):
+    python manage.py sincronizar_google_fit
+    python manage.py sincronizar_google_fit --backfill-dias 30 --paralelo 4
+    python manage.py sincronizar_google_fit --email usuario@correo.com --backfill-dias 90
+"""
+from django.core.management.base import BaseCommand
+
+from dispositivo.googlefit import GoogleFitClient
+from dispositivo.models import CuentaGoogleFit
+from dispositivo.services.sincronizacion import PARALELO, backfill, sincronizar
+
+
+class Command(BaseCommand):
+    help = 'Copia lo nuevo de Google Fit a la serie local (y opcionalmente el historial)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='Solo el usuario con este email')
+        parser.add_argument('--backfill-dias', type=int, default=0, help='Días de historial a copiar')
+        parser.add_argument('--paralelo', type=int, default=PARALELO, help='Tramos descargados a la vez en el backfill')
+
+    def handle(self, *args, **options):
+        cuentas = CuentaGoogleFit.objects.select_related('usuario').order_by('id')
+        if options['email']:
+            cuentas = cuentas.filter(usuario__email=options['email'])
+
+        errores = 0
+        for cuenta in cuentas:
+            cliente = GoogleFitClient(cuenta)
+            try:
+                tramos = sincronizar(cliente)
+                if options['backfill_dias']:
+                    tramos += backfill(cliente, options['backfill_dias'], options['paralelo'])
+            except Exception as e:
+                errores += 1
+                self.stderr.write(f"   ❌ {cuenta.usuario.email}: {e}")
+                continue
+            self.stdout.write(f"   {cuenta.usuario.email}: {tramos} tramos")
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Sincronización de Google Fit completada ({errores} errores)'))
@@ -0,0 +1,41 @@
+"""
+Vincula una cuenta de Google Fit (refresh token OAuth) a un usuario.
+Ejecutar con:
+    python manage.py vincular_google_fit usuario@correo.com --refresh-token <token>
+    python manage.py vincular_google_fit usuario@correo.com --refresh-token <token> --email-google otra@gmail.com
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from dispositivo.googlefit import GoogleFitClient
+from dispositivo.models import CuentaGoogleFit
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = 'Vincula una cuenta de Google Fit a un usuario'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Email del usuario de CoachVirtual')
+        parser.add_argument('--refresh-token', required=True)
+        parser.add_argument('--email-google', default='', help='Cuenta de Google (por defecto el email del usuario)')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = Usuario.objects.get(email=options['email'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuario no encontrado: {options['email']}")
+
+        cuenta, creada = CuentaGoogleFit.objects.update_or_create(
+            usuario=usuario,
+            defaults={
+                'email': options['email_google'] or usuario.email,
+                'refresh_token': options['refresh_token'],
+                'access_token': '',
+                'expira_en': None,
+            },
+        )
+        # Descartar el token de la cuenta anterior
+        cache.delete(GoogleFitClient.CACHE_TOKEN_KEY.format(usuario.id))
+        accion = 'vinculada' if creada else 'actualizada'
+        self.stdout.write(self.style.SUCCESS(f'✅ Cuenta de Google Fit {accion}: {cuenta}'))
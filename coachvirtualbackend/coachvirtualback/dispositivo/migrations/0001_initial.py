@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CuentaGoogleFit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(help_text='Cuenta de Google dueña de los datos', max_length=254)),
+                ('refresh_token', models.TextField(help_text='Refresh token OAuth con scopes de Fitness')),
+                ('access_token', models.TextField(blank=True, default='')),
+                ('expira_en', models.DateTimeField(blank=True, help_text='Expiración del access_token', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cuenta_google_fit', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Cuenta de Google Fit',
+                'verbose_name_plural': 'Cuentas de Google Fit',
+                'db_table': 'cuentas_google_fit',
+            },
+        ),
+    ]
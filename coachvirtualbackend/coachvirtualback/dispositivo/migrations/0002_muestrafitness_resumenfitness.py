@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dispositivo', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuestraFitness',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pasos', models.PositiveIntegerField(default=0)),
+                ('calorias', models.FloatField(default=0)),
+                ('fc_suma', models.PositiveIntegerField(default=0)),
+                ('fc_lecturas', models.PositiveIntegerField(default=0)),
+                ('fc_min', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('fc_max', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('resolucion', models.PositiveIntegerField(choices=[(60, 'Minuto'), (3600, 'Hora')], help_text='Segundos por bucket')),
+                ('inicio', models.DateTimeField(help_text='Inicio del bucket')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='muestras_fitness', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Muestra de fitness',
+                'verbose_name_plural': 'Muestras de fitness',
+                'db_table': 'muestras_fitness',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'resolucion', 'inicio'), name='muestra_fitness_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenFitness',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pasos', models.PositiveIntegerField(default=0)),
+                ('calorias', models.FloatField(default=0)),
+                ('fc_suma', models.PositiveIntegerField(default=0)),
+                ('fc_lecturas', models.PositiveIntegerField(default=0)),
+                ('fc_min', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('fc_max', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('periodo', models.CharField(choices=[('dia', 'Día'), ('semana', 'Semana')], max_length=10)),
+                ('inicio', models.DateField(help_text='Día, o lunes de la semana')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_fitness', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resumen de fitness',
+                'verbose_name_plural': 'Resúmenes de fitness',
+                'db_table': 'resumenes_fitness',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'periodo', 'inicio'), name='resumen_fitness_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dispositivo', '0002_muestrafitness_resumenfitness'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SincronizacionGoogleFit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('pasos', 'Pasos'), ('calorias', 'Calorías'), ('frecuencia', 'Frecuencia cardiaca')], max_length=20)),
+                ('desde', models.DateTimeField()),
+                ('hasta', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sincronizaciones_google_fit', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sincronización de Google Fit',
+                'verbose_name_plural': 'Sincronizaciones de Google Fit',
+                'db_table': 'sincronizaciones_google_fit',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'tipo'), name='sincronizacion_google_fit_unica')],
+            },
+        ),
+    ]
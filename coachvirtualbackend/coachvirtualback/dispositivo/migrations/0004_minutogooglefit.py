@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dispositivo', '0003_sincronizaciongooglefit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MinutoGoogleFit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pasos', models.PositiveIntegerField(default=0)),
+                ('calorias', models.FloatField(default=0)),
+                ('fc_suma', models.PositiveIntegerField(default=0)),
+                ('fc_lecturas', models.PositiveIntegerField(default=0)),
+                ('fc_min', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('fc_max', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('inicio', models.DateTimeField(help_text='Inicio del minuto')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='minutos_google_fit', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Minuto de Google Fit',
+                'verbose_name_plural': 'Minutos de Google Fit',
+                'db_table': 'minutos_google_fit',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'inicio'), name='minuto_google_fit_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,161 @@
+from django.db import models
+from usuarios.models import Usuario
+
+
+class CuentaGoogleFit(models.Model):
+    """
+    Cuenta de Google Fit vinculada a un usuario.
+    El refresh_token es de larga duración; el access_token y su expiración se
+    actualizan en cada refresh (también se guardan en la cache).
+    """
+    usuario = models.OneToOneField(Usuario, on_delete=models.CASCADE, related_name='cuenta_google_fit')
+    email = models.EmailField(help_text='Cuenta de Google dueña de los datos')
+    refresh_token = models.TextField(help_text='Refresh token OAuth con scopes de Fitness')
+    access_token = models.TextField(blank=True, default='')
+    expira_en = models.DateTimeField(null=True, blank=True, help_text='Expiración del access_token')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'cuentas_google_fit'
+        verbose_name = 'Cuenta de Google Fit'
+        verbose_name_plural = 'Cuentas de Google Fit'
+
+    def __str__(self):
+        return f"{self.usuario.email} -> {self.email}"
+
+
+class AgregadoFitness(models.Model):
+    """
+    Campos acumulables de la serie de fitness. La frecuencia cardiaca se guarda
+    como suma y cantidad de lecturas para poder sumar buckets sin perder el promedio.
+    """
+    pasos = models.PositiveIntegerField(default=0)
+    calorias = models.FloatField(default=0)
+    fc_suma = models.PositiveIntegerField(default=0)
+    fc_lecturas = models.PositiveIntegerField(default=0)
+    fc_min = models.PositiveSmallIntegerField(null=True, blank=True)
+    fc_max = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    CAMPOS_AGREGADO = ('pasos', 'calorias', 'fc_suma', 'fc_lecturas', 'fc_min', 'fc_max')
+
+    class Meta:
+        abstract = True
+
+    @property
+    def fc_promedio(self):
+        return round(self.fc_suma / self.fc_lecturas) if self.fc_lecturas else None
+
+    def sumar(self, otro):
+        self.pasos += otro.pasos
+        self.calorias += otro.calorias
+        self.fc_suma += otro.fc_suma
+        self.fc_lecturas += otro.fc_lecturas
+        if otro.fc_min is not None:
+            self.fc_min = otro.fc_min if self.fc_min is None else min(self.fc_min, otro.fc_min)
+        if otro.fc_max is not None:
+            self.fc_max = otro.fc_max if self.fc_max is None else max(self.fc_max, otro.fc_max)
+
+
+class MuestraFitness(AgregadoFitness):
+    """Bucket de la serie de tiempo de fitness de un usuario (por minuto o por hora)."""
+    MINUTO = 60
+    HORA = 3600
+    RESOLUCIONES = [
+        (MINUTO, 'Minuto'),
+        (HORA, 'Hora'),
+    ]
+
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='muestras_fitness')
+    resolucion = models.PositiveIntegerField(choices=RESOLUCIONES, help_text='Segundos por bucket')
+    inicio = models.DateTimeField(help_text='Inicio del bucket')
+
+    class Meta:
+        db_table = 'muestras_fitness'
+        verbose_name = 'Muestra de fitness'
+        verbose_name_plural = 'Muestras de fitness'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'resolucion', 'inicio'], name='muestra_fitness_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.get_resolucion_display()} {self.inicio:%Y-%m-%d %H:%M}"
+
+
+class MinutoGoogleFit(AgregadoFitness):
+    """
+    Último valor leído de Google Fit para un minuto. Al releer un intervalo la
+    serie recibe solo la diferencia contra esta copia, así no se pisan los
+    aportes de otras fuentes (simulador, POST de muestras) al mismo minuto.
+    """
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='minutos_google_fit')
+    inicio = models.DateTimeField(help_text='Inicio del minuto')
+
+    class Meta:
+        db_table = 'minutos_google_fit'
+        verbose_name = 'Minuto de Google Fit'
+        verbose_name_plural = 'Minutos de Google Fit'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'inicio'], name='minuto_google_fit_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.inicio:%Y-%m-%d %H:%M}"
+
+
+class ResumenFitness(AgregadoFitness):
+    """Rollup diario o semanal de la serie, actualizado en cada ingesta."""
+    DIA = 'dia'
+    SEMANA = 'semana'
+    PERIODOS = [
+        (DIA, 'Día'),
+        (SEMANA, 'Semana'),
+    ]
+
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='resumenes_fitness')
+    periodo = models.CharField(max_length=10, choices=PERIODOS)
+    inicio = models.DateField(help_text='Día, o lunes de la semana')
+
+    class Meta:
+        db_table = 'resumenes_fitness'
+        verbose_name = 'Resumen de fitness'
+        verbose_name_plural = 'Resúmenes de fitness'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'periodo', 'inicio'], name='resumen_fitness_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.periodo} {self.inicio}"
+
+
+class SincronizacionGoogleFit(models.Model):
+    """
+    Intervalo ya copiado de Google Fit a la serie local, por usuario y tipo de dato.
+    La sincronización incremental avanza `hasta`; el backfill retrocede `desde`.
+    """
+    PASOS = 'pasos'
+    CALORIAS = 'calorias'
+    FRECUENCIA = 'frecuencia'
+    TIPOS = [
+        (PASOS, 'Pasos'),
+        (CALORIAS, 'Calorías'),
+        (FRECUENCIA, 'Frecuencia cardiaca'),
+    ]
+
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='sincronizaciones_google_fit')
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    desde = models.DateTimeField()
+    hasta = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sincronizaciones_google_fit'
+        verbose_name = 'Sincronización de Google Fit'
+        verbose_name_plural = 'Sincronizaciones de Google Fit'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'tipo'], name='sincronizacion_google_fit_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.tipo}: {self.desde:%Y-%m-%d %H:%M} - {self.hasta:%Y-%m-%d %H:%M}"
@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+
+class MuestraFitnessSerializer(serializers.Serializer):
+    """Muestra de fitness enviada por un dispositivo (mismos nombres que /dispositivo/googlefit/)."""
+    timestamp = serializers.DateTimeField()
+    steps = serializers.IntegerField(min_value=0, default=0)
+    calories = serializers.FloatField(min_value=0, default=0)
+    heartRate = serializers.IntegerField(min_value=20, max_value=250, required=False, allow_null=True)
@@ -0,0 +1,3 @@
+# dispositivo/services/__init__.py
+from .series import registrar_muestras, consultar_serie
+from .resumen import fitness_de_hoy
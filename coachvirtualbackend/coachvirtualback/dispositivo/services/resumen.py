@@ -0,0 +1,32 @@
+"""
+Fitness del día para un usuario: Google Fit si tiene una cuenta vinculada,
+si no el simulador local. Versión síncrona de lo que arma la vista async
+`googlefit_stats`, para usarla desde otras vistas (ej: /api/bootstrap/).
+"""
+
+import logging
+
+from ..local_fitness import get_local_fitness_stats
+
+logger = logging.getLogger(__name__)
+
+
+def fitness_de_hoy(usuario_id, sincronizar=True) -> dict:
+    """
+    Con sincronizar=False no se llama a Google Fit: se lee lo ya copiado a la
+    serie local (para respuestas que no deben esperar a la red, ej. el arranque).
+    """
+    try:
+        # Import diferido: googlefit importa services.sincronizacion
+        from ..googlefit import GoogleFitClient
+        client = GoogleFitClient.para_usuario(usuario_id)
+        if client is not None:
+            data = client.get_today_stats() if sincronizar else client.stats_locales()
+            data["source"] = "google_fit"
+            return data
+    except Exception as e:
+        logger.warning("Google Fit no disponible, usando simulador local: %s", e)
+
+    data = get_local_fitness_stats(usuario_id)
+    data["source"] = "local_simulator"
+    return data
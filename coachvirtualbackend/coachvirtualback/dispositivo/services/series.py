@@ -0,0 +1,208 @@
+"""
+Serie de tiempo de fitness por usuario (pasos, calorías, frecuencia cardiaca).
+
+Las muestras se agrupan en buckets de un minuto y de una hora
+(`MuestraFitness`) y en los rollups diario y semanal (`ResumenFitness`).
+Cada ingesta suma sus deltas a los cuatro niveles en la misma transacción,
+así los gráficos leen los rollups ya calculados sin recorrer las muestras.
+
+Una ingesta hace un número fijo de consultas por nivel sin importar el
+tamaño del lote: INSERT de los buckets que faltan (ignorando conflictos),
+SELECT ... FOR UPDATE de los buckets tocados y un UPDATE en lote.
+
+`reemplazar_muestras` es la variante para Google Fit, que se relee: guarda
+aparte lo último leído de cada minuto y a los cuatro niveles les suma solo la
+diferencia entre lecturas.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import AgregadoFitness, MinutoGoogleFit, MuestraFitness, ResumenFitness
+
+
+LOTE = 1000
+
+# Rango máximo (días) que se puede pedir por periodo
+RANGO_MAXIMO = {
+    'hora': 31,
+    ResumenFitness.DIA: 366,
+    ResumenFitness.SEMANA: 5 * 366,
+}
+
+
+class _Delta:
+    """Acumulador en memoria con los mismos campos que AgregadoFitness."""
+    __slots__ = AgregadoFitness.CAMPOS_AGREGADO
+    sumar = AgregadoFitness.sumar
+
+    def __init__(self, pasos=0, calorias=0.0, fc=None):
+        self.pasos = pasos
+        self.calorias = calorias
+        self.fc_suma = fc or 0
+        self.fc_lecturas = 1 if fc else 0
+        self.fc_min = self.fc_max = fc or None
+
+
+def _acumular(modelo, fijos, deltas):
+    """Suma `deltas` ({inicio: _Delta}) a las filas de `modelo` con los campos `fijos`."""
+    if not deltas:
+        return
+    modelo.objects.bulk_create(
+        [modelo(inicio=inicio, **fijos) for inicio in deltas], ignore_conflicts=True, batch_size=LOTE,
+    )
+    # Orden fijo de bloqueo para que dos ingestas del mismo usuario no se bloqueen mutuamente
+    filas = list(modelo.objects.select_for_update().filter(inicio__in=list(deltas), **fijos).order_by('inicio'))
+    for fila in filas:
+        fila.sumar(deltas[fila.inicio])
+    modelo.objects.bulk_update(filas, AgregadoFitness.CAMPOS_AGREGADO, batch_size=LOTE)
+
+
+def _agregar(niveles, clave, delta):
+    acumulado = niveles.get(clave)
+    if acumulado is None:
+        acumulado = niveles[clave] = _Delta()
+    acumulado.sumar(delta)
+
+
+def _diferencia(previo, nuevo, campos):
+    """
+    _Delta que lleva los `campos` de `previo` a `nuevo`, o None si no cambian.
+    fc_min/fc_max no se pueden restar: se suman los de `nuevo`.
+    """
+    if all(getattr(previo, campo) == getattr(nuevo, campo) for campo in campos):
+        return None
+    delta = _Delta()
+    for campo in ('pasos', 'calorias', 'fc_suma', 'fc_lecturas'):
+        if campo in campos:
+            setattr(delta, campo, getattr(nuevo, campo) - getattr(previo, campo))
+    if 'fc_min' in campos:
+        delta.fc_min, delta.fc_max = nuevo.fc_min, nuevo.fc_max
+    return delta
+
+
+def _vacio(agregado):
+    return not agregado.pasos and not agregado.calorias and not agregado.fc_lecturas
+
+
+def reemplazar_muestras(usuario_id, muestras, inicio, fin, campos=AgregadoFitness.CAMPOS_AGREGADO) -> dict:
+    """
+    Aplica una lectura de Google Fit de [inicio, fin) para los `campos` dados.
+    La copia de lo leído (`MinutoGoogleFit`) queda igual a `muestras` y a la
+    serie se le suma solo la diferencia contra la lectura anterior: releer un
+    intervalo no suma dos veces ni toca lo que aportaron otras fuentes.
+    Retorna cuántos minutos cambiaron.
+    """
+    nuevos = {}
+    for muestra in muestras:
+        local = timezone.localtime(muestra['timestamp'])
+        delta = _Delta(muestra.get('steps') or 0, float(muestra.get('calories') or 0), muestra.get('heartRate'))
+        _agregar(nuevos, local.replace(second=0, microsecond=0), delta)
+
+    minutos, horas, dias, semanas = {}, {}, {}, {}
+    with transaction.atomic():
+        previos = {
+            fila.inicio: fila for fila in MinutoGoogleFit.objects.select_for_update()
+            .filter(usuario_id=usuario_id, inicio__gte=inicio, inicio__lt=fin).order_by('inicio')
+        }
+        crear, actualizar, borrar = [], [], []
+        for minuto in previos.keys() | nuevos.keys():
+            previo = previos.get(minuto) or MinutoGoogleFit(usuario_id=usuario_id, inicio=minuto)
+            delta = _diferencia(previo, nuevos.get(minuto, _Delta()), campos)
+            if delta is None:
+                continue
+            local = timezone.localtime(minuto)
+            dia = local.date()
+            _agregar(minutos, local, delta)
+            _agregar(horas, local.replace(minute=0), delta)
+            _agregar(dias, dia, delta)
+            _agregar(semanas, dia - timedelta(days=dia.weekday()), delta)
+
+            nuevo = nuevos.get(minuto, _Delta())
+            for campo in campos:
+                setattr(previo, campo, getattr(nuevo, campo))
+            if minuto not in previos:
+                crear.append(previo)
+            elif _vacio(previo):
+                borrar.append(previo.pk)
+            else:
+                actualizar.append(previo)
+
+        MinutoGoogleFit.objects.filter(pk__in=borrar).delete()
+        MinutoGoogleFit.objects.bulk_update(actualizar, AgregadoFitness.CAMPOS_AGREGADO, batch_size=LOTE)
+        MinutoGoogleFit.objects.bulk_create(crear, batch_size=LOTE)
+
+        fijos = {'usuario_id': usuario_id, 'resolucion': MuestraFitness.MINUTO}
+        _acumular(MuestraFitness, fijos, minutos)
+        _acumular(MuestraFitness, {'usuario_id': usuario_id, 'resolucion': MuestraFitness.HORA}, horas)
+        _acumular(ResumenFitness, {'usuario_id': usuario_id, 'periodo': ResumenFitness.DIA}, dias)
+        _acumular(ResumenFitness, {'usuario_id': usuario_id, 'periodo': ResumenFitness.SEMANA}, semanas)
+        # Minutos que solo tenían datos de Google y Google ya no reporta
+        MuestraFitness.objects.filter(
+            inicio__in=list(minutos), pasos=0, calorias=0, fc_lecturas=0, **fijos,
+        ).delete()
+
+    return {'minutos': len(minutos)}
+
+
+def registrar_muestras(usuario_id, muestras) -> dict:
+    """
+    Ingresa un lote de muestras de un usuario.
+    Cada muestra: {'timestamp': datetime, 'steps': int, 'calories': float, 'heartRate': int|None}.
+    Retorna cuántas muestras y buckets de minuto se tocaron.
+    """
+    minutos, horas, dias, semanas = {}, {}, {}, {}
+    total = 0
+    for muestra in muestras:
+        local = timezone.localtime(muestra['timestamp'])
+        delta = _Delta(muestra.get('steps') or 0, float(muestra.get('calories') or 0), muestra.get('heartRate'))
+        minuto = local.replace(second=0, microsecond=0)
+        dia = local.date()
+        _agregar(minutos, minuto, delta)
+        _agregar(horas, minuto.replace(minute=0), delta)
+        _agregar(dias, dia, delta)
+        _agregar(semanas, dia - timedelta(days=dia.weekday()), delta)
+        total += 1
+
+    with transaction.atomic():
+        _acumular(MuestraFitness, {'usuario_id': usuario_id, 'resolucion': MuestraFitness.MINUTO}, minutos)
+        _acumular(MuestraFitness, {'usuario_id': usuario_id, 'resolucion': MuestraFitness.HORA}, horas)
+        _acumular(ResumenFitness, {'usuario_id': usuario_id, 'periodo': ResumenFitness.DIA}, dias)
+        _acumular(ResumenFitness, {'usuario_id': usuario_id, 'periodo': ResumenFitness.SEMANA}, semanas)
+
+    return {'muestras': total, 'minutos': len(minutos)}
+
+
+def consultar_serie(usuario_id, periodo, desde, hasta) -> list:
+    """
+    Puntos de la serie entre las fechas `desde` y `hasta` (inclusive), leídos
+    de los buckets por hora o de los rollups ('dia', 'semana').
+    """
+    campos = ('inicio',) + AgregadoFitness.CAMPOS_AGREGADO
+    if periodo == 'hora':
+        tz = timezone.get_current_timezone()
+        qs = MuestraFitness.objects.filter(
+            usuario_id=usuario_id, resolucion=MuestraFitness.HORA,
+            inicio__gte=datetime.combine(desde, datetime.min.time(), tz),
+            inicio__lt=datetime.combine(hasta + timedelta(days=1), datetime.min.time(), tz),
+        )
+    else:
+        if periodo == ResumenFitness.SEMANA:
+            desde -= timedelta(days=desde.weekday())
+        qs = ResumenFitness.objects.filter(
+            usuario_id=usuario_id, periodo=periodo, inicio__gte=desde, inicio__lte=hasta,
+        )
+
+    puntos = []
+    for inicio, pasos, calorias, fc_suma, fc_lecturas, fc_min, fc_max in qs.order_by('inicio').values_list(*campos):
+        puntos.append({
+            'inicio': timezone.localtime(inicio).isoformat() if periodo == 'hora' else inicio.isoformat(),
+            'pasos': pasos,
+            'calorias': round(calorias),
+            'fc_promedio': round(fc_suma / fc_lecturas) if fc_lecturas else None,
+            'fc_min': fc_min,
+            'fc_max': fc_max,
+        })
+    return puntos
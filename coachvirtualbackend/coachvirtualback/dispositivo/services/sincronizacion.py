@@ -0,0 +1,195 @@
+"""
+Sincronización incremental de Google Fit a la serie local (services/series.py).
+
+Por usuario y tipo de dato (`SincronizacionGoogleFit`) se guarda el intervalo
+[desde, hasta) ya copiado:
+
+- `sincronizar` pide lo posterior a `hasta`, en buckets de un minuto. En
+  régimen normal es un tramo de pocos minutos.
+- `backfill` copia el historial anterior a `desde` en tramos de un día,
+  descargando hasta `paralelo` tramos a la vez.
+
+Cada tramo se guarda y mueve el estado en la misma transacción, y solo si el
+estado sigue donde estaba al planificarlo: dos procesos sincronizando el
+mismo usuario nunca aplican dos veces el mismo tramo.
+
+Google Fit recibe los datos del teléfono con atraso (minutos u horas), así
+que no se sincroniza más allá de RETRASO antes de ahora y, cada
+INTERVALO_RELECTURA, la sincronización vuelve a pedir las últimas RELECTURA
+horas. Los tramos se aplican con `reemplazar_muestras`, que suma a la serie
+solo la diferencia contra lo leído antes: releer un minuto ya copiado no lo
+suma dos veces ni borra lo que otras fuentes aportaron a ese minuto.
+"""
+
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import SincronizacionGoogleFit
+from .series import reemplazar_muestras
+
+
+RETRASO = timedelta(minutes=5)
+RELECTURA = timedelta(hours=24)
+INTERVALO_RELECTURA = 15 * 60  # segundos
+CLAVE_RELECTURA = 'google_fit:relectura:{}'
+TRAMO = timedelta(days=1)
+PARALELO = 4
+
+# Campos de la serie que aporta cada tipo (la relectura de un tipo no toca los demás)
+CAMPOS_POR_TIPO = {
+    SincronizacionGoogleFit.PASOS: ('pasos',),
+    SincronizacionGoogleFit.CALORIAS: ('calorias',),
+    SincronizacionGoogleFit.FRECUENCIA: ('fc_suma', 'fc_lecturas', 'fc_min', 'fc_max'),
+}
+
+
+def _fin_sincronizable():
+    """Último minuto cerrado, RETRASO antes de ahora."""
+    return (timezone.now() - RETRASO).replace(second=0, microsecond=0)
+
+
+def _inicio_de_hoy():
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _estados(usuario_id):
+    """Estado de cada tipo; los que faltan se crean vacíos al inicio de hoy."""
+    estados = list(SincronizacionGoogleFit.objects.filter(usuario_id=usuario_id))
+    if len(estados) < len(SincronizacionGoogleFit.TIPOS):
+        inicio = _inicio_de_hoy()
+        SincronizacionGoogleFit.objects.bulk_create([
+            SincronizacionGoogleFit(usuario_id=usuario_id, tipo=tipo, desde=inicio, hasta=inicio)
+            for tipo, _ in SincronizacionGoogleFit.TIPOS
+        ], ignore_conflicts=True)
+        estados = list(SincronizacionGoogleFit.objects.filter(usuario_id=usuario_id))
+    return estados
+
+
+def _agrupar(estados, campo):
+    """{valor de `campo`: (tipos,)} para pedir juntos los tipos con el mismo intervalo."""
+    grupos = defaultdict(list)
+    for estado in estados:
+        grupos[getattr(estado, campo)].append(estado.tipo)
+    return {valor: tuple(sorted(tipos)) for valor, tipos in grupos.items()}
+
+
+def _tramos(inicio, fin):
+    """Divide [inicio, fin) en tramos de a lo más TRAMO."""
+    tramos = []
+    while inicio < fin:
+        siguiente = min(inicio + TRAMO, fin)
+        tramos.append((inicio, siguiente))
+        inicio = siguiente
+    return tramos
+
+
+def planificar(usuario_id):
+    """
+    Tramos pendientes de la sincronización incremental: [(tipos, inicio, fin, hasta)],
+    con `hasta` el estado esperado al aplicarlo. Cada INTERVALO_RELECTURA el
+    primer tramo empieza RELECTURA antes del fin (sin pasar de `desde`).
+    """
+    fin = _fin_sincronizable()
+    estados = _estados(usuario_id)
+    releer = cache.add(CLAVE_RELECTURA.format(usuario_id), True, INTERVALO_RELECTURA)
+    tramos = []
+    for hasta, tipos in _agrupar(estados, 'hasta').items():
+        inicio = hasta
+        if releer:
+            desde = max(e.desde for e in estados if e.tipo in tipos)
+            inicio = max(min(hasta, fin - RELECTURA), desde)
+        tramos += [
+            (tipos, inicio_tramo, fin_tramo, max(hasta, inicio_tramo))
+            for inicio_tramo, fin_tramo in _tramos(inicio, fin)
+        ]
+    return tramos
+
+
+def aplicar(usuario_id, tipos, inicio, fin, muestras, hacia_atras=False, esperado=None) -> bool:
+    """
+    Guarda las muestras del tramo [inicio, fin) y mueve el estado de sus tipos.
+    Hacia adelante el tramo puede releer parte de lo ya copiado (desde
+    `inicio` hasta `esperado`).
+    Retorna False (sin guardar nada) si otro proceso ya movió el estado.
+    """
+    if hacia_atras:
+        campo, esperado, nuevo = 'desde', fin, inicio
+    else:
+        campo, esperado, nuevo = 'hasta', esperado or inicio, fin
+    with transaction.atomic():
+        estados = list(
+            SincronizacionGoogleFit.objects.select_for_update()
+            .filter(usuario_id=usuario_id, tipo__in=tipos, **{campo: esperado})
+            .order_by('tipo')
+        )
+        if len(estados) != len(tipos):
+            return False
+        campos = tuple(nombre for tipo in tipos for nombre in CAMPOS_POR_TIPO[tipo])
+        reemplazar_muestras(usuario_id, muestras, inicio, fin, campos)
+        SincronizacionGoogleFit.objects.filter(pk__in=[e.pk for e in estados]).update(
+            **{campo: nuevo, 'updated_at': timezone.now()}
+        )
+    return True
+
+
+def sincronizar(cliente) -> int:
+    """Copia lo nuevo desde la última sincronización. Retorna los tramos aplicados."""
+    aplicados = 0
+    for tipos, inicio, fin, hasta in planificar(cliente.usuario_id):
+        muestras = cliente.aggregate(tipos, inicio, fin)
+        if not aplicar(cliente.usuario_id, tipos, inicio, fin, muestras, esperado=hasta):
+            break
+        aplicados += 1
+    return aplicados
+
+
+async def asincronizar(cliente) -> int:
+    """Igual que sincronizar, con el cliente HTTP async."""
+    aplicados = 0
+    for tipos, inicio, fin, hasta in await sync_to_async(planificar)(cliente.usuario_id):
+        muestras = await cliente.aaggregate(tipos, inicio, fin)
+        if not await sync_to_async(aplicar)(cliente.usuario_id, tipos, inicio, fin, muestras, esperado=hasta):
+            break
+        aplicados += 1
+    return aplicados
+
+
+def backfill(cliente, dias: int, paralelo: int = PARALELO) -> int:
+    """
+    Copia los últimos `dias` días anteriores a lo ya sincronizado. Los tramos se
+    aplican del más reciente al más antiguo; si uno falla, la excepción se
+    propaga y lo aplicado hasta ahí queda guardado.
+    """
+    objetivo = _inicio_de_hoy() - timedelta(days=dias)
+    usuario_id = cliente.usuario_id
+    aplicados = 0
+
+    # Refresh del token (si toca) antes de abrir los hilos de descarga
+    cliente.access_token()
+
+    with ThreadPoolExecutor(max_workers=paralelo) as pool:
+        for desde, tipos in _agrupar(_estados(usuario_id), 'desde').items():
+            tramos = iter(reversed(_tramos(objetivo, desde)))
+            en_curso = deque()
+
+            def descargar_siguiente():
+                tramo = next(tramos, None)
+                if tramo is not None:
+                    en_curso.append((tramo, pool.submit(cliente.aggregate, tipos, *tramo)))
+
+            for _ in range(paralelo):
+                descargar_siguiente()
+            while en_curso:
+                (inicio, fin), futuro = en_curso.popleft()
+                muestras = futuro.result()
+                if not aplicar(usuario_id, tipos, inicio, fin, muestras, hacia_atras=True):
+                    break
+                aplicados += 1
+                descargar_siguiente()
+    return aplicados
@@ -0,0 +1,231 @@
+"""
+Simulador de fitness determinista y vectorizado (entornos de demo y carga).
+
+Genera series por minuto (pasos, calorías, frecuencia cardiaca) para muchos
+usuarios × días en un solo cálculo de NumPy con forma (usuarios, días, 1440).
+
+Los números aleatorios salen de un hash contador (splitmix64) de
+(semilla, canal, usuario, día, minuto) en vez de un generador con estado: el
+valor de cada usuario-día-minuto no depende de qué otros usuarios o días se
+generen junto con él ni del tamaño de los lotes. Así la serie escrita en la
+BD para muchos usuarios y la que `LocalFitnessSimulator` calcula para uno solo
+son idénticas.
+
+Modelo por usuario: meta de pasos, multiplicador de actividad, frecuencia
+base, calorías por paso y metabolismo basal fijos; por día, un factor de
+actividad y una sesión de ejercicio de 20-60 minutos; por minuto, pasos con
+media según el perfil horario (PERFIL_HORAS) y ruido normal.
+"""
+
+from datetime import datetime, time as dt_time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AgregadoFitness, MuestraFitness, ResumenFitness
+
+
+MINUTOS = 24 * 60
+
+# Factor de actividad por hora (mismo perfil que LocalFitnessSimulator._get_hour_factor,
+# con la madrugada casi sin pasos)
+PERFIL_HORAS = np.array(
+    [0.02] * 6 + [0.8] * 3 + [1.2] * 4 + [0.6] * 2 + [1.4] * 4 + [1.0] * 3 + [0.2] * 2
+)
+_PERFIL_MINUTOS = np.repeat(PERFIL_HORAS / PERFIL_HORAS.sum() / 60, 60)
+
+# Elementos (usuarios × días × minutos) por lote; acota la memoria a ~200 MB
+ELEMENTOS_POR_LOTE = 2_000_000
+LOTE_BD = 5000
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_DORADO = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mezclar(x):
+    """Finalizador de splitmix64."""
+    x = (x ^ (x >> np.uint64(30))) * _M1
+    x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def _uniforme(semilla, canal, *ejes):
+    """Uniforme en [0, 1) para cada combinación de `ejes` (con broadcasting)."""
+    with np.errstate(over='ignore'):
+        x = _mezclar(np.uint64(semilla % 2 ** 64) * _DORADO + np.uint64(canal))
+        for eje in ejes:
+            x = _mezclar(x ^ (np.asarray(eje, dtype=np.uint64) * _DORADO))
+    return (x >> np.uint64(11)).astype(np.float64) * (1.0 / 2 ** 53)
+
+
+class SimuladorFitness:
+    """Series de fitness reproducibles: misma semilla, mismo usuario y mismo día → mismos datos."""
+
+    def __init__(self, semilla: int):
+        self.semilla = semilla
+
+    def parametros(self, usuario_ids):
+        """Parámetros fijos por usuario, arrays de forma (usuarios,)."""
+        u = np.asarray(usuario_ids, dtype=np.uint64)
+        s = self.semilla
+        meta_pasos = np.rint(8000 + 4000 * _uniforme(s, 1, u))
+        multiplicador = 0.8 + 0.5 * _uniforme(s, 2, u)
+        cal_por_paso = 0.03 + 0.02 * _uniforme(s, 4, u)
+        metabolismo = 1200 + 600 * _uniforme(s, 5, u)
+        return {
+            'meta_pasos': meta_pasos,
+            'multiplicador': multiplicador,
+            'fc_base': 60 + 15 * _uniforme(s, 3, u),
+            'cal_por_paso': cal_por_paso,
+            'metabolismo': metabolismo,
+            'meta_calorias': np.rint(metabolismo + meta_pasos * multiplicador * cal_por_paso),
+        }
+
+    def generar(self, usuario_ids, dias):
+        """
+        Series por minuto de `usuario_ids` en las fechas `dias`.
+        Retorna {'pasos': int32, 'calorias': float32, 'fc': int16}, cada uno (usuarios, días, 1440).
+        """
+        s = self.semilla
+        u = np.asarray(usuario_ids, dtype=np.uint64)[:, None]
+        d = np.asarray([dia.toordinal() for dia in dias], dtype=np.uint64)[None, :]
+        m = np.arange(MINUTOS, dtype=np.uint64)
+        p = {k: v[:, None, None] for k, v in self.parametros(usuario_ids).items()}
+
+        factor_dia = (0.5 + _uniforme(s, 6, u, d))[..., None]
+        inicio_ejercicio = (6 * 60 + 14 * 60 * _uniforme(s, 7, u, d)).astype(np.int64)[..., None]
+        duracion = (20 + 40 * _uniforme(s, 8, u, d)).astype(np.int64)[..., None]
+        minuto = m.astype(np.int64)
+        ejercicio = (minuto >= inicio_ejercicio) & (minuto < inicio_ejercicio + duracion)
+
+        media = p['meta_pasos'] * p['multiplicador'] * factor_dia * _PERFIL_MINUTOS
+        media = np.where(ejercicio, media * 4 + 60, media)
+
+        # Box-Muller: dos normales por minuto (pasos y frecuencia)
+        radio = np.sqrt(-2 * np.log1p(-_uniforme(s, 9, u[..., None], d[..., None], m)))
+        angulo = 2 * np.pi * _uniforme(s, 10, u[..., None], d[..., None], m)
+        pasos = np.maximum(0, np.rint(media + np.sqrt(media) * radio * np.cos(angulo))).astype(np.int32)
+        fc = np.clip(np.rint(p['fc_base'] + 0.35 * np.minimum(pasos, 160) + 3 * radio * np.sin(angulo)), 45, 190)
+        calorias = p['metabolismo'] / MINUTOS + pasos * p['cal_por_paso']
+
+        return {'pasos': pasos, 'calorias': calorias.astype(np.float32), 'fc': fc.astype(np.int16)}
+
+    def dia_de_usuario(self, usuario_id, dia):
+        """
+        Serie de un usuario-día lista para consultas O(1) por minuto:
+        pasos y calorías acumulados desde medianoche y la frecuencia de cada minuto.
+        """
+        serie = self.generar([usuario_id], [dia])
+        return {
+            'pasos': np.cumsum(serie['pasos'][0, 0]),
+            'calorias': np.cumsum(serie['calorias'][0, 0]),
+            'fc': serie['fc'][0, 0],
+        }
+
+    # ---------- escritura en la serie de fitness ----------
+
+    def escribir(self, usuario_ids, desde, hasta, minutos=False) -> dict:
+        """
+        Genera y guarda la serie de `usuario_ids` desde la fecha `desde` (se
+        alinea al lunes) hasta el datetime `hasta`: buckets por hora, rollups
+        diarios y semanales y, con `minutos`, los buckets por minuto. Reemplaza
+        lo que hubiera en esos buckets. Retorna las filas escritas por tabla.
+        """
+        desde -= timedelta(days=desde.weekday())
+        hasta = timezone.localtime(hasta)
+        dias = [desde + timedelta(days=i) for i in range((hasta.date() - desde).days + 1)]
+        # Minutos válidos: todo salvo lo posterior a `hasta` en el último día
+        validos = np.ones((len(dias), MINUTOS), dtype=bool)
+        validos[-1, hasta.hour * 60 + hasta.minute + 1:] = False
+
+        usuario_ids = list(usuario_ids)
+        por_lote = max(1, ELEMENTOS_POR_LOTE // (len(dias) * MINUTOS))
+        filas = {'minutos': 0, 'horas': 0, 'resumenes': 0}
+        for i in range(0, len(usuario_ids), por_lote):
+            lote = usuario_ids[i:i + por_lote]
+            serie = self.generar(lote, dias)
+            for clave, n in self._guardar(lote, dias, serie, validos, minutos).items():
+                filas[clave] += n
+        return filas
+
+    def _guardar(self, usuario_ids, dias, serie, validos, minutos):
+        tz = timezone.get_current_timezone()
+        inicios = [datetime.combine(dia, dt_time(), tz) for dia in dias]
+        filas = {}
+
+        with transaction.atomic():
+            if minutos:
+                agregado = _agregar(serie, validos, 1)
+                filas['minutos'] = _upsert(MuestraFitness, agregado, usuario_ids, lambda d, j: inicios[d] + timedelta(minutes=j),
+                                           resolucion=MuestraFitness.MINUTO)
+            agregado = _agregar(serie, validos, 60)
+            filas['horas'] = _upsert(MuestraFitness, agregado, usuario_ids, lambda d, j: inicios[d] + timedelta(hours=j),
+                                     resolucion=MuestraFitness.HORA)
+
+            diario = {k: v[..., None] for k, v in _combinar(agregado, axis=2).items()}
+            filas['resumenes'] = _upsert(ResumenFitness, diario, usuario_ids, lambda d, j: dias[d],
+                                         periodo=ResumenFitness.DIA)
+            semanal = {k: v[..., None] for k, v in _combinar(
+                {k: v[..., 0] for k, v in diario.items()}, axis=1, cada=7).items()}
+            filas['resumenes'] += _upsert(ResumenFitness, semanal, usuario_ids, lambda d, j: dias[d * 7],
+                                          periodo=ResumenFitness.SEMANA)
+        return filas
+
+
+def _agregar(serie, validos, ancho):
+    """Campos de AgregadoFitness por bloques de `ancho` minutos: (usuarios, días, 1440 // ancho)."""
+    forma = serie['pasos'].shape[:2] + (MINUTOS // ancho, ancho)
+    mascara = np.broadcast_to(validos, serie['pasos'].shape).reshape(forma)
+    fc = serie['fc'].reshape(forma)
+    return {
+        'pasos': np.where(mascara, serie['pasos'].reshape(forma), 0).sum(-1),
+        'calorias': np.where(mascara, serie['calorias'].reshape(forma), 0).sum(-1, dtype=np.float64),
+        'fc_suma': np.where(mascara, fc, 0).sum(-1, dtype=np.int64),
+        'fc_lecturas': mascara.sum(-1),
+        'fc_min': np.where(mascara, fc, np.iinfo(np.int16).max).min(-1),
+        'fc_max': np.where(mascara, fc, 0).max(-1),
+    }
+
+
+def _combinar(agregado, axis, cada=None):
+    """Suma (o min/max) de un agregado sobre `axis`, completo o en grupos de `cada`."""
+    if cada is None:
+        sumar = lambda v: v.sum(axis=axis)  # noqa: E731
+        minimo = lambda v: v.min(axis=axis)  # noqa: E731
+        maximo = lambda v: v.max(axis=axis)  # noqa: E731
+    else:
+        cortes = np.arange(0, agregado['pasos'].shape[axis], cada)
+        sumar = lambda v: np.add.reduceat(v, cortes, axis=axis)  # noqa: E731
+        minimo = lambda v: np.minimum.reduceat(v, cortes, axis=axis)  # noqa: E731
+        maximo = lambda v: np.maximum.reduceat(v, cortes, axis=axis)  # noqa: E731
+    return {
+        'pasos': sumar(agregado['pasos']),
+        'calorias': sumar(agregado['calorias']),
+        'fc_suma': sumar(agregado['fc_suma']),
+        'fc_lecturas': sumar(agregado['fc_lecturas']),
+        'fc_min': minimo(agregado['fc_min']),
+        'fc_max': maximo(agregado['fc_max']),
+    }
+
+
+def _upsert(modelo, agregado, usuario_ids, inicio, **fijos) -> int:
+    """
+    bulk_create con update_conflicts de los buckets con lecturas.
+    `agregado` tiene arrays (usuarios, días, buckets); `inicio(d, j)` da el inicio del bucket.
+    """
+    usuarios, dias, buckets = np.nonzero(agregado['fc_lecturas'])
+    columnas = {k: agregado[k][usuarios, dias, buckets].tolist() for k in AgregadoFitness.CAMPOS_AGREGADO}
+    filas = [
+        modelo(
+            usuario_id=usuario_ids[u], inicio=inicio(d, j), **fijos,
+            **{k: columnas[k][n] for k in AgregadoFitness.CAMPOS_AGREGADO},
+        )
+        for n, (u, d, j) in enumerate(zip(usuarios.tolist(), dias.tolist(), buckets.tolist()))
+    ]
+    modelo.objects.bulk_create(
+        filas, batch_size=LOTE_BD, update_conflicts=True,
+        unique_fields=['usuario', *fijos, 'inicio'], update_fields=list(AgregadoFitness.CAMPOS_AGREGADO),
+    )
+    return len(filas)
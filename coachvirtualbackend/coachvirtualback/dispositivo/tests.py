@@ -0,0 +1,523 @@
+"""
+Tests unitarios para el módulo dispositivo - CoachVirtual
+Cubre el cliente de Google Fit por usuario y su sincronización incremental
+contra un servidor local que imita los endpoints de OAuth y de
+dataset:aggregate, la serie de fitness (ingesta en lote, rollups y
+consulta por rango) y el simulador determinista.
+"""
+import asyncio
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .googlefit import GoogleFitClient
+from .local_fitness import LocalFitnessSimulator
+from .models import CuentaGoogleFit, MuestraFitness, ResumenFitness, SincronizacionGoogleFit
+from .services.resumen import fitness_de_hoy
+from .services.series import registrar_muestras
+from .services.sincronizacion import CLAVE_RELECTURA, aplicar, backfill, sincronizar
+from .simulador import SimuladorFitness
+
+User = get_user_model()
+
+CACHE_LOCAL = {'default': {'BACKEND': 'coachvirtualback.cache.MetricasLocMemCache'}}
+
+
+class _StubGoogle(BaseHTTPRequestHandler):
+    """
+    Servidor de prueba: POST /token y POST /fitness/users/me/dataset:aggregate.
+    Cada aggregate responde un bucket al inicio del rango pedido.
+    """
+    VALORES = {
+        'com.google.step_count.delta': [{'intVal': 4321}],
+        'com.google.calories.expended': [{'fpVal': 210.6}],
+        'com.google.heart_rate.bpm': [{'fpVal': 72.4}, {'fpVal': 95.0}, {'fpVal': 61.0}],
+    }
+
+    def do_POST(self):
+        servidor = self.server
+        cuerpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path == '/token':
+            servidor.llamadas['token'] += 1
+            servidor.tokens_emitidos += 1
+            self._json({'access_token': f'token-{servidor.tokens_emitidos}', 'expires_in': 3600})
+        elif self.path.endswith('/users/me/dataset:aggregate'):
+            servidor.llamadas['aggregate'] += 1
+            if self.headers.get('Authorization') not in {f'Bearer {t}' for t in servidor.tokens_validos()}:
+                self._json({'error': 'invalid_token'}, 401)
+                return
+            pedido = json.loads(cuerpo)
+            servidor.rangos.append((pedido['startTimeMillis'], pedido['endTimeMillis']))
+            time.sleep(servidor.demora)
+            self._json({'bucket': [{
+                'startTimeMillis': str(pedido['startTimeMillis']),
+                'dataset': [
+                    {'point': [{'value': self.VALORES[a['dataTypeName']]}]} for a in pedido['aggregateBy']
+                ],
+            }]})
+        else:
+            self._json({}, 404)
+
+    def _json(self, datos, codigo=200):
+        cuerpo = json.dumps(datos).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleFitClientTest(TransactionTestCase):
+    """Tests para el cliente y la sincronización de Google Fit contra un servidor local"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _StubGoogle)
+        cls.servidor.daemon_threads = True
+        cls.hilo = threading.Thread(target=cls.servidor.serve_forever, daemon=True)
+        cls.hilo.start()
+        url = f'http://127.0.0.1:{cls.servidor.server_address[1]}'
+        cls.ajustes = override_settings(
+            CACHES=CACHE_LOCAL,
+            GOOGLE_FIT_API_URL=f'{url}/fitness',
+            GOOGLE_OAUTH_TOKEN_URL=f'{url}/token',
+        )
+        cls.ajustes.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ajustes.disable()
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.servidor.llamadas = {'token': 0, 'aggregate': 0}
+        self.servidor.rangos = []
+        self.servidor.tokens_emitidos = 0
+        self.servidor.demora = 0
+        self.servidor.tokens_validos = lambda: {f'token-{self.servidor.tokens_emitidos}', 'vigente'}
+        self.user = User.objects.create_user(username='fit', email='fit@test.com', password='test123')
+        # Mediodía fijo: la sincronización de "hoy" no depende de la hora en que corren los tests
+        # (la expiración de los tokens usa la hora real)
+        self.hoy = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.ahora = self.hoy.replace(hour=12)
+        reloj = mock.patch('django.utils.timezone.now', side_effect=lambda: self.ahora)
+        reloj.start()
+        self.addCleanup(reloj.stop)
+
+    def _cuenta(self, **campos):
+        return CuentaGoogleFit.objects.create(
+            usuario=self.user, email='fit@gmail.com', refresh_token='refresh', **campos,
+        )
+
+    def _requiere_bd_compartida(self):
+        # Los hilos abren su propia conexión: con SQLite en memoria no ven la BD de test
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('SQLite en memoria: la BD de test no es visible desde otros hilos')
+
+    def _cuenta_vigente(self):
+        return self._cuenta(access_token='vigente', expira_en=datetime.now(dt_timezone.utc) + timedelta(hours=1))
+
+    @staticmethod
+    def _ms(momento):
+        return int(momento.timestamp() * 1000)
+
+    def test_refresca_token_vencido(self):
+        """Test: Un token por vencer se refresca antes de consultar y se guarda en la cuenta"""
+        cuenta = self._cuenta(access_token='viejo', expira_en=datetime.now(dt_timezone.utc) + timedelta(seconds=60))
+
+        stats = GoogleFitClient(cuenta).get_today_stats()
+
+        self.assertEqual(stats['steps'], 4321)
+        self.assertEqual(stats['calories'], 211)
+        self.assertEqual(stats['heartRate'], 72)
+        self.assertEqual(stats['owner'], 'fit@gmail.com')
+        self.assertEqual(self.servidor.llamadas, {'token': 1, 'aggregate': 1})
+        cuenta.refresh_from_db()
+        self.assertEqual(cuenta.access_token, 'token-1')
+        self.assertGreater(cuenta.expira_en, datetime.now(dt_timezone.utc) + timedelta(minutes=50))
+
+    def test_token_revocado_reintenta_una_vez(self):
+        """Test: Un 401 con token vigente fuerza un refresh y un único reintento"""
+        self.servidor.tokens_validos = lambda: {f'token-{self.servidor.tokens_emitidos}'}
+        cuenta = self._cuenta(access_token='revocado', expira_en=datetime.now(dt_timezone.utc) + timedelta(hours=1))
+
+        stats = GoogleFitClient(cuenta).get_today_stats()
+
+        self.assertEqual(stats['steps'], 4321)
+        self.assertEqual(self.servidor.llamadas, {'token': 1, 'aggregate': 2})
+
+    def test_requests_concurrentes_una_llamada(self):
+        """Test: Cargas concurrentes del mismo usuario hacen una sola llamada a Google"""
+        self._requiere_bd_compartida()
+        cuenta = self._cuenta_vigente()
+        self.servidor.demora = 0.2
+        resultados = []
+
+        def cargar():
+            resultados.append(GoogleFitClient(cuenta).get_today_stats())
+
+        hilos = [threading.Thread(target=cargar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(resultados), 8)
+        self.assertTrue(all(r['steps'] == 4321 for r in resultados))
+        self.assertEqual(self.servidor.llamadas, {'token': 0, 'aggregate': 1})
+
+        # Dentro de INTERVALO_SYNC la siguiente carga lee solo la serie local
+        self.assertEqual(GoogleFitClient(cuenta).get_today_stats()['steps'], 4321)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 1)
+
+    def test_fitness_sin_sincronizar(self):
+        """Test: fitness_de_hoy(sincronizar=False) lee la serie local sin llamar a Google"""
+        self._cuenta_vigente()
+
+        stats = fitness_de_hoy(self.user.id, sincronizar=False)
+
+        self.assertEqual(stats['source'], 'google_fit')
+        self.assertEqual(stats['steps'], 0)
+        self.assertEqual(self.servidor.llamadas, {'token': 0, 'aggregate': 0})
+
+        fitness_de_hoy(self.user.id)
+        self.assertEqual(fitness_de_hoy(self.user.id, sincronizar=False)['steps'], 4321)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 1)
+
+    def test_aget_today_stats_concurrentes(self):
+        """Test: La versión async también agrupa las llamadas concurrentes"""
+        self._requiere_bd_compartida()
+        cuenta = self._cuenta_vigente()
+        self.servidor.demora = 0.1
+
+        async def cargar():
+            return await asyncio.gather(*(GoogleFitClient(cuenta).aget_today_stats() for _ in range(5)))
+
+        resultados = asyncio.run(cargar())
+
+        self.assertTrue(all(r['owner'] == 'fit@gmail.com' and r['steps'] == 4321 for r in resultados))
+        self.assertEqual(self.servidor.llamadas['aggregate'], 1)
+
+    def test_vista_wsgi_agrupa_requests_concurrentes(self):
+        """Test: Con WSGI las cargas concurrentes de la vista esperan la única sincronización en curso"""
+        self._requiere_bd_compartida()
+        self._cuenta_vigente()
+        self.servidor.demora = 0.2
+        token = str(AccessToken.for_user(self.user))
+        resultados = []
+
+        def cargar():
+            response = Client().get('/api/dispositivo/googlefit/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            resultados.append(response.json())
+
+        hilos = [threading.Thread(target=cargar) for _ in range(5)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual([r['steps'] for r in resultados], [4321] * 5)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 1)
+
+    def test_sincronizacion_incremental(self):
+        """Test: Cada sincronización pide solo el intervalo posterior a la anterior"""
+        cliente = GoogleFitClient(self._cuenta_vigente())
+
+        self.assertEqual(sincronizar(cliente), 1)
+        self.assertEqual(self.servidor.rangos, [(self._ms(self.hoy), self._ms(self.hoy.replace(hour=11, minute=55)))])
+
+        self.ahora += timedelta(minutes=10)
+        self.assertEqual(sincronizar(cliente), 1)
+        self.assertEqual(
+            self.servidor.rangos[1],
+            (self._ms(self.hoy.replace(hour=11, minute=55)), self._ms(self.hoy.replace(hour=12, minute=5))),
+        )
+        # Sin tiempo nuevo no se llama a Google
+        self.assertEqual(sincronizar(cliente), 0)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 2)
+
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA, inicio=self.hoy.date())
+        self.assertEqual(dia.pasos, 2 * 4321)
+        self.assertEqual(
+            set(SincronizacionGoogleFit.objects.filter(usuario=self.user).values_list('hasta', flat=True)),
+            {self.hoy.replace(hour=12, minute=5)},
+        )
+
+    def test_relectura_de_datos_atrasados(self):
+        """Test: Periódicamente se releen las últimas horas y los minutos cambiados se reemplazan"""
+        cliente = GoogleFitClient(self._cuenta_vigente())
+        sincronizar(cliente)
+        self.ahora += timedelta(minutes=10)
+        sincronizar(cliente)  # 4321 pasos a las 00:00 y otros 4321 a las 11:55
+
+        # El teléfono subió tarde: Google ahora tiene otros valores para el día
+        cache.delete(CLAVE_RELECTURA.format(self.user.id))
+        self.ahora += timedelta(minutes=10)
+        pasos = {**_StubGoogle.VALORES, 'com.google.step_count.delta': [{'intVal': 5000}]}
+        with mock.patch.object(_StubGoogle, 'VALORES', pasos):
+            self.assertEqual(sincronizar(cliente), 1)
+        self.assertEqual(
+            self.servidor.rangos[-1], (self._ms(self.hoy), self._ms(self.hoy.replace(hour=12, minute=15))),
+        )
+
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA, inicio=self.hoy.date())
+        self.assertEqual((dia.pasos, round(dia.calorias), dia.fc_lecturas), (5000, 211, 1))
+        minutos = MuestraFitness.objects.filter(usuario=self.user, resolucion=MuestraFitness.MINUTO)
+        self.assertEqual(list(minutos.values_list('pasos', flat=True)), [5000])
+        self.assertEqual(
+            MuestraFitness.objects.filter(usuario=self.user, resolucion=MuestraFitness.HORA)
+            .aggregate(total=Sum('pasos'))['total'], 5000,
+        )
+
+        # Releer sin cambios no escribe nada
+        cache.delete(CLAVE_RELECTURA.format(self.user.id))
+        with mock.patch.object(_StubGoogle, 'VALORES', pasos):
+            sincronizar(cliente)
+        dia.refresh_from_db()
+        self.assertEqual(dia.pasos, 5000)
+
+    def test_relectura_conserva_otras_fuentes(self):
+        """Test: La relectura solo aplica la diferencia de Google; el bonus de ejercicio y las muestras POST se conservan"""
+        cliente = GoogleFitClient(self._cuenta_vigente())
+        sincronizar(cliente)  # 4321 pasos de Google a las 00:00
+
+        registrar_muestras(self.user.id, [{'timestamp': self.hoy, 'steps': 500, 'calories': 40}])
+        self.ahora = self.hoy.replace(hour=6)
+        bonus = LocalFitnessSimulator(self.user.id).record_exercise('correr', 10)
+
+        cache.delete(CLAVE_RELECTURA.format(self.user.id))
+        self.ahora = self.hoy.replace(hour=12, minute=10)
+        pasos = {**_StubGoogle.VALORES, 'com.google.step_count.delta': [{'intVal': 5000}]}
+        with mock.patch.object(_StubGoogle, 'VALORES', pasos):
+            self.assertEqual(sincronizar(cliente), 1)
+        self.assertEqual(self.servidor.rangos[-1][0], self._ms(self.hoy))
+
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA, inicio=self.hoy.date())
+        self.assertEqual(dia.pasos, 5000 + 500 + bonus['steps_bonus'])
+        self.assertAlmostEqual(dia.calorias, 210.6 + 40 + bonus['calories_bonus'])
+        minutos = dict(
+            MuestraFitness.objects.filter(usuario=self.user, resolucion=MuestraFitness.MINUTO)
+            .values_list('inicio', 'pasos')
+        )
+        self.assertEqual(minutos, {self.hoy: 5500, self.hoy.replace(hour=6): bonus['steps_bonus']})
+
+    def test_backfill_en_paralelo(self):
+        """Test: El backfill copia un tramo por día una sola vez, del más reciente al más antiguo"""
+        cliente = GoogleFitClient(self._cuenta_vigente())
+
+        self.assertEqual(backfill(cliente, 10, paralelo=3), 10)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 10)
+        self.assertEqual(
+            ResumenFitness.objects.filter(usuario=self.user, periodo=ResumenFitness.DIA).count(), 10,
+        )
+        self.assertEqual(
+            set(SincronizacionGoogleFit.objects.filter(usuario=self.user).values_list('desde', flat=True)),
+            {self.hoy - timedelta(days=10)},
+        )
+
+        # Lo ya copiado no se vuelve a pedir
+        self.assertEqual(backfill(cliente, 10), 0)
+        self.assertEqual(self.servidor.llamadas['aggregate'], 10)
+
+    def test_tramo_aplicado_no_se_suma_dos_veces(self):
+        """Test: Un tramo que otro proceso ya aplicó se descarta"""
+        cliente = GoogleFitClient(self._cuenta_vigente())
+        fin = self.hoy.replace(hour=1)
+        tipos = (SincronizacionGoogleFit.PASOS,)
+        muestras = cliente.aggregate(tipos, self.hoy, fin)
+        sincronizar(cliente)  # crea los estados en self.hoy y avanza hasta 11:55
+
+        self.assertFalse(aplicar(self.user.id, tipos, self.hoy, fin, muestras))
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA)
+        self.assertEqual(dia.pasos, 4321)
+
+
+class SerieFitnessTest(APITestCase):
+    """Tests para la serie de fitness y sus rollups"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='serie', email='serie@test.com', password='test123')
+        self.client.force_authenticate(user=self.user)
+        self.tz = timezone.get_current_timezone()
+
+    def _momento(self, dia, hora, minuto=0, segundo=0):
+        return datetime(2025, 3, dia, hora, minuto, segundo, tzinfo=self.tz)
+
+    def test_ingesta_acumula_en_todos_los_niveles(self):
+        """Test: Las muestras se suman en minutos, horas, días y semanas"""
+        registrar_muestras(self.user.id, [
+            {'timestamp': self._momento(3, 8, 0, 10), 'steps': 100, 'calories': 4.5, 'heartRate': 80},
+            {'timestamp': self._momento(3, 8, 0, 40), 'steps': 50, 'calories': 2.0, 'heartRate': 100},
+            {'timestamp': self._momento(3, 9, 30), 'steps': 200, 'calories': 8.0},
+        ])
+        # Segundo lote sobre buckets existentes (martes de la misma semana)
+        registrar_muestras(self.user.id, [
+            {'timestamp': self._momento(3, 8, 0, 50), 'steps': 10, 'calories': 0.5, 'heartRate': 60},
+            {'timestamp': self._momento(4, 7, 0), 'steps': 1000, 'calories': 40.0},
+        ])
+
+        minuto = MuestraFitness.objects.get(
+            usuario=self.user, resolucion=MuestraFitness.MINUTO, inicio=self._momento(3, 8),
+        )
+        self.assertEqual(minuto.pasos, 160)
+        self.assertEqual((minuto.fc_min, minuto.fc_max, minuto.fc_promedio), (60, 100, 80))
+        self.assertEqual(
+            MuestraFitness.objects.filter(usuario=self.user, resolucion=MuestraFitness.HORA).count(), 3,
+        )
+
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA, inicio=date(2025, 3, 3))
+        self.assertEqual(dia.pasos, 360)
+        self.assertAlmostEqual(dia.calorias, 15.0)
+        semana = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.SEMANA)
+        self.assertEqual(semana.inicio, date(2025, 3, 3))
+        self.assertEqual(semana.pasos, 1360)
+
+    def test_ingesta_en_lote_consultas_constantes(self):
+        """Test: Las consultas de una ingesta no crecen con el tamaño del lote"""
+        def lote(n):
+            return [{'timestamp': self._momento(10, 6) + timedelta(minutes=i), 'steps': 5} for i in range(n)]
+
+        # INSERT, SELECT y UPDATE por nivel (4) más el savepoint de la transacción
+        with self.assertNumQueries(14):
+            registrar_muestras(self.user.id, lote(10))
+        with self.assertNumQueries(14):
+            registrar_muestras(self.user.id, lote(60))
+
+    def test_endpoint_ingesta_y_serie(self):
+        """Test: POST de muestras y GET de la serie diaria desde los rollups"""
+        response = self.client.post('/api/dispositivo/muestras/', {'muestras': [
+            {'timestamp': self._momento(5, 10).isoformat(), 'steps': 300, 'calories': 12, 'heartRate': 90},
+            {'timestamp': self._momento(7, 18).isoformat(), 'steps': 700, 'calories': 30},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'muestras': 2, 'minutos': 2})
+
+        response = self.client.get('/api/dispositivo/serie/', {'periodo': 'dia', 'desde': '2025-03-01', 'hasta': '2025-03-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(p['inicio'], p['pasos'], p['fc_promedio']) for p in response.data['puntos']],
+            [('2025-03-05', 300, 90), ('2025-03-07', 700, None)],
+        )
+
+        response = self.client.get('/api/dispositivo/serie/', {'periodo': 'semana', 'desde': '2025-03-05', 'hasta': '2025-03-09'})
+        self.assertEqual([(p['inicio'], p['pasos']) for p in response.data['puntos']], [('2025-03-03', 1000)])
+
+        response = self.client.get('/api/dispositivo/serie/', {'periodo': 'hora', 'desde': '2025-03-05', 'hasta': '2025-03-05'})
+        self.assertEqual(len(response.data['puntos']), 1)
+
+    def test_serie_valida_parametros(self):
+        """Test: periodo desconocido, fechas inválidas o rango excesivo retornan 400"""
+        for params in ({'periodo': 'mes'}, {'desde': 'ayer'}, {'desde': '2025-03-10', 'hasta': '2025-03-01'},
+                       {'periodo': 'hora', 'desde': '2025-01-01', 'hasta': '2025-03-01'}):
+            response = self.client.get('/api/dispositivo/serie/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    def test_ingesta_rechaza_muestras_invalidas(self):
+        """Test: Muestras sin timestamp o con valores negativos no se guardan"""
+        response = self.client.post('/api/dispositivo/muestras/', [{'steps': 10}, {
+            'timestamp': self._momento(5, 10).isoformat(), 'steps': -1,
+        }], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MuestraFitness.objects.exists())
+
+    def test_record_exercise_guarda_en_serie(self):
+        """Test: Registrar un ejercicio suma sus bonus al resumen del día"""
+        response = self.client.post('/api/dispositivo/exercise/', {'type': 'cardio', 'duration': 20}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        dia = ResumenFitness.objects.get(usuario=self.user, periodo=ResumenFitness.DIA, inicio=timezone.localdate())
+        self.assertEqual(dia.pasos, response.data['exercise']['steps_bonus'])
+
+
+class SimuladorFitnessTest(TestCase):
+    """Tests para el simulador determinista y vectorizado"""
+
+    def setUp(self):
+        self.usuarios = [
+            User.objects.create_user(username=f'sim{i}', email=f'sim{i}@test.com', password='test123')
+            for i in range(3)
+        ]
+        self.ids = [u.id for u in self.usuarios]
+
+    def test_reproducible_e_independiente_del_lote(self):
+        """Test: Un usuario-día da la misma serie solo o generado con otros"""
+        dias = [date(2025, 3, 3), date(2025, 3, 4)]
+        todos = SimuladorFitness(7).generar(self.ids, dias)
+        uno = SimuladorFitness(7).generar([self.ids[1]], [dias[1]])
+
+        self.assertEqual(todos['pasos'].shape, (3, 2, 1440))
+        for campo in ('pasos', 'calorias', 'fc'):
+            self.assertTrue((todos[campo][1, 1] == uno[campo][0, 0]).all(), campo)
+        otra_semilla = SimuladorFitness(8).generar([self.ids[1]], [dias[1]])
+        self.assertFalse((otra_semilla['pasos'] == uno['pasos']).all())
+
+    def test_escribe_rollups_consistentes(self):
+        """Test: Los resúmenes diarios y semanales suman los buckets por hora, sin el futuro"""
+        tz = timezone.get_current_timezone()
+        hasta = datetime(2025, 3, 12, 9, 30, tzinfo=tz)  # miércoles
+        simulador = SimuladorFitness(7)
+
+        filas = simulador.escribir(self.ids, date(2025, 3, 5), hasta)
+
+        # Desde el lunes 3 hasta las 9:30 del miércoles 12
+        self.assertEqual(filas['horas'], 3 * (9 * 24 + 10))
+        self.assertEqual(filas['resumenes'], 3 * (10 + 2))
+        usuario = self.ids[0]
+        horas = MuestraFitness.objects.filter(usuario_id=usuario, resolucion=MuestraFitness.HORA)
+        self.assertFalse(horas.filter(inicio__gt=hasta).exists())
+        dias = ResumenFitness.objects.filter(usuario_id=usuario, periodo=ResumenFitness.DIA)
+        semanas = ResumenFitness.objects.filter(usuario_id=usuario, periodo=ResumenFitness.SEMANA)
+        self.assertEqual(horas.aggregate(t=Sum('pasos'))['t'], dias.aggregate(t=Sum('pasos'))['t'])
+        self.assertEqual(dias.aggregate(t=Sum('pasos'))['t'], semanas.aggregate(t=Sum('pasos'))['t'])
+        self.assertEqual(sorted(semanas.values_list('inicio', flat=True)), [date(2025, 3, 3), date(2025, 3, 10)])
+
+        # El martes completo coincide con la serie por minuto
+        serie = simulador.generar([usuario], [date(2025, 3, 11)])
+        martes = dias.get(inicio=date(2025, 3, 11))
+        self.assertEqual(martes.pasos, int(serie['pasos'].sum()))
+        self.assertEqual(martes.fc_lecturas, 1440)
+
+        # Volver a escribir reemplaza en vez de duplicar
+        simulador.escribir(self.ids, date(2025, 3, 5), hasta)
+        self.assertEqual(dias.get(inicio=date(2025, 3, 11)).pasos, martes.pasos)
+        self.assertEqual(ResumenFitness.objects.count(), 3 * 12)
+
+    @override_settings(CACHES=CACHE_LOCAL, SIMULADOR_FITNESS_SEMILLA=7)
+    def test_stats_actuales_por_indice(self):
+        """Test: get_current_stats calcula la serie del día una vez y luego solo la indexa"""
+        cache.clear()
+        usuario = self.ids[0]
+        ahora = timezone.localtime()
+        minuto = ahora.hour * 60 + ahora.minute
+
+        with mock.patch.object(SimuladorFitness, 'dia_de_usuario', wraps=SimuladorFitness(7).dia_de_usuario) as dia:
+            stats = LocalFitnessSimulator(usuario).get_current_stats()
+            repetido = LocalFitnessSimulator(usuario).get_current_stats()
+
+        self.assertEqual(dia.call_count, 1)
+        serie = SimuladorFitness(7).generar([usuario], [ahora.date()])
+        acumulado = serie['pasos'][0, 0].cumsum()
+        # el minuto puede cambiar entre `ahora` y la consulta
+        self.assertIn(stats['steps'], (int(acumulado[minuto]), int(acumulado[min(minuto + 1, 1439)])))
+        self.assertEqual(stats['stepGoal'], int(SimuladorFitness(7).parametros([usuario])['meta_pasos'][0]))
+        self.assertEqual(repetido['stepGoal'], stats['stepGoal'])
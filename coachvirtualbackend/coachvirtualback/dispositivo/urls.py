@@ -1,8 +1,10 @@
 from django.urls import path
 from . import views
+from .controllers.series_controller import MuestrasFitnessVista, SerieFitnessVista
 
 urlpatterns = [
     path("dispositivo/googlefit/", views.googlefit_stats, name="dispositivo-googlefit-stats"),
     path("dispositivo/exercise/", views.record_exercise, name="dispositivo-record-exercise"),
+    path("dispositivo/muestras/", MuestrasFitnessVista.as_view(), name="dispositivo-muestras"),
+    path("dispositivo/serie/", SerieFitnessVista.as_view(), name="dispositivo-serie"),
 ]
-
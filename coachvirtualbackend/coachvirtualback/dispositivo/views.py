@@ -1,14 +1,24 @@
 """
 Endpoints del módulo dispositivo
  - Fitness local (simulador sin Google Cloud)
- - Google Fit (solo si está configurado)
+ - Google Fit (si el usuario tiene una cuenta vinculada)
+
+`googlefit_stats` es una vista async: la llamada a Google Fit no ocupa un hilo
+del worker mientras espera (con el perfil ASGI de gunicorn.conf.py).
 """
 
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from decouple import config
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.http import cerrar_clientes_al_terminar, loop_del_worker
 
 from .local_fitness import get_local_fitness_stats
 import logging
@@ -16,58 +26,75 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])  # Permitir sin autenticación para simplificar
-def googlefit_stats(request):
+def _user_id_de_token(request):
+    """user_id del JWT sin consultar la BD (None si no hay token válido)."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return auth.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except InvalidToken:
+        return None
+
+
+@require_http_methods(["GET"])
+@cerrar_clientes_al_terminar
+async def googlefit_stats(request):
     """
     GET /api/dispositivo/googlefit/
     
     Retorna estadísticas de fitness del día.
-    - Si Google Fit está configurado (GOOGLE_FIT_ACCESS_TOKEN), usa Google Fit
+    - Si el usuario tiene una cuenta de Google Fit vinculada, usa Google Fit
     - Si no, usa el simulador local con datos realistas
     """
-    # Verificar si Google Fit está configurado
-    google_fit_token = config("GOOGLE_FIT_ACCESS_TOKEN", default="")
-    
-    if google_fit_token:
+    user_id = _user_id_de_token(request)
+
+    if user_id is not None:
         # Intentar usar Google Fit real
         try:
             from .googlefit import GoogleFitClient
-            client = GoogleFitClient()
-            data = client.get_today_stats()
-            data["source"] = "google_fit"
-            return Response(data, status=status.HTTP_200_OK)
+            client = await GoogleFitClient.apara_usuario(user_id)
+            if client is not None:
+                if loop_del_worker(request):
+                    data = await client.aget_today_stats()
+                else:
+                    # Con WSGI cada request tiene su propio loop: el single-flight
+                    # por hilos es el que agrupa las cargas concurrentes
+                    data = await sync_to_async(client.get_today_stats)()
+                data["source"] = "google_fit"
+                return JsonResponse(data, status=status.HTTP_200_OK)
         except Exception as e:
             logger.warning("Google Fit no disponible, usando simulador local: %s", e)
     
     # Usar simulador local
     try:
-        # Obtener user_id si está autenticado
-        user_id = getattr(request.user, 'id', None) or 1
-        data = get_local_fitness_stats(user_id)
+        data = await sync_to_async(get_local_fitness_stats)(user_id or 1)
         data["source"] = "local_simulator"
-        return Response(data, status=status.HTTP_200_OK)
+        return JsonResponse(data, status=status.HTTP_200_OK)
     except Exception as e:
         logger.exception("Error en simulador local")
-        return Response(
+        return JsonResponse(
             {"error": f"Error obteniendo estadísticas: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
 @api_view(["POST"])
-@permission_classes([AllowAny])
+@permission_classes([IsAuthenticated])
 def record_exercise(request):
     """
     POST /api/dispositivo/exercise/
     
-    Registra una sesión de ejercicio para bonus de pasos/calorías.
+    Registra una sesión de ejercicio para bonus de pasos/calorías en la serie
+    de fitness del usuario (ver /api/dispositivo/serie/).
     Body: { "type": "cardio", "duration": 30 }
     """
     try:
         from .local_fitness import LocalFitnessSimulator
         
-        user_id = getattr(request.user, 'id', None) or 1
+        user_id = request.user.id
         exercise_type = request.data.get("type", "general")
         duration = int(request.data.get("duration", 30))
         
@@ -0,0 +1,25 @@
+"""
+Configuración de gunicorn (Procfile / nixpacks / railway).
+
+Perfiles (variable SERVIDOR_PERFIL):
+- asgi (por defecto): workers de uvicorn sobre coachvirtualback.asgi; las
+  vistas async (Google Fit, Stripe) atienden cientos de requests concurrentes
+  por worker mientras esperan la red y reutilizan sus conexiones salientes
+  (a la BD: pool de psycopg por defecto y CONN_MAX_AGE=0, ver settings.py)
+- wsgi: workers sync sobre coachvirtualback.wsgi; cada vista async corre en
+  un event loop propio y cierra sus clientes HTTP al terminar
+  (a la BD: conexiones persistentes de DB_CONN_MAX_AGE segundos)
+
+El número de workers se toma de WEB_CONCURRENCY (comportamiento estándar de gunicorn).
+"""
+import os
+
+PERFIL = os.environ.get("SERVIDOR_PERFIL", "asgi").lower()
+
+if PERFIL == "asgi":
+    wsgi_app = "coachvirtualback.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "coachvirtualback.wsgi:application"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
@@ -15,6 +15,7 @@ class MusculosConfig(AppConfig):
         """
         # Importamos aquí para evitar problemas de importación circular
         from .models import Tipo
+        from . import signals  # noqa: F401  (invalida la matriz de cobertura)
         
         # Crear tipos por defecto solo si no existen
         tipos_default = ['Gimnasio', 'Fisioterapia']
@@ -0,0 +1,91 @@
+from rest_framework.response import Response
+from rest_framework import status, views
+from ..services.cobertura import obtener_matriz
+
+
+class CoberturaController(views.APIView):
+    """
+    Consultas de cobertura muscular sobre la matriz ejercicio × músculo en memoria.
+    Usado para construir rutinas a partir de los músculos objetivo.
+    """
+
+    MODOS = ("filtro", "ranking", "cubrir")
+
+    def get(self, request):
+        """
+        GET /api/ejercicios/cobertura/?modo=<modo>&musculos=<id>[:<valor>],...
+
+        Modos:
+        - filtro (default): ejercicios con activación >= umbral en TODOS los músculos.
+            ?musculos=2:60,4:20  -> pecho >= 60% y hombros >= 20%
+        - ranking: top `limite` ejercicios por activación ponderada (valor = peso, default 1).
+            ?modo=ranking&musculos=2,4:0.5&limite=5
+        - cubrir: conjunto mínimo (greedy) de ejercicios que cubre todos los músculos
+            con al menos su umbral (default: cualquier activación).
+            ?modo=cubrir&musculos=1,2,3,4
+
+        Respuesta (filtro/ranking):
+        {
+            "modo": "filtro",
+            "total": 1,
+            "ejercicios": [
+                {"id": 5, "nombre": "Press Banca", "puntaje": 80.0, "porcentajes": {"2": 60.0, "4": 20.0}}
+            ]
+        }
+        """
+        modo = request.query_params.get("modo", "filtro")
+        if modo not in self.MODOS:
+            return Response(
+                {"error": f"Modo inválido. Debe ser uno de: {', '.join(self.MODOS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        por_defecto = 1.0 if modo == "ranking" else 0.0
+        try:
+            musculos = self._parse_musculos(request.query_params.get("musculos", ""), por_defecto)
+            limite = int(request.query_params.get("limite", 10))
+        except ValueError:
+            return Response(
+                {"error": 'Formato inválido. Use musculos=<id>[:<valor>],... y limite entero'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not musculos:
+            return Response(
+                {"error": 'Se requiere el parámetro "musculos"'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        matriz = obtener_matriz()
+
+        if modo == "cubrir":
+            resultado = matriz.cubrir(musculos)
+            return Response({
+                "modo": modo,
+                "total": len(resultado["ejercicios"]),
+                "ejercicios": resultado["ejercicios"],
+                "sin_cubrir": resultado["sin_cubrir"],
+            })
+
+        if modo == "ranking":
+            ejercicios = matriz.ranking(musculos, limite=max(1, limite))
+        else:
+            ejercicios = matriz.filtrar(musculos)
+
+        return Response({
+            "modo": modo,
+            "total": len(ejercicios),
+            "ejercicios": ejercicios,
+        })
+
+    @staticmethod
+    def _parse_musculos(valor, por_defecto):
+        """'2:60,4' -> {2: 60.0, 4: por_defecto}"""
+        musculos = {}
+        for parte in valor.split(","):
+            parte = parte.strip()
+            if not parte:
+                continue
+            musculo_id, _, numero = parte.partition(":")
+            musculos[int(musculo_id)] = float(numero) if numero else por_defecto
+        return musculos
@@ -2,6 +2,7 @@ from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import status, views
 from ..models import Ejercicio, DetalleMusculo
+from ..serializers import porcentaje_a_texto
 
 
 class EjerciciosDisponiblesController(views.APIView):
@@ -63,7 +64,7 @@ class EjerciciosDisponiblesController(views.APIView):
                     'id': ejercicio_id,
                     'nombre': detalle.ejercicio.nombre,
                     'url': detalle.ejercicio.url,
-                    'porcentaje': detalle.porcentaje,
+                    'porcentaje': porcentaje_a_texto(detalle.porcentaje),
                     'tipo': tipo_nombre,
                     'musculo': musculo_nombre
                 }
@@ -71,7 +72,7 @@ class EjerciciosDisponiblesController(views.APIView):
                 tipos_dict[tipo_nombre]['musculos'][musculo_nombre].append({
                     'id': ejercicio_id,
                     'nombre': detalle.ejercicio.nombre,
-                    'porcentaje': detalle.porcentaje
+                    'porcentaje': porcentaje_a_texto(detalle.porcentaje)
                 })
         
         return Response({
@@ -0,0 +1,51 @@
+# Convierte DetalleMusculo.porcentaje de texto ("22", "80%", "12,5") a decimal.
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def copiar_porcentajes(apps, schema_editor):
+    DetalleMusculo = apps.get_model('musculos', 'DetalleMusculo')
+    for detalle in DetalleMusculo.objects.all().only('id', 'porcentaje'):
+        texto = (detalle.porcentaje or '').strip().rstrip('%').strip().replace(',', '.')
+        try:
+            valor = Decimal(texto)
+        except InvalidOperation:
+            valor = Decimal('0')
+        valor = min(max(valor, Decimal('0')), Decimal('100'))
+        DetalleMusculo.objects.filter(id=detalle.id).update(porcentaje_valor=valor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musculos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detallemusculo',
+            name='porcentaje_valor',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.RunPython(copiar_porcentajes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='detallemusculo',
+            name='porcentaje',
+        ),
+        migrations.RenameField(
+            model_name='detallemusculo',
+            old_name='porcentaje_valor',
+            new_name='porcentaje',
+        ),
+        migrations.AlterField(
+            model_name='detallemusculo',
+            name='porcentaje',
+            field=models.DecimalField(decimal_places=2, max_digits=5),
+        ),
+        migrations.AddIndex(
+            model_name='detallemusculo',
+            index=models.Index(fields=['musculo', 'porcentaje'], name='musculos_de_musculo_2062f9_idx'),
+        ),
+    ]
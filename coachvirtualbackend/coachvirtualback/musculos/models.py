@@ -35,7 +35,8 @@ class Ejercicio(models.Model):
 
 
 class DetalleMusculo(models.Model):
-    porcentaje = models.CharField(max_length=255)
+    # Porcentaje de activación del músculo en el ejercicio (0-100)
+    porcentaje = models.DecimalField(max_digits=5, decimal_places=2)
 
     # ✅ Musculo -> DetalleMusculo (1 musculo tiene muchos detalles)
     musculo = models.ForeignKey(
@@ -54,6 +55,9 @@ class DetalleMusculo(models.Model):
     class Meta:
         # Evita duplicados del mismo musculo-ejercicio
         unique_together = ("musculo", "ejercicio")
+        indexes = [
+            models.Index(fields=["musculo", "porcentaje"]),
+        ]
 
     def __str__(self):
         return f"{self.musculo} - {self.ejercicio} ({self.porcentaje})"
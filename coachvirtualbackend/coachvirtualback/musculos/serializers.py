@@ -1,8 +1,37 @@
 # musculos/serializers.py
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import Musculo, DetalleMusculo, Ejercicio, EjercicioAsignado, Tipo
 
 
+def porcentaje_a_texto(valor):
+    """Decimal(22.50) -> "22.5"; Decimal(22.00) -> "22" (formato histórico de la API)."""
+    if valor is None:
+        return None
+    texto = format(Decimal(valor).quantize(Decimal("0.01")), "f")
+    return texto.rstrip("0").rstrip(".") if "." in texto else texto
+
+
+class PorcentajeField(serializers.DecimalField):
+    """Porcentaje 0-100. Acepta "80", "80%" o "12,5" y responde como texto."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", 5)
+        kwargs.setdefault("decimal_places", 2)
+        kwargs.setdefault("min_value", Decimal("0"))
+        kwargs.setdefault("max_value", Decimal("100"))
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = data.strip().rstrip("%").strip().replace(",", ".")
+        return super().to_internal_value(data)
+
+    def to_representation(self, value):
+        return porcentaje_a_texto(value)
+
+
 class TipoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tipo
@@ -35,6 +64,7 @@ class EjercicioAsignadoSerializer(serializers.ModelSerializer):
 
 
 class DetalleMusculoSerializer(serializers.ModelSerializer):
+    porcentaje = PorcentajeField()
     ejercicios_asignados = EjercicioAsignadoSerializer(many=True, read_only=True)
 
     # ✅ el tipo viene desde el musculo, no es FK directo acá
@@ -0,0 +1,2 @@
+# musculos/services/__init__.py
+from .cobertura import MatrizCobertura, obtener_matriz, invalidar_matriz
@@ -0,0 +1,195 @@
+"""
+Motor de cobertura muscular para la construcción de rutinas.
+
+Mantiene en memoria una matriz ejercicio × músculo con el porcentaje de
+activación (0-100) de cada `DetalleMusculo`, de modo que las consultas de
+cobertura, ranking y selección mínima de ejercicios se resuelven con
+operaciones vectorizadas de NumPy sin tocar la base de datos.
+
+La matriz se reconstruye de forma perezosa cuando cambia el catálogo: las
+señales de `musculos.signals` incrementan una versión en la cache de Django y
+cada proceso compara esa versión con la de su copia local.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from ..models import DetalleMusculo
+
+
+CACHE_VERSION_KEY = "musculos_cobertura_version"
+
+
+class MatrizCobertura:
+    """Matriz densa ejercicio × músculo con porcentajes de activación."""
+
+    def __init__(self, ejercicios: List[tuple], musculos: List[tuple],
+                 filas: np.ndarray, columnas: np.ndarray, valores: np.ndarray):
+        self.ejercicio_ids = [e[0] for e in ejercicios]
+        self.ejercicio_nombres = [e[1] for e in ejercicios]
+        self.musculo_ids = [m[0] for m in musculos]
+        self.musculo_nombres = {m[0]: m[1] for m in musculos}
+        self._columna = {mid: i for i, mid in enumerate(self.musculo_ids)}
+
+        # Columna extra en ceros para músculos sin detalles en el catálogo
+        self.pesos = np.zeros((len(ejercicios), len(musculos) + 1), dtype=np.float32)
+        if len(valores):
+            self.pesos[filas, columnas] = valores
+
+    @classmethod
+    def desde_catalogo(cls) -> "MatrizCobertura":
+        """Construye la matriz con una sola consulta sobre los ejercicios activos."""
+        registros = list(
+            DetalleMusculo.objects.filter(ejercicio__estado=True)
+            .order_by("ejercicio_id", "musculo_id")
+            .values_list("ejercicio_id", "ejercicio__nombre",
+                         "musculo_id", "musculo__nombre", "porcentaje")
+        )
+
+        ejercicios: Dict[int, int] = {}
+        musculos: Dict[int, int] = {}
+        lista_ejercicios, lista_musculos = [], []
+        filas, columnas, valores = [], [], []
+
+        for ejercicio_id, ejercicio_nombre, musculo_id, musculo_nombre, porcentaje in registros:
+            if ejercicio_id not in ejercicios:
+                ejercicios[ejercicio_id] = len(lista_ejercicios)
+                lista_ejercicios.append((ejercicio_id, ejercicio_nombre))
+            if musculo_id not in musculos:
+                musculos[musculo_id] = len(lista_musculos)
+                lista_musculos.append((musculo_id, musculo_nombre))
+            filas.append(ejercicios[ejercicio_id])
+            columnas.append(musculos[musculo_id])
+            valores.append(float(porcentaje))
+
+        return cls(
+            lista_ejercicios,
+            lista_musculos,
+            np.asarray(filas, dtype=np.intp),
+            np.asarray(columnas, dtype=np.intp),
+            np.asarray(valores, dtype=np.float32),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Utilidades
+    # ------------------------------------------------------------------ #
+
+    def _submatriz(self, musculo_ids: Iterable[int]) -> np.ndarray:
+        sin_datos = len(self.musculo_ids)
+        cols = [self._columna.get(mid, sin_datos) for mid in musculo_ids]
+        return self.pesos[:, cols]
+
+    def _resultado(self, filas: np.ndarray, sub: np.ndarray,
+                   puntajes: np.ndarray, musculo_ids: List[int]) -> List[Dict]:
+        claves = [str(mid) for mid in musculo_ids]
+        porcentajes = sub[filas].tolist()
+        return [
+            {
+                "id": self.ejercicio_ids[fila],
+                "nombre": self.ejercicio_nombres[fila],
+                "puntaje": round(puntaje, 2),
+                "porcentajes": dict(zip(claves, valores)),
+            }
+            for fila, puntaje, valores in zip(filas.tolist(), puntajes[filas].tolist(), porcentajes)
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Consultas
+    # ------------------------------------------------------------------ #
+
+    def filtrar(self, requisitos: Dict[int, float]) -> List[Dict]:
+        """
+        Ejercicios que cumplen TODOS los umbrales (ej: {pecho: 60, hombros: 20}).
+        Ordenados por activación total sobre los músculos pedidos.
+        """
+        musculo_ids = list(requisitos)
+        sub = self._submatriz(musculo_ids)
+        umbrales = np.asarray([requisitos[m] for m in musculo_ids], dtype=np.float32)
+
+        cumple = ((sub >= umbrales) & (sub > 0)).all(axis=1)
+        puntajes = sub.sum(axis=1)
+        filas = np.flatnonzero(cumple)
+        filas = filas[np.argsort(-puntajes[filas], kind="stable")]
+        return self._resultado(filas, sub, puntajes, musculo_ids)
+
+    def ranking(self, pesos_musculo: Dict[int, float], limite: int = 10) -> List[Dict]:
+        """Top-N ejercicios por activación ponderada de los músculos pedidos."""
+        musculo_ids = list(pesos_musculo)
+        sub = self._submatriz(musculo_ids)
+        pesos = np.asarray([pesos_musculo[m] for m in musculo_ids], dtype=np.float32)
+
+        puntajes = sub @ pesos
+        candidatos = np.flatnonzero(puntajes > 0)
+        if limite and len(candidatos) > limite:
+            mejores = np.argpartition(-puntajes[candidatos], limite - 1)[:limite]
+            candidatos = candidatos[mejores]
+        filas = candidatos[np.argsort(-puntajes[candidatos], kind="stable")]
+        return self._resultado(filas, sub, puntajes, musculo_ids)
+
+    def cubrir(self, requisitos: Dict[int, float]) -> Dict[str, List]:
+        """
+        Selección voraz (greedy set cover) del menor conjunto de ejercicios que
+        cubre todos los músculos pedidos con al menos su umbral de activación.
+        """
+        musculo_ids = list(requisitos)
+        sub = self._submatriz(musculo_ids)
+        umbrales = np.asarray([requisitos[m] for m in musculo_ids], dtype=np.float32)
+
+        cubre = (sub >= umbrales) & (sub > 0)
+        pendientes = cubre.any(axis=0)
+        sin_cubrir = [mid for mid, ok in zip(musculo_ids, pendientes.tolist()) if not ok]
+
+        elegidos = []
+        while pendientes.any():
+            ganancia = cubre[:, pendientes].sum(axis=1)
+            # Desempate por activación sobre los músculos aún pendientes
+            desempate = sub[:, pendientes].sum(axis=1) / (100.0 * len(musculo_ids) + 1)
+            fila = int(np.argmax(ganancia + desempate))
+            if ganancia[fila] == 0:
+                break
+            elegidos.append(fila)
+            pendientes &= ~cubre[fila]
+
+        filas = np.asarray(elegidos, dtype=np.intp)
+        puntajes = sub.sum(axis=1)
+        return {
+            "ejercicios": self._resultado(filas, sub, puntajes, musculo_ids),
+            "sin_cubrir": sin_cubrir,
+        }
+
+
+# ---------------------------------------------------------------------- #
+# Instancia por proceso
+# ---------------------------------------------------------------------- #
+
+_lock = threading.Lock()
+_matriz: Optional[MatrizCobertura] = None
+_version: Optional[int] = None
+
+
+def obtener_matriz() -> MatrizCobertura:
+    """Devuelve la matriz del proceso, reconstruyéndola si el catálogo cambió."""
+    global _matriz, _version
+    version = cache.get(CACHE_VERSION_KEY, 0)
+    if _matriz is not None and version == _version:
+        return _matriz
+
+    with _lock:
+        if _matriz is None or version != _version:
+            _matriz = MatrizCobertura.desde_catalogo()
+            _version = version
+        return _matriz
+
+
+def invalidar_matriz() -> None:
+    """Marca la matriz como obsoleta en todos los procesos que comparten cache."""
+    global _matriz
+    cache.add(CACHE_VERSION_KEY, 0, None)
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, None)
+    _matriz = None
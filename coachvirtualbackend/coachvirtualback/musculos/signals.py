@@ -0,0 +1,18 @@
+"""
+Señales del catálogo de músculos.
+Cualquier cambio en ejercicios, músculos o detalles invalida la matriz de cobertura.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DetalleMusculo, Ejercicio, Musculo
+from .services.cobertura import invalidar_matriz
+
+
+@receiver([post_save, post_delete], sender=DetalleMusculo, dispatch_uid="cobertura_detalle")
+@receiver([post_save, post_delete], sender=Ejercicio, dispatch_uid="cobertura_ejercicio")
+@receiver([post_save, post_delete], sender=Musculo, dispatch_uid="cobertura_musculo")
+def catalogo_modificado(sender, **kwargs):
+    # Después del commit: antes, otro request podría reconstruir con las filas viejas
+    transaction.on_commit(invalidar_matriz)
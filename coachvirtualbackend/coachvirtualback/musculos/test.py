@@ -287,6 +287,99 @@ class MusculoFilterTest(TestCase):
         self.assertEqual(musculos.count(), 2)  # Uno en cada categoría
 
 
+class CoberturaMusculosTest(APITestCase):
+    """Tests para el motor de cobertura muscular (matriz ejercicio × músculo)"""
+
+    def setUp(self):
+        from .services.cobertura import invalidar_matriz
+
+        self.tipo = Tipo.objects.create(nombre='Gimnasio')
+        self.pecho = Musculo.objects.create(nombre='Pecho', url='https://example.com/p.png', tipo=self.tipo)
+        self.hombros = Musculo.objects.create(nombre='Hombros', url='https://example.com/h.png', tipo=self.tipo)
+        self.triceps = Musculo.objects.create(nombre='Tríceps', url='https://example.com/t.png', tipo=self.tipo)
+
+        self.press = Ejercicio.objects.create(nombre='Press banca')
+        self.aperturas = Ejercicio.objects.create(nombre='Aperturas')
+        self.fondos = Ejercicio.objects.create(nombre='Fondos')
+
+        DetalleMusculo.objects.create(ejercicio=self.press, musculo=self.pecho, porcentaje='70')
+        DetalleMusculo.objects.create(ejercicio=self.press, musculo=self.hombros, porcentaje='20')
+        DetalleMusculo.objects.create(ejercicio=self.press, musculo=self.triceps, porcentaje='10')
+        DetalleMusculo.objects.create(ejercicio=self.aperturas, musculo=self.pecho, porcentaje='85')
+        DetalleMusculo.objects.create(ejercicio=self.fondos, musculo=self.triceps, porcentaje='60')
+        DetalleMusculo.objects.create(ejercicio=self.fondos, musculo=self.pecho, porcentaje='30')
+        invalidar_matriz()
+
+    def test_porcentaje_numerico(self):
+        """Test: El porcentaje se guarda como número"""
+        detalle = DetalleMusculo.objects.get(ejercicio=self.press, musculo=self.hombros)
+        self.assertEqual(float(detalle.porcentaje), 20.0)
+        self.assertEqual(
+            DetalleMusculo.objects.filter(musculo=self.pecho, porcentaje__gte=60).count(), 2
+        )
+
+        # La API acepta el formato de texto anterior y responde igual que antes
+        response = self.client.post('/api/detalle-musculos/', {
+            'porcentaje': '45%', 'musculo': self.hombros.id, 'ejercicio': self.aperturas.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['porcentaje'], '45')
+
+    def test_filtro_por_umbrales(self):
+        """Test: Pecho >= 60% y hombros >= 20%"""
+        response = self.client.get(
+            '/api/ejercicios/cobertura/', {'musculos': f'{self.pecho.id}:60,{self.hombros.id}:20'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['id'] for e in response.data['ejercicios']], [self.press.id])
+
+    def test_ranking(self):
+        """Test: Ranking por activación ponderada"""
+        response = self.client.get(
+            '/api/ejercicios/cobertura/',
+            {'modo': 'ranking', 'musculos': f'{self.pecho.id},{self.triceps.id}', 'limite': 2},
+        )
+        self.assertEqual(response.status_code, 200)
+        ids = [e['id'] for e in response.data['ejercicios']]
+        self.assertEqual(ids, [self.fondos.id, self.aperturas.id])
+
+    def test_cubrir_conjunto_minimo(self):
+        """Test: Set cover voraz con músculos sin cobertura"""
+        sin_detalles = Musculo.objects.create(nombre='Cuello', url='https://example.com/c.png', tipo=self.tipo)
+        response = self.client.get(
+            '/api/ejercicios/cobertura/',
+            {'modo': 'cubrir', 'musculos': f'{self.pecho.id}:60,{self.hombros.id},{self.triceps.id}:50,{sin_detalles.id}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        ids = {e['id'] for e in response.data['ejercicios']}
+        self.assertEqual(ids, {self.press.id, self.fondos.id})
+        self.assertEqual(response.data['sin_cubrir'], [sin_detalles.id])
+
+    def test_matriz_se_refresca_al_cambiar_catalogo(self):
+        """Test: Cambios en el catálogo invalidan la matriz en memoria"""
+        from .services.cobertura import obtener_matriz
+
+        self.assertEqual(obtener_matriz().filtrar({self.hombros.id: 50}), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            DetalleMusculo.objects.filter(ejercicio=self.press, musculo=self.hombros).first().delete()
+            DetalleMusculo.objects.create(ejercicio=self.press, musculo=self.hombros, porcentaje='55')
+            # Hasta el commit la matriz en memoria no cambia
+            self.assertEqual(obtener_matriz().filtrar({self.hombros.id: 50}), [])
+        self.assertEqual(
+            [e['id'] for e in obtener_matriz().filtrar({self.hombros.id: 50})], [self.press.id]
+        )
+
+    def test_parametros_invalidos(self):
+        """Test: Modo o formato inválido devuelve 400"""
+        self.assertEqual(self.client.get('/api/ejercicios/cobertura/').status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/ejercicios/cobertura/', {'modo': 'x', 'musculos': '1'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get('/api/ejercicios/cobertura/', {'musculos': 'a:b'}).status_code, 400
+        )
+
+
 # ============================================
 # RESUMEN DE COBERTURA DE TESTS - MUSCULOS
 # ============================================
@@ -302,7 +395,8 @@ class MusculoFilterTest(TestCase):
 # - EjerciciosAPITest: 3 tests
 # - EjerciciosDisponiblesTest: 1 test
 # - MusculoFilterTest: 3 tests
+# - CoberturaMusculosTest: 6 tests
 # 
-# Total: 23 tests
+# Total: 29 tests
 # Cobertura estimada: 80%
 # ============================================
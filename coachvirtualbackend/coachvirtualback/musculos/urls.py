@@ -6,6 +6,7 @@ from .controllers.detalle_musculo_controller import DetalleMusculoController
 from .controllers.ejercicio_asignado_controller import EjercicioAsignadoController
 from .controllers.tipo_controller import TipoController   # 🔹 nuevo import
 from .controllers.ejercicios_disponibles_controller import EjerciciosDisponiblesController
+from .controllers.cobertura_controller import CoberturaController
 
 urlpatterns = [
     # /api/musculos/
@@ -14,6 +15,7 @@ urlpatterns = [
 
     # /api/ejercicios/
     path('ejercicios/', EjercicioController.as_view(), name='ejercicios'),
+    path('ejercicios/cobertura/', CoberturaController.as_view(), name='ejercicios-cobertura'),
     path('ejercicios/<int:pk>/', EjercicioController.as_view(), name='ejercicio-detail'),
 
     # /api/detalle-musculos/
@@ -4,10 +4,18 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.db.models import Count
+from rest_framework.settings import api_settings
+from core import metricas
 from ..models import PoseTrainingData
+from ..renderers import MessagePackParser, MessagePackRenderer
 from ..serializers import PoseTrainingDataSerializer
 
 
+# JSON por defecto; application/msgpack con landmarks float32 empacados para el entrenador
+RENDERERS_POSES = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+PARSERS_POSES = [*api_settings.DEFAULT_PARSER_CLASSES, MessagePackParser]
+
+
 class PoseTrainingDataListaCrearVista(APIView):
     """
     Vista para listar y crear datos de entrenamiento de poses.
@@ -16,6 +24,8 @@ class PoseTrainingDataListaCrearVista(APIView):
     POST: Crea un nuevo dato de entrenamiento (snapshot o secuencia)
     """
     permission_classes = [AllowAny]  # Cambiar según tus necesidades
+    renderer_classes = RENDERERS_POSES
+    parser_classes = PARSERS_POSES
     
     def get(self, request):
         """
@@ -55,7 +65,8 @@ class PoseTrainingDataListaCrearVista(APIView):
         """
         serializer = PoseTrainingDataSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            pose = serializer.save()
+            metricas.registro.incrementar('poses_ingestadas_total', tipo=pose.tipo)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -69,6 +80,8 @@ class PoseTrainingDataDetalleVista(APIView):
     DELETE: Elimina un dato específico
     """
     permission_classes = [AllowAny]
+    renderer_classes = RENDERERS_POSES
+    parser_classes = PARSERS_POSES
     
     def get(self, request, pk):
         """Obtiene un dato de entrenamiento por ID"""
@@ -102,6 +115,8 @@ class PoseTrainingDataEstadisticasVista(APIView):
     GET: Retorna estadísticas agregadas
     """
     permission_classes = [AllowAny]
+    renderer_classes = RENDERERS_POSES
+    parser_classes = PARSERS_POSES
     
     def get(self, request):
         """
@@ -146,6 +161,8 @@ class PoseTrainingDataExportVista(APIView):
     GET: Exporta los datos en formato JSON optimizado
     """
     permission_classes = [AllowAny]
+    renderer_classes = RENDERERS_POSES
+    parser_classes = PARSERS_POSES
     
     def get(self, request):
         """
@@ -202,6 +219,7 @@ class PoseTrainingDataExportVista(APIView):
                             'secuencia_id': item.id
                         })
             
+            metricas.registro.incrementar('poses_exportadas_total', len(data_ml), formato='ml')
             return Response({
                 'total_samples': len(data_ml),
                 'formato': 'ml_optimizado',
@@ -211,8 +229,10 @@ class PoseTrainingDataExportVista(APIView):
         else:
             # Formato completo
             serializer = PoseTrainingDataSerializer(queryset, many=True)
+            data = serializer.data
+            metricas.registro.incrementar('poses_exportadas_total', len(data), formato='completo')
             return Response({
-                'total': queryset.count(),
+                'total': len(data),
                 'formato': 'completo',
-                'data': serializer.data
+                'data': data
             })
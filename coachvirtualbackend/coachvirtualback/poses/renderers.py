@@ -0,0 +1,161 @@
+"""
+MessagePack para la API de poses (`Accept` / `Content-Type: application/msgpack`).
+
+En JSON cada coordenada viaja como texto ("0.4523412") y cada landmark repite
+sus claves. Con MessagePack los landmarks viajan como arrays float32 empacados
+en tipos de extensión:
+
+- EXT_FLOAT32 (1): float32 little-endian, se decodifica como lista de floats
+  (arrays de numpy, listas numéricas bajo "landmarks")
+- EXT_LANDMARKS (2): un byte con el formato (FORMATOS_LANDMARK) y luego
+  N x campos float32 little-endian; se decodifica como la lista de dicts
+  [{"x": ..., "y": ..., "z": ..., "visibility": ...}, ...] que espera el
+  serializer, así que las vistas no distinguen el formato de entrada
+
+El resto de la estructura (ángulos, frames, etiquetas) va como MessagePack
+normal. Los valores quedan con precisión float32 (~7 dígitos), que es la
+precisión con la que BlazePose los produce.
+"""
+
+import array
+import datetime
+import decimal
+import sys
+
+import msgpack
+import numpy as np
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+from core.renderers import _default as _default_json
+
+
+MEDIA_TYPE = 'application/msgpack'
+
+EXT_FLOAT32 = 1
+EXT_LANDMARKS = 2
+
+# Campos por landmark según el byte de formato de EXT_LANDMARKS
+FORMATOS_LANDMARK = {
+    3: ('x', 'y', 'z'),
+    4: ('x', 'y', 'z', 'visibility'),
+}
+_FORMATO_POR_CAMPOS = {frozenset(campos): (codigo, campos) for codigo, campos in FORMATOS_LANDMARK.items()}
+
+
+def _ext_float32(valores) -> msgpack.ExtType:
+    return msgpack.ExtType(EXT_FLOAT32, np.asarray(valores, dtype='<f4').tobytes())
+
+
+def _empacar_landmarks(landmarks):
+    """ExtType para una lista de landmarks, o la lista tal cual si no tiene un formato conocido."""
+    if not landmarks or not isinstance(landmarks, list):
+        return landmarks
+    primero = landmarks[0]
+    if isinstance(primero, (int, float)):
+        try:
+            return _ext_float32(landmarks)
+        except (TypeError, ValueError):
+            return landmarks
+    if not isinstance(primero, dict):
+        return landmarks
+    formato = _FORMATO_POR_CAMPOS.get(frozenset(primero))
+    if formato is None:
+        return landmarks
+    codigo, campos = formato
+    try:
+        if any(len(punto) != codigo for punto in landmarks):
+            return landmarks
+        valores = np.array([[punto[c] for c in campos] for punto in landmarks], dtype='<f4')
+    except (KeyError, TypeError, ValueError):
+        return landmarks
+    return msgpack.ExtType(EXT_LANDMARKS, bytes((codigo,)) + valores.tobytes())
+
+
+def _empacar(obj):
+    """Recorre la respuesta reemplazando cada valor de "landmarks" por su ExtType."""
+    if isinstance(obj, dict):
+        return {
+            clave: _empacar_landmarks(valor) if clave == 'landmarks' else _empacar(valor)
+            for clave, valor in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_empacar(valor) for valor in obj]
+    return obj
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        return _ext_float32(obj.ravel())
+    if isinstance(obj, datetime.datetime):
+        texto = obj.isoformat()
+        return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return _default_json(obj)
+
+
+def _floats(datos) -> array.array:
+    """float32 little-endian a array('f'): sus elementos ya son floats de Python al iterar."""
+    valores = array.array('f')
+    valores.frombytes(datos)
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    return valores
+
+
+# Un dict literal por landmark (sin zip ni numpy): es lo que más pesa al
+# decodificar una secuencia, decenas de miles de landmarks
+_LANDMARKS_DESDE_FLOATS = {
+    3: lambda it: [{'x': x, 'y': y, 'z': z} for x, y, z in zip(it, it, it)],
+    4: lambda it: [{'x': x, 'y': y, 'z': z, 'visibility': v} for x, y, z, v in zip(it, it, it, it)],
+}
+
+
+def _ext_hook(codigo, datos):
+    if codigo == EXT_FLOAT32:
+        return _floats(datos).tolist()
+    if codigo == EXT_LANDMARKS:
+        campos = FORMATOS_LANDMARK.get(datos[0]) if datos else None
+        if campos is None:
+            raise ValueError('Formato de landmarks desconocido')
+        valores = _floats(datos[1:])
+        if len(valores) % len(campos):
+            raise ValueError('Landmarks incompletos')
+        return _LANDMARKS_DESDE_FLOATS[datos[0]](iter(valores))
+    return msgpack.ExtType(codigo, datos)
+
+
+def dumps(data) -> bytes:
+    return msgpack.packb(_empacar(data), default=_default, use_bin_type=True)
+
+
+def loads(contenido: bytes):
+    return msgpack.unpackb(contenido, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except Exception as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
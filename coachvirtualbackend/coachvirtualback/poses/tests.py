@@ -1,6 +1,6 @@
 """
 Tests unitarios para el módulo de poses - CoachVirtual
-Incluye pruebas de modelos, serializadores y controladores
+Incluye pruebas de modelos, serializadores, controladores y MessagePack
 Cobertura: ~85% del módulo poses
 """
 from django.test import TestCase
@@ -8,8 +8,11 @@ from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from .models import PoseTrainingData
+from . import renderers
 import json
 import math
+import msgpack
+import numpy as np
 
 
 class PoseTrainingDataModelTest(TestCase):
@@ -437,3 +440,59 @@ class VoiceFeedbackTest(TestCase):
 # Total: 32 tests
 # Cobertura estimada: 85%
 # ============================================
+
+
+class PoseMessagePackTest(APITestCase):
+    """Tests para la negociación MessagePack de la API de poses"""
+
+    def setUp(self):
+        self.landmarks = [
+            {'x': 0.4523412 + i / 100, 'y': 0.25, 'z': -0.125, 'visibility': 0.99}
+            for i in range(33)
+        ]
+        self.snapshot = {
+            'ejercicio': 'flexion',
+            'tipo': 'snapshot',
+            'landmarks': self.landmarks,
+            'angulos': {'codo_izq': 90.0},
+            'etiqueta': 'correcto',
+        }
+
+    def test_landmarks_empacados_float32(self):
+        """Test: Los landmarks viajan como extensión float32 y vuelven como dicts"""
+        contenido = renderers.dumps(self.snapshot)
+        self.assertLess(len(contenido), len(json.dumps(self.snapshot)) / 3)
+        decodificado = renderers.loads(contenido)
+        self.assertEqual(len(decodificado['landmarks']), 33)
+        self.assertEqual(set(decodificado['landmarks'][0]), {'x', 'y', 'z', 'visibility'})
+        self.assertAlmostEqual(decodificado['landmarks'][0]['x'], 0.4523412, places=6)
+        self.assertEqual(decodificado['angulos'], {'codo_izq': 90.0})
+
+    def test_landmarks_mal_formados(self):
+        """Test: Un bloque de landmarks truncado o de formato desconocido se rechaza con 400"""
+        valores = np.zeros((33, 4), dtype='<f4').tobytes()
+        for datos in (bytes((4,)) + valores[:-4], bytes((9,)) + valores):
+            contenido = msgpack.packb({**self.snapshot, 'landmarks': msgpack.ExtType(renderers.EXT_LANDMARKS, datos)})
+            response = self.client.post('/api/poses/', contenido, content_type='application/msgpack')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_crear_y_listar_en_msgpack(self):
+        """Test: POST y GET de /api/poses/ con application/msgpack"""
+        response = self.client.post(
+            '/api/poses/', renderers.dumps(self.snapshot),
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        pose = PoseTrainingData.objects.get()
+        self.assertAlmostEqual(pose.landmarks[32]['x'], 0.7723412, places=6)
+
+        response = self.client.get('/api/poses/', HTTP_ACCEPT='application/msgpack')
+        datos = renderers.loads(response.content)
+        self.assertEqual(datos[0]['ejercicio'], 'flexion')
+        self.assertEqual(len(datos[0]['landmarks']), 33)
+
+    def test_json_sigue_por_defecto(self):
+        """Test: Sin Accept msgpack la API responde JSON"""
+        response = self.client.get('/api/poses/')
+        self.assertEqual(response['Content-Type'], 'application/json')
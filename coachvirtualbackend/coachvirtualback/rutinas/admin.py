@@ -0,0 +1,27 @@
+from django.contrib import admin
+from .models import EstadisticasUsuario, Rutina, SesionEntrenamiento
+
+
+@admin.register(Rutina)
+class RutinaAdmin(admin.ModelAdmin):
+    list_display = ['id', 'nombre', 'usuario', 'categoria', 'objetivo', 'nivel', 'activa', 'created_at']
+    list_filter = ['categoria', 'objetivo', 'nivel', 'activa', 'generada_por_ia']
+    search_fields = ['nombre', 'usuario__email']
+    raw_id_fields = ['usuario']
+
+
+@admin.register(SesionEntrenamiento)
+class SesionEntrenamientoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'usuario', 'rutina', 'fecha', 'duracion_minutos', 'calorias_quemadas', 'estado']
+    list_filter = ['estado']
+    search_fields = ['usuario__email']
+    raw_id_fields = ['usuario', 'rutina']
+    date_hierarchy = 'fecha'
+
+
+@admin.register(EstadisticasUsuario)
+class EstadisticasUsuarioAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'entrenamientos_semanales', 'minutos_totales_semana', 'racha_dias', 'updated_at']
+    search_fields = ['usuario__email']
+    raw_id_fields = ['usuario']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,58 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Rutina
+from ..serializers import RutinaSerializer
+
+
+class RutinaListaCrearVista(APIView):
+    """
+    GET  /api/rutinas/?categoria=gimnasio&todas=1 — mis rutinas (por defecto solo las activas).
+    POST /api/rutinas/ — crea una rutina del usuario.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        qs = Rutina.objects.filter(usuario=request.user)
+        if request.query_params.get('todas') != '1':
+            qs = qs.filter(activa=True)
+        categoria = request.query_params.get('categoria')
+        if categoria:
+            qs = qs.filter(categoria=categoria)
+        return Response(RutinaSerializer(qs, many=True).data)
+
+    def post(self, request):
+        serializer = RutinaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rutina = serializer.save(usuario=request.user)
+        return Response(RutinaSerializer(rutina).data, status=status.HTTP_201_CREATED)
+
+
+class RutinaDetalleVista(APIView):
+    """
+    GET/PATCH/DELETE /api/rutinas/<id>/ — solo rutinas propias.
+    DELETE la desactiva: sus sesiones se conservan en el historial.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, request, pk):
+        return get_object_or_404(Rutina, pk=pk, usuario=request.user)
+
+    def get(self, request, pk):
+        return Response(RutinaSerializer(self.get_object(request, pk)).data)
+
+    def patch(self, request, pk):
+        serializer = RutinaSerializer(self.get_object(request, pk), data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return Response(RutinaSerializer(serializer.save()).data)
+
+    put = patch
+
+    def delete(self, request, pk):
+        rutina = self.get_object(request, pk)
+        rutina.activa = False
+        rutina.save(update_fields=['activa', 'updated_at'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
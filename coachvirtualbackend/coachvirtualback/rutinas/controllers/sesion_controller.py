@@ -0,0 +1,60 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import SesionEntrenamiento
+from ..serializers import SesionEntrenamientoSerializer
+from ..services.estadisticas import leer_estadisticas, registrar_sesion
+
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+
+
+class SesionListaCrearVista(APIView):
+    """
+    GET  /api/rutinas/sesiones/?rutina=<id>&limit=50&antes_de=<id> — mis sesiones, más recientes primero.
+    POST /api/rutinas/sesiones/ — registra una sesión y actualiza mis estadísticas.
+    Las sesiones no se editan ni se borran.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limite = min(max(int(request.query_params.get('limit', LIMITE_POR_DEFECTO)), 1), LIMITE_MAXIMO)
+            antes_de = request.query_params.get('antes_de')
+            antes_de = int(antes_de) if antes_de else None
+            rutina = request.query_params.get('rutina')
+            rutina = int(rutina) if rutina else None
+        except ValueError:
+            return Response({'error': 'limit, antes_de y rutina deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = SesionEntrenamiento.objects.filter(usuario=request.user).order_by('-fecha', '-id')
+        if rutina is not None:
+            qs = qs.filter(rutina_id=rutina)
+        if antes_de is not None:
+            ancla = SesionEntrenamiento.objects.filter(pk=antes_de, usuario=request.user).values('fecha').first()
+            if ancla is None:
+                return Response({'error': 'Sesión antes_de no encontrada'}, status=status.HTTP_400_BAD_REQUEST)
+            qs = qs.filter(fecha__lte=ancla['fecha']).exclude(fecha=ancla['fecha'], id__gte=antes_de)
+
+        sesiones = list(qs[:limite + 1])
+        return Response({
+            'resultados': SesionEntrenamientoSerializer(sesiones[:limite], many=True).data,
+            'siguiente': sesiones[limite - 1].id if len(sesiones) > limite else None,
+        })
+
+    def post(self, request):
+        serializer = SesionEntrenamientoSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        sesion = registrar_sesion(request.user.id, **serializer.validated_data)
+        return Response(SesionEntrenamientoSerializer(sesion).data, status=status.HTTP_201_CREATED)
+
+
+class EstadisticasVista(APIView):
+    """GET /api/rutinas/estadisticas/ — resumen semanal y racha precalculados."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(leer_estadisticas(request.user.id))
@@ -0,0 +1,53 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.renderers import ORJSONParser, con_descompresion
+from poses.renderers import MessagePackParser
+from ..serializers import LoteTelemetriaSerializer
+from ..services.telemetria import LoteInvalido, registrar_lote, resumen_sesion
+
+
+# JSON o MessagePack, opcionalmente con Content-Encoding gzip/deflate
+PARSERS_TELEMETRIA = [con_descompresion(ORJSONParser), con_descompresion(MessagePackParser)]
+
+
+class TelemetriaVista(APIView):
+    """
+    POST /api/rutinas/telemetria/ — lote de eventos del detector durante una sesión.
+    Body: {"sesion": "<uuid>", "secuencia": 3, "ejercicio": "sentadilla",
+           "inicio": "2025-01-01T10:00:00Z",
+           "eventos": [[1200, "rep", "", null], [1900, "fase", "bajada", 700],
+                       [2300, "correccion", "rodillas_adentro", 12.5]]}
+    Un lote repetido (misma sesión y secuencia) responde 200 sin volver a guardarse.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = PARSERS_TELEMETRIA
+
+    def post(self, request):
+        serializer = LoteTelemetriaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        try:
+            insertados = registrar_lote(
+                request.user.id, datos['sesion'], datos['secuencia'], datos['ejercicio'],
+                datos['inicio'], datos['eventos'],
+            )
+        except LoteInvalido as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if insertados is None:
+            return Response({'duplicado': True, 'eventos': 0}, status=status.HTTP_200_OK)
+        return Response({'duplicado': False, 'eventos': insertados}, status=status.HTTP_201_CREATED)
+
+
+class TelemetriaSesionVista(APIView):
+    """GET /api/rutinas/telemetria/<uuid>/ — resumen de la telemetría de una sesión propia."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, sesion):
+        resumen = resumen_sesion(request.user.id, sesion)
+        if resumen['inicio'] is None:
+            return Response({'error': 'Sesión sin telemetría'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(resumen)
@@ -0,0 +1,31 @@
+"""
+Crea por adelantado las particiones diarias de telemetría y elimina las antiguas.
+Ejecutar con:
+    python manage.py particiones_telemetria --adelanto 7 --retener 90
+Programar una vez al día (cron): la ingesta no crea particiones, lo que llegue
+para un día sin partición queda en la partición DEFAULT. Fuera de PostgreSQL
+solo borra las filas antiguas.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from rutinas.services.telemetria import asegurar_particiones, podar_particiones
+
+
+class Command(BaseCommand):
+    help = 'Mantiene las particiones diarias de eventos_telemetria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adelanto', type=int, default=7, help='Días futuros a crear (incluye hoy)')
+        parser.add_argument('--retener', type=int, default=90, help='Días de telemetría que se conservan')
+
+    def handle(self, *args, **options):
+        hoy = datetime.now(dt_timezone.utc).date()
+        # Desde ayer: un lote puede traer eventos de hasta unas horas antes
+        creadas = asegurar_particiones(hoy + timedelta(days=i) for i in range(-1, options['adelanto']))
+        eliminadas = podar_particiones(options['retener'])
+
+        self.stdout.write(self.style.SUCCESS('✅ Particiones de telemetría al día'))
+        self.stdout.write(f"   Creadas: {creadas}")
+        self.stdout.write(f"   Eliminadas: {eliminadas}")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sesionentrenamiento',
+            index=models.Index(fields=['usuario', '-fecha'], name='sesiones_usuario_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def particionar(apps, schema_editor):
+    """En PostgreSQL recrea la tabla (vacía) particionada por rango de `fecha`."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP TABLE eventos_telemetria')
+    schema_editor.execute("""
+        CREATE TABLE eventos_telemetria (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            usuario_id bigint NOT NULL,
+            sesion uuid NOT NULL,
+            fecha timestamp with time zone NOT NULL,
+            tipo smallint NOT NULL CHECK (tipo >= 0),
+            ejercicio varchar(50) NOT NULL,
+            codigo varchar(50) NOT NULL,
+            valor double precision NULL,
+            PRIMARY KEY (id, fecha)
+        ) PARTITION BY RANGE (fecha)
+    """)
+    schema_editor.execute('CREATE INDEX eventos_tel_sesion_fecha_idx ON eventos_telemetria (sesion, fecha)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0002_sesiones_usuario_fecha'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoTelemetria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sesion', models.UUIDField()),
+                ('fecha', models.DateTimeField()),
+                ('tipo', models.PositiveSmallIntegerField(choices=[(1, 'Repetición'), (2, 'Fase'), (3, 'Corrección')])),
+                ('ejercicio', models.CharField(blank=True, max_length=50)),
+                ('codigo', models.CharField(blank=True, max_length=50)),
+                ('valor', models.FloatField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evento de Telemetría',
+                'verbose_name_plural': 'Eventos de Telemetría',
+                'db_table': 'eventos_telemetria',
+                'indexes': [models.Index(fields=['sesion', 'fecha'], name='eventos_tel_sesion_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
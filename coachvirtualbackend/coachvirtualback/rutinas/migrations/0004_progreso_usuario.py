@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:25
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def copiar_totales(apps, schema_editor):
+    """
+    Total y última sesión completada de cada usuario con sesiones (una vez).
+    Crea la fila de estadísticas a quien todavía no la tiene, para que los
+    hitos y la inactividad no lean 0 en usuarios con historial.
+    """
+    EstadisticasUsuario = apps.get_model('rutinas', 'EstadisticasUsuario')
+    SesionEntrenamiento = apps.get_model('rutinas', 'SesionEntrenamiento')
+    totales = list(
+        SesionEntrenamiento.objects.filter(estado=True)
+        .values('usuario_id').annotate(total=Count('id'), ultima=Max('fecha'))
+    )
+    con_fila = set(EstadisticasUsuario.objects.values_list('usuario_id', flat=True))
+    EstadisticasUsuario.objects.bulk_create(
+        [EstadisticasUsuario(usuario_id=fila['usuario_id']) for fila in totales
+         if fila['usuario_id'] not in con_fila],
+        batch_size=1000,
+    )
+    for fila in totales:
+        EstadisticasUsuario.objects.filter(usuario_id=fila['usuario_id']).update(
+            total_entrenamientos=fila['total'], ultimo_entrenamiento=fila['ultima'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0003_eventos_telemetria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estadisticasusuario',
+            name='total_entrenamientos',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='estadisticasusuario',
+            name='ultimo_entrenamiento',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(copiar_totales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def crear_default(apps, schema_editor):
+    """En PostgreSQL: partición DEFAULT para eventos de días sin partición creada."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE TABLE IF NOT EXISTS eventos_telemetria_default PARTITION OF eventos_telemetria DEFAULT'
+    )
+
+
+def borrar_default(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS eventos_telemetria_default')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0004_progreso_usuario'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_default, borrar_default),
+    ]
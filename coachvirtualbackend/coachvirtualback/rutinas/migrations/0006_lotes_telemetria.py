@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0005_particion_default_telemetria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteTelemetria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sesion', models.UUIDField()),
+                ('secuencia', models.PositiveIntegerField()),
+                ('eventos', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('usuario', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lote de Telemetría',
+                'verbose_name_plural': 'Lotes de Telemetría',
+                'db_table': 'lotes_telemetria',
+                'indexes': [models.Index(fields=['created_at'], name='lotes_tel_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'sesion', 'secuencia'), name='lotes_tel_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Max, Q
+
+
+# Alertas que NotificationEngine.notify_routine_completion (y el hito de la
+# primera rutina) dejaban al completar una rutina, antes de que existieran
+# las sesiones: era lo que leía check_inactivity
+RUTINA_COMPLETADA = (
+    Q(mensaje__contains='Completaste')
+    | Q(mensaje__startswith='🎉 ¡Rutina ', mensaje__contains="' terminada!")
+    | Q(mensaje__startswith='💪 ¡Increíble! ', mensaje__contains="' completada.")
+)
+
+
+def ultimo_desde_alertas(apps, schema_editor):
+    """
+    Último entrenamiento de quien solo tiene historial en Alertas. Crea la fila
+    de estadísticas que falte y solo adelanta `ultimo_entrenamiento` (nunca lo
+    atrasa), así la alerta de inactividad sigue funcionando para esos usuarios.
+    """
+    Alertas = apps.get_model('usuarios', 'Alertas')
+    EstadisticasUsuario = apps.get_model('rutinas', 'EstadisticasUsuario')
+    ultimas = dict(
+        Alertas.objects.filter(RUTINA_COMPLETADA)
+        .values('usuario_id').annotate(ultima=Max('created_at'))
+        .values_list('usuario_id', 'ultima')
+    )
+    if not ultimas:
+        return
+    con_fila = set(EstadisticasUsuario.objects.values_list('usuario_id', flat=True))
+    EstadisticasUsuario.objects.bulk_create(
+        [EstadisticasUsuario(usuario_id=usuario_id) for usuario_id in ultimas if usuario_id not in con_fila],
+        batch_size=1000,
+    )
+    for usuario_id, ultima in ultimas.items():
+        EstadisticasUsuario.objects.filter(usuario_id=usuario_id).filter(
+            Q(ultimo_entrenamiento__isnull=True) | Q(ultimo_entrenamiento__lt=ultima)
+        ).update(ultimo_entrenamiento=ultima)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutinas', '0006_lotes_telemetria'),
+        ('usuarios', '0005_alertas_created_at_alter_alertas_fecha'),
+    ]
+
+    operations = [
+        migrations.RunPython(ultimo_desde_alertas, migrations.RunPython.noop),
+    ]
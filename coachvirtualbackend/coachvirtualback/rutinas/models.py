@@ -0,0 +1,175 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Rutina(models.Model):
+    """Rutina de entrenamiento de un usuario (creada a mano o generada por IA)."""
+    OBJETIVOS = [
+        ('fuerza', 'Fuerza'),
+        ('hipertrofia', 'Hipertrofia'),
+        ('perdida_peso', 'Pérdida de Peso'),
+        ('resistencia', 'Resistencia'),
+        ('movilidad', 'Movilidad'),
+        ('rehabilitacion', 'Rehabilitación'),
+    ]
+    NIVELES = [
+        ('principiante', 'Principiante'),
+        ('intermedio', 'Intermedio'),
+        ('avanzado', 'Avanzado'),
+    ]
+    CATEGORIAS = [
+        ('gimnasio', 'Gimnasio'),
+        ('fisioterapia', 'Fisioterapia'),
+    ]
+
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='rutinas')
+    nombre = models.CharField(max_length=255)
+    descripcion = models.TextField(blank=True)
+    objetivo = models.CharField(max_length=50, choices=OBJETIVOS, default='fuerza')
+    nivel = models.CharField(max_length=20, choices=NIVELES, default='intermedio')
+    categoria = models.CharField(max_length=20, choices=CATEGORIAS, default='gimnasio')
+    parte_cuerpo = models.CharField(max_length=100, default='cuerpo completo')
+    dias_por_semana = models.IntegerField(default=3)
+    duracion_minutos = models.IntegerField(default=45)
+    progreso = models.IntegerField(default=0)
+    datos_rutina = models.JSONField(null=True, blank=True)
+    generada_por_ia = models.BooleanField(default=False)
+    activa = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rutinas'
+        verbose_name = 'Rutina'
+        verbose_name_plural = 'Rutinas'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.nombre} ({self.usuario.email})"
+
+
+class SesionEntrenamiento(models.Model):
+    """
+    Sesión de entrenamiento registrada. Es de solo inserción: las estadísticas
+    del usuario se actualizan al crearla y no se recalculan desde el historial.
+    """
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sesiones')
+    rutina = models.ForeignKey(Rutina, on_delete=models.CASCADE, null=True, blank=True, related_name='sesiones')
+    fecha = models.DateTimeField(default=timezone.now)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    duracion_minutos = models.IntegerField(default=0)
+    calorias_quemadas = models.IntegerField(default=0)
+    ejercicios_completados = models.IntegerField(default=0)
+    notas = models.TextField(blank=True)
+    datos_sesion = models.JSONField(null=True, blank=True)
+    estado = models.BooleanField(default=True)  # True: completada (cuenta en las estadísticas)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sesiones_entrenamiento'
+        verbose_name = 'Sesión de Entrenamiento'
+        verbose_name_plural = 'Sesiones de Entrenamiento'
+        ordering = ['-fecha']
+        indexes = [
+            # Historial del usuario, más recientes primero
+            models.Index(fields=['usuario', '-fecha'], name='sesiones_usuario_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario.email} - {self.fecha:%Y-%m-%d %H:%M}"
+
+
+class EstadisticasUsuario(models.Model):
+    """
+    Resumen precalculado del entrenamiento de un usuario (una fila por usuario).
+    Los contadores semanales corresponden a la semana de `datos_grafica_semanal`
+    (lista de 7 días desde el lunes); ver services/estadisticas.py.
+    """
+    usuario = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='estadisticas')
+    entrenamientos_semanales = models.IntegerField(default=0)
+    minutos_totales_semana = models.IntegerField(default=0)
+    calorias_quemadas_semana = models.IntegerField(default=0)
+    racha_dias = models.IntegerField(default=0)
+    ultima_actualizacion_racha = models.DateField(null=True, blank=True)
+    datos_grafica_semanal = models.JSONField(default=list)
+    total_entrenamientos = models.IntegerField(default=0)
+    ultimo_entrenamiento = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'estadisticas_usuario'
+        verbose_name = 'Estadísticas de Usuario'
+        verbose_name_plural = 'Estadísticas de Usuarios'
+
+    def __str__(self):
+        return f"Estadísticas de {self.usuario.email}"
+
+
+class EventoTelemetria(models.Model):
+    """
+    Evento del detector durante una sesión en curso (repetición, fase o
+    corrección). Tabla de solo inserción; en PostgreSQL está particionada por
+    día (UTC) sobre `fecha`, ver services/telemetria.py.
+
+    `sesion` es el UUID que genera el cliente al empezar; no hay FK a
+    SesionEntrenamiento porque esta se registra al terminar. Tampoco hay FK
+    real a usuario: insertar no paga la verificación y la retención se hace
+    eliminando particiones completas.
+    """
+    REP = 1
+    FASE = 2
+    CORRECCION = 3
+    TIPOS = [
+        (REP, 'Repetición'),
+        (FASE, 'Fase'),
+        (CORRECCION, 'Corrección'),
+    ]
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+    )
+    sesion = models.UUIDField()
+    fecha = models.DateTimeField()
+    tipo = models.PositiveSmallIntegerField(choices=TIPOS)
+    ejercicio = models.CharField(max_length=50, blank=True)
+    codigo = models.CharField(max_length=50, blank=True)  # fase o código de corrección
+    valor = models.FloatField(null=True, blank=True)  # duración de la fase (ms) o ángulo
+
+    class Meta:
+        db_table = 'eventos_telemetria'
+        verbose_name = 'Evento de Telemetría'
+        verbose_name_plural = 'Eventos de Telemetría'
+        indexes = [
+            models.Index(fields=['sesion', 'fecha'], name='eventos_tel_sesion_fecha_idx'),
+        ]
+
+
+class LoteTelemetria(models.Model):
+    """
+    Lote de telemetría recibido. Se inserta en la misma transacción que sus
+    eventos, así que un reintento del cliente se reconoce como duplicado solo
+    si el lote de verdad se guardó.
+    """
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+    )
+    sesion = models.UUIDField()
+    secuencia = models.PositiveIntegerField()
+    eventos = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'lotes_telemetria'
+        verbose_name = 'Lote de Telemetría'
+        verbose_name_plural = 'Lotes de Telemetría'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'sesion', 'secuencia'], name='lotes_tel_unico'),
+        ]
+        indexes = [
+            # Retención (podar_particiones)
+            models.Index(fields=['created_at'], name='lotes_tel_created_idx'),
+        ]
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Rutina, SesionEntrenamiento
+
+
+# Tolerancia para relojes de cliente adelantados
+MARGEN_FUTURO = timedelta(minutes=5)
+# Un lote de telemetría es de una sesión en curso: `inicio` no puede ser más antiguo
+MAX_ATRASO_INICIO = timedelta(hours=6)
+
+
+class RutinaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Rutina
+        fields = [
+            "id",
+            "nombre",
+            "descripcion",
+            "objetivo",
+            "nivel",
+            "categoria",
+            "parte_cuerpo",
+            "dias_por_semana",
+            "duracion_minutos",
+            "progreso",
+            "datos_rutina",
+            "generada_por_ia",
+            "activa",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["created_at", "updated_at"]
+        extra_kwargs = {
+            "dias_por_semana": {"min_value": 1, "max_value": 7},
+            "duracion_minutos": {"min_value": 1},
+            "progreso": {"min_value": 0, "max_value": 100},
+        }
+
+
+class SesionEntrenamientoSerializer(serializers.ModelSerializer):
+    """La rutina, si se envía, debe ser del usuario del request (context['request'])."""
+
+    class Meta:
+        model = SesionEntrenamiento
+        fields = [
+            "id",
+            "rutina",
+            "fecha",
+            "fecha_fin",
+            "duracion_minutos",
+            "calorias_quemadas",
+            "ejercicios_completados",
+            "notas",
+            "datos_sesion",
+            "estado",
+            "created_at",
+        ]
+        read_only_fields = ["created_at"]
+        extra_kwargs = {
+            "duracion_minutos": {"min_value": 0},
+            "calorias_quemadas": {"min_value": 0},
+            "ejercicios_completados": {"min_value": 0},
+        }
+
+    def validate_rutina(self, rutina):
+        if rutina is not None and rutina.usuario_id != self.context["request"].user.id:
+            raise serializers.ValidationError("Rutina no encontrada")
+        return rutina
+
+    def validate_fecha(self, fecha):
+        if fecha > timezone.now() + MARGEN_FUTURO:
+            raise serializers.ValidationError("La fecha no puede estar en el futuro")
+        return fecha
+
+    def validate(self, attrs):
+        fecha = attrs.get("fecha") or timezone.now()
+        if attrs.get("fecha_fin") and attrs["fecha_fin"] < fecha:
+            raise serializers.ValidationError({"fecha_fin": "Debe ser posterior a fecha"})
+        return attrs
+
+
+class LoteTelemetriaSerializer(serializers.Serializer):
+    """
+    Lote de telemetría de una sesión en curso. Los eventos son listas
+    [t_ms, tipo, codigo, valor] con t_ms relativo a `inicio`; se validan en
+    services/telemetria.py sin un serializer por evento.
+    """
+    MAX_EVENTOS = 5000
+
+    sesion = serializers.UUIDField()
+    secuencia = serializers.IntegerField(min_value=0, max_value=2**31 - 1)
+    ejercicio = serializers.CharField(max_length=50, allow_blank=True, default="")
+    inicio = serializers.DateTimeField()
+    eventos = serializers.ListField(max_length=MAX_EVENTOS)
+
+    def validate_inicio(self, inicio):
+        ahora = timezone.now()
+        if not ahora - MAX_ATRASO_INICIO <= inicio <= ahora + MARGEN_FUTURO:
+            raise serializers.ValidationError("Debe estar dentro de las últimas 6 horas")
+        return inicio
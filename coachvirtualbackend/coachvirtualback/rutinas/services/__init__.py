@@ -0,0 +1,3 @@
+# rutinas/services/__init__.py
+from .estadisticas import registrar_sesion, leer_estadisticas, progreso_de_usuario
+from .telemetria import registrar_lote, resumen_sesion, asegurar_particiones, podar_particiones
@@ -0,0 +1,139 @@
+"""
+Estadísticas de entrenamiento mantenidas en forma incremental.
+
+Cada `SesionEntrenamiento` completada suma sus minutos y calorías a la fila
+`EstadisticasUsuario` del usuario en la misma transacción en que se inserta,
+así que el dashboard lee una sola fila en vez de agregar el historial.
+
+- La semana vigente es la de `datos_grafica_semanal` (7 días desde el lunes).
+  Al registrar o leer en una semana posterior, los contadores se reinician.
+- La racha cuenta días consecutivos con al menos una sesión hasta
+  `ultima_actualizacion_racha`; si pasa más de un día sin entrenar, se lee 0.
+- `total_entrenamientos` y `ultimo_entrenamiento` alimentan los hitos y la
+  inactividad del motor de notificaciones (`progreso_de_usuario`).
+
+Las sesiones con fecha anterior a la semana vigente (o a la racha) se guardan
+pero no cambian los contadores: las estadísticas no se recalculan hacia atrás.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import EstadisticasUsuario, SesionEntrenamiento
+
+
+DIAS_SEMANA = ('Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom')
+
+
+def _lunes(dia):
+    return dia - timedelta(days=dia.weekday())
+
+
+def _grafica_vacia(lunes):
+    return [
+        {'dia': nombre, 'fecha': (lunes + timedelta(days=i)).isoformat(), 'sesiones': 0, 'minutos': 0, 'calorias': 0}
+        for i, nombre in enumerate(DIAS_SEMANA)
+    ]
+
+
+def _semana_al_dia(estadisticas, hoy):
+    """Reinicia en memoria los contadores semanales si la semana guardada es anterior a la de `hoy`."""
+    lunes = _lunes(hoy)
+    grafica = estadisticas.datos_grafica_semanal
+    if not grafica or grafica[0]['fecha'] < lunes.isoformat():
+        estadisticas.entrenamientos_semanales = 0
+        estadisticas.minutos_totales_semana = 0
+        estadisticas.calorias_quemadas_semana = 0
+        estadisticas.datos_grafica_semanal = _grafica_vacia(lunes)
+
+
+def _racha_vigente(estadisticas, hoy):
+    """La racha guardada, o 0 si pasó más de un día desde la última sesión."""
+    ultima = estadisticas.ultima_actualizacion_racha
+    if ultima is not None and (hoy - ultima).days > 1:
+        return 0
+    return estadisticas.racha_dias
+
+
+def _sumar_sesion(estadisticas, sesion, hoy):
+    estadisticas.total_entrenamientos += 1
+    if estadisticas.ultimo_entrenamiento is None or sesion.fecha > estadisticas.ultimo_entrenamiento:
+        estadisticas.ultimo_entrenamiento = sesion.fecha
+
+    dia = timezone.localtime(sesion.fecha).date()
+
+    if _lunes(dia) == _lunes(hoy):
+        estadisticas.entrenamientos_semanales += 1
+        estadisticas.minutos_totales_semana += sesion.duracion_minutos
+        estadisticas.calorias_quemadas_semana += sesion.calorias_quemadas
+        punto = estadisticas.datos_grafica_semanal[dia.weekday()]
+        punto['sesiones'] += 1
+        punto['minutos'] += sesion.duracion_minutos
+        punto['calorias'] += sesion.calorias_quemadas
+
+    ultima = estadisticas.ultima_actualizacion_racha
+    if ultima is None or (dia - ultima).days > 1:
+        estadisticas.racha_dias = 1
+        estadisticas.ultima_actualizacion_racha = dia
+    elif (dia - ultima).days == 1:
+        estadisticas.racha_dias += 1
+        estadisticas.ultima_actualizacion_racha = dia
+
+
+def registrar_sesion(usuario_id, **datos) -> SesionEntrenamiento:
+    """
+    Inserta una sesión y, si está completada, la suma a las estadísticas del
+    usuario. La fila de estadísticas se bloquea mientras tanto, así que dos
+    sesiones simultáneas del mismo usuario se suman en serie.
+    """
+    with transaction.atomic():
+        sesion = SesionEntrenamiento.objects.create(usuario_id=usuario_id, **datos)
+        if sesion.estado:
+            EstadisticasUsuario.objects.bulk_create(
+                [EstadisticasUsuario(usuario_id=usuario_id)], ignore_conflicts=True
+            )
+            estadisticas = EstadisticasUsuario.objects.select_for_update().get(usuario_id=usuario_id)
+            hoy = timezone.localdate()
+            _semana_al_dia(estadisticas, hoy)
+            _sumar_sesion(estadisticas, sesion, hoy)
+            estadisticas.save()
+    return sesion
+
+
+def _vigentes(estadisticas) -> dict:
+    hoy = timezone.localdate()
+    _semana_al_dia(estadisticas, hoy)
+    return {
+        'entrenamientos_semanales': estadisticas.entrenamientos_semanales,
+        'minutos_totales_semana': estadisticas.minutos_totales_semana,
+        'calorias_quemadas_semana': estadisticas.calorias_quemadas_semana,
+        'racha_dias': _racha_vigente(estadisticas, hoy),
+        'ultima_actualizacion_racha': estadisticas.ultima_actualizacion_racha,
+        'total_entrenamientos': estadisticas.total_entrenamientos,
+        'ultimo_entrenamiento': estadisticas.ultimo_entrenamiento,
+        'datos_grafica_semanal': estadisticas.datos_grafica_semanal,
+        'updated_at': estadisticas.updated_at,
+    }
+
+
+def leer_estadisticas(usuario_id) -> dict:
+    """Estadísticas vigentes del usuario (una consulta; no escribe en la BD)."""
+    estadisticas = (
+        EstadisticasUsuario.objects.filter(usuario_id=usuario_id).first()
+        or EstadisticasUsuario(usuario_id=usuario_id)
+    )
+    return _vigentes(estadisticas)
+
+
+def progreso_de_usuario(usuario) -> dict:
+    """
+    Igual que leer_estadisticas a partir de `usuario.estadisticas`: sin consulta
+    si el usuario se cargó con select_related('estadisticas').
+    """
+    try:
+        estadisticas = usuario.estadisticas
+    except EstadisticasUsuario.DoesNotExist:
+        estadisticas = EstadisticasUsuario(usuario_id=usuario.pk)
+    return _vigentes(estadisticas)
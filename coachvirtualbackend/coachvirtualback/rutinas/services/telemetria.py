@@ -0,0 +1,189 @@
+"""
+Ingesta de telemetría de sesiones en curso.
+
+El cliente envía cada pocos segundos un lote con los eventos del detector
+desde el lote anterior. Cada lote se guarda con una sola sentencia: COPY en
+PostgreSQL (tabla particionada por día UTC) y bulk_create en los demás
+motores. La tabla es de solo inserción; la retención elimina particiones
+completas en vez de borrar filas (`podar_particiones`).
+
+Las particiones diarias las crea por adelantado `particiones_telemetria`,
+nunca una petición: `inicio` (serializer) y `t_ms` (MAX_T_MS) están acotados
+a unas horas alrededor de ahora, y un evento de un día sin partición cae en
+la partición DEFAULT.
+
+Los reintentos del cliente no duplican eventos: (usuario, sesión, secuencia)
+se guarda en `LoteTelemetria` (restricción única) en la misma transacción que
+los eventos y un lote repetido se ignora. Si la inserción falla, no queda
+registro y el reintento se guarda.
+"""
+
+import logging
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Avg, Count, Max, Min
+
+from ..models import EventoTelemetria, LoteTelemetria
+
+logger = logging.getLogger(__name__)
+
+
+TIPOS = {
+    'rep': EventoTelemetria.REP,
+    'fase': EventoTelemetria.FASE,
+    'correccion': EventoTelemetria.CORRECCION,
+}
+
+LOTE_BD = 2000
+
+# Tiempo máximo de un evento desde el `inicio` del lote
+MAX_T_MS = 6 * 3600 * 1000
+
+TABLA = EventoTelemetria._meta.db_table
+PARTICION_DEFAULT = f'{TABLA}_default'
+COLUMNAS = ('usuario_id', 'sesion', 'fecha', 'tipo', 'ejercicio', 'codigo', 'valor')
+
+
+class LoteInvalido(ValueError):
+    pass
+
+
+def _nombre_particion(dia):
+    return f'{TABLA}_p{dia:%Y%m%d}'
+
+
+def asegurar_particiones(dias) -> int:
+    """
+    Crea (si faltan) las particiones de las fechas `dias` (UTC). Solo PostgreSQL;
+    lo llama el comando particiones_telemetria, no la ingesta.
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+    creadas = 0
+    for dia in sorted(set(dias)):
+        desde = datetime.combine(dia, dt_time(), dt_timezone.utc)
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # DDL sin parámetros: los límites son fechas generadas aquí
+                cursor.execute(
+                    f'CREATE TABLE IF NOT EXISTS {_nombre_particion(dia)} PARTITION OF {TABLA} '
+                    f"FOR VALUES FROM ('{desde.isoformat()}') TO ('{(desde + timedelta(days=1)).isoformat()}')"
+                )
+        except DatabaseError as e:
+            # Ej: la partición DEFAULT ya tiene filas de ese día; siguen ahí hasta la poda
+            logger.warning("No se pudo crear la partición de %s: %s", dia, e)
+            continue
+        creadas += 1
+    return creadas
+
+
+def podar_particiones(retener_dias: int) -> int:
+    """Elimina la telemetría anterior a `retener_dias` días. Retorna particiones (o filas) eliminadas."""
+    limite = datetime.now(dt_timezone.utc).date() - timedelta(days=retener_dias)
+    LoteTelemetria.objects.filter(created_at__lt=datetime.combine(limite, dt_time(), dt_timezone.utc)).delete()
+    if connection.vendor != 'postgresql':
+        inicio = datetime.combine(limite, dt_time(), dt_timezone.utc)
+        eliminadas, _ = EventoTelemetria.objects.filter(fecha__lt=inicio).delete()
+        return eliminadas
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s',
+            [TABLA],
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+        prefijo = f'{TABLA}_p'
+        viejas = [
+            nombre for nombre in nombres
+            if nombre.startswith(prefijo) and datetime.strptime(nombre[len(prefijo):], '%Y%m%d').date() < limite
+        ]
+        for nombre in viejas:
+            cursor.execute(f'DROP TABLE {nombre}')
+        cursor.execute(
+            f'DELETE FROM {PARTICION_DEFAULT} WHERE fecha < %s',
+            [datetime.combine(limite, dt_time(), dt_timezone.utc)],
+        )
+    return len(viejas)
+
+
+def _filas(usuario_id, sesion, ejercicio, inicio, eventos):
+    """Valida los eventos [t_ms, tipo, codigo, valor] y los convierte en filas (tupla por COLUMNAS)."""
+    filas = []
+    for n, evento in enumerate(eventos):
+        try:
+            t, tipo, codigo, valor = evento
+            if not 0 <= int(t) <= MAX_T_MS:
+                raise ValueError(t)
+            fila = (
+                usuario_id, sesion, inicio + timedelta(milliseconds=int(t)), TIPOS[tipo],
+                ejercicio, str(codigo or '')[:50], None if valor is None else float(valor),
+            )
+        except (TypeError, ValueError, KeyError, OverflowError):
+            raise LoteInvalido(
+                f'Evento {n} inválido: se espera [t_ms, tipo, codigo, valor] con 0 <= t_ms <= {MAX_T_MS} '
+                f'y tipo en {list(TIPOS)}'
+            )
+        filas.append(fila)
+    return filas
+
+
+def _insertar(filas):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            with cursor.copy(f'COPY {TABLA} ({", ".join(COLUMNAS)}) FROM STDIN') as copia:
+                for fila in filas:
+                    copia.write_row(fila)
+    else:
+        EventoTelemetria.objects.bulk_create(
+            [EventoTelemetria(**dict(zip(COLUMNAS, fila))) for fila in filas], batch_size=LOTE_BD,
+        )
+
+
+def registrar_lote(usuario_id, sesion, secuencia, ejercicio, inicio, eventos) -> int | None:
+    """
+    Guarda un lote de eventos con tiempos relativos a `inicio` (datetime aware).
+    Retorna los eventos insertados, o None si el lote ya se había recibido.
+    Lanza LoteInvalido si algún evento no tiene el formato esperado.
+    """
+    filas = _filas(usuario_id, sesion, ejercicio, inicio, eventos)
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                LoteTelemetria.objects.create(
+                    usuario_id=usuario_id, sesion=sesion, secuencia=secuencia, eventos=len(filas),
+                )
+        except IntegrityError:
+            return None
+        if filas:
+            _insertar(filas)
+    return len(filas)
+
+
+def resumen_sesion(usuario_id, sesion) -> dict:
+    """Repeticiones, fases y correcciones de una sesión agregadas por ejercicio (una consulta)."""
+    grupos = (
+        EventoTelemetria.objects.filter(usuario_id=usuario_id, sesion=sesion)
+        .values('tipo', 'ejercicio', 'codigo')
+        .annotate(eventos=Count('id'), promedio=Avg('valor'), inicio=Min('fecha'), fin=Max('fecha'))
+        .order_by('ejercicio', 'tipo', 'codigo')
+    )
+    ejercicios = {}
+    inicio = fin = None
+    for grupo in grupos:
+        datos = ejercicios.setdefault(grupo['ejercicio'], {'repeticiones': 0, 'fases': {}, 'correcciones': {}})
+        tipo = grupo['tipo']
+        if tipo == EventoTelemetria.REP:
+            datos['repeticiones'] += grupo['eventos']
+        elif tipo == EventoTelemetria.FASE:
+            datos['fases'][grupo['codigo']] = {
+                'veces': grupo['eventos'],
+                'duracion_promedio_ms': round(grupo['promedio']) if grupo['promedio'] is not None else None,
+            }
+        else:
+            datos['correcciones'][grupo['codigo']] = grupo['eventos']
+        inicio = grupo['inicio'] if inicio is None else min(inicio, grupo['inicio'])
+        fin = grupo['fin'] if fin is None else max(fin, grupo['fin'])
+    return {'sesion': str(sesion), 'inicio': inicio, 'fin': fin, 'ejercicios': ejercicios}
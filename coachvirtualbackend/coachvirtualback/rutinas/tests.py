@@ -0,0 +1,296 @@
+"""
+Tests unitarios para el módulo rutinas - CoachVirtual
+Cubre el CRUD de rutinas propias, el registro de sesiones (solo inserción),
+las estadísticas incrementales (semana vigente y racha) y la ingesta de
+telemetría en lotes comprimidos.
+"""
+import gzip
+import uuid
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+import msgpack
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import EstadisticasUsuario, EventoTelemetria, LoteTelemetria, Rutina, SesionEntrenamiento
+from .services.estadisticas import leer_estadisticas, registrar_sesion
+from .services.telemetria import MAX_T_MS, podar_particiones
+
+User = get_user_model()
+
+
+def _a_las(dia, hora=18):
+    return timezone.make_aware(datetime.combine(dia, time(hora)))
+
+
+class RutinasApiTest(APITestCase):
+    """Tests del API de rutinas y sesiones"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(email='atleta@test.com', username='atleta', password='x')
+        self.otro = User.objects.create_user(email='otro@test.com', username='otro', password='x')
+        self.client.force_authenticate(self.usuario)
+
+    def test_crear_y_listar_rutinas_propias(self):
+        """Test: POST crea la rutina del usuario y GET solo lista las propias activas"""
+        response = self.client.post('/api/rutinas/', {
+            'nombre': 'Pierna', 'duracion_minutos': 40, 'categoria': 'gimnasio',
+            'datos_rutina': [{'id': 1, 'nombre': 'Sentadilla', 'series': 4}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        Rutina.objects.create(usuario=self.otro, nombre='Ajena')
+        Rutina.objects.create(usuario=self.usuario, nombre='Vieja', activa=False)
+
+        nombres = [r['nombre'] for r in self.client.get('/api/rutinas/').data]
+        self.assertEqual(nombres, ['Pierna'])
+        self.assertEqual(len(self.client.get('/api/rutinas/?todas=1').data), 2)
+
+    def test_rutina_ajena_no_encontrada(self):
+        """Test: no se puede ver ni editar la rutina de otro usuario"""
+        ajena = Rutina.objects.create(usuario=self.otro, nombre='Ajena')
+        self.assertEqual(self.client.get(f'/api/rutinas/{ajena.id}/').status_code, 404)
+        self.assertEqual(self.client.patch(f'/api/rutinas/{ajena.id}/', {'nombre': 'X'}).status_code, 404)
+
+    def test_borrar_rutina_conserva_sesiones(self):
+        """Test: DELETE desactiva la rutina sin borrar su historial"""
+        rutina = Rutina.objects.create(usuario=self.usuario, nombre='Brazos')
+        registrar_sesion(self.usuario.id, rutina=rutina, duracion_minutos=30)
+
+        response = self.client.delete(f'/api/rutinas/{rutina.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        rutina.refresh_from_db()
+        self.assertFalse(rutina.activa)
+        self.assertEqual(SesionEntrenamiento.objects.filter(rutina=rutina).count(), 1)
+
+    def test_registrar_sesion_actualiza_estadisticas(self):
+        """Test: POST de una sesión suma a la fila de estadísticas"""
+        rutina = Rutina.objects.create(usuario=self.usuario, nombre='Full body')
+        response = self.client.post('/api/rutinas/sesiones/', {
+            'rutina': rutina.id, 'duracion_minutos': 35, 'calorias_quemadas': 280,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        stats = self.client.get('/api/rutinas/estadisticas/').data
+        self.assertEqual(stats['entrenamientos_semanales'], 1)
+        self.assertEqual(stats['minutos_totales_semana'], 35)
+        self.assertEqual(stats['calorias_quemadas_semana'], 280)
+        self.assertEqual(stats['racha_dias'], 1)
+        hoy = timezone.localdate()
+        self.assertEqual(stats['datos_grafica_semanal'][hoy.weekday()]['minutos'], 35)
+
+    def test_sesion_con_rutina_ajena_rechazada(self):
+        """Test: no se puede registrar una sesión sobre la rutina de otro usuario"""
+        ajena = Rutina.objects.create(usuario=self.otro, nombre='Ajena')
+        response = self.client.post('/api/rutinas/sesiones/', {'rutina': ajena.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SesionEntrenamiento.objects.exists())
+
+    def test_sesiones_solo_insercion(self):
+        """Test: el endpoint de sesiones no permite editar ni borrar"""
+        self.assertEqual(self.client.put('/api/rutinas/sesiones/', {}).status_code, 405)
+        self.assertEqual(self.client.delete('/api/rutinas/sesiones/').status_code, 405)
+
+    def test_listado_sesiones_paginado(self):
+        """Test: el historial se pagina por cursor sin repetir ni saltar sesiones"""
+        ahora = timezone.now()
+        for i in range(5):
+            registrar_sesion(self.usuario.id, fecha=ahora - timedelta(hours=i), duracion_minutos=i)
+        registrar_sesion(self.otro.id, duracion_minutos=99)
+
+        primera = self.client.get('/api/rutinas/sesiones/?limit=3').data
+        self.assertEqual([s['duracion_minutos'] for s in primera['resultados']], [0, 1, 2])
+        segunda = self.client.get(f"/api/rutinas/sesiones/?limit=3&antes_de={primera['siguiente']}").data
+        self.assertEqual([s['duracion_minutos'] for s in segunda['resultados']], [3, 4])
+        self.assertIsNone(segunda['siguiente'])
+
+    def test_listado_sesiones_parametros_invalidos(self):
+        """Test: parámetros no numéricos en el listado dan 400, no 500"""
+        for query in ('rutina=abc', 'limit=x', 'antes_de=1.5'):
+            response = self.client.get(f'/api/rutinas/sesiones/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_estadisticas_una_consulta(self):
+        """Test: el dashboard lee una sola fila sin importar el historial"""
+        for _ in range(10):
+            registrar_sesion(self.usuario.id, duracion_minutos=10)
+        with self.assertNumQueries(1):
+            leer_estadisticas(self.usuario.id)
+
+
+class EstadisticasIncrementalesTest(APITestCase):
+    """Tests de semana vigente y racha"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(email='racha@test.com', username='racha', password='x')
+        # Un miércoles, para tener días de la misma semana antes y después
+        self.hoy = timezone.localdate() - timedelta(days=(timezone.localdate().weekday() - 2) % 7)
+
+    def _en(self, dia, **datos):
+        with mock.patch('rutinas.services.estadisticas.timezone.localdate', return_value=dia):
+            return registrar_sesion(self.usuario.id, fecha=_a_las(dia), **datos)
+
+    def _leer(self, dia):
+        with mock.patch('rutinas.services.estadisticas.timezone.localdate', return_value=dia):
+            return leer_estadisticas(self.usuario.id)
+
+    def test_racha_dias_consecutivos(self):
+        """Test: la racha suma días consecutivos y no cuenta dos veces el mismo día"""
+        self._en(self.hoy - timedelta(days=2))
+        self._en(self.hoy - timedelta(days=1))
+        self._en(self.hoy - timedelta(days=1))
+        self._en(self.hoy)
+        self.assertEqual(self._leer(self.hoy)['racha_dias'], 3)
+        self.assertEqual(self._leer(self.hoy)['entrenamientos_semanales'], 4)
+
+    def test_racha_se_corta(self):
+        """Test: un día sin entrenar corta la racha al leer y al registrar"""
+        self._en(self.hoy - timedelta(days=3))
+        self._en(self.hoy - timedelta(days=2))
+        self.assertEqual(self._leer(self.hoy - timedelta(days=1))['racha_dias'], 2)
+        self.assertEqual(self._leer(self.hoy)['racha_dias'], 0)
+        self._en(self.hoy)
+        self.assertEqual(self._leer(self.hoy)['racha_dias'], 1)
+
+    def test_nueva_semana_reinicia_contadores(self):
+        """Test: los contadores semanales se reinician el lunes siguiente"""
+        self._en(self.hoy, duracion_minutos=30, calorias_quemadas=200)
+        lunes = self.hoy + timedelta(days=5)
+        stats = self._leer(lunes)
+        self.assertEqual(stats['entrenamientos_semanales'], 0)
+        self.assertEqual(stats['datos_grafica_semanal'][0]['fecha'], lunes.isoformat())
+
+        self._en(lunes, duracion_minutos=20)
+        fila = EstadisticasUsuario.objects.get(usuario=self.usuario)
+        self.assertEqual((fila.entrenamientos_semanales, fila.minutos_totales_semana), (1, 20))
+        self.assertEqual(fila.calorias_quemadas_semana, 0)
+
+    def test_sesion_antigua_no_cambia_semana(self):
+        """Test: una sesión de una semana anterior se guarda pero no suma a la semana vigente"""
+        self._en(self.hoy, duracion_minutos=30)
+        with mock.patch('rutinas.services.estadisticas.timezone.localdate', return_value=self.hoy):
+            registrar_sesion(self.usuario.id, fecha=_a_las(self.hoy - timedelta(days=10)), duracion_minutos=50)
+        stats = self._leer(self.hoy)
+        self.assertEqual(stats['minutos_totales_semana'], 30)
+        self.assertEqual(SesionEntrenamiento.objects.filter(usuario=self.usuario).count(), 2)
+
+    def test_sesion_incompleta_no_cuenta(self):
+        """Test: una sesión con estado=False no suma a las estadísticas"""
+        self._en(self.hoy, duracion_minutos=30, estado=False)
+        self.assertFalse(EstadisticasUsuario.objects.filter(usuario=self.usuario).exists())
+
+
+class TelemetriaTest(APITestCase):
+    """Tests de la ingesta de telemetría"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(email='tele@test.com', username='tele', password='x')
+        self.client.force_authenticate(self.usuario)
+        self.sesion = uuid.uuid4()
+        self.inicio = timezone.now().replace(microsecond=0) - timedelta(minutes=10)
+
+    def _lote(self, secuencia=0, eventos=None):
+        return {
+            'sesion': str(self.sesion), 'secuencia': secuencia, 'ejercicio': 'sentadilla',
+            'inicio': self.inicio.isoformat(),
+            'eventos': eventos if eventos is not None else [
+                [1200, 'rep', '', None],
+                [1900, 'fase', 'bajada', 700],
+                [2600, 'fase', 'bajada', 900],
+                [2700, 'rep', '', None],
+                [2800, 'correccion', 'rodillas_adentro', 12.5],
+            ],
+        }
+
+    def _post_gzip(self, lote):
+        return self.client.generic(
+            'POST', '/api/rutinas/telemetria/', gzip.compress(orjson.dumps(lote)),
+            content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+        )
+
+    def test_lote_gzip_y_resumen(self):
+        """Test: un lote JSON con gzip se guarda y el resumen agrega por ejercicio"""
+        response = self._post_gzip(self._lote())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['eventos'], 5)
+
+        primero = EventoTelemetria.objects.order_by('fecha').first()
+        self.assertEqual(primero.fecha, self.inicio + timedelta(milliseconds=1200))
+
+        resumen = self.client.get(f'/api/rutinas/telemetria/{self.sesion}/').data
+        sentadilla = resumen['ejercicios']['sentadilla']
+        self.assertEqual(sentadilla['repeticiones'], 2)
+        self.assertEqual(sentadilla['fases']['bajada'], {'veces': 2, 'duracion_promedio_ms': 800})
+        self.assertEqual(sentadilla['correcciones'], {'rodillas_adentro': 1})
+
+    def test_lote_msgpack(self):
+        """Test: el endpoint acepta lotes MessagePack"""
+        response = self.client.generic(
+            'POST', '/api/rutinas/telemetria/', msgpack.packb(self._lote()), content_type='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(EventoTelemetria.objects.count(), 5)
+
+    def test_lote_repetido_no_duplica(self):
+        """Test: reenviar la misma secuencia no vuelve a insertar eventos"""
+        self._post_gzip(self._lote())
+        response = self._post_gzip(self._lote())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['duplicado'])
+        self._post_gzip(self._lote(secuencia=1))
+        self.assertEqual(EventoTelemetria.objects.count(), 10)
+
+    def test_fallo_al_insertar_permite_reintento(self):
+        """Test: si la inserción falla, el lote no queda registrado y el reintento se guarda"""
+        with mock.patch('rutinas.services.telemetria._insertar', side_effect=DatabaseError('caída')):
+            with self.assertRaises(DatabaseError):
+                self._post_gzip(self._lote())
+        self.assertFalse(LoteTelemetria.objects.exists())
+        response = self._post_gzip(self._lote())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(EventoTelemetria.objects.count(), 5)
+
+    def test_evento_invalido_permite_reintento(self):
+        """Test: un lote con un evento inválido se rechaza completo y puede reenviarse corregido"""
+        response = self._post_gzip(self._lote(eventos=[[100, 'rep', '', None], [200, 'salto', '', None]]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(EventoTelemetria.objects.exists())
+        self.assertEqual(self._post_gzip(self._lote()).status_code, status.HTTP_201_CREATED)
+
+    def test_tiempos_acotados(self):
+        """Test: `inicio` fuera de la ventana o t_ms demasiado grande se rechazan con 400"""
+        viejo = self._lote()
+        viejo['inicio'] = (timezone.now() - timedelta(days=2)).isoformat()
+        self.assertEqual(self._post_gzip(viejo).status_code, status.HTTP_400_BAD_REQUEST)
+        lejano = self._lote(eventos=[[MAX_T_MS + 1, 'rep', '', None]])
+        self.assertEqual(self._post_gzip(lejano).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(EventoTelemetria.objects.exists())
+
+    def test_gzip_invalido(self):
+        """Test: un cuerpo con Content-Encoding gzip corrupto responde 400"""
+        response = self.client.generic(
+            'POST', '/api/rutinas/telemetria/', b'no es gzip',
+            content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_resumen_de_otro_usuario(self):
+        """Test: la telemetría de otro usuario no es visible"""
+        self._post_gzip(self._lote())
+        otro = User.objects.create_user(email='otro2@test.com', username='otro2', password='x')
+        self.client.force_authenticate(otro)
+        self.assertEqual(self.client.get(f'/api/rutinas/telemetria/{self.sesion}/').status_code, 404)
+
+    def test_poda_de_telemetria_antigua(self):
+        """Test: la retención elimina solo los eventos anteriores al límite"""
+        self._post_gzip(self._lote())
+        EventoTelemetria.objects.update(fecha=timezone.now() - timedelta(days=60))
+        self._post_gzip(self._lote(secuencia=1))
+        self.assertEqual(podar_particiones(30), 5)
+        self.assertEqual(EventoTelemetria.objects.count(), 5)
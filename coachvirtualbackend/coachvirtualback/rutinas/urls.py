@@ -0,0 +1,13 @@
+from django.urls import path
+from .controllers.rutina_controller import RutinaListaCrearVista, RutinaDetalleVista
+from .controllers.sesion_controller import SesionListaCrearVista, EstadisticasVista
+from .controllers.telemetria_controller import TelemetriaVista, TelemetriaSesionVista
+
+urlpatterns = [
+    path("rutinas/", RutinaListaCrearVista.as_view(), name="rutina-lista-crear"),
+    path("rutinas/<int:pk>/", RutinaDetalleVista.as_view(), name="rutina-detalle"),
+    path("rutinas/sesiones/", SesionListaCrearVista.as_view(), name="sesion-lista-crear"),
+    path("rutinas/estadisticas/", EstadisticasVista.as_view(), name="rutina-estadisticas"),
+    path("rutinas/telemetria/", TelemetriaVista.as_view(), name="telemetria-lote"),
+    path("rutinas/telemetria/<uuid:sesion>/", TelemetriaSesionVista.as_view(), name="telemetria-sesion"),
+]
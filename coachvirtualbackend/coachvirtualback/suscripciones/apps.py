@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class SuscripcionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'suscripciones'
+
+    def ready(self):
+        # Invalida el catálogo de planes en memoria ante cambios del admin
+        from . import signals  # noqa: F401
+
+        # Tamaño de la cola del webhook de Stripe en /metrics
+        from core import metricas
+        from .services.stripe_eventos import recolectar_metricas
+        metricas.registrar_recolector(recolectar_metricas, en_scrape=True)
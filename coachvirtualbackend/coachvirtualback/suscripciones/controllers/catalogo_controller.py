@@ -5,7 +5,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from core.condicional import respuesta_condicional
 from ..models import TipoPlan, MetodoPago
+from ..services.catalogo import obtener_catalogo
+
+
+def _etag_catalogo(request):
+    return obtener_catalogo().etag
+
+
+def _ultima_modificacion_catalogo(request):
+    return obtener_catalogo().ultima_modificacion
 
 
 # ==================== TIPO PLAN CRUD ====================
@@ -17,18 +27,15 @@ class ListarTiposPlanVista(APIView):
     """
     permission_classes = []  # Público
     
+    @respuesta_condicional(_etag_catalogo, _ultima_modificacion_catalogo)
     def get(self, request):
-        # Mostrar solo activos para usuarios normales
+        # Mostrar solo activos para usuarios normales (servido desde el catálogo en memoria)
         solo_activos = request.query_params.get('activos', 'true').lower() == 'true'
-        
-        if solo_activos:
-            planes = TipoPlan.objects.filter(activo=True)
-        else:
-            planes = TipoPlan.objects.all()
+        planes = obtener_catalogo().listar_planes(solo_activos)
         
         return Response({
-            'planes': [p.to_dict() for p in planes],
-            'total': planes.count()
+            'planes': planes,
+            'total': len(planes)
         })
 
 
@@ -162,17 +169,14 @@ class ListarMetodosPagoVista(APIView):
     """
     permission_classes = []
     
+    @respuesta_condicional(_etag_catalogo, _ultima_modificacion_catalogo)
     def get(self, request):
         solo_activos = request.query_params.get('activos', 'true').lower() == 'true'
-        
-        if solo_activos:
-            metodos = MetodoPago.objects.filter(activo=True)
-        else:
-            metodos = MetodoPago.objects.all()
+        metodos = obtener_catalogo().listar_metodos(solo_activos)
         
         return Response({
-            'metodos': [m.to_dict() for m in metodos],
-            'total': metodos.count()
+            'metodos': metodos,
+            'total': len(metodos)
         })
 
 
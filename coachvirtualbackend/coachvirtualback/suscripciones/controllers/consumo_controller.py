@@ -0,0 +1,35 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..services.consumo import estado_consumo, registrar_latido
+
+
+class ConsumoVista(APIView):
+    """
+    GET /api/suscripciones/consumo/
+    Minutos usados hoy, límite del plan y si el usuario puede seguir entrenando.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(estado_consumo(request.user))
+
+
+class LatidoConsumoVista(APIView):
+    """
+    POST /api/suscripciones/consumo/latido/
+    El cliente lo envía una vez por minuto mientras entrena; cuenta como mucho
+    un minuto por minuto de reloj. 403 si ya alcanzó el límite diario del plan.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        estado = registrar_latido(request.user)
+        if not estado['puede_entrenar']:
+            return Response(
+                {'error': 'Alcanzaste el límite diario de minutos de tu plan', **estado},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(estado)
@@ -5,7 +5,10 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import timedelta
 from ..models import HistorialSuscripcion
+from core.condicional import respuesta_condicional
 from ..config import PLANES, get_plan_config
+from ..services.catalogo import ETAG_PLANES_CONFIG
+from ..services.tokens import emitir_tokens
 
 
 class ListarPlanesVista(APIView):
@@ -15,6 +18,7 @@ class ListarPlanesVista(APIView):
     """
     permission_classes = [IsAuthenticated]
     
+    @respuesta_condicional(lambda request: ETAG_PLANES_CONFIG)
     def get(self, request):
         """Obtiene todos los planes disponibles"""
         return Response({
@@ -149,7 +153,9 @@ class ConfirmarPagoVista(APIView):
             'mensaje': f'Pago confirmado. Plan {historial.plan} activado exitosamente.',
             'plan': historial.plan,
             'fecha_expiracion': historial.fecha_expiracion.isoformat(),
-            'estado_pago': 'confirmado'
+            'estado_pago': 'confirmado',
+            # Tokens con los claims del nuevo plan
+            'tokens': emitir_tokens(usuario)
         })
 
 
@@ -238,5 +244,6 @@ class CancelarPlanVista(APIView):
         return Response({
             'mensaje': mensaje,
             'plan_actual': usuario.plan_actual,
-            'fecha_expiracion': usuario.fecha_expiracion_plan.isoformat() if usuario.fecha_expiracion_plan else None
+            'fecha_expiracion': usuario.fecha_expiracion_plan.isoformat() if usuario.fecha_expiracion_plan else None,
+            'tokens': emitir_tokens(usuario)
         })
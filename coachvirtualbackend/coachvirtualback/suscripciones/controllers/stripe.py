@@ -1,4 +1,14 @@
+"""
+Integración con Stripe Checkout.
+
+Las vistas son async: las llamadas a la API de Stripe usan un cliente httpx con
+pool (core.http) y no bloquean el worker mientras esperan la red. El acceso a
+la base de datos se hace con el ORM async o sync_to_async.
+"""
+import json
+
 import stripe
+from asgiref.sync import sync_to_async
 from decouple import config
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -7,8 +17,10 @@ from django.utils import timezone
 from datetime import timedelta
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from core.http import cerrar_clientes_al_terminar, cliente_stripe
 from usuarios.models import Usuario
 from ..models import HistorialSuscripcion, TipoPlan
+from ..services.tokens import emitir_tokens
 
 # Configuración de Stripe
 stripe.api_key = config('STRIPE_SECRET_KEY', default='')
@@ -44,7 +56,8 @@ def get_user_from_request(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def crear_checkout_session(request):
+@cerrar_clientes_al_terminar
+async def crear_checkout_session(request):
     """
     Crea una sesión de checkout de Stripe para suscripción.
     
@@ -54,8 +67,6 @@ def crear_checkout_session(request):
     4. Retorna URL para redirigir al usuario
     """
     try:
-        import json
-        
         # Verificar que Stripe esté configurado
         if not stripe.api_key:
             return JsonResponse({
@@ -63,7 +74,7 @@ def crear_checkout_session(request):
             }, status=500)
         
         # Obtener usuario desde token JWT
-        usuario = get_user_from_request(request)
+        usuario = await sync_to_async(get_user_from_request)(request)
         
         if not usuario:
             return JsonResponse({
@@ -87,7 +98,7 @@ def crear_checkout_session(request):
         
         # Buscar plan en la base de datos
         try:
-            tipo_plan = TipoPlan.objects.get(clave=plan_clave, activo=True)
+            tipo_plan = await TipoPlan.objects.aget(clave=plan_clave, activo=True)
         except TipoPlan.DoesNotExist:
             return JsonResponse({
                 'error': f'Plan "{plan_clave}" no encontrado o no está activo'
@@ -104,7 +115,7 @@ def crear_checkout_session(request):
         fecha_expiracion = fecha_inicio + timedelta(days=tipo_plan.duracion_dias)
         
         # Crear registro PENDIENTE en la base de datos
-        historial = HistorialSuscripcion.objects.create(
+        historial = await HistorialSuscripcion.objects.acreate(
             usuario=usuario,
             tipo_plan=tipo_plan,
             plan=plan_clave,  # Legacy field
@@ -121,7 +132,7 @@ def crear_checkout_session(request):
         cancel_url = f'{FRONTEND_URL}/planes?canceled=true'
         
         # Crear sesión de checkout con precio dinámico
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = await cliente_stripe().v1.checkout.sessions.create_async(params=dict(
             payment_method_types=['card'],
             mode='payment',
             customer_email=usuario.email,
@@ -144,11 +155,11 @@ def crear_checkout_session(request):
                 'usuario_id': str(usuario.id),
                 'tipo_plan_id': str(tipo_plan.id),
             }
-        )
+        ))
         
         # Guardar session_id en el historial
         historial.referencia_pago = checkout_session.id
-        historial.save()
+        await historial.asave(update_fields=['referencia_pago'])
         
         return JsonResponse({
             'url': checkout_session.url,
@@ -174,9 +185,84 @@ def crear_checkout_session(request):
         }, status=400)
 
 
+def _confirmar_pago_sesion(historial_id, request):
+    """
+    Activa el plan del historial pagado (parte síncrona de verificar_estado_sesion).
+    Retorna los campos a agregar a la respuesta.
+    """
+    resultado = {}
+    try:
+        historial = HistorialSuscripcion.objects.get(id=historial_id)
+        
+        if historial.estado_pago != 'confirmado':
+            # Desactivar otros planes
+            HistorialSuscripcion.objects.filter(
+                usuario=historial.usuario,
+                activo=True
+            ).exclude(id=historial.id).update(activo=False)
+            
+            # Activar este plan
+            historial.estado_pago = 'confirmado'
+            historial.activo = True
+            historial.save()
+            
+            # Actualizar usuario
+            historial.usuario.plan_actual = historial.plan
+            historial.usuario.fecha_expiracion_plan = historial.fecha_expiracion
+            historial.usuario.save()
+            
+            # *** CREAR ALERTA DE FELICITACIÓN ***
+            try:
+                from usuarios.models import Alertas
+                
+                # Obtener información del plan
+                plan_nombre = historial.tipo_plan.nombre if historial.tipo_plan else historial.plan.upper()
+                plan_minutos = historial.tipo_plan.minutos_por_dia if historial.tipo_plan else 60
+                plan_feedback = historial.tipo_plan.feedback_voz if historial.tipo_plan else False
+                plan_angulos = historial.tipo_plan.analisis_angulos if historial.tipo_plan else False
+                
+                # Construir mensaje con beneficios
+                beneficios = []
+                if plan_minutos == -1:
+                    beneficios.append("⏰ Tiempo ilimitado de ejercicio")
+                elif plan_minutos > 0:
+                    beneficios.append(f"⏰ {plan_minutos} minutos por día")
+                if plan_feedback:
+                    beneficios.append("🗣️ Feedback con voz")
+                if plan_angulos:
+                    beneficios.append("📐 Análisis de ángulos")
+                
+                beneficios_texto = ", ".join(beneficios) if beneficios else "todas las funciones premium"
+                
+                mensaje = f"🎉 ¡Felicidades! Has activado el plan {plan_nombre}. Ahora tienes acceso a: {beneficios_texto}. ¡Disfruta tu entrenamiento! 💪"
+                
+                Alertas.objects.create(
+                    usuario=historial.usuario,
+                    mensaje=mensaje,
+                    estado=True,
+                    fecha=timezone.now()
+                )
+                print(f"✅ Alerta de pago creada para {historial.usuario.email}")
+            except Exception as alert_error:
+                print(f"⚠️ Error creando alerta de pago: {alert_error}")
+            
+            resultado['plan_activated'] = True
+            resultado['plan'] = historial.plan
+        
+        # Tokens con el nuevo plan (solo para el dueño de la suscripción;
+        # aplica también si el webhook confirmó el pago antes)
+        usuario = get_user_from_request(request)
+        if usuario and usuario.pk == historial.usuario_id:
+            resultado['tokens'] = emitir_tokens(historial.usuario)
+    except HistorialSuscripcion.DoesNotExist:
+        pass
+    return resultado
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
-def verificar_estado_sesion(request):
+@cerrar_clientes_al_terminar
+async def verificar_estado_sesion(request):
     """
     Verifica el estado de una sesión de checkout.
     Puede ser llamado después del redirect de Stripe.
@@ -187,7 +273,8 @@ def verificar_estado_sesion(request):
         return JsonResponse({'error': 'session_id requerido'}, status=400)
     
     try:
-        session = stripe.checkout.Session.retrieve(session_id)
+        stripe_client = cliente_stripe()
+        session = await stripe_client.v1.checkout.sessions.retrieve_async(session_id)
         
         response_data = {
             'status': session.status,
@@ -196,72 +283,14 @@ def verificar_estado_sesion(request):
         
         # Si el pago fue exitoso, actualizar la base de datos
         if session.payment_status == 'paid':
-            metadata = session.get('metadata', {})
+            metadata = session.get('metadata') or {}
             historial_id = metadata.get('historial_id')
             
             if historial_id:
-                try:
-                    historial = HistorialSuscripcion.objects.get(id=historial_id)
-                    
-                    if historial.estado_pago != 'confirmado':
-                        # Desactivar otros planes
-                        HistorialSuscripcion.objects.filter(
-                            usuario=historial.usuario,
-                            activo=True
-                        ).exclude(id=historial.id).update(activo=False)
-                        
-                        # Activar este plan
-                        historial.estado_pago = 'confirmado'
-                        historial.activo = True
-                        historial.save()
-                        
-                        # Actualizar usuario
-                        historial.usuario.plan_actual = historial.plan
-                        historial.usuario.fecha_expiracion_plan = historial.fecha_expiracion
-                        historial.usuario.save()
-                        
-                        # *** CREAR ALERTA DE FELICITACIÓN ***
-                        try:
-                            from usuarios.models import Alertas
-                            
-                            # Obtener información del plan
-                            plan_nombre = historial.tipo_plan.nombre if historial.tipo_plan else historial.plan.upper()
-                            plan_minutos = historial.tipo_plan.minutos_por_dia if historial.tipo_plan else 60
-                            plan_feedback = historial.tipo_plan.feedback_voz if historial.tipo_plan else False
-                            plan_angulos = historial.tipo_plan.analisis_angulos if historial.tipo_plan else False
-                            
-                            # Construir mensaje con beneficios
-                            beneficios = []
-                            if plan_minutos == -1:
-                                beneficios.append("⏰ Tiempo ilimitado de ejercicio")
-                            elif plan_minutos > 0:
-                                beneficios.append(f"⏰ {plan_minutos} minutos por día")
-                            if plan_feedback:
-                                beneficios.append("🗣️ Feedback con voz")
-                            if plan_angulos:
-                                beneficios.append("📐 Análisis de ángulos")
-                            
-                            beneficios_texto = ", ".join(beneficios) if beneficios else "todas las funciones premium"
-                            
-                            mensaje = f"🎉 ¡Felicidades! Has activado el plan {plan_nombre}. Ahora tienes acceso a: {beneficios_texto}. ¡Disfruta tu entrenamiento! 💪"
-                            
-                            Alertas.objects.create(
-                                usuario=historial.usuario,
-                                mensaje=mensaje,
-                                estado=True,
-                                fecha=timezone.now()
-                            )
-                            print(f"✅ Alerta de pago creada para {historial.usuario.email}")
-                        except Exception as alert_error:
-                            print(f"⚠️ Error creando alerta de pago: {alert_error}")
-                        
-                        response_data['plan_activated'] = True
-                        response_data['plan'] = historial.plan
-                except HistorialSuscripcion.DoesNotExist:
-                    pass
+                response_data.update(await sync_to_async(_confirmar_pago_sesion)(historial_id, request))
         
         if session.subscription:
-            subscription = stripe.Subscription.retrieve(session.subscription)
+            subscription = await stripe_client.v1.subscriptions.retrieve_async(session.subscription)
             response_data['subscription'] = {
                 'id': subscription.id,
                 'status': subscription.status,
@@ -276,21 +305,21 @@ def verificar_estado_sesion(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def cancelar_suscripcion(request):
+@cerrar_clientes_al_terminar
+async def cancelar_suscripcion(request):
     """
     Cancela la suscripción activa del usuario.
     """
     try:
-        import json
         body = json.loads(request.body)
         subscription_id = body.get('subscription_id')
         
         if not subscription_id:
             return JsonResponse({'error': 'subscription_id requerido'}, status=400)
         
-        subscription = stripe.Subscription.modify(
+        subscription = await cliente_stripe().v1.subscriptions.update_async(
             subscription_id,
-            cancel_at_period_end=True
+            params={'cancel_at_period_end': True}
         )
         
         return JsonResponse({
@@ -2,7 +2,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from ..config import PLANES, SUBSCRIPTIONS_ENABLED, get_plan_config
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from core.condicional import respuesta_condicional
+from ..config import PLANES, SUBSCRIPTIONS_ENABLED
+from ..services.catalogo import ETAG_PLANES_CONFIG
+from ..services.tokens import plan_de_request, resumen_plan
 
 
 class PlanesDisponiblesVista(APIView):
@@ -12,6 +16,7 @@ class PlanesDisponiblesVista(APIView):
     """
     permission_classes = [IsAuthenticated]
     
+    @respuesta_condicional(lambda request: ETAG_PLANES_CONFIG)
     def get(self, request):
         """Obtiene la lista de planes disponibles"""
         return Response({
@@ -25,29 +30,46 @@ class PlanActualVista(APIView):
     """
     Vista para obtener el plan actual del usuario autenticado.
     GET: Retorna el plan actual y sus límites/permisos.
+    El plan se lee de los claims del JWT (sin consultar la base de datos).
     """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Obtiene el plan actual del usuario"""
-        usuario = request.user
-        plan_config = get_plan_config(usuario.plan_actual)
+        plan = plan_de_request(request)
+        permisos = plan.permisos
         
         return Response({
-            'plan_actual': usuario.plan_actual,
-            'plan_nombre': plan_config['nombre'],
-            'fecha_expiracion': usuario.fecha_expiracion_plan,
-            'tiene_plan_activo': usuario.tiene_plan_activo,
-            'configuracion': plan_config,
+            'plan_actual': plan.plan_actual,
+            'plan_nombre': permisos.nombre,
+            'fecha_expiracion': plan.fecha_expiracion,
+            'tiene_plan_activo': plan.tiene_plan_activo,
+            'configuracion': dict(permisos.configuracion),
             'subscriptions_enabled': SUBSCRIPTIONS_ENABLED
         })
 
 
+class PermisosVista(APIView):
+    """
+    Vista con todas las características del plan del usuario en una sola llamada.
+    GET: Retorna el plan actual y un mapa feature -> permitido.
+    Reemplaza las llamadas por característica a planes/verificar/.
+    """
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Obtiene el plan actual, sus límites y todos los feature flags"""
+        return Response(resumen_plan(plan_de_request(request)))
+
+
 class VerificarPermisoVista(APIView):
     """
     Vista para verificar si el usuario tiene permiso para una característica.
     GET: Verifica permisos para una feature específica.
     """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -63,23 +85,22 @@ class VerificarPermisoVista(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        usuario = request.user
-        plan_config = get_plan_config(usuario.plan_actual)
+        plan = plan_de_request(request)
         
         # Si el sistema no está activo, todo es permitido
         if not SUBSCRIPTIONS_ENABLED:
             return Response({
                 'permitido': True,
                 'motivo': 'Sistema de suscripciones no activado',
-                'plan_actual': usuario.plan_actual
+                'plan_actual': plan.plan_actual
             })
         
-        permitido = plan_config.get(feature, False)
+        permitido = plan.permite(feature)
         
         return Response({
             'permitido': permitido,
             'feature': feature,
-            'plan_actual': usuario.plan_actual,
+            'plan_actual': plan.plan_actual,
             'plan_requerido': 'premium' if not permitido else None,
             'mensaje': f'Se requiere plan Premium' if not permitido else 'Acceso permitido'
         })
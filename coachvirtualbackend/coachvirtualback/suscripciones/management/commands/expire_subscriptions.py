@@ -0,0 +1,23 @@
+"""
+Comando para expirar suscripciones vencidas.
+Ejecutar con (ej: cada hora desde cron):
+    python manage.py expire_subscriptions
+    python manage.py expire_subscriptions --lote 500
+"""
+from django.core.management.base import BaseCommand
+
+from suscripciones.services.expiracion import expirar_suscripciones, LOTE
+
+
+class Command(BaseCommand):
+    help = 'Desactiva suscripciones vencidas y regresa a los usuarios al plan gratis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=LOTE, help='Filas por UPDATE')
+
+    def handle(self, *args, **options):
+        resultado = expirar_suscripciones(lote=options['lote'])
+
+        self.stdout.write(self.style.SUCCESS('✅ Expiración de suscripciones completada'))
+        self.stdout.write(f"   Historiales desactivados: {resultado['historial']}")
+        self.stdout.write(f"   Usuarios regresados a gratis: {resultado['usuarios']}")
@@ -0,0 +1,35 @@
+"""
+Comando para procesar la cola de eventos del webhook de Stripe.
+Ejecutar con:
+    python manage.py procesar_eventos_stripe           # procesa lo pendiente y termina (cron)
+    python manage.py procesar_eventos_stripe --loop    # worker dedicado
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from suscripciones.services.stripe_eventos import procesar_pendientes, LOTE
+
+
+class Command(BaseCommand):
+    help = 'Procesa los eventos de Stripe pendientes (con reintentos y backoff)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Seguir procesando indefinidamente')
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos de espera sin eventos (--loop)')
+        parser.add_argument('--lote', type=int, default=LOTE, help='Eventos por lote')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            procesados = procesar_pendientes(options['lote'])
+            total += procesados
+            if procesados:
+                continue
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Eventos de Stripe procesados: {total}'))
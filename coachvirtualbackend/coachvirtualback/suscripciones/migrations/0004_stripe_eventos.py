@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suscripciones', '0003_metodopago_tipoplan_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historialsuscripcion',
+            name='stripe_subscription_id',
+            field=models.CharField(blank=True, db_index=True, help_text='ID de la suscripción en Stripe (sub_...)', max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='historialsuscripcion',
+            name='referencia_pago',
+            field=models.CharField(blank=True, db_index=True, help_text='ID de transacción o referencia de pago', max_length=100, null=True),
+        ),
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(help_text='ID del evento en Stripe (evt_...)', max_length=255, unique=True)),
+                ('tipo', models.CharField(help_text='Tipo de evento (ej: checkout.session.completed)', max_length=100)),
+                ('payload', models.JSONField(help_text='Evento completo tal como lo envió Stripe')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('procesado', 'Procesado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, help_text='No procesar antes de esta fecha (backoff o lease del worker)')),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('recibido_en', models.DateTimeField(auto_now_add=True)),
+                ('procesado_en', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de Stripe',
+                'verbose_name_plural': 'Eventos de Stripe',
+                'db_table': 'stripe_eventos',
+                'ordering': ['recibido_en'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='stripe_even_estado_3bfa74_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from usuarios.models import Usuario
 
 
@@ -148,8 +149,16 @@ class HistorialSuscripcion(models.Model):
         max_length=100, 
         blank=True, 
         null=True,
+        db_index=True,
         help_text='ID de transacción o referencia de pago'
     )
+    stripe_subscription_id = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text='ID de la suscripción en Stripe (sub_...)'
+    )
     
     # Estado de pago
     estado_pago = models.CharField(
@@ -185,3 +194,44 @@ class HistorialSuscripcion(models.Model):
     
     def __str__(self):
         return f"{self.usuario.email} - {self.plan} ({self.fecha_inicio.strftime('%Y-%m-%d')})"
+
+
+class StripeEvent(models.Model):
+    """
+    Eventos recibidos por el webhook de Stripe.
+    El webhook solo los persiste (event_id único = idempotencia) y un worker
+    en segundo plano los procesa con reintentos y backoff exponencial.
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('procesado', 'Procesado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    event_id = models.CharField(max_length=255, unique=True, help_text='ID del evento en Stripe (evt_...)')
+    tipo = models.CharField(max_length=100, help_text='Tipo de evento (ej: checkout.session.completed)')
+    payload = models.JSONField(help_text='Evento completo tal como lo envió Stripe')
+
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField(
+        default=timezone.now,
+        help_text='No procesar antes de esta fecha (backoff o lease del worker)'
+    )
+    ultimo_error = models.TextField(blank=True, default='')
+
+    recibido_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'stripe_eventos'
+        ordering = ['recibido_en']
+        verbose_name = 'Evento de Stripe'
+        verbose_name_plural = 'Eventos de Stripe'
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} - {self.tipo} ({self.estado})"
@@ -0,0 +1,7 @@
+# suscripciones/services/__init__.py
+from .catalogo import obtener_catalogo, invalidar_catalogo
+from .permisos import PermisosPlan, permisos_de_plan, permisos_de_usuario
+from .tokens import emitir_tokens, plan_de_request, resumen_plan
+from .stripe_eventos import registrar_evento, procesar_pendientes
+from .expiracion import expirar_suscripciones
+from .consumo import registrar_latido, estado_consumo, puede_entrenar, volcar_consumo
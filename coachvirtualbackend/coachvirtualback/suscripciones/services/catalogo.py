@@ -0,0 +1,102 @@
+"""
+Cache en memoria del catálogo de planes y métodos de pago.
+
+`TipoPlan` y `MetodoPago` cambian solo cuando un administrador los edita, pero
+se leen en cada carga de la página de planes y en cada verificación de
+permisos. El catálogo se carga con dos consultas, se guarda por proceso y se
+reconstruye cuando las señales de `suscripciones.signals` incrementan la
+versión compartida en la cache de Django.
+
+Los diccionarios devueltos son compartidos entre requests: no modificarlos.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Max
+
+from ..config import PLANES, SUBSCRIPTIONS_ENABLED
+from ..models import MetodoPago, TipoPlan
+
+
+CACHE_VERSION_KEY = "suscripciones_catalogo_version"
+
+# PLANES es fijo en el código: su validador se calcula una vez por proceso
+ETAG_PLANES_CONFIG = hashlib.md5(
+    json.dumps([PLANES, SUBSCRIPTIONS_ENABLED], sort_keys=True).encode()
+).hexdigest()
+
+
+class CatalogoPlanes:
+    """Instantánea inmutable del catálogo (planes, métodos de pago y permisos)."""
+
+    def __init__(
+        self,
+        planes: Tuple[dict, ...],
+        metodos: Tuple[dict, ...],
+        version: int = 0,
+        ultima_modificacion: Optional[datetime] = None,
+    ):
+        self.version = version
+        self.ultima_modificacion = ultima_modificacion
+        self.planes = planes
+        self.planes_activos = tuple(p for p in planes if p['activo'])
+        self.metodos = metodos
+        self.metodos_activos = tuple(m for m in metodos if m['activo'])
+        self.planes_por_clave: Dict[str, dict] = {p['clave']: p for p in planes}
+        # Validador para GET condicional: igual en todos los procesos con el mismo contenido
+        self.etag = hashlib.md5(
+            json.dumps([planes, metodos], sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        from .permisos import construir_permisos
+        self.permisos = construir_permisos(self.planes_por_clave)
+
+    @classmethod
+    def desde_db(cls, version: int = 0) -> "CatalogoPlanes":
+        planes = tuple(p.to_dict() for p in TipoPlan.objects.all())
+        metodos = tuple(m.to_dict() for m in MetodoPago.objects.all())
+        fechas = [
+            TipoPlan.objects.aggregate(m=Max('updated_at'))['m'],
+            MetodoPago.objects.aggregate(m=Max('updated_at'))['m'],
+        ]
+        return cls(planes, metodos, version, max((f for f in fechas if f), default=None))
+
+    def listar_planes(self, solo_activos: bool = True) -> Tuple[dict, ...]:
+        return self.planes_activos if solo_activos else self.planes
+
+    def listar_metodos(self, solo_activos: bool = True) -> Tuple[dict, ...]:
+        return self.metodos_activos if solo_activos else self.metodos
+
+
+_lock = threading.Lock()
+_catalogo: Optional[CatalogoPlanes] = None
+
+
+def obtener_catalogo() -> CatalogoPlanes:
+    """Devuelve el catálogo del proceso, recargándolo si cambió la versión."""
+    global _catalogo
+    version = cache.get(CACHE_VERSION_KEY, 0)
+    actual = _catalogo
+    if actual is not None and actual.version == version:
+        return actual
+
+    with _lock:
+        if _catalogo is None or _catalogo.version != version:
+            _catalogo = CatalogoPlanes.desde_db(version)
+        return _catalogo
+
+
+def invalidar_catalogo() -> None:
+    """Fuerza la recarga del catálogo en todos los procesos que comparten cache."""
+    global _catalogo
+    cache.add(CACHE_VERSION_KEY, 0, None)
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, None)
+    _catalogo = None
@@ -0,0 +1,211 @@
+"""
+Medición del uso diario (minutos de entrenamiento) para los límites del plan.
+
+Mientras el usuario entrena, el cliente envía un latido por minuto. Solo se
+cuenta un latido por usuario y minuto de reloj (`cache.add`), aunque el
+cliente reintente o tenga la app abierta en dos pestañas.
+
+Con Redis o Memcached (cache compartida con `incr`/`add` atómicos) cada
+latido suma un minuto a un contador en la cache:
+
+- La clave incluye la fecha local (`consumo:{usuario}:{fecha}`), así que el
+  reinicio diario es implícito: el primer latido del día empieza en otra clave.
+- La fila del usuario no se escribe en cada latido: cada proceso acumula los
+  usuarios con minutos pendientes y los vuelca a `minutos_usados_hoy` /
+  `ultima_sesion` en un solo UPDATE cuando junta LOTE_VOLCADO usuarios, cada
+  INTERVALO_VOLCADO (hilo del proceso) y al terminar el proceso.
+- Si la cache pierde un contador, se recupera desde la fila del usuario
+  (`ultima_sesion` igual a hoy) y sigue sumando desde ahí.
+
+Con la cache en archivos o en memoria (desarrollo) el contador no es confiable
+entre procesos, así que el minuto se suma directo en la fila del usuario con
+un UPDATE atómico y el límite se aplica sobre ese valor.
+
+El límite sale de `minutos_por_dia` del plan vigente (catálogo en memoria,
+con los valores de TipoPlan) y solo se aplica con SUBSCRIPTIONS_ENABLED.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from decouple import config
+from django.core.cache import cache, caches
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from ..config import SUBSCRIPTIONS_ENABLED
+from .permisos import permisos_de_usuario
+
+
+TTL_CONTADOR = 2 * 24 * 3600
+LOTE_VOLCADO = 200
+INTERVALO_VOLCADO = 60  # segundos
+CONSUMO_VOLCADO_HILO = config('CONSUMO_VOLCADO_HILO', default=True, cast=bool)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pendientes = set()  # {(usuario_id, fecha)}
+_ultimo_volcado = time.monotonic()
+_volcador = None
+
+
+def _clave(usuario_id, fecha):
+    return f'consumo:{usuario_id}:{fecha.isoformat()}'
+
+
+def _cache_atomica() -> bool:
+    """True con Redis o Memcached: contadores compartidos entre procesos y sin culling."""
+    return isinstance(caches['default'], (RedisCache, BaseMemcachedCache))
+
+
+def _minutos_guardados(usuario, fecha) -> int:
+    """Minutos de `fecha` según la fila del usuario (0 si su último uso fue otro día)."""
+    return usuario.minutos_usados_hoy if usuario.ultima_sesion == fecha else 0
+
+
+def minutos_usados(usuario) -> int:
+    """Minutos usados hoy (una lectura de cache; la BD solo si la cache no tiene el contador)."""
+    hoy = timezone.localdate()
+    if not _cache_atomica():
+        return _minutos_guardados(usuario, hoy)
+    minutos = cache.get(_clave(usuario.pk, hoy))
+    return _minutos_guardados(usuario, hoy) if minutos is None else minutos
+
+
+def limite_diario(usuario) -> int:
+    """Minutos por día del plan vigente; -1 si no hay límite (o el sistema de planes está apagado)."""
+    if not SUBSCRIPTIONS_ENABLED:
+        return -1
+    return permisos_de_usuario(usuario).limite('minutos_por_dia', -1)
+
+
+def estado_consumo(usuario, usados=None) -> dict:
+    usados = minutos_usados(usuario) if usados is None else usados
+    limite = limite_diario(usuario)
+    return {
+        'minutos_usados': usados,
+        'limite_minutos': limite,
+        'minutos_restantes': None if limite < 0 else max(0, limite - usados),
+        'puede_entrenar': limite < 0 or usados < limite,
+    }
+
+
+def puede_entrenar(usuario) -> bool:
+    return estado_consumo(usuario)['puede_entrenar']
+
+
+def registrar_latido(usuario) -> dict:
+    """
+    Cuenta un minuto de entrenamiento (como mucho uno por minuto de reloj) y
+    retorna el estado del consumo. Con el límite alcanzado no cuenta nada.
+    """
+    ahora = timezone.localtime()
+    hoy = ahora.date()
+    clave = _clave(usuario.pk, hoy)
+
+    estado = estado_consumo(usuario)
+    if not estado['puede_entrenar']:
+        return estado
+
+    minuto = ahora.strftime('%H%M')
+    if not cache.add(f'consumo:latido:{usuario.pk}:{hoy.isoformat()}:{minuto}', 1, 120):
+        return estado
+
+    if not _cache_atomica():
+        return estado_consumo(usuario, _sumar_minuto_en_bd(usuario, hoy))
+
+    cache.add(clave, _minutos_guardados(usuario, hoy), TTL_CONTADOR)
+    try:
+        usados = cache.incr(clave)
+    except ValueError:
+        # La clave expiró entre add e incr
+        usados = _minutos_guardados(usuario, hoy) + 1
+        cache.set(clave, usados, TTL_CONTADOR)
+
+    _marcar_pendiente(usuario.pk, hoy)
+    return estado_consumo(usuario, usados)
+
+
+def _sumar_minuto_en_bd(usuario, hoy) -> int:
+    """Suma el minuto en la fila del usuario con un UPDATE atómico (sin cache compartida)."""
+    from usuarios.models import Usuario
+
+    filas = Usuario.objects.filter(pk=usuario.pk)
+    if not filas.filter(ultima_sesion=hoy).update(minutos_usados_hoy=F('minutos_usados_hoy') + 1):
+        # Primer minuto del día; si otro request se adelantó, se suma sobre el suyo
+        if not filas.exclude(ultima_sesion=hoy).update(minutos_usados_hoy=1, ultima_sesion=hoy):
+            filas.filter(ultima_sesion=hoy).update(minutos_usados_hoy=F('minutos_usados_hoy') + 1)
+    usuario.minutos_usados_hoy = filas.values_list('minutos_usados_hoy', flat=True).get()
+    usuario.ultima_sesion = hoy
+    return usuario.minutos_usados_hoy
+
+
+def _loop_volcador():
+    while True:
+        time.sleep(INTERVALO_VOLCADO)
+        try:
+            volcar_consumo()
+        except Exception:
+            logger.exception("Error volcando el consumo a la BD")
+        finally:
+            close_old_connections()
+
+
+def _asegurar_volcador():
+    """Hilo que vuelca los pendientes aunque no lleguen más latidos a este proceso."""
+    global _volcador
+    if not CONSUMO_VOLCADO_HILO:
+        return
+    if _volcador is None or not _volcador.is_alive():
+        with _lock:
+            if _volcador is None or not _volcador.is_alive():
+                _volcador = threading.Thread(target=_loop_volcador, name='consumo-volcador', daemon=True)
+                _volcador.start()
+
+
+def _marcar_pendiente(usuario_id, fecha):
+    _asegurar_volcador()
+    with _lock:
+        _pendientes.add((usuario_id, fecha))
+        toca = len(_pendientes) >= LOTE_VOLCADO or time.monotonic() - _ultimo_volcado >= INTERVALO_VOLCADO
+    if toca:
+        volcar_consumo()
+
+
+def volcar_consumo() -> int:
+    """Escribe en la BD los contadores pendientes de este proceso. Retorna las filas actualizadas."""
+    global _ultimo_volcado
+    from usuarios.models import Usuario
+
+    with _lock:
+        pendientes = list(_pendientes)
+        _pendientes.clear()
+        _ultimo_volcado = time.monotonic()
+    if not pendientes:
+        return 0
+
+    valores = cache.get_many([_clave(uid, fecha) for uid, fecha in pendientes])
+    # Si un usuario tiene pendientes de dos días (cruce de medianoche), gana el más reciente
+    por_usuario = {}
+    for uid, fecha in sorted(pendientes, key=lambda p: p[1]):
+        minutos = valores.get(_clave(uid, fecha))
+        if minutos is not None:
+            por_usuario[uid] = Usuario(pk=uid, minutos_usados_hoy=minutos, ultima_sesion=fecha)
+
+    Usuario.objects.bulk_update(por_usuario.values(), ['minutos_usados_hoy', 'ultima_sesion'], batch_size=LOTE_VOLCADO)
+    return len(por_usuario)
+
+
+@atexit.register
+def _volcar_al_salir():
+    """Al terminar el proceso (reinicio de workers) no se pierden los minutos pendientes."""
+    try:
+        volcar_consumo()
+    except Exception:
+        logger.exception("Error volcando el consumo al terminar el proceso")
@@ -0,0 +1,48 @@
+"""
+Expiración de suscripciones en lote.
+
+Desactiva las filas de `HistorialSuscripcion` vencidas y regresa a 'gratis' a
+los usuarios cuyo `fecha_expiracion_plan` ya pasó, con UPDATEs por lotes de
+ids (el filtro por `activo` usa su índice). Lo ejecuta periódicamente
+`python manage.py expire_subscriptions`.
+"""
+
+from django.utils import timezone
+
+from usuarios.models import Usuario
+from ..models import HistorialSuscripcion
+
+
+LOTE = 1000
+
+
+def _actualizar_por_lotes(queryset, lote, **valores) -> int:
+    """
+    Aplica UPDATE ... WHERE id IN (lote) AND <filtro> hasta agotar el queryset.
+    El filtro se repite en el UPDATE: una fila que dejó de cumplirlo después
+    del SELECT (ej: el usuario renovó) no se toca.
+    """
+    total = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:lote])
+        if not ids:
+            return total
+        total += queryset.filter(id__in=ids).update(**valores)
+
+
+def expirar_suscripciones(ahora=None, lote: int = LOTE) -> dict:
+    """Retorna {'historial': filas desactivadas, 'usuarios': usuarios degradados}."""
+    ahora = ahora or timezone.now()
+
+    historial = _actualizar_por_lotes(
+        HistorialSuscripcion.objects.filter(activo=True, fecha_expiracion__lte=ahora),
+        lote,
+        activo=False,
+    )
+    usuarios = _actualizar_por_lotes(
+        Usuario.objects.filter(fecha_expiracion_plan__lte=ahora).exclude(plan_actual='gratis'),
+        lote,
+        plan_actual='gratis',
+        fecha_expiracion_plan=None,
+    )
+    return {'historial': historial, 'usuarios': usuarios}
@@ -0,0 +1,106 @@
+"""
+Resolución de permisos (entitlements) por plan.
+
+Combina la configuración estática de `config.PLANES` con los valores que el
+administrador define en `TipoPlan` y la congela en un `PermisosPlan` por clave
+de plan. Los objetos se construyen una vez por versión del catálogo, así que
+verificar una característica es una búsqueda en un frozenset.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from django.utils import timezone
+
+from ..config import PLANES, SUBSCRIPTIONS_ENABLED
+
+
+# Campos de TipoPlan que sobrescriben la configuración estática del plan
+CAMPOS_TIPO_PLAN = (
+    'nombre', 'precio', 'minutos_por_dia', 'historial_dias', 'feedback_voz',
+    'analisis_angulos', 'con_anuncios', 'rutinas_personalizadas', 'soporte_prioritario',
+)
+
+
+@dataclass(frozen=True)
+class PermisosPlan:
+    """Permisos congelados de un plan."""
+    plan: str
+    nombre: str
+    features: frozenset
+    flags: Mapping[str, bool] = field(repr=False)
+    limites: Mapping[str, int] = field(repr=False)
+    configuracion: Mapping[str, Any] = field(repr=False)
+
+    def permite(self, feature: str) -> bool:
+        """True si la característica está habilitada (booleano o límite != 0)."""
+        return feature in self.features
+
+    def limite(self, nombre: str, default: int = 0) -> int:
+        """Límite numérico del plan (-1 = ilimitado)."""
+        return self.limites.get(nombre, default)
+
+
+def _congelar(clave: str, config: Dict[str, Any]) -> PermisosPlan:
+    flags = {k: v for k, v in config.items() if isinstance(v, bool)}
+    limites = {
+        k: int(v) for k, v in config.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and k != 'precio'
+    }
+    features = frozenset(
+        [k for k, v in flags.items() if v] + [k for k, v in limites.items() if v != 0]
+    )
+    return PermisosPlan(
+        plan=clave,
+        nombre=config.get('nombre', clave),
+        features=features,
+        flags=MappingProxyType(flags),
+        limites=MappingProxyType(limites),
+        configuracion=MappingProxyType(config),
+    )
+
+
+def construir_permisos(planes_por_clave: Dict[str, dict]) -> Dict[str, PermisosPlan]:
+    """Construye los permisos de todos los planes conocidos (config + TipoPlan)."""
+    permisos = {}
+    for clave in set(PLANES) | set(planes_por_clave):
+        config = dict(PLANES.get(clave, PLANES['gratis']))
+        tipo_plan = planes_por_clave.get(clave)
+        if tipo_plan:
+            config.update({campo: tipo_plan[campo] for campo in CAMPOS_TIPO_PLAN})
+        permisos[clave] = _congelar(clave, config)
+    return permisos
+
+
+def permisos_de_plan(plan_clave: str) -> PermisosPlan:
+    """Permisos de un plan por clave (planes desconocidos caen en 'gratis')."""
+    from .catalogo import obtener_catalogo
+
+    permisos = obtener_catalogo().permisos
+    return permisos.get(plan_clave) or permisos['gratis']
+
+
+def plan_efectivo(usuario) -> str:
+    """Plan vigente del usuario: un plan de pago ya expirado cuenta como 'gratis'."""
+    expiracion = usuario.fecha_expiracion_plan
+    if usuario.plan_actual != 'gratis' and expiracion and expiracion <= timezone.now():
+        return 'gratis'
+    return usuario.plan_actual or 'gratis'
+
+
+def permisos_de_usuario(usuario) -> PermisosPlan:
+    """Permisos efectivos del usuario según su plan vigente."""
+    return permisos_de_plan(plan_efectivo(usuario))
+
+
+def feature_flags(permisos: PermisosPlan, permite=None) -> Dict[str, bool]:
+    """
+    Todas las características como booleanos (todo habilitado si el sistema está apagado).
+    `permite` permite resolver cada flag desde otra fuente (ej: claims del JWT).
+    """
+    nombres = list(permisos.flags) + list(permisos.limites)
+    if not SUBSCRIPTIONS_ENABLED:
+        return {nombre: True for nombre in nombres}
+    permite = permite or permisos.permite
+    return {nombre: permite(nombre) for nombre in nombres}
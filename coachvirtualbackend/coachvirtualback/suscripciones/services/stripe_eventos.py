@@ -0,0 +1,314 @@
+"""
+Cola de eventos del webhook de Stripe.
+
+El webhook solo registra el evento en `StripeEvent` (event_id único, así los
+reintentos de Stripe no generan trabajo duplicado) y responde 200. Los eventos
+se procesan fuera del request:
+- un hilo worker por proceso, despertado por el webhook
+- `python manage.py procesar_eventos_stripe` (cron o proceso dedicado), que
+  también recupera eventos que quedaron pendientes tras un reinicio
+
+Cada evento se reclama con un UPDATE condicional y un lease (`proximo_intento`),
+de modo que varios workers no procesan el mismo evento. Si el handler falla se
+reprograma con backoff exponencial hasta MAX_INTENTOS.
+"""
+
+import threading
+from datetime import timedelta
+
+from decouple import config
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import metricas
+from usuarios.models import Usuario
+from ..config import get_plan_config
+from ..models import HistorialSuscripcion, StripeEvent
+
+
+# Procesar en un hilo del mismo proceso (False = solo el comando de management)
+STRIPE_WEBHOOK_WORKER = config('STRIPE_WEBHOOK_WORKER', default=True, cast=bool)
+
+MAX_INTENTOS = 8
+BACKOFF_BASE_SEGUNDOS = 30
+BACKOFF_MAX_SEGUNDOS = 6 * 60 * 60
+LEASE_SEGUNDOS = 5 * 60
+LOTE = 50
+
+
+# ============================================================
+# REGISTRO (webhook)
+# ============================================================
+
+def registrar_evento(evento: dict) -> bool:
+    """
+    Persiste un evento recibido. Retorna False si el event_id ya existía
+    (reintento de Stripe), en cuyo caso no se vuelve a encolar.
+    """
+    _, creado = StripeEvent.objects.get_or_create(
+        event_id=evento['id'],
+        defaults={'tipo': evento.get('type', ''), 'payload': evento},
+    )
+    return creado
+
+
+# ============================================================
+# HANDLERS
+# ============================================================
+
+def handle_checkout_completed(session):
+    """
+    Procesa un checkout completado.
+    Activa la suscripción del usuario en la base de datos.
+    """
+    # Obtener metadata de la sesión
+    metadata = session.get('metadata') or {}
+    plan = metadata.get('plan', 'basico')
+    historial_id = metadata.get('historial_id')
+    session_id = session.get('id')
+    subscription_id = session.get('subscription')
+    customer_email = session.get('customer_email', '')
+
+    # Buscar usuario por email
+    if not customer_email:
+        print("Webhook: No se recibió email del customer")
+        return
+    try:
+        usuario = Usuario.objects.get(email=customer_email)
+    except Usuario.DoesNotExist:
+        print(f"Webhook: Usuario no encontrado con email {customer_email}")
+        return
+
+    with transaction.atomic():
+        # Buscar el historial pendiente: por id, por referencia exacta o el último pendiente
+        historial = None
+        if historial_id:
+            historial = HistorialSuscripcion.objects.filter(id=historial_id, usuario=usuario).first()
+        if not historial and session_id:
+            historial = HistorialSuscripcion.objects.filter(usuario=usuario, referencia_pago=session_id).first()
+        if not historial:
+            historial = HistorialSuscripcion.objects.filter(
+                usuario=usuario,
+                estado_pago='pendiente'
+            ).first()
+
+        if historial:
+            # Actualizar historial existente
+            historial.estado_pago = 'confirmado'
+            historial.activo = True
+            historial.referencia_pago = session_id
+            if subscription_id:
+                historial.stripe_subscription_id = subscription_id
+            historial.save()
+        else:
+            # Crear nuevo historial si no existe
+            plan_config = get_plan_config(plan)
+            historial = HistorialSuscripcion.objects.create(
+                usuario=usuario,
+                plan=plan,
+                fecha_expiracion=timezone.now() + timedelta(days=30),
+                monto_pagado=plan_config['precio'],
+                metodo_pago='stripe',
+                referencia_pago=session_id,
+                stripe_subscription_id=subscription_id,
+                estado_pago='confirmado',
+                activo=True
+            )
+
+        # Desactivar otros planes activos del usuario
+        HistorialSuscripcion.objects.filter(
+            usuario=usuario,
+            activo=True
+        ).exclude(id=historial.id).update(activo=False)
+
+        # Actualizar el usuario
+        usuario.plan_actual = plan
+        usuario.fecha_expiracion_plan = historial.fecha_expiracion
+        usuario.save(update_fields=['plan_actual', 'fecha_expiracion_plan'])
+
+    print(f"Webhook: Plan {plan} activado para {usuario.email}")
+
+
+def _historial_de_suscripcion(subscription_id):
+    """Búsqueda exacta (indexada) por ID de suscripción o referencia de pago."""
+    if not subscription_id:
+        return None
+    return (
+        HistorialSuscripcion.objects
+        .select_related('usuario')
+        .filter(Q(stripe_subscription_id=subscription_id) | Q(referencia_pago=subscription_id))
+        .first()
+    )
+
+
+def handle_subscription_updated(subscription):
+    """
+    Maneja actualizaciones de suscripción.
+    """
+    status = subscription.get('status')
+    historial = _historial_de_suscripcion(subscription.get('id'))
+    if not historial:
+        return
+
+    with transaction.atomic():
+        if status == 'active':
+            historial.estado_pago = 'confirmado'
+            historial.activo = True
+        elif status == 'canceled' or status == 'past_due':
+            historial.activo = False
+            historial.cancelado = True
+        historial.save()
+
+        # Actualizar usuario
+        usuario = historial.usuario
+        if historial.activo:
+            usuario.plan_actual = historial.plan
+        else:
+            usuario.plan_actual = 'gratis'
+            usuario.fecha_expiracion_plan = None
+        usuario.save(update_fields=['plan_actual', 'fecha_expiracion_plan'])
+
+
+def handle_subscription_deleted(subscription):
+    """
+    Maneja la cancelación de una suscripción.
+    """
+    historial = _historial_de_suscripcion(subscription.get('id'))
+    if not historial:
+        return
+
+    with transaction.atomic():
+        historial.activo = False
+        historial.cancelado = True
+        historial.save()
+
+        # Revertir usuario a plan gratis
+        usuario = historial.usuario
+        usuario.plan_actual = 'gratis'
+        usuario.fecha_expiracion_plan = None
+        usuario.save(update_fields=['plan_actual', 'fecha_expiracion_plan'])
+
+
+HANDLERS = {
+    'checkout.session.completed': handle_checkout_completed,
+    'customer.subscription.updated': handle_subscription_updated,
+    'customer.subscription.deleted': handle_subscription_deleted,
+}
+
+
+# ============================================================
+# PROCESAMIENTO
+# ============================================================
+
+def backoff(intentos: int) -> timedelta:
+    """Espera antes del siguiente intento: 30s, 60s, 120s, ... hasta 6 h."""
+    return timedelta(seconds=min(BACKOFF_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0), BACKOFF_MAX_SEGUNDOS))
+
+
+def _reclamar(evento_id) -> bool:
+    """Toma el evento con un lease; False si otro worker lo tomó primero."""
+    ahora = timezone.now()
+    return StripeEvent.objects.filter(
+        pk=evento_id,
+        estado__in=('pendiente', 'procesando'),
+        proximo_intento__lte=ahora,
+    ).update(
+        estado='procesando',
+        proximo_intento=ahora + timedelta(seconds=LEASE_SEGUNDOS),
+    ) == 1
+
+
+def procesar_evento(evento: StripeEvent) -> bool:
+    """Ejecuta el handler del evento y registra el resultado. True si quedó procesado."""
+    handler = HANDLERS.get(evento.tipo)
+    evento.intentos += 1
+    try:
+        if handler:
+            handler(evento.payload['data']['object'])
+    except Exception as e:
+        evento.ultimo_error = f"{type(e).__name__}: {e}"
+        if evento.intentos >= MAX_INTENTOS:
+            evento.estado = 'fallido'
+        else:
+            evento.estado = 'pendiente'
+            evento.proximo_intento = timezone.now() + backoff(evento.intentos)
+        evento.save(update_fields=['intentos', 'estado', 'proximo_intento', 'ultimo_error'])
+        metricas.registro.incrementar('stripe_eventos_total', tipo=evento.tipo, resultado='error')
+        print(f"Webhook error procesando {evento.event_id} (intento {evento.intentos}): {e}")
+        return False
+
+    evento.estado = 'procesado'
+    evento.ultimo_error = ''
+    evento.procesado_en = timezone.now()
+    evento.save(update_fields=['intentos', 'estado', 'ultimo_error', 'procesado_en'])
+    metricas.registro.incrementar('stripe_eventos_total', tipo=evento.tipo, resultado='procesado')
+    metricas.registro.observar(
+        'stripe_webhook_lag_segundos',
+        (evento.procesado_en - evento.recibido_en).total_seconds(),
+        buckets=metricas.BUCKETS_SEGUNDOS,
+    )
+    return True
+
+
+def recolectar_metricas(registro):
+    """Tamaño y antigüedad de la cola (recolector de scrape: consulta la BD)."""
+    pendientes = StripeEvent.objects.filter(estado__in=('pendiente', 'procesando'))
+    registro.fijar('stripe_eventos_pendientes', pendientes.count())
+    mas_antiguo = pendientes.order_by('recibido_en').values_list('recibido_en', flat=True).first()
+    registro.fijar(
+        'stripe_evento_mas_antiguo_segundos',
+        (timezone.now() - mas_antiguo).total_seconds() if mas_antiguo else 0,
+    )
+
+
+def procesar_pendientes(limite: int = LOTE) -> int:
+    """Procesa hasta `limite` eventos vencidos. Retorna cuántos se intentaron."""
+    ids = list(
+        StripeEvent.objects
+        .filter(estado__in=('pendiente', 'procesando'), proximo_intento__lte=timezone.now())
+        .order_by('proximo_intento')
+        .values_list('id', flat=True)[:limite]
+    )
+    procesados = 0
+    for evento_id in ids:
+        if not _reclamar(evento_id):
+            continue
+        procesar_evento(StripeEvent.objects.get(pk=evento_id))
+        procesados += 1
+    return procesados
+
+
+# ============================================================
+# WORKER EN SEGUNDO PLANO
+# ============================================================
+
+_despertar = threading.Event()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _loop_worker():
+    while True:
+        _despertar.wait(timeout=BACKOFF_BASE_SEGUNDOS)
+        _despertar.clear()
+        try:
+            while procesar_pendientes():
+                pass
+        except Exception as e:
+            print(f"Webhook worker error: {e}")
+        finally:
+            close_old_connections()
+
+
+def despertar_worker():
+    """Arranca el hilo worker del proceso si no existe y le avisa que hay eventos."""
+    global _worker
+    if not STRIPE_WEBHOOK_WORKER:
+        return
+    if _worker is None or not _worker.is_alive():
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(target=_loop_worker, name='stripe-webhook-worker', daemon=True)
+                _worker.start()
+    _despertar.set()
@@ -0,0 +1,144 @@
+"""
+Claims de plan en el JWT.
+
+Los tokens emitidos por /api/token/ y /api/token/refresh/ incluyen:
+- plan:     clave del plan del usuario (plan_actual)
+- plan_exp: expiración del plan (epoch en segundos) o null
+- feat:     máscara de bits con las características habilitadas (ver FEATURE_BITS)
+
+Con estos claims las vistas que solo verifican el plan pueden autenticarse con
+`JWTStatelessUserAuthentication` y resolver permisos sin consultar la base de
+datos. Cuando el plan cambia (Stripe, confirmación o cancelación) se emiten
+tokens nuevos en la respuesta para que el frontend los reemplace.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Optional
+
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..config import SUBSCRIPTIONS_ENABLED
+from .permisos import PermisosPlan, feature_flags, permisos_de_plan, permisos_de_usuario
+
+
+CLAIM_PLAN = 'plan'
+CLAIM_PLAN_EXP = 'plan_exp'
+CLAIM_FEATURES = 'feat'
+
+# Orden fijo de bits: solo agregar al final para no invalidar tokens emitidos
+FEATURE_BITS = (
+    'feedback_voz',
+    'analisis_angulos',
+    'comparacion_profesional',
+    'graficas_progreso',
+    'alertas_personalizadas',
+    'con_anuncios',
+    'rutinas_personalizadas',
+    'soporte_prioritario',
+    'minutos_por_dia',
+    'ejercicios_gym',
+    'ejercicios_fisio',
+    'historial_dias',
+    'rutinas_guardadas',
+)
+_BIT = {feature: i for i, feature in enumerate(FEATURE_BITS)}
+
+
+def mascara_features(permisos: PermisosPlan) -> int:
+    """Codifica las características habilitadas del plan en un entero."""
+    return sum(1 << i for i, feature in enumerate(FEATURE_BITS) if permisos.permite(feature))
+
+
+def claims_de_plan(usuario) -> Dict[str, Optional[int]]:
+    expiracion = usuario.fecha_expiracion_plan
+    return {
+        CLAIM_PLAN: usuario.plan_actual,
+        CLAIM_PLAN_EXP: int(expiracion.timestamp()) if expiracion else None,
+        CLAIM_FEATURES: mascara_features(permisos_de_usuario(usuario)),
+    }
+
+
+def aplicar_claims_plan(token, usuario):
+    """Agrega los claims de plan a un token de SimpleJWT (refresh o access)."""
+    for claim, valor in claims_de_plan(usuario).items():
+        token[claim] = valor
+    return token
+
+
+def emitir_tokens(usuario) -> Dict[str, str]:
+    """Par de tokens nuevo con los claims del plan vigente del usuario."""
+    refresh = aplicar_claims_plan(RefreshToken.for_user(usuario), usuario)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+class PlanSolicitante:
+    """Plan del usuario que hace la petición, resuelto desde el token o la BD."""
+
+    __slots__ = ('plan_actual', 'fecha_expiracion', 'permisos', 'mascara')
+
+    def __init__(self, plan_actual, fecha_expiracion, permisos: PermisosPlan, mascara: int):
+        self.plan_actual = plan_actual
+        self.fecha_expiracion = fecha_expiracion
+        self.permisos = permisos
+        self.mascara = mascara
+
+    @property
+    def tiene_plan_activo(self) -> bool:
+        return (
+            self.plan_actual != 'gratis'
+            and self.fecha_expiracion is not None
+            and self.fecha_expiracion > timezone.now()
+        )
+
+    def permite(self, feature: str) -> bool:
+        bit = _BIT.get(feature)
+        if bit is None:
+            return self.permisos.permite(feature)
+        return bool(self.mascara >> bit & 1)
+
+
+def plan_de_request(request) -> PlanSolicitante:
+    """
+    Resuelve el plan desde los claims del access token cuando están presentes
+    (sin consultar la BD); con tokens antiguos sin claims, desde el usuario.
+    """
+    token = request.auth
+    if token is not None and CLAIM_FEATURES in token:
+        plan = token[CLAIM_PLAN] or 'gratis'
+        plan_exp = token.get(CLAIM_PLAN_EXP)
+        expiracion = datetime.fromtimestamp(plan_exp, tz=dt_timezone.utc) if plan_exp else None
+
+        if plan != 'gratis' and expiracion and expiracion <= timezone.now():
+            permisos = permisos_de_plan('gratis')
+            return PlanSolicitante(plan, expiracion, permisos, mascara_features(permisos))
+        return PlanSolicitante(plan, expiracion, permisos_de_plan(plan), int(token[CLAIM_FEATURES]))
+
+    usuario = request.user
+    if not hasattr(usuario, 'plan_actual'):
+        # TokenUser de la autenticación sin estado: cargar el usuario real
+        from usuarios.models import Usuario
+        usuario = Usuario.objects.only('plan_actual', 'fecha_expiracion_plan').get(
+            **{api_settings.USER_ID_FIELD: usuario.id}
+        )
+    permisos = permisos_de_usuario(usuario)
+    return PlanSolicitante(
+        usuario.plan_actual, usuario.fecha_expiracion_plan, permisos, mascara_features(permisos)
+    )
+
+
+def resumen_plan(plan: PlanSolicitante) -> Dict[str, object]:
+    """Plan, límites y feature flags tal como los retorna /api/suscripciones/permisos/."""
+    permisos = plan.permisos
+    return {
+        'plan_actual': plan.plan_actual,
+        'plan_efectivo': permisos.plan,
+        'plan_nombre': permisos.nombre,
+        'fecha_expiracion': plan.fecha_expiracion,
+        'tiene_plan_activo': plan.tiene_plan_activo,
+        'subscriptions_enabled': SUBSCRIPTIONS_ENABLED,
+        'features': feature_flags(permisos, plan.permite),
+        'limites': dict(permisos.limites),
+        'configuracion': dict(permisos.configuracion),
+    }
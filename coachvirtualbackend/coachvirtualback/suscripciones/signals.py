@@ -0,0 +1,17 @@
+"""
+Señales del catálogo de suscripciones.
+Cualquier alta, edición o baja de planes/métodos de pago invalida el catálogo en memoria.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import MetodoPago, TipoPlan
+from .services.catalogo import invalidar_catalogo
+
+
+@receiver([post_save, post_delete], sender=TipoPlan, dispatch_uid="catalogo_tipo_plan")
+@receiver([post_save, post_delete], sender=MetodoPago, dispatch_uid="catalogo_metodo_pago")
+def catalogo_modificado(sender, **kwargs):
+    # Después del commit: antes, otro request podría reconstruir con las filas viejas
+    transaction.on_commit(invalidar_catalogo)
@@ -1,3 +1,480 @@
+"""
+Tests unitarios para el módulo de suscripciones - CoachVirtual
+Cubre el catálogo de planes en memoria, la resolución de permisos y los
+claims de plan en el JWT, el checkout async de Stripe, la cola de eventos del
+webhook de Stripe, la expiración de suscripciones en lote y la medición del
+consumo diario con contadores en cache.
+"""
+import builtins
+from datetime import timedelta
+from unittest import mock
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import TipoPlan, MetodoPago, HistorialSuscripcion, StripeEvent
+from .services.catalogo import obtener_catalogo, invalidar_catalogo
+from .services.permisos import permisos_de_plan, permisos_de_usuario
+from .services.tokens import FEATURE_BITS, emitir_tokens
+from .services import consumo, stripe_eventos
+from .services.expiracion import expirar_suscripciones
+
+User = get_user_model()
+
+
+class CatalogoPlanesTest(APITestCase):
+    """Tests para el catálogo de planes y métodos de pago en memoria"""
+
+    def setUp(self):
+        invalidar_catalogo()
+        self.basico = TipoPlan.objects.create(
+            nombre='Básico', clave='basico', precio=25, minutos_por_dia=45, feedback_voz=True
+        )
+        TipoPlan.objects.create(nombre='Oculto', clave='oculto', activo=False)
+        MetodoPago.objects.create(nombre='Stripe', clave='stripe')
+
+    def test_listado_sin_consultas_repetidas(self):
+        """Test: El listado se sirve desde memoria tras la primera carga"""
+        self.client.get('/api/suscripciones/tipos-plan/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/suscripciones/tipos-plan/')
+            self.client.get('/api/suscripciones/metodos-pago/')
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['planes'][0]['clave'], 'basico')
+
+    def test_listado_incluye_inactivos(self):
+        """Test: ?activos=false devuelve todos los planes"""
+        response = self.client.get('/api/suscripciones/tipos-plan/', {'activos': 'false'})
+        self.assertEqual(response.data['total'], 2)
+
+    def test_get_condicional(self):
+        """Test: Con el ETag vigente se responde 304 y tras editar cambia"""
+        response = self.client.get('/api/suscripciones/tipos-plan/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get('/api/suscripciones/tipos-plan/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/api/suscripciones/metodos-pago/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basico.precio = 30
+            self.basico.save()
+        response = self.client.get('/api/suscripciones/tipos-plan/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalidacion_en_crud(self):
+        """Test: Editar un plan invalida el catálogo al confirmar la transacción"""
+        obtener_catalogo()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basico.precio = 30
+            self.basico.save()
+            # Antes del commit se sigue sirviendo el catálogo anterior
+            self.assertNotEqual(obtener_catalogo().planes_por_clave['basico']['precio'], 30.0)
+        self.assertEqual(obtener_catalogo().planes_por_clave['basico']['precio'], 30.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MetodoPago.objects.filter(clave='stripe').first().delete()
+        self.assertEqual(obtener_catalogo().listar_metodos(), ())
+
+
+class PermisosPlanTest(APITestCase):
+    """Tests para la resolución de permisos por plan"""
+
+    def setUp(self):
+        invalidar_catalogo()
+        self.user = User.objects.create_user(
+            username='plan', email='plan@coachvirtual.com', password='testpass123'
+        )
+
+    def test_permisos_desde_config(self):
+        """Test: Permisos congelados a partir de PLANES"""
+        premium = permisos_de_plan('premium')
+        self.assertTrue(premium.permite('analisis_angulos'))
+        self.assertEqual(premium.limite('minutos_por_dia'), -1)
+        self.assertFalse(permisos_de_plan('gratis').permite('feedback_voz'))
+        self.assertEqual(permisos_de_plan('desconocido').plan, 'gratis')
+        with self.assertRaises(Exception):
+            premium.plan = 'gratis'
+
+    def test_tipo_plan_sobrescribe_config(self):
+        """Test: Los valores de TipoPlan prevalecen sobre la configuración estática"""
+        TipoPlan.objects.create(nombre='Gratis+', clave='gratis', feedback_voz=True, minutos_por_dia=20)
+        gratis = permisos_de_plan('gratis')
+        self.assertTrue(gratis.permite('feedback_voz'))
+        self.assertEqual(gratis.limite('minutos_por_dia'), 20)
+        self.assertEqual(gratis.nombre, 'Gratis+')
+
+    def test_plan_expirado_cuenta_como_gratis(self):
+        """Test: Un plan de pago expirado no otorga permisos"""
+        self.user.plan_actual = 'premium'
+        self.user.fecha_expiracion_plan = timezone.now() - timedelta(days=1)
+        self.assertEqual(permisos_de_usuario(self.user).plan, 'gratis')
+
+        self.user.fecha_expiracion_plan = timezone.now() + timedelta(days=1)
+        self.assertEqual(permisos_de_usuario(self.user).plan, 'premium')
+
+    def test_endpoint_permisos(self):
+        """Test: GET /api/suscripciones/permisos/ devuelve todos los flags"""
+        self.client.force_authenticate(user=self.user)
+        with mock.patch('suscripciones.services.permisos.SUBSCRIPTIONS_ENABLED', True):
+            response = self.client.get('/api/suscripciones/permisos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['plan_actual'], 'gratis')
+        self.assertFalse(response.data['features']['feedback_voz'])
+        self.assertTrue(response.data['features']['con_anuncios'])
+        self.assertEqual(response.data['limites']['minutos_por_dia'], 15)
+
+    def test_endpoint_requiere_autenticacion(self):
+        """Test: El endpoint de permisos requiere autenticación"""
+        response = self.client.get('/api/suscripciones/permisos/')
+        self.assertIn(response.status_code, [401, 403])
+
+
+class TokenPlanTest(APITestCase):
+    """Tests para los claims de plan embebidos en el JWT"""
+
+    def setUp(self):
+        invalidar_catalogo()
+        self.user = User.objects.create_user(
+            username='jwt', email='jwt@coachvirtual.com', password='testpass123'
+        )
+        self.user.plan_actual = 'premium'
+        self.user.fecha_expiracion_plan = timezone.now() + timedelta(days=30)
+        self.user.save()
+
+    def _login(self):
+        response = self.client.post(
+            '/api/token/', {'email': 'jwt@coachvirtual.com', 'password': 'testpass123'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_login_incluye_claims_de_plan(self):
+        """Test: El access token lleva plan, expiración y máscara de features"""
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        access = AccessToken(self._login()['access'])
+        self.assertEqual(access['plan'], 'premium')
+        self.assertEqual(access['plan_exp'], int(self.user.fecha_expiracion_plan.timestamp()))
+        bit = FEATURE_BITS.index('analisis_angulos')
+        self.assertTrue(access['feat'] >> bit & 1)
+
+    def test_verificar_permiso_sin_consultas(self):
+        """Test: Verificar una feature con el token no consulta la base de datos"""
+        obtener_catalogo()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._login()['access']}")
+        with mock.patch('suscripciones.controllers.suscripcion_controller.SUBSCRIPTIONS_ENABLED', True), \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/suscripciones/planes/verificar/?feature=analisis_angulos')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['permitido'])
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_refresh_actualiza_plan(self):
+        """Test: El refresh emite un access token con el plan vigente"""
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        tokens = self._login()
+        self.user.plan_actual = 'gratis'
+        self.user.fecha_expiracion_plan = None
+        self.user.save()
+
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['plan'], 'gratis')
+        self.assertIsNone(access['plan_exp'])
+
+
+@mock.patch('suscripciones.controllers.stripe.stripe.api_key', 'sk_test')
+class StripeCheckoutTest(APITestCase):
+    """Tests para las vistas async de Stripe Checkout"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='checkout', email='checkout@coachvirtual.com', password='testpass123'
+        )
+        self.premium = TipoPlan.objects.create(nombre='Premium', clave='premium', precio=49)
+        self.stripe = mock.Mock()
+        self.stripe.v1.checkout.sessions.create_async = mock.AsyncMock(
+            return_value=mock.Mock(id='cs_async_1', url='https://checkout.stripe.test/cs_async_1')
+        )
+        patcher = mock.patch('suscripciones.controllers.stripe.cliente_stripe', return_value=self.stripe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_checkout_crea_historial_pendiente(self):
+        """Test: El checkout async registra el pago pendiente con la sesión de Stripe"""
+        token = emitir_tokens(self.user)['access']
+        response = self.client.post(
+            '/api/suscripciones/stripe/checkout/', {'plan': 'premium'}, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['session_id'], 'cs_async_1')
+        historial = HistorialSuscripcion.objects.get(id=response.json()['historial_id'])
+        self.assertEqual(historial.referencia_pago, 'cs_async_1')
+        self.assertEqual(historial.estado_pago, 'pendiente')
+        params = self.stripe.v1.checkout.sessions.create_async.call_args.kwargs['params']
+        self.assertEqual(params['line_items'][0]['price_data']['unit_amount'], 4900)
+
+    def test_checkout_sin_token(self):
+        """Test: Sin JWT no se llama a Stripe"""
+        response = self.client.post('/api/suscripciones/stripe/checkout/', {'plan': 'premium'}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.stripe.v1.checkout.sessions.create_async.assert_not_called()
+
+
+@mock.patch('suscripciones.controllers.stripe_webhook.STRIPE_WEBHOOK_SECRET', '')
+@mock.patch('suscripciones.services.stripe_eventos.STRIPE_WEBHOOK_WORKER', False)
+class StripeWebhookTest(APITestCase):
+    """Tests para el webhook de Stripe idempotente y encolado"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='stripe', email='stripe@coachvirtual.com', password='testpass123'
+        )
+        self.historial = HistorialSuscripcion.objects.create(
+            usuario=self.user, plan='premium', monto_pagado=49, metodo_pago='stripe',
+            referencia_pago='cs_test_1', fecha_expiracion=timezone.now() + timedelta(days=30),
+        )
+
+    def _evento(self, event_id='evt_1', tipo='checkout.session.completed', objeto=None):
+        objeto = objeto or {
+            'id': 'cs_test_1',
+            'subscription': 'sub_test_1',
+            'customer_email': 'stripe@coachvirtual.com',
+            'metadata': {'plan': 'premium', 'historial_id': str(self.historial.id)},
+        }
+        return {'id': event_id, 'type': tipo, 'data': {'object': objeto}}
+
+    def _post(self, evento):
+        return self.client.post('/api/suscripciones/stripe/webhook/', evento, format='json')
+
+    def test_webhook_encola_sin_procesar(self):
+        """Test: El webhook responde 200 y solo registra el evento"""
+        response = self._post(self._evento())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StripeEvent.objects.get(event_id='evt_1').estado, 'pendiente')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.plan_actual, 'gratis')
+
+    def test_evento_duplicado_no_se_encola(self):
+        """Test: Los reintentos de Stripe con el mismo event.id no duplican trabajo"""
+        self._post(self._evento())
+        self._post(self._evento())
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(stripe_eventos.procesar_pendientes(), 1)
+        self.assertEqual(stripe_eventos.procesar_pendientes(), 0)
+
+    def test_worker_activa_plan_y_elimina_por_id_exacto(self):
+        """Test: El worker activa el plan y la cancelación busca por ID de suscripción exacto"""
+        self._post(self._evento())
+        stripe_eventos.procesar_pendientes()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.plan_actual, 'premium')
+        self.historial.refresh_from_db()
+        self.assertEqual(self.historial.stripe_subscription_id, 'sub_test_1')
+
+        self._post(self._evento('evt_2', 'customer.subscription.deleted', {'id': 'sub_test_1'}))
+        stripe_eventos.procesar_pendientes()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.plan_actual, 'gratis')
+
+    def test_error_reprograma_con_backoff(self):
+        """Test: Un handler que falla deja el evento pendiente con backoff"""
+        self._post(self._evento())
+        with mock.patch.dict(stripe_eventos.HANDLERS, {'checkout.session.completed': mock.Mock(side_effect=RuntimeError('boom'))}):
+            stripe_eventos.procesar_pendientes()
+        evento = StripeEvent.objects.get(event_id='evt_1')
+        self.assertEqual(evento.estado, 'pendiente')
+        self.assertEqual(evento.intentos, 1)
+        self.assertIn('boom', evento.ultimo_error)
+        self.assertGreater(evento.proximo_intento, timezone.now())
+        # No se reintenta antes de tiempo
+        self.assertEqual(stripe_eventos.procesar_pendientes(), 0)
+
+
+class ExpirarSuscripcionesTest(TestCase):
+    """Tests para el comando expire_subscriptions"""
+
+    def _usuario(self, email, plan, dias):
+        usuario = User.objects.create_user(username=email.split('@')[0], email=email, password='testpass123')
+        usuario.plan_actual = plan
+        usuario.fecha_expiracion_plan = timezone.now() + timedelta(days=dias)
+        usuario.save()
+        HistorialSuscripcion.objects.create(
+            usuario=usuario, plan=plan, activo=True, estado_pago='confirmado',
+            fecha_expiracion=usuario.fecha_expiracion_plan,
+        )
+        return usuario
+
+    def test_expira_solo_vencidas(self):
+        """Test: Desactiva historiales vencidos y degrada usuarios en lotes"""
+        vencidos = [self._usuario(f'v{i}@coachvirtual.com', 'premium', -1) for i in range(3)]
+        vigente = self._usuario('ok@coachvirtual.com', 'basico', 10)
+
+        salida = StringIO()
+        call_command('expire_subscriptions', '--lote', '2', stdout=salida)
+
+        self.assertIn('Historiales desactivados: 3', salida.getvalue())
+        self.assertIn('Usuarios regresados a gratis: 3', salida.getvalue())
+        for usuario in vencidos:
+            usuario.refresh_from_db()
+            self.assertEqual(usuario.plan_actual, 'gratis')
+            self.assertIsNone(usuario.fecha_expiracion_plan)
+        vigente.refresh_from_db()
+        self.assertEqual(vigente.plan_actual, 'basico')
+        self.assertEqual(HistorialSuscripcion.objects.filter(activo=True).count(), 1)
+
+    def test_segunda_ejecucion_no_hace_nada(self):
+        """Test: El comando es idempotente"""
+        self._usuario('v@coachvirtual.com', 'premium', -1)
+        call_command('expire_subscriptions', stdout=StringIO())
+        salida = StringIO()
+        call_command('expire_subscriptions', stdout=salida)
+        self.assertIn('Historiales desactivados: 0', salida.getvalue())
+        self.assertIn('Usuarios regresados a gratis: 0', salida.getvalue())
+
+    def test_renovacion_entre_select_y_update(self):
+        """Test: Un usuario que renueva después del SELECT de ids no se degrada"""
+        usuario = self._usuario('r@coachvirtual.com', 'premium', -1)
+        nueva_expiracion = timezone.now() + timedelta(days=30)
+
+        def listar_y_renovar(consulta):
+            ids = builtins.list(consulta)
+            if consulta.model is User:
+                User.objects.filter(pk=usuario.pk).update(fecha_expiracion_plan=nueva_expiracion)
+            return ids
+
+        with mock.patch('suscripciones.services.expiracion.list', create=True, side_effect=listar_y_renovar):
+            resultado = expirar_suscripciones()
+        self.assertEqual(resultado['usuarios'], 0)
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.plan_actual, 'premium')
+        self.assertEqual(usuario.fecha_expiracion_plan, nueva_expiracion)
+
+
+@mock.patch('suscripciones.services.consumo.CONSUMO_VOLCADO_HILO', False)
+class ConsumoDiarioTest(APITestCase):
+    """Tests de la medición de minutos por latidos y del límite diario del plan"""
+
+    def setUp(self):
+        cache.clear()
+        consumo.volcar_consumo()
+        invalidar_catalogo()
+        self.user = User.objects.create_user(username='consumo', email='consumo@coachvirtual.com', password='x')
+        self.client.force_authenticate(user=self.user)
+        self.ahora = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def _latido(self, minuto=0, usuario=None):
+        with mock.patch('suscripciones.services.consumo.timezone.localtime',
+                        return_value=self.ahora + timedelta(minutes=minuto)):
+            return consumo.registrar_latido(usuario or self.user)
+
+    def test_un_minuto_por_minuto_de_reloj(self):
+        """Test: Latidos repetidos en el mismo minuto cuentan una sola vez"""
+        self._latido(0)
+        self._latido(0)
+        estado = self._latido(1)
+        self.assertEqual(estado['minutos_usados'], 2)
+
+    @mock.patch('suscripciones.services.consumo._cache_atomica', return_value=True)
+    def test_latido_no_escribe_en_la_bd(self, _):
+        """Test: Con cache atómica un latido solo toca la cache; la fila se escribe en el volcado por lotes"""
+        with self.assertNumQueries(0):
+            for minuto in range(3):
+                self._latido(minuto)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.minutos_usados_hoy, 0)
+
+        otro = User.objects.create_user(username='otro', email='otro@coachvirtual.com', password='x')
+        self._latido(0, usuario=otro)
+        with self.assertNumQueries(1):
+            self.assertEqual(consumo.volcar_consumo(), 2)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.minutos_usados_hoy, self.user.ultima_sesion), (3, self.ahora.date()))
+
+    def test_reinicio_diario_implicito(self):
+        """Test: Los minutos de otro día guardados en la fila no cuentan hoy"""
+        self.user.minutos_usados_hoy = 40
+        self.user.ultima_sesion = self.ahora.date() - timedelta(days=1)
+        self.assertEqual(consumo.minutos_usados(self.user), 0)
+
+    @mock.patch('suscripciones.services.consumo._cache_atomica', return_value=True)
+    def test_recupera_contador_perdido(self, _):
+        """Test: Si la cache pierde el contador se continúa desde la fila del usuario"""
+        self.user.minutos_usados_hoy = 5
+        self.user.ultima_sesion = self.ahora.date()
+        self.assertEqual(self._latido(0)['minutos_usados'], 6)
+
+    def test_sin_cache_atomica_cuenta_en_la_bd(self):
+        """Test: Con la cache en archivos/memoria el minuto se suma en la fila, no en la cache"""
+        self._latido(0)
+        self._latido(1)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.minutos_usados_hoy, self.user.ultima_sesion), (2, self.ahora.date()))
+        self.assertIsNone(cache.get(f'consumo:{self.user.pk}:{self.ahora.date().isoformat()}'))
+        self.assertEqual(consumo.volcar_consumo(), 0)
+
+    @mock.patch('suscripciones.services.consumo._cache_atomica', return_value=True)
+    def test_volcado_por_hilo_y_al_salir(self, _):
+        """Test: Los pendientes se vuelcan desde un hilo periódico y al terminar el proceso"""
+        with mock.patch('suscripciones.services.consumo.CONSUMO_VOLCADO_HILO', True), \
+                mock.patch('suscripciones.services.consumo._volcador', None), \
+                mock.patch('suscripciones.services.consumo.threading.Thread') as hilo:
+            self._latido(0)
+        hilo.assert_called_once_with(target=consumo._loop_volcador, name='consumo-volcador', daemon=True)
+        hilo.return_value.start.assert_called_once()
+
+        consumo._volcar_al_salir()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.minutos_usados_hoy, 1)
+
+    def test_limite_del_plan(self):
+        """Test: Con el límite de TipoPlan alcanzado no se cuenta más y puede_entrenar es False"""
+        TipoPlan.objects.create(nombre='Gratis', clave='gratis', minutos_por_dia=2)
+        with mock.patch('suscripciones.services.consumo.SUBSCRIPTIONS_ENABLED', True):
+            self.assertTrue(self.user.puede_entrenar)
+            self._latido(0)
+            estado = self._latido(1)
+            self.assertEqual(estado['minutos_restantes'], 0)
+            self.assertFalse(self.user.puede_entrenar)
+            self.assertEqual(self._latido(2)['minutos_usados'], 2)
+
+            response = self.client.post('/api/suscripciones/consumo/latido/')
+            self.assertEqual(response.status_code, 403)
+            self.assertFalse(response.data['puede_entrenar'])
+
+    def test_sin_sistema_de_planes_no_hay_limite(self):
+        """Test: Con SUBSCRIPTIONS_ENABLED apagado se mide pero no se limita"""
+        response = self.client.post('/api/suscripciones/consumo/latido/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['limite_minutos'], -1)
+        self.assertTrue(response.data['puede_entrenar'])
 
-# Create your tests here.
+    def test_alerta_de_limite_usa_consumo_del_servidor(self):
+        """Test: exercise-limit ignora los minutos enviados por el cliente"""
+        with mock.patch('suscripciones.services.consumo.SUBSCRIPTIONS_ENABLED', True):
+            for minuto in range(12):
+                self._latido(minuto)
+            response = self.client.post('/api/alertas/exercise-limit/', {
+                'current_minutes': 0, 'limit_minutes': 1000,
+            }, format='json')
+        self.assertEqual(response.data['current_minutes'], 12)
+        self.assertEqual(response.data['limit_minutes'], 15)
+        self.assertEqual(response.data['remaining_minutes'], 3)
+        self.assertTrue(response.data['alert_created'])
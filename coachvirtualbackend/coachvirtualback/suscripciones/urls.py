@@ -2,6 +2,7 @@ from django.urls import path
 from .controllers.suscripcion_controller import (
     PlanesDisponiblesVista, PlanActualVista, 
     VerificarPermisoVista, ActualizarPlanVista,
+    PermisosVista,
 )
 from .controllers.plan_crud_controller import (
     ListarPlanesVista,
@@ -16,6 +17,7 @@ from .controllers.stripe import (
     cancelar_suscripcion,
 )
 from .controllers.stripe_webhook import stripe_webhook
+from .controllers.consumo_controller import ConsumoVista, LatidoConsumoVista
 from .controllers.catalogo_controller import (
     ListarTiposPlanVista,
     CrearTipoPlanVista,
@@ -34,6 +36,11 @@ urlpatterns = [
     path('planes/actual/', PlanActualVista.as_view(), name='plan-actual'),
     path('planes/verificar/', VerificarPermisoVista.as_view(), name='verificar-permiso'),
     path('planes/actualizar/', ActualizarPlanVista.as_view(), name='actualizar-plan'),
+    path('permisos/', PermisosVista.as_view(), name='permisos'),
+    
+    # Consumo diario (minutos de entrenamiento)
+    path('consumo/', ConsumoVista.as_view(), name='consumo'),
+    path('consumo/latido/', LatidoConsumoVista.as_view(), name='consumo-latido'),
     
     # CRUD de Planes (nuevo sistema)
     path('planes/lista/', ListarPlanesVista.as_view(), name='planes-lista'),
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from core.paginacion import ConteoEstimadoPaginator
 from .models import (
     Usuario,
     Plan,
@@ -21,9 +22,16 @@ from .models import (
 
 @admin.register(Usuario)
 class UsuarioAdmin(admin.ModelAdmin):
-    list_display = ["username", "first_name", "last_name", "email"]
-    list_filter = ["is_staff", "is_active"]
-    search_fields = ["username", "first_name", "last_name", "email"]
+    list_display = ["email", "username", "first_name", "last_name", "plan_actual", "fecha_expiracion_plan", "is_active"]
+    list_filter = ["plan_actual", "is_staff", "is_active"]
+    # icontains sobre columnas con índice trigram (migración 0008)
+    search_fields = ["email", "username", "first_name", "last_name"]
+    # Ordenar solo por columnas indexadas; sin COUNT(*) de la tabla completa
+    sortable_by = ["email", "fecha_expiracion_plan"]
+    ordering = ("-id",)
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+    list_per_page = 50
 
 
 @admin.register(Plan)
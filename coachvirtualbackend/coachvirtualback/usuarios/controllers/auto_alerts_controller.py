@@ -10,6 +10,9 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import api_view, permission_classes
 from django.utils import timezone
 
+from rutinas.models import SesionEntrenamiento
+from rutinas.services.estadisticas import registrar_sesion
+from suscripciones.services.consumo import estado_consumo
 from ..services.notification_engine import NotificationEngine, run_notifications_for_all_users
 
 
@@ -36,24 +39,43 @@ class NotifyRoutineCompleteVista(APIView):
     """
     POST /api/alertas/routine-complete/
     Notifica que se completó una rutina.
-    Body: { "routine_name": "Día 1: Pecho", "duration_minutes": 45 }
+    Body: { "routine_name": "Día 1: Pecho", "duration_minutes": 45, "sesion_id": 12 }
+    Sin `sesion_id` registra la sesión (y actualiza el progreso); con él, la
+    sesión ya se registró en /api/rutinas/sesiones/ y no se vuelve a contar.
     """
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
         routine_name = request.data.get('routine_name', 'Rutina')
-        duration = int(request.data.get('duration_minutes', 30))
+        try:
+            duration = int(request.data.get('duration_minutes', 30))
+            sesion_id = request.data.get('sesion_id')
+            sesion_id = int(sesion_id) if sesion_id else None
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'duration_minutes y sesion_id deben ser enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if sesion_id is not None:
+            if not SesionEntrenamiento.objects.filter(pk=sesion_id, usuario=request.user).exists():
+                return Response({'error': 'Sesión no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            registrar_sesion(request.user.id, duracion_minutos=duration, notas=routine_name)
         
         engine = NotificationEngine(request.user)
         alert = engine.notify_routine_completion(routine_name, duration)
         
-        # También verificar hitos de progreso
-        # TODO: Contar rutinas completadas del usuario
+        # Hitos de progreso y de racha, desde el resumen precalculado
+        achievements = engine.check_session_milestones()
         
         return Response({
             'success': True,
             'alert_created': alert is not None,
             'message': alert.mensaje if alert else 'Ya notificado recientemente',
+            'achievements': [a.mensaje for a in achievements],
+            'total_routines': engine.progress['total_entrenamientos'],
+            'streak_days': engine.progress['racha_dias'],
         }, status=status.HTTP_200_OK)
 
 
@@ -61,22 +83,24 @@ class NotifyExerciseLimitVista(APIView):
     """
     POST /api/alertas/exercise-limit/
     Verifica y notifica si se está acercando al límite de ejercicio.
-    Body: { "current_minutes": 55, "limit_minutes": 60 }
+    Los minutos usados y el límite salen del consumo medido en el servidor
+    (suscripciones.services.consumo); el body ya no se usa.
     """
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        current = int(request.data.get('current_minutes', 0))
-        limit = int(request.data.get('limit_minutes', 60))
+        consumo = estado_consumo(request.user)
         
         engine = NotificationEngine(request.user)
-        alert = engine.check_exercise_time_limit(current, limit)
+        alert = engine.check_exercise_time_limit(consumo['minutos_usados'], consumo['limite_minutos'])
         
         return Response({
             'success': True,
             'alert_created': alert is not None,
             'message': alert.mensaje if alert else None,
-            'remaining_minutes': max(0, limit - current),
+            'current_minutes': consumo['minutos_usados'],
+            'limit_minutes': consumo['limite_minutos'],
+            'remaining_minutes': consumo['minutos_restantes'],
         }, status=status.HTTP_200_OK)
 
 
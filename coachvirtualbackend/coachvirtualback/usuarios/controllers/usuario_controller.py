@@ -1,11 +1,21 @@
+from datetime import datetime, time
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from core.paginacion import PaginacionEstandar
 from ..models import Usuario
 from ..serializers import UsuarioSerializer
 
+
+# Solo columnas con índice (ver Usuario.Meta); `id` desempata
+ORDENES_USUARIOS = {"id", "email", "date_joined", "fecha_expiracion_plan"}
+
 # ⬇️ NUEVO: endpoint para traer el usuario autenticado con flags
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
@@ -25,9 +35,52 @@ class UsuarioListaCrearVista(APIView):
                 {"detail": "No tienes permiso para ver la lista de usuarios."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        usuarios = Usuario.objects.all().order_by("id")
-        serializer = UsuarioSerializer(usuarios, many=True)
-        return Response(serializer.data)
+
+        # ?q= busca en email/usuario/nombres (índices trigram en PostgreSQL)
+        usuarios = Usuario.objects.all()
+        q = request.query_params.get("q", "").strip()
+        if q:
+            usuarios = usuarios.filter(
+                Q(email__icontains=q) | Q(username__icontains=q)
+                | Q(first_name__icontains=q) | Q(last_name__icontains=q)
+            )
+        # ?ids=1,2,3 trae usuarios puntuales (p. ej. los destinatarios de las alertas en pantalla)
+        ids = request.query_params.get("ids")
+        if ids:
+            try:
+                usuarios = usuarios.filter(id__in=[int(i) for i in ids.split(",") if i.strip()])
+            except ValueError:
+                return Response({"error": "ids debe ser una lista de enteros separados por coma"}, status=status.HTTP_400_BAD_REQUEST)
+        plan = request.query_params.get("plan")
+        if plan:
+            usuarios = usuarios.filter(plan_actual=plan)
+        expira_antes = request.query_params.get("expira_antes")
+        if expira_antes:
+            try:
+                fecha = parse_date(expira_antes)
+            except ValueError:
+                fecha = None
+            if fecha is None:
+                return Response({"error": "expira_antes debe ser YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+            # Rango sobre la columna (no __date) para que use el índice
+            inicio = timezone.make_aware(datetime.combine(fecha, time.min))
+            usuarios = usuarios.filter(fecha_expiracion_plan__lt=inicio)
+
+        orden = request.query_params.get("orden", "id")
+        if orden.lstrip("-") not in ORDENES_USUARIOS:
+            return Response(
+                {"error": f"orden debe ser uno de: {', '.join(sorted(ORDENES_USUARIOS))} (con - para descendente)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if orden.lstrip("-") != "id":
+            usuarios = usuarios.order_by(orden, "-id" if orden.startswith("-") else "id")
+        else:
+            usuarios = usuarios.order_by(orden)
+
+        paginador = PaginacionEstandar()
+        pagina = paginador.paginate_queryset(usuarios, request, view=self)
+        serializer = UsuarioSerializer(pagina, many=True)
+        return paginador.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = UsuarioSerializer(data=request.data)
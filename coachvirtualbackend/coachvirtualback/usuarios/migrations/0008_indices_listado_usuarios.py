@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:34
+
+from django.db import migrations, models
+
+
+# icontains en PostgreSQL compara UPPER(col::text) LIKE UPPER(%s); los índices
+# usan la misma expresión para que el planificador los tome.
+CAMPOS_BUSQUEDA = ('email', 'username', 'first_name', 'last_name')
+
+
+def crear_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for campo in CAMPOS_BUSQUEDA:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS usuarios_{campo}_trgm_idx ON usuarios_usuario '
+            f'USING gin ((UPPER({campo}::text)) gin_trgm_ops)'
+        )
+
+
+def borrar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for campo in CAMPOS_BUSQUEDA:
+        schema_editor.execute(f'DROP INDEX IF EXISTS usuarios_{campo}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0007_usuario_fecha_expiracion_plan_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['plan_actual', 'id'], name='usuarios_plan_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['fecha_expiracion_plan'], name='usuarios_expiracion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['date_joined'], name='usuarios_date_joined_idx'),
+        ),
+        migrations.RunPython(crear_indices_trigram, borrar_indices_trigram),
+    ]
@@ -32,6 +32,15 @@ class Usuario(AbstractUser):
     minutos_usados_hoy = models.IntegerField(default=0, help_text='Minutos de entrenamiento usados hoy')
     ultima_sesion = models.DateField(null=True, blank=True, help_text='Última fecha de entrenamiento')
 
+    class Meta(AbstractUser.Meta):
+        # Filtros y ordenamientos del listado de usuarios (API y admin). La
+        # búsqueda por email/nombres usa índices trigram creados en la migración 0008.
+        indexes = [
+            models.Index(fields=['plan_actual', 'id'], name='usuarios_plan_id_idx'),
+            models.Index(fields=['fecha_expiracion_plan'], name='usuarios_expiracion_idx'),
+            models.Index(fields=['date_joined'], name='usuarios_date_joined_idx'),
+        ]
+
     def __str__(self):
         return self.email
     
@@ -47,9 +56,9 @@ class Usuario(AbstractUser):
     
     @property
     def puede_entrenar(self):
-        """Verifica si el usuario puede entrenar según su plan y límites"""
-        # TODO: Implementar lógica de límites cuando se active el sistema
-        return True  # Por ahora siempre True
+        """Verifica si el usuario puede entrenar según su plan y los minutos usados hoy"""
+        from suscripciones.services.consumo import puede_entrenar
+        return puede_entrenar(self)
 
 
 class Plan(models.Model):
@@ -1,4 +1,8 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from suscripciones.services.tokens import aplicar_claims_plan
 from .models import Usuario, Alertas
 
 
@@ -67,3 +71,27 @@ class AlertasSerializer(serializers.ModelSerializer):
             else:
                 validated_data["usuario"] = request.user
         return super().create(validated_data)
+
+
+class TokenPlanObtainPairSerializer(TokenObtainPairSerializer):
+    """Login JWT: agrega los claims del plan (plan, plan_exp, feat) al par de tokens."""
+
+    @classmethod
+    def get_token(cls, user):
+        return aplicar_claims_plan(super().get_token(user), user)
+
+
+class TokenPlanRefreshSerializer(TokenRefreshSerializer):
+    """Refresh JWT: vuelve a leer el plan del usuario para que el access token no quede desactualizado."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        usuario = (
+            Usuario.objects.only("plan_actual", "fecha_expiracion_plan")
+            .filter(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]})
+            .first()
+        )
+        if usuario is not None:
+            data["access"] = str(aplicar_claims_plan(access, usuario))
+        return data
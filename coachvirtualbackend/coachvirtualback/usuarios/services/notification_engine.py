@@ -15,6 +15,8 @@ from django.db.models import Count, Max
 from typing import List, Dict, Any, Optional
 import random
 
+from core import metricas
+from rutinas.services.estadisticas import progreso_de_usuario
 from ..models import Usuario, Alertas
 
 
@@ -56,8 +58,22 @@ class NotificationEngine:
         '100_routines': "👑 ¡100 rutinas! ¡Leyenda del fitness!",
     }
     
+    # Hitos de racha (días consecutivos) -> clave en ACHIEVEMENT_MESSAGES
+    STREAK_MILESTONES = {
+        7: 'week_streak',
+        30: 'month_streak',
+    }
+    
     def __init__(self, user: Usuario):
         self.user = user
+        self._progress = None
+    
+    @property
+    def progress(self) -> Dict[str, Any]:
+        """Resumen de progreso precalculado (rutinas.EstadisticasUsuario), leído una vez."""
+        if self._progress is None:
+            self._progress = progreso_de_usuario(self.user)
+        return self._progress
     
     def _create_alert(self, mensaje: str, tipo: str = 'motivation', 
                       estado: bool = True, **extra) -> Optional[Alertas]:
@@ -190,14 +206,11 @@ class NotificationEngine:
     
     def check_inactivity(self, days_inactive: int = 3) -> Optional[Alertas]:
         """Alerta si no ha habido actividad en X días."""
-        # Verificar última actividad (última alerta de rutina completada)
-        last_activity = Alertas.objects.filter(
-            usuario=self.user,
-            mensaje__contains='Completaste'
-        ).order_by('-created_at').first()
+        # Última sesión completada, del resumen de progreso
+        last_activity = self.progress['ultimo_entrenamiento']
         
         if last_activity:
-            days_since = (timezone.now() - last_activity.created_at).days
+            days_since = (timezone.now() - last_activity).days
             
             if days_since >= days_inactive:
                 messages = [
@@ -228,8 +241,29 @@ class NotificationEngine:
         
         return None
     
+    def check_streak_milestone(self, streak_days: int) -> Optional[Alertas]:
+        """Verifica si la racha actual alcanzó un hito."""
+        key = self.STREAK_MILESTONES.get(streak_days)
+        if key:
+            return self._create_alert(self.ACHIEVEMENT_MESSAGES[key], tipo='achievement')
+        return None
+    
+    def check_session_milestones(self) -> List[Alertas]:
+        """Hitos de total de rutinas y de racha, tras registrar una sesión."""
+        alerts = [
+            self.check_progress_milestone(self.progress['total_entrenamientos']),
+            self.check_streak_milestone(self.progress['racha_dias']),
+        ]
+        return [a for a in alerts if a]
+    
     def run_all_checks(self) -> Dict[str, Any]:
         """Ejecuta todas las verificaciones de notificaciones."""
+        with metricas.medir('notificaciones_duracion_ms', alcance='usuario'):
+            results = self._run_all_checks()
+        metricas.registro.incrementar('notificaciones_alertas_total', results['total'])
+        return results
+    
+    def _run_all_checks(self) -> Dict[str, Any]:
         results = {
             'user': self.user.email,
             'timestamp': timezone.now().isoformat(),
@@ -256,7 +290,13 @@ class NotificationEngine:
 
 def run_notifications_for_all_users() -> Dict[str, Any]:
     """Ejecuta el motor de notificaciones para todos los usuarios activos."""
-    users = Usuario.objects.filter(is_active=True)
+    with metricas.medir('notificaciones_duracion_ms', alcance='todos'):
+        return _run_notifications_for_all_users()
+
+
+def _run_notifications_for_all_users() -> Dict[str, Any]:
+    # El resumen de progreso viene en la misma consulta (check_inactivity)
+    users = Usuario.objects.filter(is_active=True).select_related('estadisticas')
     results = {
         'timestamp': timezone.now().isoformat(),
         'users_processed': 0,
@@ -2,12 +2,20 @@
 Tests unitarios para el módulo de usuarios - CoachVirtual
 Cobertura: ~85% del módulo usuarios
 """
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Usuario
+from rutinas.models import EstadisticasUsuario, SesionEntrenamiento
+from rutinas.services.estadisticas import registrar_sesion
+from .models import Alertas, Usuario
+from .services.notification_engine import NotificationEngine
 
 User = get_user_model()
 
@@ -295,6 +303,128 @@ class ValidacionDatosUsuarioTest(TestCase):
         self.assertIn('.', user.email)
 
 
+
+class NotificacionesProgresoTest(APITestCase):
+    """Tests de hitos, racha e inactividad desde el resumen de progreso"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='progreso@test.com', username='progreso', password='x')
+        self.client.force_authenticate(self.user)
+
+    def test_rutina_completada_cuenta_y_crea_hito(self):
+        """Test: completar la primera rutina la registra y crea el logro"""
+        response = self.client.post('/api/alertas/routine-complete/', {
+            'routine_name': 'Pecho', 'duration_minutes': 40,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_routines'], 1)
+        self.assertEqual(response.data['streak_days'], 1)
+        self.assertEqual(len(response.data['achievements']), 1)
+        self.assertEqual(SesionEntrenamiento.objects.filter(usuario=self.user).count(), 1)
+
+    def test_sesion_ya_registrada_no_se_cuenta_dos_veces(self):
+        """Test: con sesion_id solo notifica, sin registrar otra sesión"""
+        sesion = registrar_sesion(self.user.id, duracion_minutos=20)
+        response = self.client.post('/api/alertas/routine-complete/', {
+            'routine_name': 'Pierna', 'duration_minutes': 20, 'sesion_id': sesion.id,
+        }, format='json')
+        self.assertEqual(response.data['total_routines'], 1)
+        self.assertEqual(SesionEntrenamiento.objects.filter(usuario=self.user).count(), 1)
+
+    def test_sesion_id_no_entero(self):
+        """Test: un sesion_id no numérico da 400 y no registra nada"""
+        response = self.client.post('/api/alertas/routine-complete/', {
+            'routine_name': 'Pierna', 'sesion_id': 'abc',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SesionEntrenamiento.objects.exists())
+
+    def test_inactividad_desde_resumen(self):
+        """Test: la inactividad usa la última sesión del resumen, no el historial de alertas"""
+        registrar_sesion(self.user.id, fecha=timezone.now() - timedelta(days=5))
+        engine = NotificationEngine(User.objects.select_related('estadisticas').get(pk=self.user.pk))
+        with self.assertNumQueries(2):  # duplicado reciente + INSERT de la alerta
+            alerta = engine.check_inactivity()
+        self.assertIsNotNone(alerta)
+
+    def test_inactividad_con_historial_solo_en_alertas(self):
+        """Test: la migración toma la última rutina completada de las alertas para quien no tiene sesiones"""
+        ultimo_desde_alertas = import_module('rutinas.migrations.0007_ultimo_entrenamiento_desde_alertas').ultimo_desde_alertas
+        otro = User.objects.create_user(email='sin-alertas@test.com', username='sin-alertas', password='x')
+        alerta = Alertas.objects.create(
+            usuario=self.user, mensaje="✅ ¡Excelente! Completaste 'Pierna' en 20 min.", fecha=timezone.now(),
+        )
+        Alertas.objects.filter(pk=alerta.pk).update(created_at=timezone.now() - timedelta(days=5))
+
+        ultimo_desde_alertas(apps, None)
+
+        self.assertFalse(EstadisticasUsuario.objects.filter(usuario=otro).exists())
+        self.assertIsNotNone(NotificationEngine(User.objects.get(pk=self.user.pk)).check_inactivity())
+
+    def test_hito_de_racha(self):
+        """Test: 7 días seguidos generan el logro de racha"""
+        hoy = timezone.now()
+        for dias in range(6, -1, -1):
+            registrar_sesion(self.user.id, fecha=hoy - timedelta(days=dias))
+        engine = NotificationEngine(self.user)
+        mensajes = [a.mensaje for a in engine.check_session_milestones()]
+        self.assertIn(NotificationEngine.ACHIEVEMENT_MESSAGES['week_streak'], mensajes)
+
+
+class UsuarioListadoTest(APITestCase):
+    """Tests del listado paginado de usuarios (solo superusuario)"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='x')
+        for i in range(5):
+            User.objects.create_user(
+                username=f'user{i}', email=f'user{i}@test.com', password='x',
+                first_name='Ana' if i % 2 else 'Luis', plan_actual='premium' if i < 2 else 'gratis',
+            )
+        self.client.force_authenticate(self.admin)
+
+    def test_listado_paginado(self):
+        """Test: la respuesta trae count/next/results con page_size"""
+        response = self.client.get('/api/usuarios/', {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_busqueda_y_filtros(self):
+        """Test: ?q busca en nombres y ?plan filtra por plan"""
+        response = self.client.get('/api/usuarios/', {'q': 'ana'})
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get('/api/usuarios/', {'plan': 'premium', 'q': 'luis'})
+        self.assertEqual([u['email'] for u in response.data['results']], ['user0@test.com'])
+
+    def test_ids(self):
+        """Test: ?ids trae solo esos usuarios y rechaza valores no numéricos"""
+        ids = list(User.objects.filter(email__in=['user1@test.com', 'user3@test.com']).values_list('id', flat=True))
+        response = self.client.get('/api/usuarios/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(sorted(u['id'] for u in response.data['results']), sorted(ids))
+        response = self.client.get('/api/usuarios/', {'ids': '1,x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_orden(self):
+        """Test: ?orden acepta solo columnas indexadas"""
+        response = self.client.get('/api/usuarios/', {'orden': '-email'})
+        emails = [u['email'] for u in response.data['results']]
+        self.assertEqual(emails, sorted(emails, reverse=True))
+        response = self.client.get('/api/usuarios/', {'orden': 'peso'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expira_antes(self):
+        """Test: ?expira_antes filtra por fecha de expiración del plan"""
+        User.objects.filter(email='user1@test.com').update(
+            fecha_expiracion_plan=timezone.now() - timedelta(days=3)
+        )
+        response = self.client.get('/api/usuarios/', {'expira_antes': timezone.localdate().isoformat()})
+        self.assertEqual([u['email'] for u in response.data['results']], ['user1@test.com'])
+        response = self.client.get('/api/usuarios/', {'expira_antes': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 # ============================================
 # RESUMEN DE COBERTURA DE TESTS - USUARIOS
 # ============================================
@@ -309,7 +439,9 @@ class ValidacionDatosUsuarioTest(TestCase):
 # - RegistroUsuarioTest: 3 tests
 # - CambioPasswordTest: 2 tests
 # - ValidacionDatosUsuarioTest: 2 tests
+# - NotificacionesProgresoTest: 4 tests
+# - UsuarioListadoTest: 5 tests
 # 
-# Total: 25 tests
+# Total: 34 tests
 # Cobertura estimada: 85%
 # ============================================
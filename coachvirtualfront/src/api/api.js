@@ -63,7 +63,15 @@ api.interceptors.request.use(async (config) => {
 
 // ---------- response: si 401, intenta refresh y reintenta UNA vez ----------
 api.interceptors.response.use(
-  (res) => res,
+  (res) => {
+    // el backend devuelve tokens nuevos cuando cambia el plan (claims del JWT)
+    const tokens = res.data?.tokens;
+    if (tokens?.access) {
+      localStorage.setItem("access_token", tokens.access);
+      if (tokens.refresh) localStorage.setItem("refresh_token", tokens.refresh);
+    }
+    return res;
+  },
   async (error) => {
     const original = error.config;
     if (error.response?.status === 401 && !original?._retry) {
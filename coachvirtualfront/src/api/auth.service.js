@@ -5,6 +5,8 @@ import api from "../api/api";
 // Persiste tokens en localStorage y siempre consulta /usuarios/me/ para obtener flags.
 
 const ME_URL = import.meta.env.VITE_ME_URL || "/usuarios/me/"; // ⬅️ por defecto
+// Arranque en una llamada: perfil, plan, consumo, alertas y fitness
+const BOOTSTRAP_URL = "/bootstrap/";
 
 let accessToken = null;
 let refreshToken = null;
@@ -80,6 +82,17 @@ export const authService = {
     }
   },
 
+  // null si falla (el llamador puede caer a me())
+  async bootstrap(campos) {
+    try {
+      const params = campos ? { campos: campos.join(",") } : undefined;
+      const { data } = await api.get(BOOTSTRAP_URL, { params });
+      return data;
+    } catch {
+      return null;
+    }
+  },
+
   async logout() {
     try { await api.post("/auth/logout/"); } catch {}
     clearTokens();
@@ -16,9 +16,18 @@ const AuthContext = createContext(null);
 
 export function AuthProvider({ children }) {
   const [user, setUser] = useState(null);
+  // Respuesta de /bootstrap/ (plan, consumo, alertas, fitness) para los demás contextos
+  const [bootstrap, setBootstrap] = useState(null);
   const [initializing, setInitializing] = useState(true);
 
-  // Restaurar sesión al cargar (token + /usuarios/me/)
+  // Perfil y datos de arranque en una llamada; /usuarios/me/ si /bootstrap/ falla
+  const cargarSesion = async () => {
+    const boot = await authService.bootstrap();
+    const me = boot?.perfil ?? (await authService.me()); // ← trae is_superuser
+    return { me: me || null, boot };
+  };
+
+  // Restaurar sesión al cargar (token + /bootstrap/)
   useEffect(() => {
     let mounted = true;
     const { accessToken } = restoreTokensFromStorage();
@@ -26,8 +35,11 @@ export function AuthProvider({ children }) {
 
     (async () => {
       try {
-        const me = await authService.me(); // ← trae is_superuser
-        if (mounted) setUser(me || null);
+        const { me, boot } = await cargarSesion();
+        if (mounted) {
+          setBootstrap(boot);
+          setUser(me);
+        }
       } catch {
         if (mounted) setUser(null);
       } finally {
@@ -38,15 +50,17 @@ export function AuthProvider({ children }) {
     return () => { mounted = false; };
   }, []);
 
-  // Login: guarda tokens y LUEGO trae /me para tener is_superuser
+  // Login: guarda tokens y LUEGO trae el perfil para tener is_superuser
   const signIn = async (email, password) => {
     await authService.login(email, password);   // guarda tokens
-    const me = await authService.me();          // perfil con is_superuser
-    setUser(me || null);
+    const { me, boot } = await cargarSesion();
+    setBootstrap(boot);
+    setUser(me);
   };
 
   const signOut = async () => {
     await authService.logout();
+    setBootstrap(null);
     setUser(null);
   };
 
@@ -54,6 +68,7 @@ export function AuthProvider({ children }) {
     user,
     isAuthenticated: !!user,
     initializing,
+    bootstrap,
     // 🔹 Helpers de rol:
     isSuper: !!user?.is_superuser,
     hasRole: (r) => !!user && (user.role === r || user?.roles?.includes?.(r)),
@@ -62,7 +77,7 @@ export function AuthProvider({ children }) {
     signIn,
     signOut,
     setUser,
-  }), [user, initializing]);
+  }), [user, initializing, bootstrap]);
 
   return <AuthContext.Provider value={value}>{children}</AuthContext.Provider>;
 }
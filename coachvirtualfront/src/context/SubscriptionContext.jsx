@@ -54,24 +54,30 @@ export const PLANES = {
 };
 
 export function SubscriptionProvider({ children }) {
-  const { user } = useAuth();
+  const { user, bootstrap } = useAuth();
   const [planActual, setPlanActual] = useState(null);
   const [subscriptionsEnabled, setSubscriptionsEnabled] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    if (user) {
+    if (user && bootstrap?.plan) {
+      // Ya vino con /bootstrap/ (mismo formato que /suscripciones/permisos/)
+      setPlanActual(bootstrap.plan);
+      setSubscriptionsEnabled(bootstrap.plan.subscriptions_enabled || false);
+      setLoading(false);
+    } else if (user) {
       cargarPlanActual();
     } else {
       setLoading(false);
     }
-  }, [user]);
+  }, [user, bootstrap]);
 
   const cargarPlanActual = async () => {
     try {
       setError(null);
-      const response = await api.get('/suscripciones/planes/actual/');
+      // Plan, límites y todos los feature flags en una sola llamada
+      const response = await api.get('/suscripciones/permisos/');
 
       if (response.data) {
         setPlanActual(response.data);
@@ -97,6 +103,10 @@ export function SubscriptionProvider({ children }) {
 
     if (!planActual) return false;
 
+    if (planActual.features && feature in planActual.features) {
+      return planActual.features[feature] === true;
+    }
+
     const config = planActual.configuracion || PLANES.gratis;
     return config[feature] === true || config[feature] === -1;
   };
@@ -25,12 +25,20 @@ const toInputDateTime = (iso) => {
 // <input datetime-local> -> "YYYY-MM-DDTHH:mm:ss"
 const fromInputDateTime = (val) => (!val ? "" : `${val}:00`);
 
+const userOptionLabel = (u) =>
+  `${u.email || u.username}${
+    u.first_name || u.last_name ? ` (${u.first_name ?? ""} ${u.last_name ?? ""})` : ""
+  }`;
+
+const BUSQUEDA_DEBOUNCE_MS = 300;
+
 class Alerta extends Component {
   state = {
     form: { id: null, mensaje: "", fecha: "", usuario: "" },
     items: [],
-    users: [],
-    usersById: {},
+    users: [],       // resultados de la búsqueda (opciones del select)
+    usersById: {},   // usuarios ya conocidos: etiquetas del listado y del select
+    userQuery: "",
     loadingList: false,
     loadingUsers: false,
     loadingSave: false,
@@ -46,9 +54,16 @@ class Alerta extends Component {
     pageSize: 5,    // 5 en 5
   };
 
+  searchTimer = null;
+  searchSeq = 0;
+
   componentDidMount() {
     this.loadList();
-    this.loadUsers();
+    this.searchUsers("");
+  }
+
+  componentWillUnmount() {
+    clearTimeout(this.searchTimer);
   }
 
   componentDidUpdate(prevProps, prevState) {
@@ -95,6 +110,7 @@ class Alerta extends Component {
         return (b.id || 0) - (a.id || 0);
       });
       this.setState({ items: sorted, loadingList: false }, this.ensurePageInRange);
+      this.loadUserLabels(sorted);
     } catch (err) {
       const msg =
         err?.response?.data?.detail ||
@@ -104,14 +120,43 @@ class Alerta extends Component {
     }
   };
 
-  loadUsers = async () => {
+  rememberUsers = (users) => {
+    this.setState((prev) => {
+      const usersById = { ...prev.usersById };
+      (users || []).forEach((u) => (usersById[u.id] = u));
+      return { usersById };
+    });
+  };
+
+  // Etiquetas de los destinatarios de las alertas que todavía no conocemos
+  loadUserLabels = async (items) => {
+    const { usersById } = this.state;
+    const ids = [
+      ...new Set(
+        items
+          .map((row) => row.usuario)
+          .filter((id) => id != null && typeof id !== "object" && !usersById[id])
+      ),
+    ];
+    if (ids.length === 0) return;
+    try {
+      this.rememberUsers(await AlertaService.getUsersByIds(ids));
+    } catch {
+      // Sin etiqueta el listado muestra el id del usuario
+    }
+  };
+
+  // Búsqueda del select (?q=); descarta respuestas de búsquedas anteriores
+  searchUsers = async (q) => {
+    const seq = ++this.searchSeq;
     this.setState({ loadingUsers: true, errorUsers: null });
     try {
-      const users = await AlertaService.listUsers();
-      const usersById = {};
-      (users || []).forEach((u) => (usersById[u.id] = u));
-      this.setState({ users, usersById, loadingUsers: false });
+      const users = await AlertaService.searchUsers(q);
+      if (seq !== this.searchSeq) return;
+      this.setState({ users, loadingUsers: false });
+      this.rememberUsers(users);
     } catch (err) {
+      if (seq !== this.searchSeq) return;
       const msg =
         err?.response?.data?.detail ||
         err?.message ||
@@ -120,6 +165,16 @@ class Alerta extends Component {
     }
   };
 
+  handleUserQuery = (e) => {
+    const userQuery = e.target.value;
+    this.setState({ userQuery });
+    clearTimeout(this.searchTimer);
+    this.searchTimer = setTimeout(
+      () => this.searchUsers(userQuery.trim()),
+      BUSQUEDA_DEBOUNCE_MS
+    );
+  };
+
   // ====== Form ======
   handleChange = (e) => {
     const { name, value } = e.target;
@@ -268,13 +323,27 @@ class Alerta extends Component {
   }
 
   renderUserSelect() {
-    const { users, form, errorsByField, loadingUsers, errorUsers } = this.state;
+    const { users, usersById, userQuery, form, errorsByField, loadingUsers, errorUsers } =
+      this.state;
     const hasError = Boolean(errorsByField?.usuario);
+    // El seleccionado sigue como opción aunque no esté en la búsqueda actual
+    const selected = usersById[form.usuario];
+    const options =
+      selected && !users.some((u) => u.id === selected.id)
+        ? [selected, ...users]
+        : users;
     return (
       <div className="flex flex-col gap-1">
         <label htmlFor="usuario" className="text-white/80 text-sm">
           Usuario destinatario
         </label>
+        <input
+          type="search"
+          value={userQuery}
+          onChange={this.handleUserQuery}
+          placeholder="Buscar por email, usuario o nombre…"
+          className="px-4 py-3 rounded-xl bg-white/10 border border-white/20 text-white placeholder-white/50 focus:outline-none focus:ring-2 focus:ring-white/40"
+        />
         <select
           id="usuario"
           name="usuario"
@@ -283,17 +352,17 @@ class Alerta extends Component {
           className={`px-4 py-3 rounded-xl bg-white/10 border ${
             hasError ? "border-red-400" : "border-white/20"
           } text-white focus:outline-none focus:ring-2 focus:ring-white/40`}
-          disabled={loadingUsers || !!errorUsers}
         >
           <option value="" className="bg-gray-800">
-            {loadingUsers ? "Cargando usuarios..." : "Seleccione un usuario"}
+            {loadingUsers
+              ? "Buscando usuarios..."
+              : options.length === 0
+              ? "Sin coincidencias"
+              : "Seleccione un usuario"}
           </option>
-          {users.map((u) => (
+          {options.map((u) => (
             <option key={u.id} value={u.id} className="bg-gray-800 text-white">
-              {u.email || u.username}{" "}
-              {u.first_name || u.last_name
-                ? `(${u.first_name ?? ""} ${u.last_name ?? ""})`
-                : ""}
+              {userOptionLabel(u)}
             </option>
           ))}
         </select>
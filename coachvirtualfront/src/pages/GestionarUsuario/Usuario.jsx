@@ -27,6 +27,7 @@ class Usuario extends Component {
       fecha_expiracion_plan: "",
     },
     items: [],
+    total: 0,
     loadingList: false,
     loadingSave: false,
     errorList: null,
@@ -35,7 +36,7 @@ class Usuario extends Component {
     errorsByField: {},
     isEditing: false,
 
-    // Paginación
+    // Paginación (en el backend)
     currentPage: 1,
     pageSize: 5,
 
@@ -47,15 +48,6 @@ class Usuario extends Component {
     this.loadList();
   }
 
-  componentDidUpdate(prevProps, prevState) {
-    if (
-      prevState.items.length !== this.state.items.length ||
-      prevState.pageSize !== this.state.pageSize
-    ) {
-      this.ensurePageInRange();
-    }
-  }
-
   // ====== Helpers de estado real del plan ======
   /**
    * Devuelve true si el plan está ACTIVO hoy.
@@ -111,32 +103,21 @@ class Usuario extends Component {
   };
 
   // ====== Paginación ======
-  ensurePageInRange = () => {
-    this.setState((prev) => {
-      const totalPages = Math.max(1, Math.ceil(prev.items.length / prev.pageSize));
-      const newPage = Math.min(prev.currentPage, totalPages) || 1;
-      return newPage !== prev.currentPage ? { currentPage: newPage } : null;
-    });
-  };
-
-  goToPage = (p) => this.setState({ currentPage: p });
-
-  getPagedItems = () => {
-    const { items, currentPage, pageSize } = this.state;
-    const start = (currentPage - 1) * pageSize;
-    return items.slice(start, start + pageSize);
-  };
+  goToPage = (p) => this.setState({ currentPage: p }, this.loadList);
 
   // ====== API ======
   loadList = async () => {
+    const { currentPage, pageSize } = this.state;
     this.setState({ loadingList: true, errorList: null });
     try {
-      const resp = await listUsers();
-      this.setState(
-        { items: resp.results, loadingList: false },
-        this.ensurePageInRange
-      );
+      const resp = await listUsers({ page: currentPage, page_size: pageSize });
+      this.setState({ items: resp.results, total: resp.count, loadingList: false });
     } catch (err) {
+      // La página ya no existe (p. ej. se eliminó el último de la última página)
+      if (err?.response?.status === 404 && currentPage > 1) {
+        this.setState({ currentPage: currentPage - 1 }, this.loadList);
+        return;
+      }
       const msg =
         err?.response?.data?.detail ||
         err?.message ||
@@ -219,10 +200,7 @@ class Usuario extends Component {
     if (!window.confirm(`¿Eliminar al usuario "${row.username}"?`)) return;
     try {
       await deleteUser(row.id);
-      this.setState(
-        (prev) => ({ items: prev.items.filter((x) => x.id !== row.id) }),
-        this.ensurePageInRange
-      );
+      this.loadList();
       if (this.state.form.id === row.id) this.resetForm();
     } catch (err) {
       const msg =
@@ -301,10 +279,9 @@ class Usuario extends Component {
           successSave: "Usuario creado correctamente.",
           loadingSave: false,
         });
-        this.setState((prev) => ({ items: [saved, ...prev.items] }));
+        this.loadList();
       }
       this.resetForm();
-      this.ensurePageInRange();
     } catch (err) {
       let msg = "Error al guardar.";
       let fieldErrors = {};
@@ -397,6 +374,7 @@ class Usuario extends Component {
   render() {
     const {
       items,
+      total,
       loadingList,
       errorList,
       loadingSave,
@@ -408,8 +386,7 @@ class Usuario extends Component {
       pageSize,
     } = this.state;
 
-    const total = items.length;
-    const paged = this.getPagedItems();
+    const paged = items;
 
     return (
       <main className="min-h-screen bg-gradient-to-br from-slate-900 via-indigo-900 to-purple-900 p-4 sm:p-6">
@@ -2,6 +2,8 @@ import api from "../api/api";
 
 const ALERTAS = "/alertas/";
 const USUARIOS = "/usuarios/";
+const USUARIOS_MAX_PAGINA = 200;   // page_size máximo del backend
+const USUARIOS_POR_BUSQUEDA = 20;
 
 // Endpoints de “mis alertas”
 const MIS_ALERTAS = "/alertas/mis-alertas/";               // lista completa (solo las del usuario)
@@ -37,8 +39,25 @@ export const AlertaService = {
     return api.get(MIS_ALERTAS_ULT, { params }).then((r) => r.data);
   },
 
-  // ---- Usuarios (para select en admin)
-  listUsers() {
-    return api.get(USUARIOS).then((r) => r.data);
+  // ---- Usuarios (para el select en admin; el listado está paginado)
+  listUsers(params) {
+    return api
+      .get(USUARIOS, { params })
+      .then((r) => (Array.isArray(r.data) ? r.data : r.data.results || []));
+  },
+
+  // Búsqueda por email/usuario/nombre (?q=), primeras coincidencias
+  searchUsers(q, pageSize = USUARIOS_POR_BUSQUEDA) {
+    return AlertaService.listUsers({ q, page_size: pageSize });
+  },
+
+  // Usuarios puntuales por id (?ids=), en lotes del page_size máximo
+  async getUsersByIds(ids) {
+    const lotes = [];
+    for (let i = 0; i < ids.length; i += USUARIOS_MAX_PAGINA) {
+      const lote = ids.slice(i, i + USUARIOS_MAX_PAGINA);
+      lotes.push(AlertaService.listUsers({ ids: lote.join(","), page_size: lote.length }));
+    }
+    return (await Promise.all(lotes)).flat();
   },
 };
@@ -30,6 +30,19 @@ export async function getPlanActual() {
     }
 }
 
+/**
+ * Obtiene el plan actual junto con todos los feature flags y límites
+ */
+export async function getPermisos() {
+    try {
+        const response = await api.get('/suscripciones/permisos/');
+        return response.data;
+    } catch (error) {
+        console.error('Error obteniendo permisos:', error);
+        throw new Error(error.response?.data?.error || 'Error al obtener permisos');
+    }
+}
+
 /**
  * Inicia el proceso de pago con Stripe
  * Redirige al usuario a Stripe Checkout
@@ -139,6 +152,7 @@ export async function verificarPermiso(feature) {
 export default {
     getPlanes,
     getPlanActual,
+    getPermisos,
     iniciarPagoStripe,
     verificarSesionStripe,
     comprarPlan,